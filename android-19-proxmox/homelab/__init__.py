@@ -0,0 +1,6 @@
+"""Python tooling for the Android #19 Proxmox homelab.
+
+Shared helpers used by the Makefile, provisioning scripts and the test
+suite. Everything here reads ``infrastructure-catalog.yml`` as the single
+source of truth for service IDs and IPs.
+"""
@@ -0,0 +1,280 @@
+"""Batch Ansible syntax checking in a single process.
+
+``ansible-playbook --syntax-check`` pays Ansible's multi-second start-up for
+every playbook. This module initialises Ansible's Python API once and checks
+any number of playbooks with it, recording which files each check loaded so
+results can be cached by content hash.
+
+Command line (``make env-check``):
+    python3 -m homelab.ansible_syntax --all
+    python3 -m homelab.ansible_syntax path/to/playbook.yml ...
+
+Test suite: ``SyntaxCheckSession`` keeps one worker process
+(``--serve``) alive for the whole pytest session and serves cached results
+from a JSON file when none of a playbook's inputs changed. It is exposed as
+the ``ansible_syntax`` fixture in ``tests/conftest.py``.
+"""
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from homelab.yaml_loader import load_yaml
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Directories whose top-level *.yml files are playbooks (roles live below them)
+PLAYBOOK_ROOTS = (
+    REPO_ROOT / "android-19-proxmox" / "configuration-by-ansible",
+    REPO_ROOT / "android-16-bastion",
+)
+
+_PLAY_KEYS = ("hosts", "import_playbook", "ansible.builtin.import_playbook")
+
+
+def is_playbook(path: Path) -> bool:
+    """Return True if the file is a list of plays (not a task or vars file)."""
+    try:
+        data = load_yaml(path)
+    except Exception:
+        # Unparseable files are still candidates so the syntax check reports them
+        return True
+    return (
+        isinstance(data, list)
+        and bool(data)
+        and all(isinstance(play, dict) and any(key in play for key in _PLAY_KEYS) for play in data)
+    )
+
+
+def discover_playbooks(roots: Iterable[Path] = PLAYBOOK_ROOTS) -> List[Path]:
+    """Return every playbook directly under the given directories, sorted."""
+    playbooks = []
+    for root in roots:
+        playbooks.extend(p for p in sorted(root.glob("*.yml")) if is_playbook(p))
+    return playbooks
+
+
+class _Checker:
+    """In-process syntax checker; Ansible is imported and configured once."""
+
+    def __init__(self):
+        from ansible.cli import CLI
+        from ansible.cli.playbook import PlaybookCLI
+
+        cli = PlaybookCLI(["ansible-playbook", "--syntax-check", "placeholder.yml"])
+        # CLI.run parses arguments into context.CLIARGS and initialises the
+        # plugin loader; PlaybookCLI.run would go on to execute the placeholder.
+        CLI.run(cli)
+        self._loader, self._inventory, self._variable_manager = cli._play_prereqs()
+        self._loaded: List[str] = []
+
+        read = self._loader._get_file_contents
+
+        def recording_read(file_name):
+            self._loaded.append(os.path.abspath(self._loader.path_dwim(file_name)))
+            return read(file_name)
+
+        self._loader._get_file_contents = recording_read
+
+    def check(self, playbook: str) -> Dict[str, Union[None, str, List[str]]]:
+        """Syntax-check one playbook.
+
+        Returns:
+            Dict with ``error`` (None when valid) and ``files`` (every file
+            Ansible read while loading the playbook, including itself)
+        """
+        from ansible.executor.playbook_executor import PlaybookExecutor
+        from ansible.module_utils.common.text.converters import to_bytes
+        from ansible.plugins.loader import add_all_plugin_dirs
+
+        playbook = os.path.abspath(playbook)
+        self._loaded = [playbook]
+        # Files may change between checks in --serve mode
+        self._loader._FILE_CACHE.clear()
+
+        error = None
+        try:
+            add_all_plugin_dirs(os.path.dirname(to_bytes(playbook)))
+            PlaybookExecutor(
+                playbooks=[playbook],
+                inventory=self._inventory,
+                variable_manager=self._variable_manager,
+                loader=self._loader,
+                passwords={},
+            ).run()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+
+        return {"error": error, "files": sorted(set(self._loaded))}
+
+
+def check_playbooks(playbooks: Iterable[Union[str, Path]]) -> Dict[str, Dict]:
+    """Syntax-check playbooks in this process.
+
+    Returns:
+        Mapping of absolute playbook path to the result of ``_Checker.check``
+    """
+    checker = _Checker()
+    return {os.path.abspath(p): checker.check(str(p)) for p in playbooks}
+
+
+def _serve() -> int:
+    """Answer one JSON line per playbook path read from stdin."""
+    # Keep the protocol on the real stdout; anything Ansible prints goes to stderr
+    protocol = os.fdopen(os.dup(1), "w")
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+
+    checker = _Checker()
+    for line in sys.stdin:
+        playbook = line.strip()
+        if not playbook:
+            continue
+        result = checker.check(playbook)
+        protocol.write(json.dumps({"playbook": os.path.abspath(playbook), **result}) + "\n")
+        protocol.flush()
+    return 0
+
+
+def _layout_digest(roots: Iterable[Path] = PLAYBOOK_ROOTS) -> str:
+    """Hash the set of YAML files under the playbook roots.
+
+    Per-playbook results only track files Ansible actually read, so a newly
+    added file (e.g. a role's handlers/main.yml) must invalidate the cache too.
+    """
+    digest = hashlib.sha256()
+    for root in roots:
+        for path in sorted(root.rglob("*.yml")):
+            digest.update(str(path).encode() + b"\0")
+    return digest.hexdigest()
+
+
+def _file_hash(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class SyntaxCheckSession:
+    """Client for a long-lived ``--serve`` worker with a result cache.
+
+    Args:
+        cwd: Working directory for Ansible (the repo root, so ansible.cfg applies)
+        cache_file: JSON file persisting results between runs (optional)
+    """
+
+    def __init__(self, cwd: Path = REPO_ROOT, cache_file: Optional[Path] = None):
+        self.cwd = Path(cwd)
+        self.cache_file = Path(cache_file) if cache_file else None
+        self._worker: Optional[subprocess.Popen] = None
+        self._layout = _layout_digest()
+        self._cache: Dict[str, Dict] = {}
+        if self.cache_file and self.cache_file.exists():
+            try:
+                stored = json.loads(self.cache_file.read_text())
+            except (OSError, ValueError):
+                stored = {}
+            if stored.get("layout") == self._layout:
+                self._cache = stored.get("results", {})
+
+    @staticmethod
+    def available() -> bool:
+        """Return True if Ansible is importable by this interpreter."""
+        return importlib.util.find_spec("ansible") is not None
+
+    def check(self, playbook: Union[str, Path]) -> Optional[str]:
+        """Return the syntax error for a playbook, or None if it is valid."""
+        return self.check_many([playbook])[os.path.abspath(playbook)]
+
+    def check_many(self, playbooks: Iterable[Union[str, Path]]) -> Dict[str, Optional[str]]:
+        """Check several playbooks, only sending uncached ones to the worker."""
+        results = {}
+        for playbook in playbooks:
+            key = os.path.abspath(playbook)
+            cached = self._cache.get(key)
+            if cached and all(_file_hash(f) == h for f, h in cached["files"].items()):
+                results[key] = cached["error"]
+                continue
+
+            answer = self._ask(key)
+            self._cache[key] = {
+                "error": answer["error"],
+                "files": {f: _file_hash(f) for f in answer["files"]},
+            }
+            results[key] = answer["error"]
+        return results
+
+    def _ask(self, playbook: str) -> Dict:
+        if self._worker is None:
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+                filter(None, [str(Path(__file__).resolve().parents[1]), os.environ.get("PYTHONPATH")])
+            ))
+            self._worker = subprocess.Popen(
+                [sys.executable, "-m", "homelab.ansible_syntax", "--serve"],
+                cwd=str(self.cwd),
+                env=env,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+        self._worker.stdin.write(playbook + "\n")
+        self._worker.stdin.flush()
+        line = self._worker.stdout.readline()
+        if not line:
+            raise RuntimeError(f"Ansible syntax-check worker exited (code {self._worker.poll()})")
+        return json.loads(line)
+
+    def close(self) -> None:
+        """Stop the worker and persist the result cache."""
+        if self._worker is not None:
+            self._worker.stdin.close()
+            self._worker.wait(timeout=30)
+            self._worker = None
+        if self.cache_file:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            self.cache_file.write_text(json.dumps(
+                {"layout": self._layout, "results": self._cache}, indent=1, sort_keys=True
+            ))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m homelab.ansible_syntax",
+        description="Syntax-check Ansible playbooks with a single Ansible start-up.",
+    )
+    parser.add_argument("playbooks", nargs="*", type=Path)
+    parser.add_argument("--all", action="store_true", help="Check every playbook in the repository")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        return _serve()
+
+    playbooks = list(args.playbooks)
+    if args.all:
+        playbooks.extend(discover_playbooks())
+    if not playbooks:
+        parser.error("no playbooks given (pass paths or --all)")
+
+    failures = 0
+    for playbook, result in check_playbooks(playbooks).items():
+        name = os.path.relpath(playbook)
+        if result["error"]:
+            failures += 1
+            print(f"❌ {name}\n   {result['error']}")
+        else:
+            print(f"✅ {name}")
+    print(f"\n{len(playbooks) - failures}/{len(playbooks)} playbooks passed syntax check")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
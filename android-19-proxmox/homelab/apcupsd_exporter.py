@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""Prometheus exporter for apcupsd, speaking its NIS protocol directly.
+
+host-proxmox-monitoring used to run ``apcupsd-to-prom.sh`` from cron: every
+minute it forked ``apcaccess`` and ``awk`` and rewrote a node_exporter
+textfile, so UPS metrics were up to a minute old and each run cost several
+process spawns. This exporter stays resident instead:
+
+- it keeps one TCP connection to apcupsd's Network Information Server
+  (port 3551) and sends ``status`` requests over it, reconnecting when the
+  connection drops;
+- the last reading is cached: scrapes within ``--refresh`` seconds of it are
+  served without asking apcupsd, and when apcupsd cannot be reached the
+  cached reading is served until it is ``--max-age`` seconds old, after
+  which only ``apcupsd_up 0`` is reported;
+- ``/metrics`` serves the fields the script exported (``apcupsd_linev``,
+  ``apcupsd_loadpct``, ``apcupsd_bcharge``, ...) plus gauges derived from
+  STATUS (``apcupsd_online`` and ``apcupsd_status{flag="onbatt"}`` etc.).
+
+It only uses the standard library (plus homelab.exporter, deployed with
+it) and runs from ``apcupsd_exporter.service``.
+
+Usage:
+    from homelab.apcupsd_exporter import NisClient, Exporter
+
+    exporter = Exporter(NisClient("127.0.0.1", 3551), refresh=5, max_age=60)
+    print(exporter.metrics())
+
+Command line:
+    python3 -m homelab.apcupsd_exporter                                   # 127.0.0.1:3551 -> :9162
+    python3 -m homelab.apcupsd_exporter --apcupsd-addr ups:3551 --listen 127.0.0.1:9162
+"""
+import argparse
+import socket
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from homelab.exporter import address, escape, labels, serve
+
+# NIS fields exported as ``apcupsd_<field>`` gauges, in the units apcupsd reports them
+NUMERIC_FIELDS = (
+    "LINEV", "LOADPCT", "BCHARGE", "TIMELEFT", "BATTV", "ITEMP", "LINEFREQ", "NOMPOWER", "TONBATT", "CUMONBATT",
+)
+
+# STATUS flags, each exported as ``apcupsd_status{flag="<lowercase>"}``
+STATUS_FLAGS = (
+    "ONLINE", "ONBATT", "LOWBATT", "CAL", "TRIM", "BOOST", "OVERLOAD", "REPLACEBATT", "COMMLOST", "SHUTTING DOWN",
+    "SLAVE", "SLAVEDOWN", "NOBATT",
+)
+
+
+class NisError(Exception):
+    """apcupsd could not be reached or sent a malformed reply."""
+
+
+def parse_status(lines: List[str]) -> Dict[str, str]:
+    """``KEY : value`` lines of a ``status`` reply as a mapping."""
+    status = {}
+    for line in lines:
+        key, separator, value = line.partition(":")
+        if separator:
+            status[key.strip()] = value.strip()
+    return status
+
+
+def _number(value: str) -> Optional[float]:
+    """Leading number of a value such as ``"230.0 Volts"``."""
+    try:
+        return float(value.split()[0])
+    except (IndexError, ValueError):
+        return None
+
+
+class NisClient:
+    """A persistent connection to apcupsd's Network Information Server."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 3551, timeout: float = 5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._socket: Optional[socket.socket] = None
+        self.connects = 0
+
+    def _connect(self) -> socket.socket:
+        if self._socket is None:
+            try:
+                self._socket = socket.create_connection((self.host, self.port), self.timeout)
+            except OSError as e:
+                raise NisError(f"cannot connect to apcupsd at {self.host}:{self.port}: {e}") from e
+            self.connects += 1
+        return self._socket
+
+    def close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def _receive(self, sock: socket.socket, size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise NisError("apcupsd closed the connection")
+            data += chunk
+        return data
+
+    def _request(self, command: str) -> List[str]:
+        sock = self._connect()
+        payload = command.encode("ascii")
+        sock.sendall(struct.pack("!H", len(payload)) + payload)
+        lines = []
+        while True:
+            (length,) = struct.unpack("!H", self._receive(sock, 2))
+            if length == 0:
+                return lines
+            lines.append(self._receive(sock, length).decode("ascii", "replace").rstrip("\n"))
+
+    def status(self) -> Dict[str, str]:
+        """Send ``status`` and parse the reply.
+
+        A request failing on a reused connection (apcupsd restarted, idle
+        timeout) is retried once on a fresh one.
+
+        Raises:
+            NisError: If apcupsd cannot be reached or the reply is malformed
+        """
+        reused = self._socket is not None
+        try:
+            status = parse_status(self._request("status"))
+        except (OSError, NisError) as e:
+            self.close()
+            if reused:
+                return self.status()
+            raise e if isinstance(e, NisError) else NisError(f"apcupsd request failed: {e}") from e
+        if not status:
+            self.close()
+            raise NisError("apcupsd sent an empty status")
+        return status
+
+
+def render(status: Optional[Dict[str, str]], up: bool, age: Optional[float], errors: int) -> str:
+    """The Prometheus text exposition for a reading (``None`` when there is none to serve)."""
+    lines = [
+        "# HELP apcupsd_up Whether the last reading is fresh enough to be served.",
+        "# TYPE apcupsd_up gauge",
+        f"apcupsd_up {int(up)}",
+        "# HELP apcupsd_nis_errors_total Failed requests to apcupsd's NIS.",
+        "# TYPE apcupsd_nis_errors_total counter",
+        f"apcupsd_nis_errors_total {errors}",
+    ]
+    if age is not None:
+        lines += [
+            "# HELP apcupsd_reading_age_seconds Age of the served reading.",
+            "# TYPE apcupsd_reading_age_seconds gauge",
+            f"apcupsd_reading_age_seconds {age:.3f}",
+        ]
+    if status is None:
+        return "\n".join(lines) + "\n"
+
+    for field in NUMERIC_FIELDS:
+        value = _number(status.get(field, ""))
+        if value is not None:
+            name = f"apcupsd_{field.lower()}"
+            lines += [f"# TYPE {name} gauge", f"{name} {value:g}"]
+
+    flags = status.get("STATUS", "").upper()
+    lines += ["# HELP apcupsd_online Whether the UPS runs on line power.", "# TYPE apcupsd_online gauge",
+              f"apcupsd_online {int('ONLINE' in flags.split())}",
+              "# HELP apcupsd_status Flags set in the UPS STATUS.", "# TYPE apcupsd_status gauge"]
+    for flag in STATUS_FLAGS:
+        # "SHUTTING DOWN" is the only two-word flag
+        present = flag in flags if " " in flag else flag in flags.split()
+        lines.append(f'apcupsd_status{{flag="{flag.lower().replace(" ", "_")}"}} {int(present)}')
+
+    if "SELFTEST" in status:
+        lines += ["# HELP apcupsd_selftest_info Result of the last self test.", "# TYPE apcupsd_selftest_info gauge",
+                  f'apcupsd_selftest_info{{result="{escape(status["SELFTEST"])}"}} 1']
+    info = {key.lower(): status[key] for key in ("UPSNAME", "MODEL", "SERIALNO", "VERSION") if key in status}
+    if info:
+        lines += ["# TYPE apcupsd_info gauge", f"apcupsd_info{{{labels(**info)}}} 1"]
+    return "\n".join(lines) + "\n"
+
+
+class Exporter:
+    """Caches apcupsd readings between scrapes within a staleness bound."""
+
+    def __init__(self, client: NisClient, refresh: float = 5.0, max_age: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.client = client
+        self.refresh = refresh
+        self.max_age = max_age
+        self.clock = clock
+        self.errors = 0
+        self._reading: Optional[Tuple[float, Dict[str, str]]] = None
+        self._lock = threading.Lock()
+
+    def reading(self) -> Tuple[Optional[Dict[str, str]], Optional[float]]:
+        """The reading to serve and its age; refreshed from apcupsd once older than ``refresh``."""
+        with self._lock:
+            now = self.clock()
+            if self._reading is None or now - self._reading[0] >= self.refresh:
+                try:
+                    self._reading = (now, self.client.status())
+                except NisError as e:
+                    self.errors += 1
+                    print(f"ERROR: {e}", file=sys.stderr)
+            if self._reading is None:
+                return None, None
+            age = now - self._reading[0]
+            return (self._reading[1] if age <= self.max_age else None), age
+
+    def metrics(self) -> str:
+        status, age = self.reading()
+        return render(status, status is not None, age, self.errors)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m homelab.apcupsd_exporter",
+                                     description=__doc__.split("\n\n")[0])
+    parser.add_argument("--apcupsd-addr", type=address("127.0.0.1"), default=("127.0.0.1", 3551),
+                        help="apcupsd NIS address (default: 127.0.0.1:3551)")
+    parser.add_argument("--listen", type=address(), default=("", 9162),
+                        help="Address to serve /metrics on (default: :9162)")
+    parser.add_argument("--refresh", type=float, default=5.0,
+                        help="Seconds a reading is served before apcupsd is asked again (default: 5)")
+    parser.add_argument("--max-age", type=float, default=60.0,
+                        help="Seconds a reading is served while apcupsd is unreachable (default: 60)")
+    args = parser.parse_args(argv)
+
+    exporter = Exporter(NisClient(*args.apcupsd_addr), refresh=args.refresh, max_age=args.max_age)
+    try:
+        return serve(args.listen, exporter.metrics, "apcupsd metrics",
+                     f"serving apcupsd {args.apcupsd_addr[0]}:{args.apcupsd_addr[1]}")
+    finally:
+        exporter.client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+"""Parsed, indexed view of the infrastructure catalog.
+
+``infrastructure-catalog.yml`` is the source of truth for every service ID
+and IP in the homelab. This module parses it once per process, validates it
+into typed records and exposes O(1) lookups by VM ID, name, IP and type, so
+tests, scripts and Makefile targets share one view instead of re-walking
+``catalog['services']`` themselves.
+
+Usage:
+    from homelab.catalog import load_catalog
+
+    catalog = load_catalog()
+    catalog.service(140).ip              # '192.168.0.140'
+    catalog.by_name('adguard').id        # 125
+    catalog.by_ip('192.168.0.26').name   # 'monitoring'
+    catalog.of_type('container')         # (Service(125), Service(130), ...)
+
+Command line (used by the Makefile and provisioning scripts):
+    python3 -m homelab.catalog list
+    python3 -m homelab.catalog services --type container
+    python3 -m homelab.catalog get 125 ip
+    python3 -m homelab.catalog proxmox ip node_name
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from homelab.yaml_loader import load_yaml
+
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parent.parent / "infrastructure-catalog.yml"
+
+SERVICE_TYPES = ("container", "vm")
+
+_REQUIRED_SERVICE_FIELDS = ("name", "type", "ip")
+_REQUIRED_PROXMOX_FIELDS = ("ip", "node_name")
+_REQUIRED_NETWORK_FIELDS = ("subnet", "gateway", "dns")
+
+
+class CatalogError(ValueError):
+    """Raised when the infrastructure catalog is malformed."""
+
+
+class Resources:
+    """CPU, memory (MB) and disk (GB) allocation for a service."""
+
+    __slots__ = ("cores", "memory", "disk")
+
+    def __init__(self, cores: int, memory: int, disk: int):
+        self.cores = cores
+        self.memory = memory
+        self.disk = disk
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Resources":
+        return cls(data.get("cores"), data.get("memory"), data.get("disk"))
+
+    def __repr__(self) -> str:
+        return f"Resources(cores={self.cores}, memory={self.memory}, disk={self.disk})"
+
+
+class Service:
+    """A container or VM entry from ``services:``.
+
+    The original mapping is kept in ``raw`` for fields that have no typed
+    attribute (e.g. ``cloud_init_password``).
+    """
+
+    __slots__ = (
+        "id", "name", "type", "ip", "description", "template",
+        "template_vm_id", "iso", "cloud_init", "cloud_init_user", "agent",
+        "onboot", "gpu_passthrough", "resources", "storage", "raw",
+    )
+
+    def __init__(self, service_id: int, data: Dict[str, Any]):
+        self.id = service_id
+        self.name = data["name"]
+        self.type = data["type"]
+        self.ip = data["ip"]
+        self.description = data.get("description", "")
+        self.template = data.get("template")
+        self.template_vm_id = data.get("template_vm_id")
+        self.iso = data.get("iso")
+        self.cloud_init = data.get("cloud_init", False)
+        self.cloud_init_user = data.get("cloud_init_user")
+        self.agent = data.get("agent", False)
+        self.onboot = data.get("onboot", False)
+        self.gpu_passthrough = data.get("gpu_passthrough")
+        self.resources = Resources.from_dict(data.get("resources") or {})
+        self.storage = data.get("storage")
+        self.raw = data
+
+    @property
+    def is_vm(self) -> bool:
+        return self.type == "vm"
+
+    @property
+    def is_container(self) -> bool:
+        return self.type == "container"
+
+    @property
+    def gpu_enabled(self) -> bool:
+        """Whether ``gpu_passthrough.enabled`` is set (the key holds a mapping, not a flag)."""
+        return bool((self.gpu_passthrough or {}).get("enabled"))
+
+    @property
+    def gpu_device(self) -> Optional[str]:
+        """PCI address of the service's passthrough GPU, if one is assigned."""
+        return (self.gpu_passthrough or {}).get("device_id")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a raw catalog field, like ``dict.get``."""
+        return self.raw.get(key, default)
+
+    def __repr__(self) -> str:
+        return f"Service({self.id}, name={self.name!r}, type={self.type!r}, ip={self.ip!r})"
+
+
+class Network:
+    """The ``network:`` section (subnet, gateway, DNS and IP ranges)."""
+
+    __slots__ = ("subnet", "gateway", "dns", "ranges", "raw")
+
+    def __init__(self, data: Dict[str, Any]):
+        self.subnet = data["subnet"]
+        self.gateway = data["gateway"]
+        self.dns = data["dns"]
+        self.ranges = data.get("ranges") or {}
+        self.raw = data
+
+
+class Proxmox:
+    """The ``proxmox:`` section describing the hypervisor host."""
+
+    __slots__ = ("ip", "node_name", "api_port", "raw")
+
+    def __init__(self, data: Dict[str, Any]):
+        self.ip = data["ip"]
+        self.node_name = data["node_name"]
+        self.api_port = data.get("api_port", 8006)
+        self.raw = data
+
+
+class Catalog:
+    """Validated catalog with indexes by ID, name, IP and type.
+
+    ``raw`` is the parsed YAML document, shared by every consumer of
+    :func:`load_catalog` - treat it as read-only.
+    """
+
+    __slots__ = ("path", "raw", "services", "network", "proxmox",
+                 "_by_name", "_by_ip", "_by_type")
+
+    def __init__(self, data: Dict[str, Any], path: Optional[Path] = None):
+        if not isinstance(data, dict):
+            raise CatalogError(f"{path or 'catalog'}: top level must be a mapping")
+
+        self.path = path
+        self.raw = data
+        self.services: Dict[int, Service] = {}
+        self._by_name: Dict[str, Service] = {}
+        self._by_ip: Dict[str, Service] = {}
+        self._by_type: Dict[str, List[Service]] = {kind: [] for kind in SERVICE_TYPES}
+
+        services = data.get("services")
+        if not isinstance(services, dict) or not services:
+            raise CatalogError("catalog must define a non-empty 'services' mapping")
+
+        for service_id, entry in services.items():
+            self._add_service(service_id, entry)
+
+        self.proxmox = Proxmox(_require(data, "proxmox", _REQUIRED_PROXMOX_FIELDS))
+        self.network = Network(_require(data, "network", _REQUIRED_NETWORK_FIELDS))
+
+    def _add_service(self, service_id: Any, entry: Any) -> None:
+        if not isinstance(service_id, int):
+            raise CatalogError(f"service ID {service_id!r} must be an integer")
+        if not isinstance(entry, dict):
+            raise CatalogError(f"service {service_id} must be a mapping")
+
+        missing = [field for field in _REQUIRED_SERVICE_FIELDS if field not in entry]
+        if missing:
+            raise CatalogError(f"service {service_id} missing required field(s): {', '.join(missing)}")
+        if entry["type"] not in SERVICE_TYPES:
+            raise CatalogError(
+                f"service {service_id} has type {entry['type']!r}, "
+                f"expected one of {', '.join(SERVICE_TYPES)}"
+            )
+
+        service = Service(service_id, entry)
+        if service.name in self._by_name:
+            raise CatalogError(
+                f"duplicate service name {service.name!r} "
+                f"(IDs {self._by_name[service.name].id} and {service_id})"
+            )
+        if service.ip in self._by_ip:
+            raise CatalogError(
+                f"duplicate IP {service.ip} "
+                f"(IDs {self._by_ip[service.ip].id} and {service_id})"
+            )
+
+        self.services[service_id] = service
+        self._by_name[service.name] = service
+        self._by_ip[service.ip] = service
+        self._by_type[service.type].append(service)
+
+    def service(self, service_id: int) -> Service:
+        """Return the service with the given VM/CT ID.
+
+        Raises:
+            KeyError: If the ID is not in the catalog
+        """
+        return self.services[service_id]
+
+    def by_name(self, name: str) -> Optional[Service]:
+        """Return the service with the given name, or None."""
+        return self._by_name.get(name)
+
+    def by_ip(self, ip: str) -> Optional[Service]:
+        """Return the service assigned the given IP, or None."""
+        return self._by_ip.get(ip)
+
+    def of_type(self, kind: str) -> Tuple[Service, ...]:
+        """Return all services of a type ('container' or 'vm') in catalog order."""
+        return tuple(self._by_type.get(kind, ()))
+
+    @property
+    def containers(self) -> Tuple[Service, ...]:
+        return self.of_type("container")
+
+    @property
+    def vms(self) -> Tuple[Service, ...]:
+        return self.of_type("vm")
+
+    def __iter__(self) -> Iterator[Service]:
+        return iter(self.services.values())
+
+    def __len__(self) -> int:
+        return len(self.services)
+
+    def __contains__(self, service_id: object) -> bool:
+        return service_id in self.services
+
+
+def _require(data: Dict[str, Any], section: str, fields: Tuple[str, ...]) -> Dict[str, Any]:
+    value = data.get(section)
+    if not isinstance(value, dict):
+        raise CatalogError(f"catalog must define a '{section}' mapping")
+    missing = [field for field in fields if field not in value]
+    if missing:
+        raise CatalogError(f"'{section}' missing required field(s): {', '.join(missing)}")
+    return value
+
+
+# Parsed catalogs keyed by resolved path; reloaded when the file's mtime changes.
+_cache: Dict[Path, Tuple[int, Catalog]] = {}
+
+
+def load_catalog(path: Optional[Path] = None) -> Catalog:
+    """Load and index the catalog, reusing the parsed copy while the file is unchanged.
+
+    Args:
+        path: Catalog file (default: android-19-proxmox/infrastructure-catalog.yml)
+
+    Returns:
+        Shared Catalog instance
+
+    Raises:
+        CatalogError: If the catalog fails validation
+    """
+    resolved = Path(path or DEFAULT_CATALOG_PATH).resolve()
+    mtime = resolved.stat().st_mtime_ns
+
+    cached = _cache.get(resolved)
+    if cached and cached[0] == mtime:
+        sys.audit("homelab.read", str(resolved))
+        return cached[1]
+
+    catalog = Catalog(load_yaml(resolved), path=resolved)
+    _cache[resolved] = (mtime, catalog)
+    return catalog
+
+
+def _lookup(data: Dict[str, Any], field: str) -> Any:
+    """Resolve a dotted field path (e.g. ``resources.cores``) in a raw mapping."""
+    value: Any = data
+    for part in field.split("."):
+        if not isinstance(value, dict) or part not in value:
+            raise KeyError(field)
+        value = value[part]
+    return value
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m homelab.catalog", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--catalog", type=Path, default=None, help="Path to infrastructure-catalog.yml")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="List all services with name, IP and description")
+
+    services = commands.add_parser("services", help="Print id:name:ip for each service")
+    services.add_argument("--type", choices=SERVICE_TYPES, help="Only services of this type")
+
+    get = commands.add_parser("get", help="Print fields of one service")
+    get.add_argument("service_id", type=int)
+    get.add_argument("fields", nargs="+", help="Field names, dotted for nested (resources.cores)")
+
+    for section in ("proxmox", "network"):
+        sub = commands.add_parser(section, help=f"Print fields of the {section} section")
+        sub.add_argument("fields", nargs="+")
+
+    args = parser.parse_args(argv)
+
+    try:
+        catalog = load_catalog(args.catalog)
+        if args.command == "list":
+            for service in catalog:
+                print(f"{service.id}: {service.name} ({service.ip}) - {service.description}")
+        elif args.command == "services":
+            selected = catalog.of_type(args.type) if args.type else tuple(catalog)
+            for service in selected:
+                print(f"{service.id}:{service.name}:{service.ip}")
+        elif args.command == "get":
+            raw = catalog.service(args.service_id).raw
+            print(" ".join(str(_lookup(raw, field)) for field in args.fields))
+        else:
+            raw = catalog.raw[args.command]
+            print(" ".join(str(_lookup(raw, field)) for field in args.fields))
+    except KeyError as e:
+        print(f"ERROR: not found in catalog: {e.args[0]}", file=sys.stderr)
+        return 1
+    except (OSError, CatalogError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
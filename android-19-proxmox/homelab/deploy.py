@@ -0,0 +1,464 @@
+"""Parallel, dependency-aware deployment of the homelab.
+
+The Makefile deploy targets run Terraform and Ansible strictly in sequence.
+This module derives a DAG of stages from the infrastructure catalog and runs
+independent stages concurrently on a bounded worker pool:
+
+- ``terraform-init`` first, then one ``terraform apply`` per group of services
+  with the same prerequisites (Terraform parallelises resources inside an
+  apply; applies share the state lock so they never overlap);
+- VMs cloned from the cloud image template (9000) wait for
+  ``proxmox-cloud-templates``; VMs cloned from a catalog VM wait for that VM;
+- ``ready:<id>`` waits for a new VM's guest agent, SSH and cloud-init
+  (``homelab.readiness``) instead of sleeping;
+- ``configure:<id>`` runs the service's playbook once its resources exist
+  (and the VM is ready), after the DNS server (the service at ``network.dns``) is configured;
+  services attaching the same PCI device (``gpu_passthrough.device_id``) take turns;
+- ``prepare:<id>`` downloads a service's ISO (only the ``download``/``iso``
+  tagged tasks of its playbook) before Terraform creates it;
+- ``proxmox-base`` and ``bastion`` playbooks run alongside everything else;
+  playbooks that configure the Proxmox host itself (base, cloud templates,
+  GPU passthrough, ISO downloads) take turns so they never race on apt/dpkg;
+- ``proxmox-gpu-passthrough`` (when a service has ``gpu_passthrough.enabled``)
+  may reboot the Proxmox host, so it runs first and every stage except
+  ``bastion`` waits for it.
+
+Stages stream their output prefixed with the stage name and a per-stage
+timing table is printed at the end.
+
+Command line (run inside the homelab-dev container, from the repo root):
+    python3 -m homelab.deploy                  # full lab rebuild
+    python3 -m homelab.deploy proxmox-base services   # Proxmox host + every service
+    python3 -m homelab.deploy 140 160          # services and their prerequisites
+    python3 -m homelab.deploy bastion proxmox-base --workers 2
+    python3 -m homelab.deploy --dry-run
+"""
+import argparse
+import json
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, TextIO
+
+from homelab.catalog import Catalog, Service, load_catalog
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+INVENTORY = "inventory.yml"
+PLAYBOOK_DIR = "android-19-proxmox/configuration-by-ansible"
+TERRAFORM_DIR = "android-19-proxmox/provisioning-by-terraform"
+
+# Proxmox template VM IDs created by the cloud-templates host role, not Terraform
+CLOUD_TEMPLATE_IDS = (9000,)
+
+# Playbook that configures each service once Terraform has created it
+CONFIGURE_PLAYBOOKS = {
+    125: "adguard-setup.yml",
+    126: "monitoring-stack-setup.yml",
+    106: "ubuntu-desktop-openclaw-setup.yml",
+    140: "vm-llm-aimachine-setup.yml",
+    141: "vm-llm-aimachine-testing-setup.yml",
+    160: "vm-coolify-platform.yml",
+}
+
+# Playbook that must run before Terraform creates the service (ISO downloads)
+PREPARE_PLAYBOOKS = {
+    101: "omarchy-vm-setup.yml",
+    103: "ubuntu-desktop-dev-setup.yml",
+}
+
+# Only the ISO tasks: the rest of these playbooks configures the running VM
+PREPARE_TAGS = "download,iso"
+
+# Stages that hold the same lock never run at the same time
+TERRAFORM_LOCK = "terraform-state"
+PROXMOX_HOST_LOCK = "proxmox-host"
+PCI_DEVICE_LOCK = "pci:{}"
+
+# Stage that may reboot the Proxmox host (host-gpu-passthrough's reboot-system.yml)
+GPU_PASSTHROUGH_STAGE = "proxmox-gpu-passthrough"
+
+# Target selecting every catalog service
+ALL_SERVICES = "services"
+
+
+class PlanError(ValueError):
+    """Raised when a deployment plan references unknown stages or has a cycle."""
+
+
+class Stage:
+    """One command in the deployment DAG."""
+
+    __slots__ = ("name", "command", "deps", "lock", "description")
+
+    def __init__(self, name: str, command: List[str], deps: Iterable[str] = (),
+                 lock: Optional[str] = None, description: str = ""):
+        self.name = name
+        self.command = command
+        self.deps: Set[str] = set(deps)
+        self.lock = lock
+        self.description = description
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, deps={sorted(self.deps)})"
+
+
+class StageResult:
+    """Outcome and timing of a stage; ``start`` is seconds since the run began."""
+
+    __slots__ = ("name", "status", "start", "elapsed", "returncode")
+
+    def __init__(self, name: str, status: str, start: float = 0.0, elapsed: float = 0.0,
+                 returncode: Optional[int] = None):
+        self.name = name
+        self.status = status
+        self.start = start
+        self.elapsed = elapsed
+        self.returncode = returncode
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+    def as_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+def _playbook(name: str, *args: str) -> List[str]:
+    return ["ansible-playbook", "--inventory", INVENTORY, f"{PLAYBOOK_DIR}/{name}", *args]
+
+
+def _terraform(*args: str) -> List[str]:
+    return ["terraform", f"-chdir={TERRAFORM_DIR}", *args]
+
+
+def _readiness(vm_id: int) -> List[str]:
+    return [sys.executable, "-m", "homelab.readiness", str(vm_id)]
+
+
+def terraform_address(service: Service) -> str:
+    """Terraform resource address of a catalog service."""
+    if service.is_container:
+        return f'proxmox_virtual_environment_container.containers["{service.id}"]'
+    return f'proxmox_virtual_environment_vm.vms["{service.id}"]'
+
+
+def _selected(catalog: Catalog, targets: Sequence[str]) -> List[Service]:
+    """Resolve service IDs/names plus their clone sources, in catalog order."""
+    wanted: Set[int] = set()
+    queue = []
+    for target in targets:
+        service = catalog.services.get(int(target)) if str(target).isdigit() else catalog.by_name(target)
+        if service is None:
+            raise PlanError(f"unknown service: {target}")
+        queue.append(service)
+    while queue:
+        service = queue.pop()
+        if service.id in wanted:
+            continue
+        wanted.add(service.id)
+        source = service.template_vm_id
+        if source in catalog and source != service.id:
+            queue.append(catalog.service(source))
+    return [service for service in catalog if service.id in wanted]
+
+
+def build_plan(
+    catalog: Catalog,
+    targets: Optional[Sequence[str]] = None,
+) -> Dict[str, Stage]:
+    """Derive the deployment DAG for the catalog.
+
+    Args:
+        catalog: Parsed infrastructure catalog
+        targets: Service IDs or names, ``services`` for all of them, and/or
+            ``bastion``/``proxmox-base`` (default: everything)
+
+    Returns:
+        Stages by name, in a stable order
+
+    Raises:
+        PlanError: If a target is unknown or the DAG has a cycle
+    """
+    host_stages = {
+        "bastion": Stage("bastion", ["ansible-playbook", "--inventory", INVENTORY, "android-16-bastion/playbook.yml"],
+                         description="Bastion configuration"),
+        "proxmox-base": Stage("proxmox-base", _playbook("playbook.yml"), lock=PROXMOX_HOST_LOCK,
+                              description="Base Proxmox configuration"),
+    }
+    targets = [str(t) for t in targets or []]
+    wanted_hosts = [t for t in targets if t in host_stages] if targets else list(host_stages)
+    service_targets = [t for t in targets if t not in host_stages]
+    if not targets or ALL_SERVICES in service_targets:
+        services = list(catalog)
+    else:
+        services = _selected(catalog, service_targets) if service_targets else []
+
+    plan: Dict[str, Stage] = {name: host_stages[name] for name in wanted_hosts}
+    if not services:
+        return plan
+
+    def add(stage: Stage) -> Stage:
+        plan.setdefault(stage.name, stage)
+        return plan[stage.name]
+
+    add(Stage("terraform-init", _terraform("init"), lock=TERRAFORM_LOCK, description="Initialize Terraform"))
+    if any(s.template_vm_id in CLOUD_TEMPLATE_IDS for s in services):
+        add(Stage("proxmox-cloud-templates", _playbook("proxmox-host-setup.yml", "--tags", "cloud-templates"),
+                  lock=PROXMOX_HOST_LOCK, description="Ubuntu cloud image templates"))
+    if any(s.gpu_enabled for s in services):
+        add(Stage(GPU_PASSTHROUGH_STAGE, _playbook("gpu-passthrough-setup.yml"),
+                  lock=PROXMOX_HOST_LOCK, description="GPU passthrough on the Proxmox host"))
+    for service in services:
+        if service.id in PREPARE_PLAYBOOKS:
+            add(Stage(f"prepare:{service.id}", _playbook(PREPARE_PLAYBOOKS[service.id], "--tags", PREPARE_TAGS),
+                      lock=PROXMOX_HOST_LOCK, description=f"Prepare {service.name}"))
+
+    # Group services into one terraform apply per distinct set of prerequisites
+    selected_ids = {s.id for s in services}
+    apply_of: Dict[int, str] = {}
+    remaining = list(services)
+    while remaining:
+        groups: Dict[frozenset, List[Service]] = {}
+        deferred = []
+        for service in remaining:
+            source = service.template_vm_id
+            if source in selected_ids and source != service.id and source not in apply_of:
+                deferred.append(service)
+                continue
+            deps = {"terraform-init"}
+            if source in CLOUD_TEMPLATE_IDS:
+                deps.add("proxmox-cloud-templates")
+            elif source in apply_of and source != service.id:
+                deps.add(apply_of[source])
+            if service.id in PREPARE_PLAYBOOKS:
+                deps.add(f"prepare:{service.id}")
+            groups.setdefault(frozenset(deps), []).append(service)
+        if len(deferred) == len(remaining):
+            raise PlanError(f"clone cycle between services {sorted(s.id for s in deferred)}")
+        for deps, members in groups.items():
+            name = "terraform:" + ",".join(str(s.id) for s in members)
+            command = _terraform("apply", "-auto-approve", *(f"-target={terraform_address(s)}" for s in members))
+            add(Stage(name, command, deps, lock=TERRAFORM_LOCK,
+                      description="Create " + ", ".join(s.name for s in members)))
+            for member in members:
+                apply_of[member.id] = name
+        remaining = deferred
+
+    dns = catalog.by_ip(catalog.network.dns)
+    dns_stage = f"configure:{dns.id}" if dns and dns.id in selected_ids and dns.id in CONFIGURE_PLAYBOOKS else None
+    for service in services:
+        playbook = CONFIGURE_PLAYBOOKS.get(service.id)
+        if playbook is None:
+            continue
+        deps = {apply_of[service.id]}
+        if service.is_vm and (service.agent or service.cloud_init):
+            deps = {add(Stage(f"ready:{service.id}", _readiness(service.id), deps,
+                              description=f"Wait for {service.name} to boot")).name}
+        if dns_stage and service.id != dns.id:
+            deps.add(dns_stage)
+        # vm-llm-aimachine attaches device_id whether or not the catalog enables passthrough
+        lock = PCI_DEVICE_LOCK.format(service.gpu_device) if service.gpu_device else None
+        add(Stage(f"configure:{service.id}", _playbook(playbook), deps, lock=lock,
+                  description=f"Configure {service.name}"))
+
+    if GPU_PASSTHROUGH_STAGE in plan:
+        # A barrier: nothing may talk to the host while it can reboot
+        for stage in plan.values():
+            if stage.name not in (GPU_PASSTHROUGH_STAGE, "bastion"):
+                stage.deps.add(GPU_PASSTHROUGH_STAGE)
+
+    validate_plan(plan)
+    return plan
+
+
+def validate_plan(plan: Dict[str, Stage]) -> None:
+    """Check every dependency exists and the graph is acyclic.
+
+    Raises:
+        PlanError: On an unknown dependency or a cycle
+    """
+    for stage in plan.values():
+        unknown = stage.deps - plan.keys()
+        if unknown:
+            raise PlanError(f"{stage.name} depends on unknown stage(s): {', '.join(sorted(unknown))}")
+    waves(plan)
+
+
+def waves(plan: Dict[str, Stage]) -> List[List[str]]:
+    """Group stages into topological levels (stages in a level are independent).
+
+    Raises:
+        PlanError: If the plan has a cycle
+    """
+    done: Set[str] = set()
+    levels = []
+    while len(done) < len(plan):
+        level = [name for name, stage in plan.items() if name not in done and stage.deps <= done]
+        if not level:
+            raise PlanError(f"dependency cycle among: {', '.join(sorted(plan.keys() - done))}")
+        levels.append(level)
+        done.update(level)
+    return levels
+
+
+_print_lock = threading.Lock()
+
+
+def _emit(out: TextIO, text: str) -> None:
+    with _print_lock:
+        out.write(text)
+        out.flush()
+
+
+def run_command(stage: Stage, out: TextIO = sys.stdout) -> int:
+    """Run a stage's command from the repo root, prefixing its output lines."""
+    process = subprocess.Popen(
+        stage.command,
+        cwd=str(REPO_ROOT),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+    )
+    for line in process.stdout:
+        _emit(out, f"[{stage.name}] {line}")
+    return process.wait()
+
+
+def run_plan(
+    plan: Dict[str, Stage],
+    workers: int = 4,
+    runner: Optional[Callable[[Stage], int]] = None,
+    out: TextIO = sys.stdout,
+) -> Dict[str, StageResult]:
+    """Execute a plan, running every ready stage concurrently up to ``workers``.
+
+    A failed stage skips everything that depends on it; independent stages
+    still run.
+
+    Args:
+        plan: Stages by name (see build_plan)
+        workers: Maximum stages running at once
+        runner: Callable running a stage and returning its exit code
+            (default: run_command)
+        out: Stream for progress output
+
+    Returns:
+        StageResult per stage, in completion order
+    """
+    validate_plan(plan)
+    runner = runner or (lambda stage: run_command(stage, out))
+    results: Dict[str, StageResult] = {}
+    pending = dict(plan)
+    running: Dict[Future, StageResult] = {}
+    locks: Set[str] = set()
+    t0 = time.monotonic()
+
+    def timed(stage: Stage, result: StageResult) -> StageResult:
+        start = time.monotonic()
+        try:
+            result.returncode = runner(stage)
+        except Exception as e:
+            _emit(out, f"[{stage.name}] {type(e).__name__}: {e}\n")
+            result.returncode = -1
+        result.elapsed = time.monotonic() - start
+        result.status = "ok" if result.returncode == 0 else "failed"
+        return result
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="deploy") as pool:
+        while pending or running:
+            skipped = True
+            while skipped:
+                skipped = False
+                for name, stage in list(pending.items()):
+                    blocked = [d for d in stage.deps if d in results and not results[d].ok]
+                    if blocked:
+                        results[name] = StageResult(name, "skipped", time.monotonic() - t0)
+                        del pending[name]
+                        skipped = True
+                        _emit(out, f"⏭️  {name} skipped ({', '.join(sorted(blocked))} did not succeed)\n")
+
+            for name, stage in list(pending.items()):
+                if len(running) >= workers:
+                    break
+                if not all(d in results and results[d].ok for d in stage.deps):
+                    continue
+                if stage.lock and stage.lock in locks:
+                    continue
+                if stage.lock:
+                    locks.add(stage.lock)
+                del pending[name]
+                _emit(out, f"▶️  {name}: {stage.description or ' '.join(stage.command)}\n")
+                result = StageResult(name, "running", time.monotonic() - t0)
+                running[pool.submit(timed, stage, result)] = result
+
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                del running[future]
+                stage = plan[result.name]
+                if stage.lock:
+                    locks.discard(stage.lock)
+                results[result.name] = result
+                icon = "✅" if result.ok else "❌"
+                _emit(out, f"{icon} {result.name} {result.status} in {result.elapsed:.1f}s\n")
+    return results
+
+
+def format_timings(results: Dict[str, StageResult]) -> str:
+    """Render a per-stage timing table with wall time versus serial time."""
+    ordered = sorted(results.values(), key=lambda r: (r.start, r.name))
+    width = max((len(r.name) for r in ordered), default=5)
+    lines = [f"{'Stage':<{width}}  {'Status':<8} {'Start':>8} {'Duration':>9}"]
+    for r in ordered:
+        lines.append(f"{r.name:<{width}}  {r.status:<8} {r.start:>7.1f}s {r.elapsed:>8.1f}s")
+    wall = max((r.start + r.elapsed for r in ordered), default=0.0)
+    serial = sum(r.elapsed for r in ordered)
+    lines.append(f"Wall time {wall:.1f}s; stages sum to {serial:.1f}s"
+                 + (f" ({serial / wall:.1f}x parallel speed-up)" if wall else ""))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m homelab.deploy",
+        description="Deploy the homelab with independent stages in parallel.",
+    )
+    parser.add_argument("targets", nargs="*",
+                        help="Service IDs or names, 'services', 'bastion', 'proxmox-base' (default: everything)")
+    parser.add_argument("--catalog", type=Path, default=None, help="Path to infrastructure-catalog.yml")
+    parser.add_argument("--workers", type=int, default=4, help="Maximum concurrent stages (default: 4)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the stage graph without running it")
+    parser.add_argument("--timings-json", type=Path, help="Write per-stage timings to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        plan = build_plan(load_catalog(args.catalog), args.targets)
+    except PlanError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+
+    if args.dry_run:
+        for number, level in enumerate(waves(plan), 1):
+            print(f"Wave {number}:")
+            for name in level:
+                stage = plan[name]
+                after = f"  (after {', '.join(sorted(stage.deps))})" if stage.deps else ""
+                print(f"  {name}: {' '.join(stage.command)}{after}")
+        return 0
+
+    results = run_plan(plan, workers=args.workers)
+    print()
+    print(format_timings(results))
+    if args.timings_json:
+        args.timings_json.write_text(json.dumps([r.as_dict() for r in results.values()], indent=2))
+    return 0 if all(r.ok for r in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
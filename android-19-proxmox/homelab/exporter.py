@@ -0,0 +1,100 @@
+"""Shared plumbing for the homelab's Prometheus exporters.
+
+homelab.apcupsd_exporter, homelab.pve_exporter and homelab.ollama_exporter
+run on hosts that have none of the repo's dependencies, so they only use
+the standard library.
+The parts every exporter needs live here instead of in each of them:
+
+- ``labels``/``escape``: label sets in the text exposition format;
+- ``address``: the ``[host]:port`` argparse type for ``--listen`` and
+  upstream addresses;
+- ``handler``/``serve``: the HTTP server answering ``/metrics`` (and a
+  link on ``/``), started from each exporter's ``main``.
+
+Roles deploy this module next to the exporter as a ``homelab`` package in
+``/usr/local/lib/homelab-exporters`` and start the exporter with
+``python3 -m homelab.<exporter>`` from there.
+
+Usage:
+    from homelab.exporter import labels, serve
+
+    text = f'demo_up{{{labels(node="pve")}}} 1\\n'
+    serve(("", 9100), lambda: text, "demo metrics", "serving demo")
+"""
+import argparse
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Where roles install this package and the exporters (PYTHONPATH of their units)
+INSTALL_DIR = "/usr/local/lib/homelab-exporters"
+
+
+def escape(value: object) -> str:
+    """A label value escaped for the text exposition format."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def labels(**values: object) -> str:
+    """``key="value",...`` for a metric's label set, in argument order."""
+    return ",".join(f'{key}="{escape(value)}"' for key, value in values.items())
+
+
+def address(default_host: str = "") -> Callable[[str], Tuple[str, int]]:
+    """An argparse type parsing ``[host]:port``, filling in ``default_host``."""
+
+    def parse(value: str) -> Tuple[str, int]:
+        host, _, port = value.rpartition(":")
+        try:
+            return host or default_host, int(port)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"expected [host]:port, got {value!r}")
+
+    return parse
+
+
+def handler(metrics: Callable[[], str], title: str) -> type:
+    """An HTTP request handler serving ``metrics()`` on ``/metrics``."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path == "/metrics":
+                status, content_type, body = 200, CONTENT_TYPE, metrics()
+            elif self.path == "/":
+                status, content_type, body = 200, "text/html", f'<a href="/metrics">{title}</a>\n'
+            else:
+                status, content_type, body = 404, "text/plain", "not found\n"
+            data = body.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    return Handler
+
+
+def serve(listen: Tuple[str, int], metrics: Callable[[], str], title: str, banner: str) -> int:
+    """Serve ``metrics()`` on ``listen`` until interrupted.
+
+    Returns:
+        Exit code: 0 after Ctrl-C, 1 if the address cannot be bound
+    """
+    try:
+        server = ThreadingHTTPServer(listen, handler(metrics, title))
+    except OSError as e:
+        print(f"ERROR: cannot listen on {listen[0]}:{listen[1]}: {e}", file=sys.stderr)
+        return 1
+    print(f"✅ {banner} on :{listen[1]}/metrics")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
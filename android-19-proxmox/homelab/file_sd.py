@@ -0,0 +1,253 @@
+"""Prometheus file-based service discovery generated from the catalog.
+
+lxc-monitoring's prometheus.yml used to list node and GPU exporter targets
+by hand, so every new service meant re-templating the config and restarting
+Prometheus. Instead, each catalog service (and the Proxmox host) declares
+the exporters it runs::
+
+    140:
+      name: "vm-llm-aimachine"
+      ...
+      monitoring:
+        node: "ai"          # `node` label the dashboards filter on (default: name)
+        exporters:
+          node: 9100        # job name: port
+          gpu: 9400
+
+Exporters whose port and on/off switch belong to the role that configures
+the service name that role's variables instead of repeating their values::
+
+      monitoring:
+        role: "vm-llm-aimachine"
+        exporters:
+          vllm: {port: vllm_port, enabled: vllm_service_enabled}
+
+The variables are the role's defaults overridden by the inventory vars of
+the service's host (its ``vm_id``; the homelab_catalog vars plugin passes
+Ansible's view of them as ``service_vars``, the command line reads
+inventory.yml), resolved like
+homelab.templating.role_vars does. The job gets a target only while its
+``enabled`` variable is true, so a service the role leaves stopped is not
+scraped and alerted on as down, and enabling it in the inventory adds it.
+
+This module turns that into one file_sd JSON file per job
+(``targets/<job>.json``), each target labelled with ``node``,
+``service_id``, ``service_name`` and ``service_type``. Prometheus watches
+the files and picks up changes without a reload; files are replaced
+atomically and only when their content changes, so a half-written file is
+never read and unchanged jobs are not touched.
+
+Usage:
+    from homelab.file_sd import scrape_targets
+
+    scrape_targets(load_catalog())["gpu"]
+    # [{'targets': ['192.168.0.140:9400'], 'labels': {'node': 'ai', 'service_id': '140', ...}}]
+
+Command line (``make monitoring-targets``):
+    python3 -m homelab.file_sd                     # print every job's targets
+    python3 -m homelab.file_sd --output targets/   # write targets/<job>.json
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+from homelab.catalog import Catalog, CatalogError, load_catalog
+from homelab.templating import PROJECT_ROOT, role_vars
+from homelab.yaml_loader import load_yaml
+
+ROLES_DIR = PROJECT_ROOT / "configuration-by-ansible"
+INVENTORY_FILE = PROJECT_ROOT.parent / "inventory.yml"
+
+_JOB_NAME = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+
+
+class TargetGroup:
+    """One exporter of one service, as a file_sd target group."""
+
+    __slots__ = ("job", "address", "labels")
+
+    def __init__(self, job: str, address: str, labels: Dict[str, str]):
+        self.job = job
+        self.address = address
+        self.labels = labels
+
+    def as_dict(self) -> Dict:
+        return {"targets": [self.address], "labels": dict(self.labels)}
+
+    def __repr__(self) -> str:
+        return f"TargetGroup({self.job!r}, {self.address!r})"
+
+
+def _role_port(owner: str, job: str, spec: Dict, variables: Optional[Dict[str, Any]]) -> Optional[int]:
+    """Port of a role-defined exporter, or ``None`` while the role leaves it disabled."""
+    if variables is None:
+        raise CatalogError(f"{owner}: exporter {job!r} names role variables but 'monitoring' has no 'role'")
+    if set(spec) != {"port", "enabled"}:
+        raise CatalogError(f"{owner}: exporter {job!r} must name a role's 'port' and 'enabled' variables")
+    values = {}
+    for key, name in spec.items():
+        if name not in variables:
+            raise CatalogError(f"{owner}: exporter {job!r} {key} variable {name!r} is not defined by the role")
+        values[key] = variables[name]
+    if not isinstance(values["enabled"], bool):
+        raise CatalogError(f"{owner}: exporter {job!r} enabled variable {spec['enabled']!r} must be true or false")
+    return values["port"] if values["enabled"] else None
+
+
+def _groups(owner: str, monitoring: Any, ip: str, labels: Dict[str, str],
+            roles: Dict[str, Dict[str, Any]], overrides: Optional[Mapping[str, Any]] = None) -> List[TargetGroup]:
+    if monitoring is None:
+        return []
+    if not isinstance(monitoring, dict) or not isinstance(monitoring.get("exporters"), dict):
+        raise CatalogError(f"{owner}: 'monitoring' must be a mapping with an 'exporters' mapping")
+    labels = {"node": str(monitoring.get("node") or labels["service_name"]), **labels}
+    role = monitoring.get("role")
+    if role is not None and role not in roles:
+        if not isinstance(role, str) or not (ROLES_DIR / role / "defaults" / "main.yml").is_file():
+            raise CatalogError(f"{owner}: monitoring role {role!r} has no defaults/main.yml in {ROLES_DIR}")
+        roles[role] = role_vars(ROLES_DIR / role)
+    variables = roles.get(role)
+    if role is not None and overrides:
+        variables = role_vars(ROLES_DIR / role, overrides=overrides)
+    groups = []
+    for job, port in monitoring["exporters"].items():
+        if not isinstance(job, str) or not _JOB_NAME.match(job):
+            raise CatalogError(f"{owner}: exporter name {job!r} is not a valid Prometheus job name")
+        if isinstance(port, dict):
+            port = _role_port(owner, job, port, variables)
+            if port is None:
+                continue
+        if not isinstance(port, int) or not 0 < port < 65536:
+            raise CatalogError(f"{owner}: exporter {job!r} port must be an integer 1-65535, got {port!r}")
+        groups.append(TargetGroup(job, f"{ip}:{port}", labels))
+    return groups
+
+
+def target_groups(catalog: Catalog,
+                  service_vars: Optional[Mapping[int, Mapping[str, Any]]] = None) -> List[TargetGroup]:
+    """Every exporter declared in the catalog: the Proxmox host first, then services by ID.
+
+    Disabled role-defined exporters are left out.
+
+    Args:
+        catalog: Parsed infrastructure catalog
+        service_vars: Inventory vars of each service's host by service ID,
+            overriding the role defaults of role-defined exporters
+
+    Raises:
+        CatalogError: If a ``monitoring`` block is malformed
+    """
+    roles: Dict[str, Dict[str, Any]] = {}
+    proxmox = catalog.proxmox
+    groups = _groups("proxmox", proxmox.raw.get("monitoring"), proxmox.ip,
+                     {"service_name": proxmox.node_name, "service_type": "host"}, roles)
+    for service in sorted(catalog, key=lambda service: service.id):
+        groups += _groups(f"service {service.id}", service.get("monitoring"), service.ip, {
+            "service_id": str(service.id),
+            "service_name": service.name,
+            "service_type": service.type,
+        }, roles, (service_vars or {}).get(service.id))
+    return groups
+
+
+def scrape_targets(catalog: Catalog,
+                   service_vars: Optional[Mapping[int, Mapping[str, Any]]] = None) -> Dict[str, List[Dict]]:
+    """file_sd content per job name, jobs sorted by name (``service_vars`` as for :func:`target_groups`)."""
+    jobs: Dict[str, List[Dict]] = {}
+    for group in target_groups(catalog, service_vars):
+        jobs.setdefault(group.job, []).append(group.as_dict())
+    return dict(sorted(jobs.items()))
+
+
+def inventory_service_vars(path: Path = INVENTORY_FILE) -> Dict[int, Dict[str, Any]]:
+    """Vars of each inventory host with a ``vm_id``, by that ID.
+
+    Group vars apply to the group's hosts and child groups; host vars win.
+    """
+    result: Dict[int, Dict[str, Any]] = {}
+
+    def walk(group: Any, inherited: Dict[str, Any]) -> None:
+        group = group or {}
+        variables = {**inherited, **(group.get("vars") or {})}
+        for host_vars in (group.get("hosts") or {}).values():
+            merged = {**variables, **(host_vars or {})}
+            if isinstance(merged.get("vm_id"), int):
+                result.setdefault(merged["vm_id"], {}).update(merged)
+        for child in (group.get("children") or {}).values():
+            walk(child, variables)
+
+    for group in (load_yaml(path) or {}).values():
+        walk(group, {})
+    return result
+
+
+def render(groups: List[Dict]) -> str:
+    """A job's file_sd JSON as written to disk."""
+    return json.dumps(groups, indent=2, sort_keys=True) + "\n"
+
+
+def write_file_sd(jobs: Dict[str, List[Dict]], directory: Path) -> List[Path]:
+    """Write ``<job>.json`` per job and remove files of jobs no longer declared.
+
+    Files are replaced atomically (temp file + rename in the same directory)
+    and only when their content changes.
+
+    Returns:
+        Files written or removed
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    changed = []
+    for job, groups in jobs.items():
+        path = directory / f"{job}.json"
+        content = render(groups)
+        if path.exists() and path.read_text() == content:
+            continue
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{job}.", suffix=".tmp")
+        with os.fdopen(fd, "w") as tmp_file:
+            tmp_file.write(content)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+        changed.append(path)
+    for stale in sorted(directory.glob("*.json")):
+        if stale.stem not in jobs:
+            stale.unlink()
+            changed.append(stale)
+    return changed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m homelab.file_sd", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--catalog", type=Path, default=None, help="Path to infrastructure-catalog.yml")
+    parser.add_argument("--inventory", type=Path, default=INVENTORY_FILE,
+                        help="Ansible inventory whose host vars override role defaults (default: inventory.yml)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Directory to write <job>.json files to (default: print them)")
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = scrape_targets(load_catalog(args.catalog), inventory_service_vars(args.inventory))
+    except (OSError, CatalogError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+
+    if args.output is None:
+        for job, groups in jobs.items():
+            print(f"# {job}.json")
+            print(render(groups), end="")
+        return 0
+
+    changed = write_file_sd(jobs, args.output)
+    for path in changed:
+        print(f"{'✅ wrote' if path.exists() else '🗑️  removed'} {path}")
+    if not changed:
+        print(f"✅ {len(jobs)} job(s) up to date in {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
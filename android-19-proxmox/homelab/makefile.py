@@ -0,0 +1,225 @@
+"""Parsed, indexed view of the repository Makefile.
+
+Makefile tests used to reopen the Makefile and run multi-line DOTALL regexes
+per test to cut a target's recipe out of the text. This module parses the
+Makefile once per process into rules (target → prerequisites, recipe, help
+text and ``# Section``), variables and ``.PHONY`` targets, with O(1) target
+lookup and make-style expansion of ``$(ANSIBLE_EXEC)``, ``$(DOCKER_COMPOSE)``
+and the other variables, so many checks share one parsed structure.
+
+Usage:
+    from homelab.makefile import load_makefile
+
+    makefile = load_makefile()
+    makefile.rule("deploy-vm-llm-aimachine").prerequisites   # ('proxmox-tf-init', ...)
+    makefile.recipe("setup-ssh")                 # ['$(DOCKER_COMPOSE) exec -T homelab-dev bash ...']
+    makefile.recipe("setup-ssh", expand=True)    # ['docker compose exec -T homelab-dev bash ...']
+    makefile.section("Testing")                  # (Rule('test-ping'), ...)
+"""
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+DEFAULT_MAKEFILE_PATH = Path(__file__).resolve().parents[2] / "Makefile"
+
+_ASSIGNMENT = re.compile(r"^(?:override\s+|export\s+)?([A-Za-z_][A-Za-z0-9_.]*)\s*(::=|:=|\?=|\+=|!=|=)\s*(.*)$")
+_RULE = re.compile(r"^([^\s:#=][^:=]*?)\s*::?(?!=)\s*(.*)$")
+_SECTION = re.compile(r"^# ([A-Z].*?)\s*$")
+_REFERENCE = re.compile(r"\$(?:\(([^()$]*)\)|\{([^{}$]*)\})")
+_BUILTINS = {"MAKE": "make"}
+
+
+class Rule:
+    """One target: its prerequisites, recipe lines and ``## help`` text."""
+
+    __slots__ = ("name", "prerequisites", "recipe", "help", "section", "line")
+
+    def __init__(self, name: str, prerequisites: Tuple[str, ...], help: Optional[str],
+                 section: Optional[str], line: int):
+        self.name = name
+        self.prerequisites = prerequisites
+        self.recipe: List[str] = []
+        self.help = help
+        self.section = section
+        self.line = line
+
+    @property
+    def commands(self) -> List[str]:
+        """Recipe lines without the ``@``/``-``/``+`` echo and error prefixes."""
+        return [line.lstrip("@-+ ") for line in self.recipe]
+
+    def as_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"Rule({self.name!r})"
+
+
+class Makefile:
+    """Rules, variables and phony targets of one Makefile."""
+
+    def __init__(self, text: str, path: Optional[Path] = None):
+        self.path = path
+        self.rules: Dict[str, Rule] = {}
+        self.variables: Dict[str, str] = {}
+        self.phony: Set[str] = set()
+        self._sections: Dict[str, List[Rule]] = {}
+        self._parse(text)
+
+    def _parse(self, text: str) -> None:
+        section = None
+        current: Optional[Rule] = None
+        for number, line in _logical_lines(text):
+            if line.startswith("\t"):
+                if current is not None and line.strip():
+                    current.recipe.append(line.strip())
+                continue
+            if not line.strip():
+                continue
+            current = None
+            if line.startswith("#"):
+                match = _SECTION.match(line)
+                if match:
+                    section = match.group(1)
+                continue
+            assignment = _ASSIGNMENT.match(line)
+            if assignment:
+                self._assign(*assignment.groups())
+                continue
+            rule = _RULE.match(line)
+            if not rule:
+                continue
+            dependencies, _, help = rule.group(2).partition("## ")
+            prerequisites = tuple(dependencies.split("#", 1)[0].split())
+            for name in rule.group(1).split():
+                if name == ".PHONY":
+                    self.phony.update(prerequisites)
+                    continue
+                current = Rule(name, prerequisites, help.strip() or None, section, number)
+                self.rules[name] = current
+                self._sections.setdefault(section, []).append(current)
+
+    def _assign(self, name: str, operator: str, value: str) -> None:
+        if operator == "?=" and name in self.variables:
+            return
+        if operator == "+=" and name in self.variables:
+            value = f"{self.variables[name]} {value}"
+        self.variables[name] = value
+
+    def __contains__(self, target: object) -> bool:
+        return target in self.rules
+
+    def __iter__(self) -> Iterator[Rule]:
+        return iter(self.rules.values())
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def rule(self, target: str) -> Rule:
+        """Rule for a target.
+
+        Raises:
+            KeyError: If the Makefile has no such target
+        """
+        try:
+            return self.rules[target]
+        except KeyError:
+            raise KeyError(f"Makefile has no target '{target}'") from None
+
+    def section(self, name: str) -> Tuple[Rule, ...]:
+        """Rules under a ``# Name`` comment, in file order (as ``make help`` lists them)."""
+        return tuple(self._sections.get(name, ()))
+
+    def expand(self, text: str) -> str:
+        """Expand variable references the way make would.
+
+        Unknown names and make functions (``$(if ...)``) are left as written;
+        ``$$`` becomes ``$``.
+        """
+        text = text.replace("$$", "\0")
+        for _ in range(20):
+            expanded = _REFERENCE.sub(self._substitute, text)
+            if expanded == text:
+                break
+            text = expanded
+        return text.replace("\0", "$")
+
+    def _substitute(self, match: re.Match) -> str:
+        name = match.group(1) if match.group(1) is not None else match.group(2)
+        if name in self.variables:
+            return self.variables[name]
+        if name in _BUILTINS:
+            return _BUILTINS[name]
+        if name == "MAKEFILE_LIST" and self.path is not None:
+            return self.path.name
+        return match.group(0)
+
+    def recipe(self, target: str, expand: bool = False) -> List[str]:
+        """Commands a target runs, optionally with variables expanded."""
+        commands = self.rule(target).commands
+        return [self.expand(command) for command in commands] if expand else commands
+
+    def commands(self, expand: bool = False) -> Iterator[Tuple[Rule, str]]:
+        """Every (rule, command) pair in file order."""
+        for rule in sorted(self.rules.values(), key=lambda rule: rule.line):
+            for command in rule.commands:
+                yield rule, self.expand(command) if expand else command
+
+    def prerequisites(self, target: str, recursive: bool = False) -> Tuple[str, ...]:
+        """Direct (or, with ``recursive``, transitive) prerequisites of a target."""
+        if not recursive:
+            return self.rule(target).prerequisites
+        seen: Dict[str, None] = {}
+        pending = list(self.rule(target).prerequisites)
+        while pending:
+            name = pending.pop(0)
+            if name in seen:
+                continue
+            seen[name] = None
+            if name in self.rules:
+                pending.extend(self.rules[name].prerequisites)
+        return tuple(seen)
+
+
+def _logical_lines(text: str) -> Iterator[Tuple[int, str]]:
+    """Lines with backslash continuations joined, numbered by their first line."""
+    buffer: List[str] = []
+    start = 1
+    for number, line in enumerate(text.splitlines(), 1):
+        if not buffer:
+            start = number
+        if line.endswith("\\"):
+            buffer.append(line[:-1].rstrip() if not buffer else line[:-1].strip())
+            continue
+        buffer.append(line.strip() if buffer else line)
+        yield start, " ".join(buffer)
+        buffer = []
+    if buffer:
+        yield start, " ".join(buffer)
+
+
+# Parsed Makefiles keyed by resolved path; reparsed when the file's mtime changes.
+_cache: Dict[Path, Tuple[int, Makefile]] = {}
+
+
+def load_makefile(path: Optional[Path] = None) -> Makefile:
+    """Parse the Makefile, reusing the parsed copy while the file is unchanged.
+
+    Args:
+        path: Makefile to parse (default: the repository Makefile)
+
+    Returns:
+        Shared Makefile instance
+    """
+    resolved = Path(path or DEFAULT_MAKEFILE_PATH).resolve()
+    mtime = resolved.stat().st_mtime_ns
+
+    cached = _cache.get(resolved)
+    if cached and cached[0] == mtime:
+        sys.audit("homelab.read", str(resolved))
+        return cached[1]
+
+    makefile = Makefile(resolved.read_text(), path=resolved)
+    _cache[resolved] = (mtime, makefile)
+    return makefile
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Prometheus sidecar exporter for Ollama's runtime state.
+
+vLLM serves Prometheus metrics on its API port, but Ollama has no metrics
+endpoint: which models are loaded, how much of each sits in VRAM and when
+keep-alive unloads them were only visible through ``ollama ps``. This
+exporter runs next to Ollama on the AI VMs and, at most once per
+``--interval``, polls ``/api/ps`` (and ``/api/version``), serving:
+
+- ``ollama_loaded_models`` and, per loaded model, ``ollama_model_size_bytes``,
+  ``ollama_model_vram_bytes``, ``ollama_model_vram_ratio`` (below 1 means
+  layers were offloaded to the CPU), ``ollama_model_context_length`` and
+  ``ollama_model_expires_in_seconds`` (keep-alive countdown);
+- ``ollama_config_info``: the settings Ollama was started with
+  (``--setting num_parallel=1 ...``), so dashboards can show them next to
+  the load they are tuned for.
+
+If Ollama cannot be reached, ``ollama_up`` is 0 and no model metrics are
+served. It only needs the standard library and homelab.exporter on the VM.
+
+Usage:
+    from homelab.ollama_exporter import Collector
+
+    print(Collector("http://localhost:11434").metrics())
+
+Command line (on the AI VM):
+    python3 -m homelab.ollama_exporter --ollama-url http://localhost:11434 --setting num_parallel=1
+"""
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from homelab.exporter import address, labels, serve
+
+# Go timestamps carry nanoseconds; datetime takes at most microseconds
+_FRACTION = re.compile(r"(\.\d{6})\d+")
+
+
+class OllamaError(Exception):
+    """Ollama could not be reached or sent something other than JSON."""
+
+
+def fetch_json(base_url: str, path: str, timeout: float = 5.0) -> Dict:
+    """GET ``base_url + path`` and decode the JSON body."""
+    try:
+        with urllib.request.urlopen(base_url.rstrip("/") + path, timeout=timeout) as response:
+            return json.loads(response.read())
+    except (OSError, urllib.error.URLError, ValueError) as e:
+        raise OllamaError(f"GET {path} failed: {e}") from e
+
+
+def expires_in(expires_at: str, now: float) -> Optional[float]:
+    """Seconds until an ``expires_at`` timestamp, or ``None`` if it cannot be parsed."""
+    try:
+        expiry = datetime.fromisoformat(_FRACTION.sub(r"\1", expires_at).replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+    if expiry.tzinfo is None:
+        return None
+    return expiry.timestamp() - now
+
+
+def render(ps: Optional[Dict], version: Optional[str], settings: Dict[str, str], now: float) -> str:
+    """Exposition for an ``/api/ps`` reply (``None`` when Ollama is unreachable)."""
+    lines = ["# HELP ollama_up Whether Ollama's API answered.", "# TYPE ollama_up gauge",
+             f"ollama_up {int(ps is not None)}"]
+    if settings:
+        lines += ["# HELP ollama_config_info Settings Ollama was started with.", "# TYPE ollama_config_info gauge",
+                  f"ollama_config_info{{{labels(**settings)}}} 1"]
+    if version:
+        lines += ["# TYPE ollama_version_info gauge", f"ollama_version_info{{{labels(version=version)}}} 1"]
+    if ps is None:
+        return "\n".join(lines) + "\n"
+
+    models = sorted(ps.get("models") or [], key=lambda model: str(model.get("name", "")))
+    lines += ["# HELP ollama_loaded_models Models currently loaded.", "# TYPE ollama_loaded_models gauge",
+              f"ollama_loaded_models {len(models)}"]
+    samples: Dict[str, List[str]] = {}
+    for model in models:
+        name = labels(model=model.get("name") or model.get("model", ""))
+        details = model.get("details") or {}
+        info = labels(family=details.get("family", ""), parameter_size=details.get("parameter_size", ""),
+                       quantization_level=details.get("quantization_level", ""))
+        samples.setdefault("ollama_model_info", []).append(f"ollama_model_info{{{name},{info}}} 1")
+        size, vram = model.get("size"), model.get("size_vram")
+        if isinstance(size, (int, float)):
+            samples.setdefault("ollama_model_size_bytes", []).append(f"ollama_model_size_bytes{{{name}}} {size:g}")
+        if isinstance(vram, (int, float)):
+            samples.setdefault("ollama_model_vram_bytes", []).append(f"ollama_model_vram_bytes{{{name}}} {vram:g}")
+            if isinstance(size, (int, float)) and size > 0:
+                samples.setdefault("ollama_model_vram_ratio", []).append(
+                    f"ollama_model_vram_ratio{{{name}}} {vram / size:.4f}")
+        if isinstance(model.get("context_length"), int):
+            samples.setdefault("ollama_model_context_length", []).append(
+                f"ollama_model_context_length{{{name}}} {model['context_length']}")
+        remaining = expires_in(model.get("expires_at", ""), now)
+        if remaining is not None:
+            samples.setdefault("ollama_model_expires_in_seconds", []).append(
+                f"ollama_model_expires_in_seconds{{{name}}} {remaining:.0f}")
+    for metric, metric_samples in samples.items():
+        lines += [f"# TYPE {metric} gauge"] + metric_samples
+    return "\n".join(lines) + "\n"
+
+
+class Collector:
+    """Polls Ollama at most once per interval and serves the cached reply."""
+
+    def __init__(self, base_url: str, settings: Optional[Dict[str, str]] = None, interval: float = 5.0,
+                 fetch: Callable[[str, str], Dict] = fetch_json, clock: Callable[[], float] = time.monotonic,
+                 wall_clock: Callable[[], float] = time.time):
+        self.base_url = base_url
+        self.settings = dict(settings or {})
+        self.interval = interval
+        self.fetch = fetch
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.polls = 0
+        self.errors = 0
+        self._result: Optional[Tuple[float, Optional[Dict], Optional[str]]] = None
+        self._lock = threading.Lock()
+
+    def collect(self) -> Tuple[Optional[Dict], Optional[str]]:
+        """The last ``/api/ps`` reply (``None`` if the poll failed) and Ollama's version."""
+        with self._lock:
+            now = self.clock()
+            if self._result is None or now - self._result[0] >= self.interval:
+                self.polls += 1
+                version = self._result[2] if self._result else None
+                try:
+                    ps = self.fetch(self.base_url, "/api/ps")
+                    if version is None:
+                        version = self.fetch(self.base_url, "/api/version").get("version")
+                except OllamaError as e:
+                    self.errors += 1
+                    print(f"ERROR: {e}", file=sys.stderr)
+                    ps = None
+                self._result = (now, ps, version)
+            return self._result[1], self._result[2]
+
+    def metrics(self) -> str:
+        ps, version = self.collect()
+        return render(ps, version, self.settings, self.wall_clock()) + "\n".join([
+            "# HELP ollama_exporter_errors_total Failed polls of Ollama's API.",
+            "# TYPE ollama_exporter_errors_total counter",
+            f"ollama_exporter_errors_total {self.errors}",
+        ]) + "\n"
+
+
+def _setting(value: str) -> Tuple[str, str]:
+    key, separator, setting = value.partition("=")
+    if not separator or not re.match(r"^[a-zA-Z_][a-zA-Z0-9_]*$", key):
+        raise argparse.ArgumentTypeError(f"expected name=value, got {value!r}")
+    return key, setting
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m homelab.ollama_exporter",
+                                     description=__doc__.split("\n\n")[0])
+    parser.add_argument("--ollama-url", default="http://localhost:11434",
+                        help="Ollama API base URL (default: http://localhost:11434)")
+    parser.add_argument("--listen", type=address(), default=("", 9435),
+                        help="Address to serve /metrics on (default: :9435)")
+    parser.add_argument("--interval", type=float, default=5.0,
+                        help="Seconds a poll is served before polling again (default: 5)")
+    parser.add_argument("--setting", type=_setting, action="append", default=[],
+                        help="name=value exported in ollama_config_info (repeatable)")
+    args = parser.parse_args(argv)
+
+    collector = Collector(args.ollama_url, dict(args.setting), interval=args.interval)
+    return serve(args.listen, collector.metrics, "Ollama metrics", f"serving {args.ollama_url}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Per-guest Proxmox metrics from one cluster query per interval.
+
+Nothing on the Proxmox host exported per-VM/per-LXC CPU, memory, disk I/O
+or network counters, and checks of guest state ran one ``qm config <id>``
+per guest. This exporter runs on the host and, per ``--interval``, issues a
+single ``pvesh get /cluster/resources --type vm`` query; the result is
+cached and fanned out as ``pve_guest_*`` metrics labelled with the catalog
+service it belongs to (``service_id``, ``service_name``, ``service_type``,
+the same labels homelab.file_sd puts on scrape targets). Scrapes within the
+interval are served from the cache, so the cost stays one call per interval
+however many guests the catalog grows to; if the query fails, the previous
+result is served until it is ``--max-age`` seconds old.
+Prometheus scrapes it as the ``pve`` job with ``honor_labels`` (lxc-monitoring's
+``prometheus_honor_labels_jobs``), so these labels win over the target's.
+
+Catalog services are read from a JSON file (``{"<id>": {"name": ...,
+"type": ...}}``) that host-proxmox-monitoring templates from the catalog;
+guests not in it are still exported, labelled from their Proxmox name and
+type. Catalog services missing on the node report
+``pve_catalog_guest_present 0``. It only needs the standard library and
+homelab.exporter on the host.
+
+Usage:
+    from homelab.pve_exporter import parse_resources
+
+    guests = parse_resources(ssh.run(host, CLUSTER_RESOURCES_COMMAND).stdout)
+    guests[9000].template      # True
+
+Command line (on the Proxmox host):
+    python3 -m homelab.pve_exporter --services services.json              # serve :9221/metrics
+    python3 -m homelab.pve_exporter --services services.json --once       # print metrics once
+"""
+import argparse
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from homelab.exporter import address, labels, serve
+
+CLUSTER_RESOURCES_COMMAND = "pvesh get /cluster/resources --type vm --output-format json"
+
+# Catalog service type per Proxmox guest type, for guests outside the catalog
+SERVICE_TYPES = {"qemu": "vm", "lxc": "container"}
+
+# (metric, /cluster/resources field, type, help)
+GUEST_METRICS = (
+    ("pve_guest_cpu_ratio", "cpu", "gauge", "CPU usage as a fraction of the guest's CPUs."),
+    ("pve_guest_cpus", "maxcpu", "gauge", "CPUs assigned to the guest."),
+    ("pve_guest_memory_bytes", "mem", "gauge", "Memory used by the guest."),
+    ("pve_guest_memory_max_bytes", "maxmem", "gauge", "Memory assigned to the guest."),
+    ("pve_guest_disk_bytes", "disk", "gauge", "Root disk space used (containers only)."),
+    ("pve_guest_disk_max_bytes", "maxdisk", "gauge", "Root disk size."),
+    ("pve_guest_disk_read_bytes_total", "diskread", "counter", "Bytes read from the guest's disks."),
+    ("pve_guest_disk_written_bytes_total", "diskwrite", "counter", "Bytes written to the guest's disks."),
+    ("pve_guest_network_receive_bytes_total", "netin", "counter", "Bytes received by the guest."),
+    ("pve_guest_network_transmit_bytes_total", "netout", "counter", "Bytes sent by the guest."),
+    ("pve_guest_uptime_seconds", "uptime", "gauge", "Seconds since the guest started."),
+)
+
+
+class CollectorError(Exception):
+    """The cluster query failed or returned something other than a resource list."""
+
+
+class Guest:
+    """One ``/cluster/resources`` entry of type qemu or lxc."""
+
+    __slots__ = ("vmid", "name", "type", "node", "status", "template", "values")
+
+    def __init__(self, resource: Dict):
+        self.vmid = int(resource["vmid"])
+        self.name = str(resource.get("name", ""))
+        self.type = str(resource.get("type", ""))
+        self.node = str(resource.get("node", ""))
+        self.status = str(resource.get("status", "unknown"))
+        self.template = bool(resource.get("template"))
+        self.values = {
+            field: resource[field] for _, field, _, _ in GUEST_METRICS
+            if isinstance(resource.get(field), (int, float)) and not isinstance(resource.get(field), bool)
+        }
+
+    @property
+    def running(self) -> bool:
+        return self.status == "running"
+
+    def as_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"Guest({self.vmid}, {self.name!r}, {self.status!r})"
+
+
+def parse_resources(text: str, node: Optional[str] = None) -> Dict[int, Guest]:
+    """Guests by VM ID from ``pvesh get /cluster/resources --type vm`` JSON output.
+
+    Args:
+        text: The command's stdout
+        node: Only keep guests on this Proxmox node
+
+    Raises:
+        CollectorError: If the output is not a JSON list of resources
+    """
+    try:
+        resources = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise CollectorError(f"unexpected pvesh output: {e}") from e
+    if not isinstance(resources, list):
+        raise CollectorError("unexpected pvesh output: expected a list of resources")
+    return {
+        guest.vmid: guest
+        for guest in (Guest(resource) for resource in resources
+                      if isinstance(resource, dict) and "vmid" in resource and resource.get("type") in SERVICE_TYPES)
+        if node is None or guest.node == node
+    }
+
+
+def load_services(path: Optional[Path]) -> Dict[int, Dict[str, str]]:
+    """Catalog services (name and type) by ID from the JSON file the role writes."""
+    if path is None:
+        return {}
+    return {int(service_id): service for service_id, service in json.loads(Path(path).read_text()).items()}
+
+
+def _service_labels(guest: Guest, services: Dict[int, Dict[str, str]]) -> str:
+    service = services.get(guest.vmid, {})
+    return labels(service_id=guest.vmid, service_name=service.get("name") or guest.name,
+                  service_type=service.get("type") or SERVICE_TYPES.get(guest.type, guest.type))
+
+
+def render_guests(guests: Dict[int, Guest], services: Dict[int, Dict[str, str]]) -> str:
+    """``pve_guest_*`` and ``pve_catalog_guest_present`` metrics for a cluster listing."""
+    ordered = [guests[vmid] for vmid in sorted(guests)]
+    guest_labels = {guest.vmid: _service_labels(guest, services) for guest in ordered}
+    lines = ["# HELP pve_guest_info Proxmox guest identity and state.", "# TYPE pve_guest_info gauge"]
+    for guest in ordered:
+        info = labels(guest_name=guest.name, guest_type=guest.type, pve_node=guest.node, status=guest.status,
+                      template=str(guest.template).lower())
+        lines.append(f"pve_guest_info{{{guest_labels[guest.vmid]},{info}}} 1")
+    lines += ["# HELP pve_guest_up Whether the guest is running.", "# TYPE pve_guest_up gauge"]
+    lines += [f"pve_guest_up{{{guest_labels[guest.vmid]}}} {int(guest.running)}" for guest in ordered]
+    for name, field, kind, help in GUEST_METRICS:
+        samples = [f"{name}{{{guest_labels[guest.vmid]}}} {guest.values[field]:g}"
+                   for guest in ordered if field in guest.values]
+        if samples:
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"] + samples
+    if services:
+        lines += ["# HELP pve_catalog_guest_present Whether a catalog service exists as a guest on the node.",
+                  "# TYPE pve_catalog_guest_present gauge"]
+        for service_id, service in sorted(services.items()):
+            present = labels(service_id=service_id, service_name=service.get("name", ""),
+                             service_type=service.get("type", ""))
+            lines.append(f"pve_catalog_guest_present{{{present}}} {int(service_id in guests)}")
+    return "\n".join(lines) + "\n"
+
+
+def run_pvesh() -> str:
+    """Run the cluster query locally and return its stdout."""
+    try:
+        result = subprocess.run(CLUSTER_RESOURCES_COMMAND.split(), capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise CollectorError(f"pvesh failed: {e}") from e
+    if result.returncode != 0:
+        raise CollectorError(f"pvesh failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+class Collector:
+    """Runs the cluster query at most once per interval and caches the rendered metrics."""
+
+    def __init__(self, services: Dict[int, Dict[str, str]], query: Callable[[], str] = run_pvesh,
+                 node: Optional[str] = None, interval: float = 15.0, max_age: float = 120.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.services = services
+        self.query = query
+        self.node = node
+        self.interval = interval
+        self.max_age = max_age
+        self.clock = clock
+        self.queries = 0
+        self.errors = 0
+        self.duration = 0.0
+        self._result: Optional[Tuple[float, Dict[int, Guest], str]] = None
+        self._lock = threading.Lock()
+
+    def collect(self) -> Tuple[Optional[Dict[int, Guest]], Optional[str], Optional[float]]:
+        """Guests, their rendered metrics and the result's age; ``None``s once it is too old."""
+        with self._lock:
+            now = self.clock()
+            if self._result is None or now - self._result[0] >= self.interval:
+                started = time.perf_counter()
+                self.queries += 1
+                try:
+                    guests = parse_resources(self.query(), self.node)
+                    self._result = (now, guests, render_guests(guests, self.services))
+                except CollectorError as e:
+                    self.errors += 1
+                    print(f"ERROR: {e}", file=sys.stderr)
+                self.duration = time.perf_counter() - started
+            if self._result is None:
+                return None, None, None
+            age = now - self._result[0]
+            if age > self.max_age:
+                return None, None, age
+            return self._result[1], self._result[2], age
+
+    def metrics(self) -> str:
+        guests, text, age = self.collect()
+        lines = [
+            "# HELP pve_exporter_up Whether the served cluster listing is fresh enough.",
+            "# TYPE pve_exporter_up gauge",
+            f"pve_exporter_up {int(guests is not None)}",
+            "# HELP pve_exporter_cluster_queries_total /cluster/resources queries issued.",
+            "# TYPE pve_exporter_cluster_queries_total counter",
+            f"pve_exporter_cluster_queries_total {self.queries}",
+            "# HELP pve_exporter_errors_total Failed /cluster/resources queries.",
+            "# TYPE pve_exporter_errors_total counter",
+            f"pve_exporter_errors_total {self.errors}",
+            "# HELP pve_exporter_query_seconds Duration of the last query.",
+            "# TYPE pve_exporter_query_seconds gauge",
+            f"pve_exporter_query_seconds {self.duration:.6f}",
+        ]
+        if age is not None:
+            lines += ["# HELP pve_exporter_age_seconds Age of the served cluster listing.",
+                      "# TYPE pve_exporter_age_seconds gauge", f"pve_exporter_age_seconds {age:.3f}"]
+        return "\n".join(lines) + "\n" + (text or "")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m homelab.pve_exporter", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--services", type=Path, default=None,
+                        help="JSON file of catalog services by ID (labels guests with their catalog name)")
+    parser.add_argument("--node", default=None, help="Only export guests on this Proxmox node")
+    parser.add_argument("--listen", type=address(), default=("", 9221),
+                        help="Address to serve /metrics on (default: :9221)")
+    parser.add_argument("--interval", type=float, default=15.0,
+                        help="Seconds a cluster listing is served before querying again (default: 15)")
+    parser.add_argument("--max-age", type=float, default=120.0,
+                        help="Seconds a listing is served while queries fail (default: 120)")
+    parser.add_argument("--once", action="store_true", help="Print the metrics once and exit")
+    args = parser.parse_args(argv)
+
+    try:
+        services = load_services(args.services)
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"ERROR: cannot read services from {args.services}: {e}", file=sys.stderr)
+        return 1
+    collector = Collector(services, node=args.node, interval=args.interval, max_age=args.max_age)
+
+    if args.once:
+        text = collector.metrics()
+        print(text, end="")
+        return 0 if "pve_exporter_up 1" in text else 1
+
+    return serve(args.listen, collector.metrics, "Proxmox guest metrics",
+                 f"serving {len(services)} catalog service(s)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""Readiness probes for freshly created VMs.
+
+Deploy targets used to ``sleep 30`` after ``terraform apply`` and hope
+cloud-init had finished. ``wait_until_ready`` instead polls, with a short
+backoff, the same signals Ansible needs and returns the moment they hold:
+
+1. QEMU guest agent answers (``qm agent <id> ping`` on the Proxmox host),
+   for VMs with ``agent: true``;
+2. the VM's SSH port accepts connections on its catalog IP;
+3. ``cloud-init status --wait`` succeeds, for VMs with ``cloud_init: true``.
+
+Boot-to-ready latency (overall and per phase) is appended to a JSON-lines
+file per run so slow boots can be spotted over time.
+
+Command line (run inside the homelab-dev container):
+    python3 -m homelab.readiness 140
+    python3 -m homelab.readiness 140 160 --timeout 900
+"""
+import argparse
+import json
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from homelab.catalog import Catalog, Service, load_catalog
+from homelab.ssh_pool import SSHChannelError, SSHPool
+
+DEFAULT_TIMEOUT = 600
+DEFAULT_RECORD_PATH = Path(__file__).resolve().parents[2] / ".cache" / "homelab" / "readiness.jsonl"
+
+# Same default Terraform gives cloud-init VMs without cloud_init_user
+DEFAULT_CLOUD_INIT_USER = "dev"
+
+# cloud-init status exit codes: 0 done, 2 done with recoverable errors
+_CLOUD_INIT_DONE = (0, 2)
+
+
+class NotReadyError(TimeoutError):
+    """Raised when a VM is not ready before the timeout."""
+
+
+class ReadinessReport:
+    """Boot-to-ready timing for one VM."""
+
+    __slots__ = ("vm_id", "name", "ready", "seconds", "phases", "attempts")
+
+    def __init__(self, vm_id: int, name: str):
+        self.vm_id = vm_id
+        self.name = name
+        self.ready = False
+        self.seconds = 0.0
+        self.phases: Dict[str, float] = {}
+        self.attempts: Dict[str, int] = {}
+
+    def as_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+def _delays(initial: float = 0.25, maximum: float = 5.0, factor: float = 1.5):
+    """Yield backoff delays with +/-20% jitter."""
+    delay = initial
+    while True:
+        yield delay * random.uniform(0.8, 1.2)
+        delay = min(delay * factor, maximum)
+
+
+def port_open(host: str, port: int = 22, timeout: float = 2.0) -> bool:
+    """Return True if a TCP connection to host:port succeeds."""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+class ReadinessProbe:
+    """Polls one VM until it is ready for Ansible.
+
+    Args:
+        service: Catalog entry of the VM
+        proxmox_host: Proxmox host IP (for guest agent pings)
+        ssh: SSH pool used for the agent ping and cloud-init check
+        port_check: ``(host, port) -> bool`` reachability check
+        ssh_port: Port probed on the VM (default: 22)
+    """
+
+    def __init__(
+        self,
+        service: Service,
+        proxmox_host: str,
+        ssh: SSHPool,
+        port_check: Callable[[str, int], bool] = port_open,
+        ssh_port: int = 22,
+    ):
+        self.service = service
+        self.proxmox_host = proxmox_host
+        self.ssh = ssh
+        self.port_check = port_check
+        self.ssh_port = ssh_port
+
+    def phases(self) -> List[str]:
+        """Probe phases that apply to this VM, in order."""
+        phases = []
+        if self.service.agent:
+            phases.append("guest-agent")
+        phases.append("ssh")
+        if self.service.cloud_init:
+            phases.append("cloud-init")
+        return phases
+
+    def _check(self, phase: str, remaining: float) -> bool:
+        if phase == "guest-agent":
+            result = self.ssh.run(self.proxmox_host, f"qm agent {self.service.id} ping",
+                                  timeout=min(remaining, 10))
+            return result.returncode == 0
+        if phase == "ssh":
+            return self.port_check(self.service.ip, self.ssh_port)
+        user = self.service.cloud_init_user or DEFAULT_CLOUD_INIT_USER
+        result = self.ssh.run(self.service.ip, "cloud-init status --wait", user=user, timeout=remaining)
+        if result.returncode in _CLOUD_INIT_DONE:
+            return True
+        if "status: error" in result.stdout:
+            raise RuntimeError(f"cloud-init failed on VM {self.service.id}:\n{result.stdout}{result.stderr}")
+        return False
+
+    def wait(self, timeout: float = DEFAULT_TIMEOUT) -> ReadinessReport:
+        """Block until every phase passes.
+
+        Returns:
+            ReadinessReport with total and per-phase seconds
+
+        Raises:
+            NotReadyError: If a phase is still failing at the timeout
+            RuntimeError: If cloud-init reports a fatal error
+        """
+        report = ReadinessReport(self.service.id, self.service.name)
+        started = time.monotonic()
+        deadline = started + timeout
+
+        for phase in self.phases():
+            phase_started = time.monotonic()
+            delays = _delays()
+            report.attempts[phase] = 0
+            while True:
+                report.attempts[phase] += 1
+                remaining = deadline - time.monotonic()
+                try:
+                    passed = remaining > 0 and self._check(phase, remaining)
+                except (SSHChannelError, subprocess.TimeoutExpired):
+                    passed = False
+                if passed:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    report.seconds = time.monotonic() - started
+                    raise NotReadyError(
+                        f"VM {self.service.id} ({self.service.name}) not ready after {timeout}s: "
+                        f"{phase} check still failing"
+                    )
+                time.sleep(min(next(delays), remaining))
+            report.phases[phase] = time.monotonic() - phase_started
+
+        report.ready = True
+        report.seconds = time.monotonic() - started
+        return report
+
+
+def record(report: ReadinessReport, path: Path = DEFAULT_RECORD_PATH) -> None:
+    """Append a report to the JSON-lines latency log."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps({"time": time.time(), **report.as_dict()}) + "\n")
+
+
+def wait_until_ready(
+    catalog: Catalog,
+    vm_id: int,
+    timeout: float = DEFAULT_TIMEOUT,
+    ssh: Optional[SSHPool] = None,
+) -> ReadinessReport:
+    """Wait for a catalog VM to be ready for configuration.
+
+    Raises:
+        KeyError: If the ID is not in the catalog
+        NotReadyError: If the VM is not ready in time
+    """
+    service = catalog.service(vm_id)
+    own_pool = ssh is None
+    ssh = ssh or SSHPool()
+    try:
+        return ReadinessProbe(service, catalog.proxmox.ip, ssh).wait(timeout)
+    finally:
+        if own_pool:
+            ssh.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m homelab.readiness",
+        description="Wait until VMs answer on the guest agent and SSH and cloud-init has finished.",
+    )
+    parser.add_argument("vm_ids", nargs="+", type=int)
+    parser.add_argument("--catalog", type=Path, default=None, help="Path to infrastructure-catalog.yml")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"Seconds to wait per VM (default: {DEFAULT_TIMEOUT})")
+    parser.add_argument("--record", type=Path, default=DEFAULT_RECORD_PATH,
+                        help="JSON-lines file receiving boot-to-ready latencies")
+    args = parser.parse_args(argv)
+
+    catalog = load_catalog(args.catalog)
+    with SSHPool() as ssh:
+        for vm_id in args.vm_ids:
+            print(f"⏳ Waiting for VM {vm_id} to be ready...", flush=True)
+            try:
+                report = wait_until_ready(catalog, vm_id, args.timeout, ssh=ssh)
+            except KeyError:
+                print(f"ERROR: not found in catalog: {vm_id}", file=sys.stderr)
+                return 1
+            except (NotReadyError, RuntimeError) as e:
+                print(f"❌ {e}", file=sys.stderr)
+                return 1
+            record(report, args.record)
+            phases = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in report.phases.items())
+            print(f"✅ VM {vm_id} ({report.name}) ready in {report.seconds:.1f}s ({phases})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
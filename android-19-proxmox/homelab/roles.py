@@ -0,0 +1,427 @@
+"""Indexed model of Ansible roles and a single-pass structural rule engine.
+
+Role structure tests used to load a task file per test and scan it linearly,
+or grep ``str(tasks)`` for substrings that could match anywhere in the
+stringified dict. This module parses every ``tasks/*.yml`` of a role once:
+
+- tasks become ``Task`` records with their module (FQCN collapsed, so
+  ``ansible.builtin.command`` is ``command``), arguments, ``when``
+  conditions and tags (inherited from enclosing blocks) and ``register``;
+- they are indexed by module, tag, registered variable and the variables
+  their ``when`` conditions read;
+- ``Role.flow()`` follows ``include_tasks``/``import_tasks`` from
+  ``main.yml`` to give the execution order.
+
+``RoleRule`` declares a structural rule (select tasks by role, file,
+module, tag or field patterns; expect field values; bound the match count)
+and ``evaluate`` checks any number of rules in one traversal of the tasks.
+
+Usage:
+    from homelab.roles import RoleRule, evaluate, load_role, load_roles
+
+    role = load_role("host-proxmox")
+    role.find(module="command", file="grub-pcie-aspm-update.yml")
+    role.registered("update_grub_result").get("failed_when")
+    role.uses("pcie_aspm_configured")          # tasks whose when reads it
+
+    results = evaluate([RoleRule("grub-update-checked", "update-grub registers its result",
+                                 module="command", match={"command": "update-grub"},
+                                 expect={"register": r"\\w+"})], load_roles())
+"""
+import re
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from jinja2 import TemplateError
+
+from homelab.templating import referenced_names
+from homelab.yaml_loader import load_yaml
+
+ROLES_DIR = Path(__file__).resolve().parent.parent / "configuration-by-ansible"
+
+# Task keys that are keywords, not the module being called
+TASK_KEYWORDS = frozenset({
+    "name", "when", "tags", "register", "notify", "listen", "vars", "args", "environment",
+    "become", "become_user", "become_method", "become_flags", "delegate_to", "delegate_facts",
+    "run_once", "ignore_errors", "ignore_unreachable", "failed_when", "changed_when",
+    "check_mode", "diff", "no_log", "loop", "loop_control", "until", "retries", "delay",
+    "async", "poll", "throttle", "timeout", "any_errors_fatal", "collections", "module_defaults",
+    "debugger", "connection", "remote_user", "port", "block", "rescue", "always", "local_action",
+})
+INCLUDE_MODULES = frozenset({"include_tasks", "import_tasks"})
+FREE_FORM_MODULES = frozenset({"command", "shell", "raw", "script"})
+
+_COLLAPSED_PREFIXES = ("ansible.builtin.", "ansible.legacy.")
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def _listify(value: Any) -> Tuple:
+    if value is None:
+        return ()
+    if isinstance(value, (list, tuple)):
+        return tuple(value)
+    return (value,)
+
+
+class Task:
+    """One task of a role task file (blocks flattened)."""
+
+    __slots__ = ("name", "module", "args", "raw", "file", "index", "when", "tags", "register")
+
+    def __init__(self, raw: Dict[str, Any], file: str, index: int,
+                 when: Tuple[str, ...] = (), tags: Tuple[str, ...] = ()):
+        self.raw = raw
+        self.file = file
+        self.index = index
+        self.name = raw.get("name")
+        self.register = raw.get("register")
+        self.when = when + tuple(str(condition) for condition in _listify(raw.get("when")))
+        self.tags = tags + tuple(str(tag) for tag in _listify(raw.get("tags")))
+
+        module = next((key for key in raw if key not in TASK_KEYWORDS), None)
+        self.module = module
+        if module and module.startswith(_COLLAPSED_PREFIXES):
+            self.module = module.split(".", 2)[2]
+        value = raw.get(module) if module else None
+        if isinstance(value, dict):
+            self.args = dict(value)
+        else:
+            self.args = {"_raw_params": value} if value is not None else {}
+        if isinstance(raw.get("args"), dict):
+            self.args = {**raw["args"], **self.args}
+
+    @property
+    def command(self) -> Optional[str]:
+        """Command line of a command/shell/raw/script task."""
+        if self.module not in FREE_FORM_MODULES:
+            return None
+        if self.args.get("_raw_params") is not None:
+            return str(self.args["_raw_params"])
+        if self.args.get("cmd") is not None:
+            return str(self.args["cmd"])
+        if self.args.get("argv"):
+            return " ".join(str(arg) for arg in self.args["argv"])
+        return None
+
+    @property
+    def variables(self) -> Set[str]:
+        """Variables the task's ``when`` conditions read."""
+        names: Set[str] = set()
+        for condition in self.when:
+            try:
+                names |= referenced_names("{{ (" + condition + ") }}")
+            except TemplateError:
+                names |= set(_IDENTIFIER.findall(condition))
+        return names
+
+    @property
+    def include(self) -> Optional[str]:
+        """Task file pulled in by an include_tasks/import_tasks task."""
+        if self.module not in INCLUDE_MODULES:
+            return None
+        target = self.args.get("_raw_params") or self.args.get("file")
+        return str(target) if target is not None else None
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """A field by name: a record attribute, a task keyword or ``args.<path>``.
+
+        ``when`` is returned joined with `` and ``, as Ansible evaluates it.
+        """
+        if field == "when":
+            return " and ".join(self.when) if self.when else default
+        if field in ("name", "module", "register", "file", "tags", "command", "include"):
+            value = getattr(self, field)
+            return default if value is None else value
+        if field.startswith("args."):
+            value: Any = self.args
+            for part in field[len("args."):].split("."):
+                if not isinstance(value, dict) or part not in value:
+                    return default
+                value = value[part]
+            return value
+        return self.raw.get(field, default)
+
+    def __repr__(self) -> str:
+        return f"Task({self.file}#{self.index}: {self.name!r})"
+
+
+def _flatten(items: Any, file: str, when: Tuple[str, ...] = (), tags: Tuple[str, ...] = (),
+             tasks: Optional[List[Task]] = None) -> List[Task]:
+    tasks = [] if tasks is None else tasks
+    for raw in items or []:
+        if not isinstance(raw, dict):
+            continue
+        if any(key in raw for key in ("block", "rescue", "always")):
+            block = Task({key: value for key, value in raw.items() if key not in ("block", "rescue", "always")},
+                         file, len(tasks), when, tags)
+            for key in ("block", "rescue", "always"):
+                _flatten(raw.get(key), file, block.when, block.tags, tasks)
+            continue
+        tasks.append(Task(raw, file, len(tasks), when, tags))
+    return tasks
+
+
+class Role:
+    """Every task file of a role, parsed once and indexed."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.name = self.path.name
+        defaults_file = self.path / "defaults" / "main.yml"
+        self.defaults: Dict[str, Any] = (load_yaml(defaults_file) or {}) if defaults_file.exists() else {}
+
+        tasks_dir = self.path / "tasks"
+        self.files: Dict[str, List[Task]] = {}
+        for task_file in sorted(tasks_dir.rglob("*.yml")) if tasks_dir.is_dir() else ():
+            relative = task_file.relative_to(tasks_dir).as_posix()
+            self.files[relative] = _flatten(load_yaml(task_file), relative)
+
+        handlers_file = self.path / "handlers" / "main.yml"
+        self.handlers = _flatten(load_yaml(handlers_file), "handlers/main.yml") if handlers_file.exists() else []
+
+        self._by_module: Dict[str, List[Task]] = {}
+        self._by_tag: Dict[str, List[Task]] = {}
+        self._by_register: Dict[str, Task] = {}
+        self._by_variable: Dict[str, List[Task]] = {}
+        for task in self:
+            self._by_module.setdefault(task.module, []).append(task)
+            for tag in task.tags:
+                self._by_tag.setdefault(tag, []).append(task)
+            if task.register:
+                self._by_register.setdefault(task.register, task)
+            for name in task.variables:
+                self._by_variable.setdefault(name, []).append(task)
+
+    def __iter__(self) -> Iterator[Task]:
+        """Every task, file by file."""
+        for tasks in self.files.values():
+            yield from tasks
+
+    def tasks_in(self, file: str) -> List[Task]:
+        """Tasks of one file (relative to tasks/), includes not expanded.
+
+        Raises:
+            KeyError: If the role has no such task file
+        """
+        try:
+            return self.files[file]
+        except KeyError:
+            raise KeyError(f"role {self.name} has no task file '{file}'") from None
+
+    def find(self, module: Union[str, Sequence[str], None] = None, file: Optional[str] = None,
+             tag: Optional[str] = None, where: Optional[Callable[[Task], bool]] = None) -> List[Task]:
+        """Tasks matching every given criterion, in file order."""
+        if module is not None:
+            modules = (module,) if isinstance(module, str) else tuple(module)
+            candidates = sorted((task for name in modules for task in self._by_module.get(name, ())),
+                                key=self._order)
+        elif tag is not None:
+            candidates = self._by_tag.get(tag, [])
+        elif file is not None:
+            candidates = self.tasks_in(file)
+        else:
+            candidates = list(self)
+        return [
+            task for task in candidates
+            if (file is None or task.file == file)
+            and (tag is None or tag in task.tags)
+            and (where is None or where(task))
+        ]
+
+    def first(self, **criteria: Any) -> Optional[Task]:
+        """First task matching ``find`` criteria, or None."""
+        found = self.find(**criteria)
+        return found[0] if found else None
+
+    def registered(self, variable: str) -> Optional[Task]:
+        """Task that registers a variable."""
+        return self._by_register.get(variable)
+
+    def uses(self, variable: str) -> List[Task]:
+        """Tasks whose ``when`` conditions read a variable."""
+        return list(self._by_variable.get(variable, ()))
+
+    def flow(self, file: str = "main.yml") -> List[Task]:
+        """Tasks in execution order from a file, following include/import_tasks.
+
+        Each include task is listed before the tasks it pulls in; templated
+        or missing include targets are listed but not followed.
+        """
+        order: List[Task] = []
+        visiting: Set[str] = set()
+
+        def walk(name: str) -> None:
+            if name in visiting or name not in self.files:
+                return
+            visiting.add(name)
+            for task in self.files[name]:
+                order.append(task)
+                if task.include and "{{" not in task.include:
+                    walk(task.include)
+            visiting.discard(name)
+
+        walk(file)
+        return order
+
+    def _order(self, task: Task) -> Tuple[int, int]:
+        return list(self.files).index(task.file), task.index
+
+    def __repr__(self) -> str:
+        return f"Role({self.name!r})"
+
+
+# Parsed roles keyed by path; reparsed when any of the role's YAML files changes.
+_cache: Dict[Path, Tuple[Tuple, Role]] = {}
+
+
+def _signature(path: Path) -> Tuple:
+    return tuple(sorted((str(file), file.stat().st_mtime_ns) for file in path.rglob("*.yml")))
+
+
+def load_role(role: Union[str, Path], root: Path = ROLES_DIR) -> Role:
+    """Parse and index a role (by name under configuration-by-ansible, or by path)."""
+    path = Path(role) if Path(role).is_absolute() else root / role
+    path = path.resolve()
+    signature = _signature(path)
+    cached = _cache.get(path)
+    if cached and cached[0] == signature:
+        for file, _ in signature:
+            sys.audit("homelab.read", file)
+        return cached[1]
+    parsed = Role(path)
+    _cache[path] = (signature, parsed)
+    return parsed
+
+
+def load_roles(root: Path = ROLES_DIR) -> Dict[str, Role]:
+    """Every role (directory with a tasks/ subdirectory) under root, by name."""
+    return {path.name: load_role(path) for path in sorted(root.iterdir()) if (path / "tasks").is_dir()}
+
+
+Expectation = Union[str, bool, int, None, Sequence[str], Callable[[Any], bool]]
+
+
+def _matches(value: Any, expected: Expectation) -> bool:
+    if callable(expected):
+        return bool(expected(value))
+    if isinstance(expected, str):
+        return value is not None and re.search(expected, str(value)) is not None
+    if isinstance(expected, (list, tuple)):
+        return value is not None and all(item in _listify(value) for item in expected)
+    if isinstance(expected, bool) and isinstance(value, str):
+        return value.strip().lower() == str(expected).lower()
+    return value == expected
+
+
+class RoleRule:
+    """A declarative structural rule over role tasks.
+
+    Tasks are selected by ``role``, ``file``, ``module`` (a name or tuple of
+    names), ``tag`` and ``match`` (field → expectation). Every selected task
+    must meet ``expect`` (field → expectation), and the number of selected
+    tasks must lie within ``min_count``/``max_count``; ``max_count=0`` forbids
+    a pattern.
+
+    Expectations: a string is a regex searched in the field's value, a list
+    must all be contained in it (e.g. tags), a callable is a predicate, and
+    anything else is compared for equality (``False`` also equals ``"false"``).
+    Fields are those of ``Task.get``.
+    """
+
+    __slots__ = ("id", "description", "role", "file", "module", "tag", "match", "expect",
+                 "min_count", "max_count")
+
+    def __init__(self, id: str, description: str, role: Optional[str] = None, file: Optional[str] = None,
+                 module: Union[str, Sequence[str], None] = None, tag: Optional[str] = None,
+                 match: Optional[Dict[str, Expectation]] = None, expect: Optional[Dict[str, Expectation]] = None,
+                 min_count: int = 1, max_count: Optional[int] = None):
+        self.id = id
+        self.description = description
+        self.role = role
+        self.file = file
+        self.module = (module,) if isinstance(module, str) else tuple(module) if module else None
+        self.tag = tag
+        self.match = match or {}
+        self.expect = expect or {}
+        self.min_count = min_count
+        self.max_count = max_count
+
+    def selects(self, task: Task) -> bool:
+        return (
+            (self.file is None or task.file == self.file)
+            and (self.tag is None or self.tag in task.tags)
+            and all(_matches(task.get(field), expected) for field, expected in self.match.items())
+        )
+
+    def check(self, task: Task) -> List[str]:
+        """Unmet expectations of a selected task."""
+        return [
+            f"{task!r}: {field} is {task.get(field)!r}, expected {expected!r}"
+            for field, expected in self.expect.items()
+            if not _matches(task.get(field), expected)
+        ]
+
+    def __repr__(self) -> str:
+        return f"RoleRule({self.id!r})"
+
+
+class RuleResult:
+    """Tasks a rule selected and the violations found."""
+
+    __slots__ = ("rule", "matched", "violations")
+
+    def __init__(self, rule: RoleRule):
+        self.rule = rule
+        self.matched: List[Task] = []
+        self.violations: List[str] = []
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+    @property
+    def message(self) -> str:
+        return f"{self.rule.id} ({self.rule.description}):\n  " + "\n  ".join(self.violations)
+
+    def as_dict(self) -> Dict:
+        return {"rule": self.rule.id, "matched": [repr(task) for task in self.matched],
+                "violations": self.violations}
+
+
+def evaluate(rules: Iterable[RoleRule], roles: Dict[str, Role]) -> Dict[str, RuleResult]:
+    """Check every rule against the roles in one pass over their tasks.
+
+    Rules are dispatched by role and module, so each task is only offered
+    to the rules that can select it.
+
+    Returns:
+        RuleResult per rule id
+    """
+    rules = list(rules)
+    results = {rule.id: RuleResult(rule) for rule in rules}
+
+    dispatch: Dict[Tuple[Optional[str], Optional[str]], List[RoleRule]] = {}
+    for rule in rules:
+        for module in rule.module or (None,):
+            dispatch.setdefault((rule.role, module), []).append(rule)
+
+    for name, role in roles.items():
+        for task in role:
+            for key in ((name, task.module), (name, None), (None, task.module), (None, None)):
+                for rule in dispatch.get(key, ()):
+                    if rule.selects(task):
+                        result = results[rule.id]
+                        result.matched.append(task)
+                        result.violations.extend(rule.check(task))
+
+    for result in results.values():
+        rule, count = result.rule, len(result.matched)
+        if rule.role is not None and rule.role not in roles:
+            result.violations.append(f"role {rule.role} not found")
+        elif count < rule.min_count:
+            result.violations.append(f"expected at least {rule.min_count} matching task(s), found {count}")
+        elif rule.max_count is not None and count > rule.max_count:
+            result.violations.append(f"expected at most {rule.max_count} matching task(s), found {count}: "
+                                     + ", ".join(repr(task) for task in result.matched))
+    return results
@@ -0,0 +1,255 @@
+"""Pooled SSH sessions for running many short commands on homelab hosts.
+
+Every ``ssh user@host 'cmd'`` through ``docker compose exec`` pays for a
+container exec plus a full SSH handshake. ``SSHPool`` instead keeps one
+long-lived ``ssh user@host sh`` channel per (user, host) and feeds it
+commands over stdin, so only the first command to a host connects.
+
+Each command runs in its own ``$SHELL -c`` (the user's login shell, as
+sshd runs a one-shot command; ``sh`` if unset) with stdin from /dev/null,
+so bash-isms behave as before and state (cwd, variables) never leaks
+between commands. Results come back as
+``subprocess.CompletedProcess`` exactly like the one-shot form. Output is
+delimited by a random marker printed after the command exits, followed by
+its exit status.
+
+Usage:
+    pool = SSHPool(prefix="docker compose exec -T homelab-dev", cwd=project_root)
+    result = pool.run("192.168.0.19", "uname -a")
+    pool.timings[-1].seconds      # latency of that command
+    pool.close()
+"""
+import os
+import selectors
+import shlex
+import subprocess
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_SSH_OPTIONS = (
+    "-o", "StrictHostKeyChecking=no",
+    "-o", "UserKnownHostsFile=/dev/null",
+    "-o", "GlobalKnownHostsFile=/dev/null",
+    "-o", "LogLevel=ERROR",
+    "-o", "ServerAliveInterval=30",
+)
+
+
+class SSHChannelError(RuntimeError):
+    """Raised when a pooled SSH channel dies or cannot be opened."""
+
+
+class CommandTiming:
+    """Wall time of one pooled command, including any connection set-up."""
+
+    __slots__ = ("host", "user", "command", "seconds", "connected")
+
+    def __init__(self, host: str, user: str, command: str, seconds: float, connected: bool):
+        self.host = host
+        self.user = user
+        self.command = command
+        self.seconds = seconds
+        self.connected = connected
+
+    def __repr__(self) -> str:
+        return f"CommandTiming({self.user}@{self.host}, {self.seconds:.3f}s, {self.command!r})"
+
+
+class _Channel:
+    """One ``ssh user@host sh`` process; commands on it are serialized."""
+
+    def __init__(self, argv: List[str], cwd: Optional[str]):
+        self.lock = threading.Lock()
+        self.process = subprocess.Popen(
+            argv,
+            cwd=cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self._buffers = {self.process.stdout.fileno(): b"", self.process.stderr.fileno(): b""}
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, command: str, timeout: Optional[float]) -> Tuple[int, bytes, bytes]:
+        marker = f"__HOMELAB_SSH_{uuid.uuid4().hex}__".encode()
+        script = (
+            f"\"${{SHELL:-sh}}\" -c {shlex.quote(command)} </dev/null; "
+            f"printf '\\n%s %d\\n' {marker.decode()} $?; "
+            f"printf '\\n%s\\n' {marker.decode()} >&2\n"
+        )
+        try:
+            self.process.stdin.write(script.encode())
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise SSHChannelError(f"SSH channel closed: {e}") from e
+
+        stdout_fd = self.process.stdout.fileno()
+        stderr_fd = self.process.stderr.fileno()
+        delimiter = b"\n" + marker
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        with selectors.DefaultSelector() as selector:
+            selector.register(stdout_fd, selectors.EVENT_READ)
+            selector.register(stderr_fd, selectors.EVENT_READ)
+            while not self._complete(stdout_fd, delimiter) or delimiter + b"\n" not in self._buffers[stderr_fd]:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise subprocess.TimeoutExpired(command, timeout)
+                for key, _ in selector.select(remaining):
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        raise SSHChannelError(
+                            f"SSH channel exited (code {self.process.poll()}): "
+                            f"{self._buffers[stderr_fd].decode(errors='replace').strip()}"
+                        )
+                    self._buffers[key.fd] += chunk
+
+        out, rest = self._buffers[stdout_fd].split(delimiter, 1)
+        status, self._buffers[stdout_fd] = rest.split(b"\n", 1)
+        err, self._buffers[stderr_fd] = self._buffers[stderr_fd].split(delimiter + b"\n", 1)
+        return int(status), out, err
+
+    def _complete(self, fd: int, delimiter: bytes) -> bool:
+        """True once the marker and the exit status line after it have arrived."""
+        index = self._buffers[fd].find(delimiter)
+        return index != -1 and b"\n" in self._buffers[fd][index + len(delimiter):]
+
+    def close(self, kill: bool = False) -> None:
+        if kill and self.alive():
+            self.process.kill()
+        if self.alive():
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout, self.process.stderr):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+class SSHPool:
+    """Reusable SSH channels keyed by (user, host), with per-command timing.
+
+    Args:
+        prefix: Command prefix the ssh client runs under (e.g. the
+            ``docker compose exec -T homelab-dev`` wrapper), as a string or argv
+        cwd: Working directory for the prefix command (the project root)
+        ssh_command: Client argv; tests point this at a local sshd stand-in
+        ssh_options: Extra client options (default: no host key checking)
+    """
+
+    def __init__(
+        self,
+        prefix: Union[str, Sequence[str]] = (),
+        cwd: Optional[Union[str, Path]] = None,
+        ssh_command: Sequence[str] = ("ssh",),
+        ssh_options: Sequence[str] = DEFAULT_SSH_OPTIONS,
+    ):
+        self.prefix = shlex.split(prefix) if isinstance(prefix, str) else list(prefix)
+        self.cwd = str(cwd) if cwd is not None else None
+        self.ssh_command = list(ssh_command)
+        self.ssh_options = list(ssh_options)
+        self.timings: List[CommandTiming] = []
+        self._channels: Dict[Tuple[str, str], _Channel] = {}
+        self._lock = threading.Lock()
+
+    def run(
+        self,
+        host: str,
+        command: str,
+        user: str = "root",
+        timeout: Optional[float] = None,
+    ) -> subprocess.CompletedProcess:
+        """Run a shell command on a host over a pooled channel.
+
+        A dead channel (host rebooted, connection dropped) is reopened once.
+
+        Returns:
+            subprocess.CompletedProcess with text stdout/stderr
+
+        Raises:
+            SSHChannelError: If the host cannot be reached
+            subprocess.TimeoutExpired: If the command outlives ``timeout``;
+                the channel is discarded since its output is now unframed
+        """
+        started = time.monotonic()
+        connected = False
+        for attempt in range(2):
+            channel, opened = self._channel(user, host)
+            connected = connected or opened
+            with channel.lock:
+                try:
+                    returncode, out, err = channel.run(command, timeout)
+                    break
+                except subprocess.TimeoutExpired:
+                    self._discard(user, host, channel)
+                    raise
+                except SSHChannelError:
+                    self._discard(user, host, channel)
+                    if opened or attempt:
+                        raise
+
+        self.timings.append(CommandTiming(host, user, command, time.monotonic() - started, connected))
+        return subprocess.CompletedProcess(
+            args=f"ssh {user}@{host} {shlex.quote(command)}",
+            returncode=returncode,
+            stdout=out.decode(errors="replace"),
+            stderr=err.decode(errors="replace"),
+        )
+
+    def _channel(self, user: str, host: str) -> Tuple[_Channel, bool]:
+        with self._lock:
+            channel = self._channels.get((user, host))
+            if channel is not None and channel.alive():
+                return channel, False
+            argv = [*self.prefix, *self.ssh_command, "-T", *self.ssh_options, f"{user}@{host}", "sh"]
+            try:
+                channel = _Channel(argv, self.cwd)
+            except OSError as e:
+                raise SSHChannelError(f"Cannot start {argv[0]}: {e}") from e
+            self._channels[(user, host)] = channel
+            return channel, True
+
+    def _discard(self, user: str, host: str, channel: _Channel) -> None:
+        with self._lock:
+            if self._channels.get((user, host)) is channel:
+                del self._channels[(user, host)]
+        channel.close(kill=True)
+
+    def latency_summary(self) -> Dict[str, Dict[str, float]]:
+        """Per ``user@host`` command count, total, mean and max latency in seconds."""
+        summary: Dict[str, Dict[str, float]] = {}
+        for timing in self.timings:
+            entry = summary.setdefault(
+                f"{timing.user}@{timing.host}",
+                {"commands": 0, "connections": 0, "total": 0.0, "max": 0.0},
+            )
+            entry["commands"] += 1
+            entry["connections"] += timing.connected
+            entry["total"] += timing.seconds
+            entry["max"] = max(entry["max"], timing.seconds)
+        for entry in summary.values():
+            entry["mean"] = entry["total"] / entry["commands"]
+        return summary
+
+    def close(self) -> None:
+        """Close every pooled channel."""
+        with self._lock:
+            channels, self._channels = list(self._channels.values()), {}
+        for channel in channels:
+            channel.close()
+
+    def __enter__(self) -> "SSHPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
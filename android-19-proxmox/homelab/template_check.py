@@ -0,0 +1,351 @@
+"""Offline render-and-validate pipeline for every role template.
+
+Tests used to render only AdGuardHome-minimal.yaml.j2 and string-grep the
+other templates. This module renders every ``templates/**/*.j2`` under
+configuration-by-ansible the way the role would, and validates the output
+by format:
+
+- variables are the role defaults resolved against the catalog
+  (``homelab.templating.role_vars``) plus the inventory vars of a host the
+  role is applied to (found from the playbooks), including the vars the
+  homelab_catalog plugin sets (``vm_config``, ``prometheus_file_sd``);
+- the format comes from the rendered file name: YAML, JSON, systemd units,
+  shell scripts (``bash -n``), ``.conf`` (INI or modprobe.d) and
+  ``KEY=value`` environment files (no extension);
+- templates render in a process pool, and results are cached by a hash of
+  the template source and its variables, so only changed templates render
+  again.
+
+Command line (``make env-check``):
+    python3 -m homelab.template_check
+    python3 -m homelab.template_check --workers 8 --cache .cache/homelab/templates.json
+"""
+import argparse
+import configparser
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+from homelab.ansible_syntax import discover_playbooks
+from homelab.catalog import load_catalog
+from homelab.file_sd import scrape_targets
+from homelab.templating import render_file, role_vars
+from homelab.yaml_loader import load_yaml
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+ROLES_DIR = REPO_ROOT / "android-19-proxmox" / "configuration-by-ansible"
+INVENTORY_FILE = REPO_ROOT / "inventory.yml"
+DEFAULT_CACHE = REPO_ROOT / ".cache" / "homelab" / "templates.json"
+
+# Bump when validation rules change to invalidate cached results
+_VERSION = 2
+
+_MODPROBE_COMMANDS = ("alias", "blacklist", "install", "options", "remove", "softdep")
+_ENV_LINE = re.compile(r"^(export\s+)?[A-Za-z_][A-Za-z0-9_]*=")
+_UNIT_SECTIONS = ("Unit", "Service", "Install", "Timer", "Socket", "Path", "Mount")
+
+
+class TemplateResult:
+    """Outcome of rendering and validating one template."""
+
+    __slots__ = ("template", "format", "error", "seconds", "cached")
+
+    def __init__(self, template: str, format: str, error: Optional[str] = None,
+                 seconds: float = 0.0, cached: bool = False):
+        self.template = template
+        self.format = format
+        self.error = error
+        self.seconds = seconds
+        self.cached = cached
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def as_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+def discover_templates(root: Path = ROLES_DIR) -> List[Path]:
+    """Every role template, sorted."""
+    return sorted(root.glob("*/templates/**/*.j2"))
+
+
+def detect_format(template: Path) -> str:
+    """Output format of a template, from the name it renders to."""
+    name = template.name[:-len(".j2")] if template.name.endswith(".j2") else template.name
+    suffix = Path(name).suffix
+    if suffix in (".yml", ".yaml"):
+        return "yaml"
+    if suffix == ".json":
+        return "json"
+    if suffix in (".service", ".timer", ".socket", ".path", ".mount"):
+        return "systemd"
+    if suffix == ".sh":
+        return "shell"
+    if suffix == ".conf":
+        return "conf"
+    if not suffix:
+        return "env"
+    return "text"
+
+
+def _validate_yaml(text: str) -> None:
+    list(yaml.safe_load_all(text))
+
+
+def _validate_systemd(text: str) -> None:
+    section = None
+    sections = set()
+    # A trailing backslash continues the value on the next line
+    text = re.sub(r"\\\n", " ", text)
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith(("#", ";")):
+            continue
+        if line.startswith("[") and line.endswith("]"):
+            section = line[1:-1]
+            if section not in _UNIT_SECTIONS:
+                raise ValueError(f"line {number}: unknown section [{section}]")
+            sections.add(section)
+        elif section is None:
+            raise ValueError(f"line {number}: setting outside a section")
+        elif "=" not in line:
+            raise ValueError(f"line {number}: expected Key=Value, got {line!r}")
+    if "Service" in sections and not re.search(r"^\s*ExecStart\s*=\s*\S", text, re.MULTILINE):
+        raise ValueError("[Service] has no ExecStart")
+    if not sections & {"Service", "Timer", "Socket", "Path", "Mount"}:
+        raise ValueError("no [Service]/[Timer]/[Socket]/[Path]/[Mount] section")
+
+
+def _validate_shell(text: str) -> None:
+    bash = shutil.which("bash")
+    if bash is None:
+        return
+    result = subprocess.run([bash, "-n"], input=text, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise ValueError(result.stderr.strip())
+
+
+def _validate_conf(text: str) -> None:
+    parser = configparser.ConfigParser(strict=True, interpolation=None)
+    try:
+        parser.read_string(text)
+        return
+    except configparser.MissingSectionHeaderError:
+        pass
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if line and not line.startswith("#") and line.split()[0] not in _MODPROBE_COMMANDS:
+            raise ValueError(f"line {number}: neither INI nor a modprobe.d directive: {line!r}")
+
+
+def _validate_env(text: str) -> None:
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if line and not line.startswith("#") and not _ENV_LINE.match(line):
+            raise ValueError(f"line {number}: expected KEY=value, got {line!r}")
+
+
+VALIDATORS = {
+    "yaml": _validate_yaml,
+    "json": json.loads,
+    "systemd": _validate_systemd,
+    "shell": _validate_shell,
+    "conf": _validate_conf,
+    "env": _validate_env,
+    "text": lambda text: None,
+}
+
+
+def validate(text: str, format: str) -> Optional[str]:
+    """Return an error message, or None if the text is valid for its format."""
+    try:
+        VALIDATORS[format](text)
+    except Exception as e:
+        return f"invalid {format}: {e}"
+    return None
+
+
+def _inventory() -> Tuple[Dict[str, Dict], Dict[str, List[str]]]:
+    """Host vars by host and member hosts by group, from inventory.yml."""
+    hosts: Dict[str, Dict] = {}
+    groups: Dict[str, List[str]] = {}
+
+    def walk(name: str, group: Dict) -> List[str]:
+        members = []
+        for host, host_vars in ((group or {}).get("hosts") or {}).items():
+            hosts.setdefault(host, {}).update(host_vars or {})
+            members.append(host)
+        for child, child_group in ((group or {}).get("children") or {}).items():
+            members.extend(walk(child, child_group))
+        groups[name] = members
+        return members
+
+    for name, group in (load_yaml(INVENTORY_FILE) or {}).items():
+        walk(name, group)
+    return hosts, groups
+
+
+def role_hosts(playbooks: Optional[Iterable[Path]] = None) -> Dict[str, str]:
+    """First inventory host each role is applied to by the playbooks."""
+    hosts, groups = _inventory()
+    result: Dict[str, str] = {}
+    for playbook in playbooks if playbooks is not None else discover_playbooks():
+        for play in load_yaml(playbook) or []:
+            pattern = str(play.get("hosts", ""))
+            members = groups.get(pattern) or ([pattern] if pattern in hosts else [])
+            if not members:
+                continue
+            for role in play.get("roles") or []:
+                name = role.get("role") or role.get("name") if isinstance(role, dict) else role
+                result.setdefault(name, members[0])
+    return result
+
+
+def host_vars(host: str, catalog: Dict) -> Dict[str, Any]:
+    """Inventory vars of a host plus the magic vars templates use."""
+    hosts, groups = _inventory()
+    variables = dict(hosts.get(host, {}))
+    variables.setdefault("ansible_host", host)
+    variables["inventory_hostname"] = host
+    variables["inventory_hostname_short"] = host.split(".")[0]
+    variables["group_names"] = sorted(g for g, members in groups.items() if host in members and g != "all")
+    vm_id = variables.get("vm_id")
+    if vm_id in (catalog.get("services") or {}):
+        variables["vm_config"] = catalog["services"][vm_id]
+    return variables
+
+
+def template_context(template: Path, catalog: Dict, hosts: Dict[str, str],
+                     group_vars: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Variables a template sees when its role runs.
+
+    ``group_vars`` are ``all``-group vars (e.g. from the homelab_catalog
+    plugin); host vars take precedence over them.
+    """
+    role = template.relative_to(ROLES_DIR).parts[0]
+    overrides = dict(group_vars or {})
+    if role in hosts:
+        overrides.update(host_vars(hosts[role], catalog))
+    return role_vars(ROLES_DIR / role, catalog, overrides)
+
+
+def _input_hash(template: Path, context: Dict[str, Any]) -> str:
+    digest = hashlib.sha256(f"{_VERSION}\0".encode())
+    digest.update(template.read_bytes())
+    digest.update(json.dumps(context, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def render_and_validate(template: str, context: Dict[str, Any]) -> TemplateResult:
+    """Render one template and validate the output (runs in a worker process)."""
+    path = Path(template)
+    format = detect_format(path)
+    started = time.perf_counter()
+    try:
+        error = validate(render_file(path, context), format)
+    except Exception as e:
+        error = f"render failed: {type(e).__name__}: {e}"
+    return TemplateResult(template, format, error, time.perf_counter() - started)
+
+
+def check_templates(
+    templates: Optional[Iterable[Path]] = None,
+    workers: Optional[int] = None,
+    cache_file: Optional[Path] = None,
+) -> Dict[str, TemplateResult]:
+    """Render and validate templates, reusing cached results for unchanged inputs.
+
+    Args:
+        templates: Templates to check (default: every role template)
+        workers: Process pool size (default: CPU count; 1 renders inline)
+        cache_file: JSON file with results keyed by input hash (optional)
+
+    Returns:
+        TemplateResult per template path, relative to the repository root
+    """
+    templates = list(templates) if templates is not None else discover_templates()
+    parsed = load_catalog()
+    catalog = parsed.raw
+    group_vars = {"prometheus_file_sd": scrape_targets(parsed)}
+    hosts = role_hosts()
+
+    cache: Dict[str, Dict] = {}
+    if cache_file and cache_file.exists():
+        try:
+            cache = json.loads(cache_file.read_text())
+        except ValueError:
+            cache = {}
+
+    results: Dict[str, TemplateResult] = {}
+    pending: List[Tuple[str, str, Dict]] = []
+    for template in templates:
+        template = Path(template).resolve()
+        key = os.path.relpath(template, REPO_ROOT)
+        context = template_context(template, catalog, hosts, group_vars)
+        digest = _input_hash(template, context)
+        stored = cache.get(key)
+        if stored and stored["hash"] == digest:
+            results[key] = TemplateResult(key, stored["format"], stored["error"], cached=True)
+        else:
+            pending.append((key, digest, context))
+
+    if workers == 1 or len(pending) < 2:
+        rendered = [render_and_validate(str(REPO_ROOT / key), context) for key, _, context in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = list(pool.map(render_and_validate,
+                                     [str(REPO_ROOT / key) for key, _, _ in pending],
+                                     [context for _, _, context in pending]))
+
+    for (key, digest, _), result in zip(pending, rendered):
+        result.template = key
+        results[key] = result
+        cache[key] = {"hash": digest, "format": result.format, "error": result.error}
+
+    if cache_file:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps(cache, indent=1, sort_keys=True))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m homelab.template_check",
+        description="Render every role template offline and validate the output format.",
+    )
+    parser.add_argument("templates", nargs="*", type=Path, help="Templates to check (default: all)")
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (default: CPU count)")
+    parser.add_argument("--cache", type=Path, default=DEFAULT_CACHE, help="Result cache file")
+    parser.add_argument("--no-cache", action="store_true", help="Render everything, ignoring the cache")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    results = check_templates(args.templates or None, args.workers, None if args.no_cache else args.cache)
+
+    failures = 0
+    for key, result in sorted(results.items()):
+        if result.ok:
+            print(f"✅ {key} ({result.format}{', cached' if result.cached else ''})")
+        else:
+            failures += 1
+            print(f"❌ {key}\n   {result.error}")
+    cached = sum(result.cached for result in results.values())
+    print(f"\n{len(results) - failures}/{len(results)} templates valid "
+          f"({cached} cached) in {time.perf_counter() - started:.2f}s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
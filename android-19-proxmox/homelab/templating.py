@@ -0,0 +1,271 @@
+"""Shared Jinja2 rendering for role templates and variables.
+
+Tests used to build a fresh ``jinja2.Environment`` (and recompile every
+string) each time they rendered a role template or resolved a templated
+default, then walk the variables twice hoping nested references settle.
+This module keeps one sandboxed environment for the process:
+
+- compiled file templates are held in Jinja2's own LRU (auto-reloaded when
+  the file changes) and compiled strings/expressions in an LRU here;
+- Ansible-compatible filters (``to_yaml``, ``from_yaml``, ``to_json``,
+  ``bool``, ``ternary``, ``combine``, ``regex_replace``, a lite ``ipaddr``)
+  so role templates render as they would under the template module;
+- ``resolve_vars`` resolves inter-variable references (``adguard_dhcp_gateway:
+  "{{ catalog.network.gateway }}"``) once each, in dependency order.
+
+Usage:
+    from homelab.templating import render_file, role_vars
+    variables = role_vars(role_dir, catalog, overrides={"adguard_dhcp_enabled": True})
+    rendered = render_file(role_dir / "templates" / "AdGuardHome-minimal.yaml.j2", variables)
+"""
+import ipaddress
+import json
+import os
+import re
+from functools import lru_cache
+from graphlib import CycleError, TopologicalSorter
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Set, Union
+
+import yaml
+from jinja2 import FileSystemLoader, StrictUndefined, Template, TemplateError, Undefined, meta
+from jinja2.sandbox import SandboxedEnvironment
+
+from homelab.yaml_loader import load_yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# A value that is a single expression keeps its native type, as in Ansible
+_SINGLE_EXPRESSION = re.compile(r"^\s*\{\{(?P<expr>(?:(?!\{\{|\}\}).)*)\}\}\s*$", re.DOTALL)
+
+_TRUTHY = ("yes", "on", "1", "true", "y", "t")
+
+
+class TemplateResolutionError(ValueError):
+    """Raised when templated variables reference each other in a cycle."""
+
+
+def _to_yaml(value: Any, **kwargs: Any) -> str:
+    return yaml.safe_dump(value, allow_unicode=True, default_flow_style=kwargs.pop("default_flow_style", None),
+                          **kwargs)
+
+
+def _to_nice_yaml(value: Any, indent: int = 4, **kwargs: Any) -> str:
+    return yaml.safe_dump(value, indent=indent, allow_unicode=True, default_flow_style=False, **kwargs)
+
+
+def _from_yaml(value: Any) -> Any:
+    return yaml.safe_load(value) if isinstance(value, str) else value
+
+
+def _to_nice_json(value: Any, indent: int = 4, **kwargs: Any) -> str:
+    return json.dumps(value, indent=indent, sort_keys=True, separators=(",", ": "), **kwargs)
+
+
+def _bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in _TRUTHY
+
+
+def _ternary(value: Any, true_value: Any, false_value: Any) -> Any:
+    return true_value if value else false_value
+
+
+def _combine(*dicts: Mapping, recursive: bool = False) -> Dict:
+    result: Dict = {}
+    for item in dicts:
+        for key, value in item.items():
+            if recursive and isinstance(value, Mapping) and isinstance(result.get(key), Mapping):
+                value = _combine(result[key], value, recursive=True)
+            result[key] = value
+    return result
+
+
+def _regex_replace(value: Any, pattern: str, replacement: str = "", ignorecase: bool = False) -> str:
+    return re.sub(pattern, replacement, str(value), flags=re.IGNORECASE if ignorecase else 0)
+
+
+def _ipaddr(value: Any, query: str = "") -> Union[str, int, bool]:
+    """Subset of ansible.utils.ipaddr: validate, or extract one property.
+
+    Returns False for invalid input, like the Ansible filter.
+    """
+    try:
+        interface = ipaddress.ip_interface(str(value).strip())
+    except ValueError:
+        return False
+    properties = {
+        "": str(value).strip(),
+        "address": str(interface.ip),
+        "network": str(interface.network.network_address),
+        "netmask": str(interface.netmask),
+        "prefix": interface.network.prefixlen,
+        "broadcast": str(interface.network.broadcast_address),
+        "host": f"{interface.ip}/{interface.network.prefixlen}",
+        "net": str(interface.network),
+        "private": interface.ip.is_private,
+    }
+    if query not in properties:
+        raise TemplateError(f"ipaddr: unsupported query {query!r}")
+    return properties[query]
+
+
+FILTERS = {
+    "to_yaml": _to_yaml,
+    "to_nice_yaml": _to_nice_yaml,
+    "from_yaml": _from_yaml,
+    "to_json": json.dumps,
+    "to_nice_json": _to_nice_json,
+    "from_json": json.loads,
+    "bool": _bool,
+    "ternary": _ternary,
+    "combine": _combine,
+    "regex_replace": _regex_replace,
+    "basename": os.path.basename,
+    "dirname": os.path.dirname,
+    "ipaddr": _ipaddr,
+    "ansible.utils.ipaddr": _ipaddr,
+    "ipv4": lambda value, query="": _ipaddr(value, query) if ":" not in str(value) else False,
+}
+
+
+def _environment() -> SandboxedEnvironment:
+    # Same whitespace handling as Ansible's template module
+    env = SandboxedEnvironment(
+        loader=FileSystemLoader(str(PROJECT_ROOT)),
+        trim_blocks=True,
+        keep_trailing_newline=True,
+        auto_reload=True,
+        cache_size=400,
+    )
+    env.filters.update(FILTERS)
+    return env
+
+
+ENVIRONMENT = _environment()
+
+# Resolution uses the same filters but fails on undefined names instead of rendering ""
+_STRICT = _environment()
+_STRICT.undefined = StrictUndefined
+
+
+@lru_cache(maxsize=1024)
+def compile_string(source: str, strict: bool = False) -> Template:
+    """Compiled template for a string, shared across callers."""
+    return (_STRICT if strict else ENVIRONMENT).from_string(source)
+
+
+@lru_cache(maxsize=1024)
+def _compile_expression(expression: str):
+    return _STRICT.compile_expression(expression, undefined_to_none=False)
+
+
+@lru_cache(maxsize=1024)
+def referenced_names(source: str) -> frozenset:
+    """Top-level variable names a template string reads."""
+    return frozenset(meta.find_undeclared_variables(ENVIRONMENT.parse(source)))
+
+
+def render_string(source: str, variables: Mapping[str, Any]) -> str:
+    """Render a template string."""
+    return compile_string(source).render(variables)
+
+
+def render_file(path: Union[str, Path], variables: Mapping[str, Any]) -> str:
+    """Render a template file (relative paths are taken from android-19-proxmox/)."""
+    path = Path(path)
+    if path.is_absolute():
+        try:
+            path = path.resolve().relative_to(PROJECT_ROOT)
+        except ValueError:
+            return render_string(path.read_text(), variables)
+    return ENVIRONMENT.get_template(path.as_posix()).render(variables)
+
+
+def _strings(value: Any):
+    if isinstance(value, str):
+        if "{{" in value or "{%" in value:
+            yield value
+    elif isinstance(value, Mapping):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(item)
+
+
+def _render_value(value: Any, context: Mapping[str, Any]) -> Any:
+    if isinstance(value, str):
+        if "{{" not in value and "{%" not in value:
+            return value
+        try:
+            single = _SINGLE_EXPRESSION.match(value)
+            if single:
+                result = _compile_expression(single.group("expr"))(**context)
+                return value if isinstance(result, Undefined) else result
+            return compile_string(value, strict=True).render(context)
+        except (TemplateError, TypeError, ValueError, KeyError, AttributeError):
+            # Unresolvable here (undefined name, Ansible-only lookup): keep the string
+            return value
+    if isinstance(value, Mapping):
+        return {key: _render_value(item, context) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_render_value(item, context) for item in value]
+    return value
+
+
+def resolve_vars(variables: Mapping[str, Any], context: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """Resolve templated values, including references between the variables.
+
+    Each variable is rendered exactly once, after the variables it refers
+    to. Values that cannot be resolved offline are returned unchanged.
+
+    Args:
+        variables: Variables whose values may be template strings
+        context: Extra names available to templates (e.g. ``catalog``);
+            variables with the same name take precedence
+
+    Returns:
+        New dict with resolved values
+
+    Raises:
+        TemplateResolutionError: If variables reference each other in a cycle
+    """
+    graph: Dict[str, Set[str]] = {}
+    for name, value in variables.items():
+        refs: Set[str] = set()
+        for source in _strings(value):
+            try:
+                refs |= referenced_names(source)
+            except TemplateError:
+                continue
+        graph[name] = {ref for ref in refs if ref in variables and ref != name}
+
+    try:
+        order = list(TopologicalSorter(graph).static_order())
+    except CycleError as e:
+        raise TemplateResolutionError(f"Variables reference each other in a cycle: {e.args[1]}") from e
+
+    resolved: Dict[str, Any] = dict(context or {})
+    for name in order:
+        resolved[name] = _render_value(variables[name], resolved)
+    return {name: resolved[name] for name in variables}
+
+
+def role_vars(
+    role_dir: Union[str, Path],
+    catalog: Optional[Mapping[str, Any]] = None,
+    overrides: Optional[Mapping[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Role defaults (plus overrides) resolved against the catalog.
+
+    The returned dict includes ``catalog`` so templates can use it directly.
+    """
+    defaults_file = Path(role_dir) / "defaults" / "main.yml"
+    variables = (load_yaml(defaults_file) or {}) if defaults_file.exists() else {}
+    variables.update(overrides or {})
+    context = {"catalog": catalog} if catalog is not None else {}
+    resolved = resolve_vars(variables, context)
+    resolved.update(context)
+    return resolved
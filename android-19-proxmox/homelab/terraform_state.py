@@ -0,0 +1,291 @@
+"""Rebuild Terraform state from what already exists on Proxmox.
+
+``rebuild-state.sh`` used to start a Python interpreter per catalog field
+and then run ``terraform import`` once per resource, each re-initialising
+the provider and re-locking the state. This module instead:
+
+1. reads the catalog once;
+2. lists every guest on the node with a single API call
+   (``pvesh get /cluster/resources --type vm`` on the Proxmox host);
+3. asks Terraform once which addresses it already manages;
+4. writes one ``imports.tf`` with an ``import {}`` block per catalog guest
+   that exists but is not in state, and imports them all in a single
+   ``plan``/``apply`` cycle targeted at those addresses.
+
+The saved plan is applied automatically only when it does nothing but
+import; if the live guests differ from the configuration (the import would
+also update them) the plan is printed for review and ``--apply`` applies it.
+``imports.tf`` and the saved plan are removed again either way.
+Terraform older than 1.5 (no ``import`` blocks) falls back to one
+``terraform import`` per resource.
+
+Command line (run inside the homelab-dev container):
+    python3 -m homelab.terraform_state              # import, apply if import-only
+    python3 -m homelab.terraform_state --dry-run    # print the import blocks
+    python3 -m homelab.terraform_state --apply      # apply even with drift
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from homelab.catalog import Catalog, Service, load_catalog
+from homelab.deploy import REPO_ROOT, TERRAFORM_DIR, terraform_address
+from homelab.pve_exporter import CLUSTER_RESOURCES_COMMAND, CollectorError, parse_resources
+from homelab.ssh_pool import SSHChannelError, SSHPool
+
+IMPORTS_FILE = "imports.tf"
+PLAN_FILE = "rebuild-state.tfplan"
+
+# Proxmox guest type per catalog service type
+_GUEST_TYPES = {"container": "lxc", "vm": "qemu"}
+
+# First Terraform release supporting import blocks
+_IMPORT_BLOCKS_VERSION = (1, 5)
+
+Runner = Callable[[List[str]], subprocess.CompletedProcess]
+
+
+class StateRebuildError(RuntimeError):
+    """Raised when Proxmox or Terraform cannot be queried."""
+
+
+class ImportTarget:
+    """A catalog guest to import: Terraform address plus provider import ID."""
+
+    __slots__ = ("service", "address", "import_id")
+
+    def __init__(self, service: Service, node_name: str):
+        self.service = service
+        self.address = terraform_address(service)
+        self.import_id = f"{node_name}/{service.id}"
+
+    def __repr__(self) -> str:
+        return f"ImportTarget({self.address!r}, {self.import_id!r})"
+
+
+class ImportPlan:
+    """Which catalog guests to import, skip or leave for ``terraform apply``."""
+
+    __slots__ = ("imports", "managed", "missing", "conflicts")
+
+    def __init__(self):
+        self.imports: List[ImportTarget] = []
+        self.managed: List[Service] = []
+        self.missing: List[Service] = []
+        self.conflicts: List[Tuple[Service, str]] = []
+
+
+def list_guests(ssh: SSHPool, host: str, node_name: str) -> Dict[int, str]:
+    """List guests on a node with one Proxmox API call.
+
+    Returns:
+        Guest type (``qemu`` or ``lxc``) by VM ID
+
+    Raises:
+        StateRebuildError: If the listing fails or is not valid JSON
+    """
+    try:
+        result = ssh.run(host, CLUSTER_RESOURCES_COMMAND, timeout=60)
+    except (SSHChannelError, subprocess.TimeoutExpired) as e:
+        raise StateRebuildError(f"Could not reach Proxmox at {host}: {e}") from e
+    if result.returncode != 0:
+        raise StateRebuildError(f"Could not list guests on {host}: {result.stderr.strip()}")
+    try:
+        guests = parse_resources(result.stdout, node=node_name)
+    except CollectorError as e:
+        raise StateRebuildError(f"Unexpected pvesh output from {host}: {e}") from e
+    return {vmid: guest.type for vmid, guest in guests.items()}
+
+
+def managed_addresses(runner: Runner) -> List[str]:
+    """Addresses already in Terraform state (empty when there is no state)."""
+    result = runner(["terraform", "state", "list"])
+    if result.returncode != 0:
+        return []
+    return [line.strip() for line in result.stdout.splitlines() if line.strip()]
+
+
+def plan_imports(catalog: Catalog, guests: Dict[int, str], managed: Sequence[str]) -> ImportPlan:
+    """Match catalog services against live guests and current state."""
+    plan = ImportPlan()
+    managed = set(managed)
+    for service in catalog:
+        target = ImportTarget(service, catalog.proxmox.node_name)
+        if target.address in managed:
+            plan.managed.append(service)
+        elif service.id not in guests:
+            plan.missing.append(service)
+        elif guests[service.id] != _GUEST_TYPES.get(service.type):
+            plan.conflicts.append((service, guests[service.id]))
+        else:
+            plan.imports.append(target)
+    return plan
+
+
+def render_import_blocks(imports: Sequence[ImportTarget]) -> str:
+    """Terraform ``import {}`` blocks for the targets."""
+    blocks = ["# Generated by homelab.terraform_state - removed once the imports are applied\n"]
+    for target in imports:
+        blocks.append(
+            f"\n# {target.service.name}\n"
+            f"import {{\n"
+            f"  to = {target.address}\n"
+            f"  id = {json.dumps(target.import_id)}\n"
+            f"}}\n"
+        )
+    return "".join(blocks)
+
+
+def terraform_version(runner: Runner) -> Tuple[int, ...]:
+    """Installed Terraform version as a tuple of ints."""
+    result = runner(["terraform", "version", "-json"])
+    if result.returncode != 0:
+        raise StateRebuildError(f"terraform version failed: {result.stderr.strip()}")
+    version = json.loads(result.stdout)["terraform_version"]
+    return tuple(int(part) for part in version.split("-")[0].split("."))
+
+
+def is_import_only(plan_json: Dict) -> bool:
+    """True if a ``terraform show -json`` plan only imports existing resources."""
+    for change in plan_json.get("resource_changes", []):
+        actions = change["change"]["actions"]
+        if actions != ["no-op"] or not change["change"].get("importing"):
+            return False
+    return True
+
+
+def _runner(workdir: Path) -> Runner:
+    def run(args: List[str]) -> subprocess.CompletedProcess:
+        return subprocess.run(args, cwd=workdir, capture_output=True, text=True)
+    return run
+
+
+def _check(result: subprocess.CompletedProcess, what: str) -> None:
+    if result.returncode != 0:
+        raise StateRebuildError(f"{what} failed:\n{result.stdout}{result.stderr}")
+
+
+def backup_state(workdir: Path) -> Optional[Path]:
+    """Copy terraform.tfstate aside before changing it."""
+    state = workdir / "terraform.tfstate"
+    if not state.exists():
+        return None
+    backup = workdir / f"terraform.tfstate.backup.{time.strftime('%Y%m%d-%H%M%S')}"
+    shutil.copy2(state, backup)
+    return backup
+
+
+def import_all(
+    imports: Sequence[ImportTarget],
+    workdir: Path,
+    runner: Runner,
+    force: bool = False,
+) -> bool:
+    """Import every target in one targeted plan/apply cycle.
+
+    Args:
+        imports: Guests to import
+        workdir: Terraform directory (``imports.tf`` is written here)
+        runner: Runs a terraform command in ``workdir``
+        force: Apply even if the plan would also change the guests
+
+    Returns:
+        True if the imports were applied, False if the plan was printed for review
+
+    Raises:
+        StateRebuildError: If a terraform command fails
+    """
+    if terraform_version(runner) < _IMPORT_BLOCKS_VERSION:
+        for target in imports:
+            _check(runner(["terraform", "import", target.address, target.import_id]),
+                   f"terraform import {target.address}")
+        return True
+
+    imports_file = workdir / IMPORTS_FILE
+    imports_file.write_text(render_import_blocks(imports))
+    # Leftover import blocks would be picked up by the next ordinary plan/apply
+    try:
+        targets = [f"-target={target.address}" for target in imports]
+        _check(runner(["terraform", "plan", "-input=false", f"-out={PLAN_FILE}", *targets]), "terraform plan")
+
+        shown = runner(["terraform", "show", "-json", PLAN_FILE])
+        _check(shown, "terraform show")
+        if not force and not is_import_only(json.loads(shown.stdout)):
+            print(runner(["terraform", "show", PLAN_FILE]).stdout)
+            return False
+
+        _check(runner(["terraform", "apply", "-input=false", PLAN_FILE]), "terraform apply")
+        return True
+    finally:
+        imports_file.unlink(missing_ok=True)
+        (workdir / PLAN_FILE).unlink(missing_ok=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m homelab.terraform_state",
+        description="Import existing Proxmox guests into Terraform state in one plan/apply.",
+    )
+    parser.add_argument("--catalog", type=Path, default=None, help="Path to infrastructure-catalog.yml")
+    parser.add_argument("--terraform-dir", type=Path, default=REPO_ROOT / TERRAFORM_DIR,
+                        help="Terraform working directory")
+    parser.add_argument("--dry-run", action="store_true", help="Print the import blocks without importing")
+    parser.add_argument("--apply", action="store_true",
+                        help="Apply the imports even if they would also update the guests")
+    args = parser.parse_args(argv)
+
+    catalog = load_catalog(args.catalog)
+    workdir = args.terraform_dir
+    runner = _runner(workdir)
+    print(f"📡 Proxmox Host: {catalog.proxmox.ip} (node {catalog.proxmox.node_name})")
+
+    try:
+        with SSHPool() as ssh:
+            guests = list_guests(ssh, catalog.proxmox.ip, catalog.proxmox.node_name)
+        if not (workdir / ".terraform").is_dir():
+            _check(runner(["terraform", "init", "-input=false"]), "terraform init")
+        plan = plan_imports(catalog, guests, managed_addresses(runner))
+    except StateRebuildError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        print("   Make sure SSH is set up: make setup-ssh", file=sys.stderr)
+        return 1
+
+    for service in plan.managed:
+        print(f"  ℹ️  {service.id} ({service.name}) already in Terraform state")
+    for service in plan.missing:
+        print(f"  ⚠️  {service.id} ({service.name}) not found on Proxmox - will be created on next terraform apply")
+    for service, guest_type in plan.conflicts:
+        print(f"  ⚠️  {service.id} ({service.name}) is a {service.type} in the catalog but a {guest_type} "
+              f"guest on Proxmox - not imported")
+    for target in plan.imports:
+        print(f"  📥 {target.service.id} ({target.service.name}) -> {target.address}")
+
+    if not plan.imports:
+        print("🎉 Nothing to import")
+        return 0
+    if args.dry_run:
+        print(render_import_blocks(plan.imports))
+        return 0
+
+    backup = backup_state(workdir)
+    if backup:
+        print(f"💾 Backed up existing state to {backup.name}")
+    try:
+        applied = import_all(plan.imports, workdir, runner, force=args.apply)
+    except StateRebuildError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    if not applied:
+        print("⚠️  The import would also change these guests; review the plan above and re-run with --apply")
+        return 1
+    print(f"🎉 Imported {len(plan.imports)} resources in one apply")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
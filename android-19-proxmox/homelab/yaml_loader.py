@@ -0,0 +1,207 @@
+"""Cached YAML loading for catalog, role and playbook files.
+
+PyYAML's pure-Python loader dominates the unit suite's wall time because the
+same role defaults and task files are parsed over and over. ``load_yaml``
+parses with libyaml's ``CSafeLoader`` when PyYAML was built with it and
+memoizes the result at two levels:
+
+- in-process, keyed by path + mtime + size, so repeated loads in one run
+  never re-read the file;
+- on disk (when a cache directory is configured), keyed by the SHA-256 of
+  the file content, so warm reruns skip parsing entirely. The test suite
+  points this at ``.pytest_cache`` from ``tests/conftest.py``.
+
+Documents are stored pickled and every call returns a fresh copy, so
+callers may mutate the result without affecting other callers.
+
+For pytest-xdist runs, the controller parses every repository YAML file
+once into a single snapshot file (``build_snapshot``); each worker loads
+it into its memory cache (``attach_snapshot``) instead of parsing again.
+Entries are still checked against the file's mtime and size on use, so a
+file edited mid-run is re-parsed.
+"""
+import fcntl
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+import yaml
+
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Bump when the pickled representation changes to orphan old cache entries.
+_FORMAT = 1
+
+# Absolute path -> (mtime_ns, size, pickled document)
+_memory: Dict[str, Tuple[int, int, bytes]] = {}
+
+_cache_dir: Optional[Path] = (
+    Path(os.environ["HOMELAB_YAML_CACHE_DIR"]) if os.environ.get("HOMELAB_YAML_CACHE_DIR") else None
+)
+
+
+def set_cache_dir(path: Optional[Union[str, Path]]) -> None:
+    """Set (or disable with None) the on-disk cache directory."""
+    global _cache_dir
+    _cache_dir = Path(path) if path else None
+    if _cache_dir:
+        _cache_dir.mkdir(parents=True, exist_ok=True)
+
+
+def clear_memory_cache() -> None:
+    """Forget all in-process entries (the on-disk cache is left alone)."""
+    _memory.clear()
+
+
+def load_yaml(path: Union[str, Path]) -> Any:
+    """Parse a YAML file, reusing a cached parse when the file is unchanged.
+
+    Args:
+        path: YAML file to load
+
+    Returns:
+        Parsed document (a fresh copy on every call)
+
+    Raises:
+        OSError: If the file cannot be read
+        yaml.YAMLError: If the file is not valid YAML
+    """
+    key = os.path.abspath(path)
+    stat = os.stat(key)
+
+    cached = _memory.get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        # Served without opening the file; let audit hooks (test impact) see the read
+        sys.audit("homelab.read", key)
+        return pickle.loads(cached[2])
+
+    with open(key, "rb") as f:
+        content = f.read()
+    digest = hashlib.sha256(content).hexdigest()
+
+    blob = _read_disk(digest)
+    if blob is not None:
+        try:
+            data = pickle.loads(blob)
+        except Exception:
+            blob = None
+    if blob is None:
+        data = yaml.load(content, Loader=SafeLoader)
+        blob = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        _write_disk(digest, blob)
+
+    _memory[key] = (stat.st_mtime_ns, stat.st_size, blob)
+    return data
+
+
+def _disk_path(digest: str) -> Optional[Path]:
+    if _cache_dir is None:
+        return None
+    return _cache_dir / f"{digest}.v{_FORMAT}.pickle"
+
+
+def _read_disk(digest: str) -> Optional[bytes]:
+    target = _disk_path(digest)
+    if target is None:
+        return None
+    try:
+        return target.read_bytes()
+    except OSError:
+        return None
+
+
+def _write_disk(digest: str, blob: bytes) -> None:
+    target = _disk_path(digest)
+    if target is None:
+        return
+    # Write-then-rename so concurrent test workers never see a partial file
+    try:
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, target)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+# Directories never searched for snapshot candidates
+_SKIP_DIRS = {".git", ".cache", ".pytest_cache", ".terraform", "node_modules", "__pycache__", ".venv", "venv"}
+
+
+def discover_yaml(root: Union[str, Path]) -> Iterable[Path]:
+    """Every *.yml/*.yaml file below root, skipping VCS and cache directories."""
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in _SKIP_DIRS)
+        for name in sorted(files):
+            if name.endswith((".yml", ".yaml")):
+                yield Path(directory) / name
+
+
+def build_snapshot(paths: Iterable[Union[str, Path]], directory: Union[str, Path]) -> Path:
+    """Parse files into one snapshot file, reusing it while no file changed.
+
+    The snapshot name is derived from every file's path, mtime and size, so
+    an existing snapshot is valid as-is. Building holds an exclusive lock
+    so concurrent sessions never parse the same set twice.
+
+    Args:
+        paths: YAML files to include (unparseable files are skipped)
+        directory: Where snapshots are kept
+
+    Returns:
+        Path of the snapshot file
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stats = {}
+    for path in paths:
+        key = os.path.abspath(path)
+        stat = os.stat(key)
+        stats[key] = (stat.st_mtime_ns, stat.st_size)
+    digest = hashlib.sha256(repr(sorted(stats.items())).encode()).hexdigest()[:16]
+    target = directory / f"snapshot-{digest}.v{_FORMAT}.pickle"
+
+    with open(directory / ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if target.exists():
+            return target
+        entries = {}
+        for key in stats:
+            try:
+                load_yaml(key)
+            except (OSError, yaml.YAMLError):
+                continue
+            entries[key] = _memory[key]
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, target)
+        for stale in directory.glob("snapshot-*.pickle"):
+            if stale != target:
+                stale.unlink(missing_ok=True)
+    return target
+
+
+def attach_snapshot(path: Union[str, Path]) -> int:
+    """Preload the memory cache from a snapshot; returns the number of entries.
+
+    A missing or unreadable snapshot is ignored (files are parsed on demand).
+    """
+    try:
+        with open(path, "rb") as f:
+            entries = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return 0
+    for key, entry in entries.items():
+        _memory.setdefault(key, entry)
+    return len(entries)
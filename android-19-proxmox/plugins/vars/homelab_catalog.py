@@ -0,0 +1,106 @@
+"""Ansible vars plugin exposing the infrastructure catalog.
+
+Plays used to define ``catalog: "{{ lookup('file', ...) | from_yaml }}"``;
+because Ansible templates vars lazily, every ``catalog.*``/``vm_config.*``
+reference in every task re-read and re-parsed the YAML file. This plugin
+loads infrastructure-catalog.yml once per run (through
+``homelab.catalog.load_catalog``, which re-parses only when the file's
+mtime changes) and hands out the parsed data as inventory vars:
+
+- ``catalog`` on the ``all`` group;
+- ``prometheus_file_sd`` on the ``all`` group: file_sd target groups per
+  Prometheus job, from the services' ``monitoring`` blocks
+  (``homelab.file_sd``), with role-defined exporters resolved against the
+  inventory vars of the host whose ``vm_id`` is the service;
+- ``vm_config`` on each host whose inventory ``vm_id`` is a catalog service.
+
+Play vars still win over these (inventory-level) vars, so a play can
+override ``vm_config`` for hosts without a ``vm_id``.
+"""
+from __future__ import annotations
+
+DOCUMENTATION = """
+    name: homelab_catalog
+    short_description: Pre-parsed infrastructure catalog as inventory vars
+    requirements:
+        - Enabled in configuration
+    description:
+        - Sets C(catalog) for the C(all) group from infrastructure-catalog.yml.
+        - Sets C(prometheus_file_sd) for the C(all) group, the Prometheus file_sd targets per job.
+        - Sets C(vm_config) for hosts whose C(vm_id) matches a catalog service.
+        - The catalog is parsed once and reloaded only when its mtime changes.
+    options:
+      catalog_path:
+        description: Path to infrastructure-catalog.yml
+        default: ""
+        env:
+          - name: HOMELAB_CATALOG
+        ini:
+          - key: catalog_path
+            section: vars_homelab_catalog
+      stage:
+        ini:
+          - key: stage
+            section: vars_homelab_catalog
+        env:
+          - name: ANSIBLE_VARS_PLUGIN_STAGE
+    extends_documentation_fragment:
+      - vars_plugin_staging
+"""
+
+import sys
+from pathlib import Path
+
+from ansible.errors import AnsibleError
+from ansible.inventory.group import Group
+from ansible.inventory.helpers import get_group_vars
+from ansible.inventory.host import Host
+from ansible.plugins.vars import BaseVarsPlugin
+from ansible.utils.vars import combine_vars
+
+# homelab package lives next to this plugins/ directory
+_PACKAGE_ROOT = str(Path(__file__).resolve().parents[2])
+if _PACKAGE_ROOT not in sys.path:
+    sys.path.insert(0, _PACKAGE_ROOT)
+
+from homelab.catalog import CatalogError, load_catalog  # noqa: E402
+from homelab.file_sd import scrape_targets  # noqa: E402
+
+
+def _service_vars(group):
+    """Inventory vars (group vars, then host vars) of each host with a vm_id, by that ID."""
+    service_vars = {}
+    for host in group.get_hosts():
+        variables = combine_vars(get_group_vars(host.get_groups()), host.vars)
+        if isinstance(variables.get("vm_id"), int):
+            service_vars[variables["vm_id"]] = variables
+    return service_vars
+
+
+class VarsModule(BaseVarsPlugin):
+
+    REQUIRES_ENABLED = True
+    is_stateless = True
+
+    def get_vars(self, loader, path, entities, cache=True):
+        if not isinstance(entities, list):
+            entities = [entities]
+
+        try:
+            catalog = load_catalog(self.get_option("catalog_path") or None)
+        except (OSError, CatalogError) as e:
+            raise AnsibleError(f"Could not load infrastructure catalog: {e}") from e
+
+        data = {}
+        for entity in entities:
+            if isinstance(entity, Group) and entity.name == "all":
+                data["catalog"] = catalog.raw
+                try:
+                    data["prometheus_file_sd"] = scrape_targets(catalog, _service_vars(entity))
+                except CatalogError as e:
+                    raise AnsibleError(f"Could not build Prometheus targets from the catalog: {e}") from e
+            elif isinstance(entity, Host):
+                vm_id = entity.vars.get("vm_id")
+                if isinstance(vm_id, int) and vm_id in catalog:
+                    data["vm_config"] = catalog.service(vm_id).raw
+        return data
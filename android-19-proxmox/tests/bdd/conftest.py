@@ -1,21 +1,49 @@
-"""pytest-bdd configuration and step definition imports.
-
-This file ensures all step definitions are loaded for pytest-bdd scenarios.
+"""pytest-bdd configuration and lazy step definition loading.
+
+Step definition modules are loaded per feature: a step module is only
+imported when pytest collects it (it binds its feature with ``scenarios()``),
+and sibling modules are registered as plugins only when that feature uses
+steps they define. With ``-k``/``-m``, step modules none of whose scenarios
+can match are not collected at all, so selecting one scenario does not pay
+for importing pytest-bdd and parsing every feature. Which module binds which
+feature, and the step texts each defines, is read statically (tests/bdd/gherkin.py).
 """
 import pytest
 import subprocess
 from pathlib import Path
 
-# Import all step definition modules to register them with pytest-bdd
-pytest_plugins = [
-    "tests.bdd.step_defs.test_vm_llm_gpu_passthrough_steps",
-    "tests.bdd.step_defs.test_rgb_led_control_steps",
-    "tests.bdd.step_defs.test_ram_led_control_steps",
-    "tests.bdd.step_defs.test_coolify_platform_steps",
-    "tests.bdd.step_defs.test_adguard_dhcp_server_steps",
-    "tests.bdd.step_defs.test_bastion_dns_configuration_steps",
-    "tests.bdd.step_defs.test_scenario_02_github_deployment_steps",
-]
+from homelab.pve_exporter import CLUSTER_RESOURCES_COMMAND, CollectorError, parse_resources
+from homelab.ssh_pool import SSHChannelError, SSHPool
+from tests.bdd.gherkin import STEP_DEFS_DIR, STEP_MODULES, load_step_module, may_select, providers
+
+
+def _step_module(path):
+    """Static view of a step module under step_defs/, or None for other files."""
+    path = Path(path)
+    if path.parent.resolve() != STEP_DEFS_DIR or not path.name.startswith("test_") or path.suffix != ".py":
+        return None
+    return load_step_module(path)
+
+
+def pytest_ignore_collect(collection_path, config):
+    """Skip step modules whose scenarios cannot match ``-k``/``-m``."""
+    module = _step_module(collection_path)
+    if module is None:
+        return None
+    if not may_select(module, config.getoption("keyword"), config.getoption("markexpr")):
+        return True
+    return None
+
+
+def pytest_collect_file(file_path, parent):
+    """Before a step module is imported, register the modules its feature borrows steps from."""
+    module = _step_module(file_path)
+    if module is None:
+        return None
+    candidates = [load_step_module(STEP_DEFS_DIR / f"{name.rsplit('.', 1)[1]}.py") for name in STEP_MODULES]
+    for name in providers(module, candidates):
+        parent.config.pluginmanager.import_plugin(name)
+    return None
 
 
 @pytest.fixture(scope="session")
@@ -91,9 +119,39 @@ def ansible_runner(ansible_exec, inventory_file, project_root):
     return run
 
 
+@pytest.fixture(scope="session")
+def ssh_pool(request, ansible_exec, project_root):
+    """Pooled SSH channels (one per user@host) shared by the whole session."""
+    pool = SSHPool(prefix=ansible_exec, cwd=project_root)
+    yield pool
+    pool.close()
+
+    cache = getattr(request.config, "cache", None)
+    if cache is not None and pool.timings:
+        cache.set("homelab/ssh-latency", pool.latency_summary())
+
+
+@pytest.fixture(scope="session")
+def cluster_resources(ssh_pool):
+    """Every guest on the Proxmox host by VM ID, from one /cluster/resources query per session.
+
+    Steps checking guest existence or state read this instead of running
+    ``qm config``/``qm status`` per guest.
+    """
+    try:
+        result = ssh_pool.run("192.168.0.19", CLUSTER_RESOURCES_COMMAND)
+    except SSHChannelError as e:
+        pytest.fail(f"Failed to query Proxmox cluster resources: {e}")
+    assert result.returncode == 0, f"Failed to query Proxmox cluster resources:\n{result.stderr}"
+    try:
+        return parse_resources(result.stdout)
+    except CollectorError as e:
+        pytest.fail(f"Failed to parse Proxmox cluster resources: {e}")
+
+
 @pytest.fixture
-def ssh_runner(ansible_exec, project_root):
-    """Helper to run SSH commands via Docker."""
+def ssh_runner(ssh_pool):
+    """Helper to run SSH commands via Docker over pooled connections."""
     def run(host, command, user="root"):
         """Run SSH command.
 
@@ -105,17 +163,12 @@ def ssh_runner(ansible_exec, project_root):
         Returns:
             subprocess.CompletedProcess result
         """
-        ssh_cmd = f"{ansible_exec} ssh -o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null -o GlobalKnownHostsFile=/dev/null {user}@{host} '{command}'"
-
-        result = subprocess.run(
-            ssh_cmd,
-            shell=True,
-            cwd=str(project_root),
-            capture_output=True,
-            text=True,
-        )
-
-        return result
+        try:
+            return ssh_pool.run(host, command, user=user)
+        except SSHChannelError as e:
+            return subprocess.CompletedProcess(
+                args=f"ssh {user}@{host}", returncode=255, stdout="", stderr=str(e)
+            )
 
     return run
 
@@ -2,27 +2,165 @@
 
 Provides a Python client for interacting with Coolify REST API
 to automate application deployment testing.
+
+``CoolifyAPIClient`` is synchronous; ``AsyncCoolifyAPIClient`` exposes the
+same calls as coroutines so setup/teardown for many applications can run
+concurrently (see ``gather``).
 """
+import asyncio
+import functools
+import json
+import random
 import requests
+import threading
 import time
-from typing import Dict, List, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Seconds to wait for any single API call unless the caller overrides it
+DEFAULT_TIMEOUT = 30
+DEFAULT_POOL_SIZE = 10
+
+
+FAILED_STATUSES = ('failed', 'error')
+
+
+class DeploymentFailedError(Exception):
+    """Raised when a deployment ends in a failed status."""
+
+
+class Backoff:
+    """Exponential backoff delays with +/- ``jitter`` proportional randomness."""
+
+    def __init__(self, initial: float = 0.5, maximum: float = 5, factor: float = 2, jitter: float = 0.2):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self._delay = initial
+
+    def reset(self) -> None:
+        """Start again from the initial delay (e.g. after observing progress)."""
+        self._delay = self.initial
+
+    def next(self) -> float:
+        """Return the next delay in seconds and grow the following one."""
+        delay = self._delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+        self._delay = min(self._delay * self.factor, self.maximum)
+        return min(delay, self.maximum)
+
+
+class DeploymentWait:
+    """Outcome and timing metrics of wait_for_deployment.
+
+    Truthy when the application reached ``running``, so callers can keep
+    writing ``assert client.wait_for_deployment(app_id)``.
+    """
+
+    def __init__(self, app_id: str):
+        self.app_id = app_id
+        self.status = 'unknown'
+        self.started = time.monotonic()
+        self.elapsed: Optional[float] = None
+        self.polls = 0
+        self.not_modified = 0
+        self.events = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.status == 'running' or self.status in FAILED_STATUSES
+
+    @property
+    def time_to_running(self) -> Optional[float]:
+        """Seconds from the start of the wait until ``running`` was seen."""
+        return self.elapsed if self else None
+
+    def observe(self, app: Optional[Dict]) -> bool:
+        """Record one poll result (None for 304); return True if the status changed."""
+        self.polls += 1
+        if app is None:
+            self.not_modified += 1
+            return False
+        status = app.get('status', 'unknown')
+        changed = status != self.status
+        self.status = status
+        return changed
+
+    def __bool__(self) -> bool:
+        return self.status == 'running'
+
+    def __repr__(self) -> str:
+        return (f"DeploymentWait({self.app_id}, status={self.status!r}, elapsed={self.elapsed}, "
+                f"polls={self.polls}, not_modified={self.not_modified}, events={self.events})")
 
 
 class CoolifyAPIClient:
     """Client for Coolify REST API v1."""
 
-    def __init__(self, base_url: str, email: str, password: str):
+    def __init__(
+        self,
+        base_url: str,
+        email: str,
+        password: str,
+        timeout: float = DEFAULT_TIMEOUT,
+        pool_size: int = DEFAULT_POOL_SIZE
+    ):
         """Initialize Coolify API client.
 
         Args:
             base_url: Base URL of Coolify instance (e.g., http://192.168.0.160:8000)
             email: Admin email for authentication
             password: Admin password for authentication
+            timeout: Per-request timeout in seconds (default: 30)
+            pool_size: Keep-alive connections kept open to Coolify (default: 10)
         """
         self.base_url = base_url.rstrip('/')
         self.auth = (email, password)
+        self.timeout = timeout
+        # Per-thread override set by AsyncCoolifyAPIClient for per-call timeouts
+        self._call_timeout = threading.local()
         self.session = requests.Session()
         self.session.auth = self.auth
+        # Block rather than open throwaway connections when the pool is busy
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Send a request to the API and raise on HTTP errors.
+
+        Args:
+            method: HTTP method
+            path: API path starting with /api/v1
+            **kwargs: Passed to requests (json, stream, headers, ...)
+
+        Returns:
+            The response
+        """
+        kwargs.setdefault('timeout', self.request_timeout())
+        response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+        response.raise_for_status()
+        return response
+
+    def request_timeout(self) -> float:
+        """Timeout for the next request: the calling thread's per-call override or the client default."""
+        return getattr(self._call_timeout, 'value', None) or self.timeout
+
+    def call_with_timeout(self, timeout: float, func: Callable, *args, **kwargs) -> Any:
+        """Run ``func`` with every request it makes bounded by ``timeout``.
+
+        Args:
+            timeout: Per-request timeout in seconds for the duration of the call
+            func: A method of this client
+        """
+        previous = getattr(self._call_timeout, 'value', None)
+        self._call_timeout.value = timeout
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._call_timeout.value = previous
 
     def health_check(self) -> bool:
         """Check if Coolify is accessible and healthy.
@@ -33,7 +171,7 @@ class CoolifyAPIClient:
         try:
             response = self.session.get(
                 f"{self.base_url}/api/v1/health",
-                timeout=5
+                timeout=min(5, self.request_timeout())
             )
             return response.status_code == 200
         except requests.RequestException:
@@ -45,9 +183,7 @@ class CoolifyAPIClient:
         Returns:
             List of Git source configurations (GitHub, GitLab, etc.)
         """
-        response = self.session.get(f"{self.base_url}/api/v1/sources")
-        response.raise_for_status()
-        return response.json()
+        return self._request('GET', '/api/v1/sources').json()
 
     def get_github_source(self) -> Optional[Dict]:
         """Get GitHub source configuration if it exists.
@@ -91,12 +227,7 @@ class CoolifyAPIClient:
         if name:
             payload['name'] = name
 
-        response = self.session.post(
-            f"{self.base_url}/api/v1/applications",
-            json=payload
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._request('POST', '/api/v1/applications', json=payload).json()
 
     def deploy_application(self, app_id: str) -> Dict:
         """Trigger deployment for an application.
@@ -107,11 +238,7 @@ class CoolifyAPIClient:
         Returns:
             Deployment result dict
         """
-        response = self.session.post(
-            f"{self.base_url}/api/v1/applications/{app_id}/deploy"
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._request('POST', f'/api/v1/applications/{app_id}/deploy').json()
 
     def get_application(self, app_id: str) -> Dict:
         """Get application details and status.
@@ -122,11 +249,7 @@ class CoolifyAPIClient:
         Returns:
             Application details dict
         """
-        response = self.session.get(
-            f"{self.base_url}/api/v1/applications/{app_id}"
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._request('GET', f'/api/v1/applications/{app_id}').json()
 
     def get_deployment_status(self, app_id: str) -> str:
         """Get current deployment status for an application.
@@ -149,49 +272,213 @@ class CoolifyAPIClient:
         Returns:
             Deployment logs as string
         """
+        return self._request('GET', f'/api/v1/applications/{app_id}/logs').text
+
+    def stream_deployment_logs(
+        self,
+        app_id: str,
+        since_offset: int = 0,
+        chunk_size: int = 8192
+    ) -> Iterator[Tuple[int, str]]:
+        """Stream deployment logs line by line without buffering the whole log.
+
+        Resumes at ``since_offset`` with an HTTP Range request (skipping the
+        prefix locally if the server ignores it). Stop iterating as soon as
+        the wanted line appears; the rest of the log is never downloaded.
+
+        Args:
+            app_id: Application ID or UUID
+            since_offset: Byte offset to resume from (0 for the whole log)
+            chunk_size: Bytes read from the response at a time
+
+        Yields:
+            (offset, line) where offset is the byte position just after the
+            line, to pass back as ``since_offset`` when tailing again
+        """
+        headers = {'Range': f'bytes={since_offset}-'} if since_offset else {}
+        with self.session.get(
+            f"{self.base_url}/api/v1/applications/{app_id}/logs",
+            headers=headers,
+            stream=True,
+            timeout=self.request_timeout()
+        ) as response:
+            if response.status_code == 416:
+                return  # Nothing new since the offset
+            response.raise_for_status()
+
+            offset = since_offset
+            skip = since_offset if response.status_code != 206 else 0
+            pending = b''
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if skip:
+                    dropped = min(skip, len(chunk))
+                    chunk, skip = chunk[dropped:], skip - dropped
+                pending += chunk
+                *lines, pending = pending.split(b'\n')
+                for line in lines:
+                    offset += len(line) + 1
+                    yield offset, line.rstrip(b'\r').decode('utf-8', errors='replace')
+            if pending:
+                offset += len(pending)
+                yield offset, pending.rstrip(b'\r').decode('utf-8', errors='replace')
+
+    def find_in_deployment_logs(
+        self,
+        app_id: str,
+        indicators: Iterable[str],
+        since_offset: int = 0
+    ) -> Optional[Tuple[int, str]]:
+        """Return the first log line containing any indicator (case-insensitive).
+
+        Args:
+            app_id: Application ID or UUID
+            indicators: Lowercase substrings to look for
+            since_offset: Byte offset to start searching from
+
+        Returns:
+            (offset after the line, line), or None if no line matches
+        """
+        indicators = [indicator.lower() for indicator in indicators]
+        for offset, line in self.stream_deployment_logs(app_id, since_offset):
+            lowered = line.lower()
+            if any(indicator in lowered for indicator in indicators):
+                return offset, line
+        return None
+
+    def tail_deployment_logs(self, app_id: str, lines: int = 50) -> str:
+        """Return the last lines of the deployment log, streaming the rest past.
+
+        Args:
+            app_id: Application ID or UUID
+            lines: Number of trailing lines to keep (default: 50)
+
+        Returns:
+            Trailing log lines joined with newlines
+        """
+        tail = deque((line for _, line in self.stream_deployment_logs(app_id)), maxlen=lines)
+        return '\n'.join(tail)
+
+    def get_application_if_changed(self, app_id: str, etag: Optional[str] = None) -> Tuple[Optional[Dict], Optional[str]]:
+        """Get application details unless they match a previously seen ETag.
+
+        Args:
+            app_id: Application ID or UUID
+            etag: ETag from the previous call (None for an unconditional GET)
+
+        Returns:
+            (application dict, ETag), or (None, etag) if the server answered
+            304 Not Modified
+        """
+        headers = {'If-None-Match': etag} if etag else {}
         response = self.session.get(
-            f"{self.base_url}/api/v1/applications/{app_id}/logs"
+            f"{self.base_url}/api/v1/applications/{app_id}",
+            headers=headers,
+            timeout=self.request_timeout()
         )
+        if response.status_code == 304:
+            return None, etag
         response.raise_for_status()
-        return response.text
+        return response.json(), response.headers.get('ETag')
 
     def wait_for_deployment(
         self,
         app_id: str,
         timeout: int = 300,
-        poll_interval: int = 5
-    ) -> bool:
+        poll_interval: float = 5,
+        initial_interval: float = 0.5,
+        events: bool = False
+    ) -> 'DeploymentWait':
         """Wait for deployment to complete (success or failure).
 
+        Polls with exponential backoff and jitter, starting at
+        ``initial_interval`` and capped at ``poll_interval``; the interval
+        resets whenever the status changes. Polls are conditional on the
+        last ETag so unchanged applications cost a 304. With ``events`` the
+        deployment event stream is followed instead, falling back to polling
+        if the server does not offer one.
+
         Args:
             app_id: Application ID or UUID
             timeout: Maximum time to wait in seconds (default: 300)
-            poll_interval: Time between status checks in seconds (default: 5)
+            poll_interval: Maximum time between status checks in seconds (default: 5)
+            initial_interval: First delay between status checks in seconds (default: 0.5)
+            events: Subscribe to the deployment event stream (default: False)
 
         Returns:
-            True if deployment succeeded, False if failed or timed out
+            DeploymentWait with timing metrics (truthy when running)
 
         Raises:
             TimeoutError: If deployment doesn't complete within timeout
-            Exception: If deployment fails
+            DeploymentFailedError: If deployment fails
         """
-        start_time = time.time()
-
-        while time.time() - start_time < timeout:
-            status = self.get_deployment_status(app_id)
-
-            if status == 'running':
-                return True
-            elif status in ['failed', 'error']:
-                logs = self.get_deployment_logs(app_id)
-                raise Exception(f"Deployment failed with status: {status}\nLogs:\n{logs}")
-
-            time.sleep(poll_interval)
+        wait = DeploymentWait(app_id)
+        deadline = wait.started + timeout
+
+        if events:
+            status = self._follow_deployment_events(app_id, deadline, wait)
+            if status is not None:
+                return self._settle(wait, status)
+
+        backoff = Backoff(initial_interval, poll_interval)
+        etag = None
+        while True:
+            app, etag = self.get_application_if_changed(app_id, etag)
+            if wait.observe(app):
+                backoff.reset()
+            if wait.finished:
+                return self._settle(wait, wait.status)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(
+                    f"Deployment timeout after {timeout}s. "
+                    f"Last status: {wait.status}"
+                )
+            time.sleep(min(backoff.next(), remaining))
+
+    def _follow_deployment_events(self, app_id: str, deadline: float, wait: 'DeploymentWait') -> Optional[str]:
+        """Read the server-sent deployment event stream until a final status.
 
-        raise TimeoutError(
-            f"Deployment timeout after {timeout}s. "
-            f"Last status: {self.get_deployment_status(app_id)}"
-        )
+        Returns:
+            Final status, or None if the stream is unavailable, ended early or
+            outlived ``deadline`` (the polling loop then raises TimeoutError)
+        """
+        try:
+            with self.session.get(
+                f"{self.base_url}/api/v1/applications/{app_id}/events",
+                headers={'Accept': 'text/event-stream'},
+                stream=True,
+                timeout=(self.timeout, max(deadline - time.monotonic(), 0.1))
+            ) as response:
+                if response.status_code != 200:
+                    return None
+                for line in response.iter_lines(decode_unicode=True):
+                    # The read timeout only bounds each read; a stream that keeps
+                    # sending non-final events must not outlive the deadline
+                    if time.monotonic() >= deadline:
+                        return None
+                    if not line or not line.startswith('data:'):
+                        continue
+                    try:
+                        event = json.loads(line[len('data:'):])
+                    except ValueError:
+                        continue
+                    wait.events += 1
+                    wait.status = event.get('status', wait.status)
+                    if wait.finished:
+                        return wait.status
+        except requests.RequestException:
+            return None
+        return None
+
+    def _settle(self, wait: 'DeploymentWait', status: str) -> 'DeploymentWait':
+        """Record the final status; raise with logs if the deployment failed."""
+        wait.status = status
+        wait.elapsed = time.monotonic() - wait.started
+        if status in FAILED_STATUSES:
+            logs = self.tail_deployment_logs(wait.app_id)
+            raise DeploymentFailedError(f"Deployment failed with status: {status}\nLogs:\n{logs}")
+        return wait
 
     def delete_application(self, app_id: str) -> None:
         """Delete an application.
@@ -199,10 +486,7 @@ class CoolifyAPIClient:
         Args:
             app_id: Application ID or UUID
         """
-        response = self.session.delete(
-            f"{self.base_url}/api/v1/applications/{app_id}"
-        )
-        response.raise_for_status()
+        self._request('DELETE', f'/api/v1/applications/{app_id}')
 
     def get_application_url(self, app_id: str) -> str:
         """Get the public URL for accessing an application.
@@ -215,3 +499,182 @@ class CoolifyAPIClient:
         """
         app = self.get_application(app_id)
         return app.get('fqdn', '')
+
+
+class AsyncCoolifyAPIClient:
+    """Asyncio variant of CoolifyAPIClient for concurrent API calls.
+
+    Calls run on a bounded thread pool sharing one keep-alive connection
+    pool, so at most ``pool_size`` requests are in flight and connections
+    are reused across calls. Use as an async context manager:
+
+        async with AsyncCoolifyAPIClient(url, email, password) as api:
+            apps = await api.create_applications([{...}, {...}])
+            await api.gather(*(api.deploy_application(a['id']) for a in apps))
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        email: str,
+        password: str,
+        timeout: float = DEFAULT_TIMEOUT,
+        pool_size: int = DEFAULT_POOL_SIZE
+    ):
+        """Initialize async Coolify API client.
+
+        Args:
+            base_url: Base URL of Coolify instance (e.g., http://192.168.0.160:8000)
+            email: Admin email for authentication
+            password: Admin password for authentication
+            timeout: Default per-call timeout in seconds (default: 30)
+            pool_size: Maximum concurrent requests and pooled connections (default: 10)
+        """
+        self.timeout = timeout
+        self.client = CoolifyAPIClient(base_url, email, password, timeout=timeout, pool_size=pool_size)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='coolify-api')
+
+    async def __aenter__(self) -> 'AsyncCoolifyAPIClient':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Wait for in-flight calls and close the connection pool."""
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        self.client.session.close()
+
+    async def _call(self, func: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run a CoolifyAPIClient method on the pool with a per-call timeout.
+
+        ``wait_for`` cannot stop the worker thread, so the timeout is also
+        passed down to requests: a timed-out call's thread ends at about the
+        same time and returns its pooled connection instead of holding it.
+
+        Raises:
+            asyncio.TimeoutError: If the call takes longer than ``timeout``
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self._executor, functools.partial(self.client.call_with_timeout, timeout, func, *args, **kwargs)
+        )
+        return await asyncio.wait_for(future, timeout)
+
+    async def gather(self, *calls: Awaitable, return_exceptions: bool = False) -> List[Any]:
+        """Await several API calls concurrently, returning results in order.
+
+        Args:
+            *calls: Coroutines from this client's methods
+            return_exceptions: Return failures in the result list instead of raising
+
+        Returns:
+            List of results, one per call
+        """
+        return list(await asyncio.gather(*calls, return_exceptions=return_exceptions))
+
+    async def health_check(self, timeout: Optional[float] = None) -> bool:
+        """Check if Coolify is accessible and healthy."""
+        return await self._call(self.client.health_check, timeout=timeout)
+
+    async def get_sources(self, timeout: Optional[float] = None) -> List[Dict]:
+        """Get all configured Git sources."""
+        return await self._call(self.client.get_sources, timeout=timeout)
+
+    async def get_github_source(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Get GitHub source configuration if it exists."""
+        return await self._call(self.client.get_github_source, timeout=timeout)
+
+    async def create_application(self, source_id: str, repository: str, timeout: Optional[float] = None,
+                                 **options) -> Dict:
+        """Create a new application from a GitHub repository.
+
+        Args:
+            source_id: ID of the GitHub source
+            repository: Repository name (e.g., "owner/repo")
+            timeout: Per-call timeout override in seconds
+            **options: branch, build_pack, environment, name (see CoolifyAPIClient)
+        """
+        return await self._call(self.client.create_application, source_id, repository,
+                                timeout=timeout, **options)
+
+    async def deploy_application(self, app_id: str, timeout: Optional[float] = None) -> Dict:
+        """Trigger deployment for an application."""
+        return await self._call(self.client.deploy_application, app_id, timeout=timeout)
+
+    async def get_application(self, app_id: str, timeout: Optional[float] = None) -> Dict:
+        """Get application details and status."""
+        return await self._call(self.client.get_application, app_id, timeout=timeout)
+
+    async def get_deployment_status(self, app_id: str, timeout: Optional[float] = None) -> str:
+        """Get current deployment status for an application."""
+        return await self._call(self.client.get_deployment_status, app_id, timeout=timeout)
+
+    async def get_deployment_logs(self, app_id: str, timeout: Optional[float] = None) -> str:
+        """Get deployment logs for an application."""
+        return await self._call(self.client.get_deployment_logs, app_id, timeout=timeout)
+
+    async def wait_for_deployment(
+        self,
+        app_id: str,
+        timeout: int = 300,
+        poll_interval: float = 5,
+        initial_interval: float = 0.5
+    ) -> DeploymentWait:
+        """Wait for deployment to complete without blocking the event loop.
+
+        Same backoff and conditional polling as CoolifyAPIClient.wait_for_deployment.
+
+        Raises:
+            TimeoutError: If deployment doesn't complete within timeout
+            DeploymentFailedError: If deployment fails
+        """
+        wait = DeploymentWait(app_id)
+        deadline = wait.started + timeout
+        backoff = Backoff(initial_interval, poll_interval)
+        etag = None
+        while True:
+            app, etag = await self._call(self.client.get_application_if_changed, app_id, etag)
+            if wait.observe(app):
+                backoff.reset()
+            if wait.finished:
+                return await self._call(self.client._settle, wait, wait.status)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(
+                    f"Deployment timeout after {timeout}s. "
+                    f"Last status: {wait.status}"
+                )
+            await asyncio.sleep(min(backoff.next(), remaining))
+
+    async def delete_application(self, app_id: str, timeout: Optional[float] = None) -> None:
+        """Delete an application."""
+        await self._call(self.client.delete_application, app_id, timeout=timeout)
+
+    async def get_application_url(self, app_id: str, timeout: Optional[float] = None) -> str:
+        """Get the public URL for accessing an application."""
+        return await self._call(self.client.get_application_url, app_id, timeout=timeout)
+
+    async def create_applications(self, specs: Iterable[Dict]) -> List[Dict]:
+        """Create several applications concurrently.
+
+        Args:
+            specs: create_application keyword arguments, one dict per application
+
+        Returns:
+            Created application dicts in the order of ``specs``
+        """
+        return await self.gather(*(self.create_application(**spec) for spec in specs))
+
+    async def delete_applications(self, app_ids: Iterable[str]) -> List[Optional[BaseException]]:
+        """Delete several applications concurrently, for teardown.
+
+        Every deletion is attempted even if some fail.
+
+        Returns:
+            None per successful deletion, or the exception raised for it
+        """
+        return await self.gather(*(self.delete_application(app_id) for app_id in app_ids),
+                                 return_exceptions=True)
@@ -0,0 +1,260 @@
+"""In-process fake of the Coolify REST API for testing coolify_api clients.
+
+Implements the endpoints CoolifyAPIClient uses against in-memory state and
+records every request, the number of TCP connections and the peak number of
+concurrent requests, so tests can check pooling and parallelism without a
+real Coolify instance.
+
+After a deploy, an application's status follows ``deploy_plan`` (seconds
+since deploy -> status). JSON GETs carry an ETag and honour If-None-Match,
+``events_enabled`` turns on a server-sent deployment event stream (which
+repeats the current status every ``event_interval`` seconds when set), and
+logs honour ``Range: bytes=N-`` unless ``ranges_enabled`` is cleared.
+
+Usage:
+    with FakeCoolify() as coolify:
+        client = CoolifyAPIClient(coolify.url, "admin@example.com", "secret")
+        client.create_application("src-1", "owner/repo")
+"""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+    def setup(self):
+        super().setup()
+        with self.server.fake.lock:
+            self.server.fake.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method: str):
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+
+        with fake.lock:
+            fake.requests.append((method, self.path))
+            if self.headers.get("If-None-Match"):
+                fake.conditional_requests += 1
+            fake.in_flight += 1
+            fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+        try:
+            if fake.delay:
+                time.sleep(fake.delay)
+            status, payload = fake.handle(method, self.path, body)
+            if status == 200 and isinstance(payload, FakeEventStream):
+                self._stream(payload)
+                return
+            if status == 200 and isinstance(payload, bytes):
+                self._send_log(payload)
+                return
+        finally:
+            with fake.lock:
+                fake.in_flight -= 1
+
+        data = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+        etag = None
+        if method == "GET" and status == 200 and not isinstance(payload, str):
+            etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain" if isinstance(payload, str) else "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_log(self, log: bytes):
+        """Send a log, honouring ``Range: bytes=N-`` and counting bytes written."""
+        fake = self.server.fake
+        start = 0
+        requested = self.headers.get("Range", "")
+        if fake.ranges_enabled and requested.startswith("bytes=") and requested.endswith("-"):
+            start = int(requested[len("bytes="):-1])
+            if start >= len(log):
+                self.send_response(416)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(log) - 1}/{len(log)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(log) - start))
+        self.end_headers()
+        try:
+            for position in range(start, len(log), 65536):
+                chunk = log[position:position + 65536]
+                self.wfile.write(chunk)
+                with fake.lock:
+                    fake.log_bytes_sent += len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _stream(self, stream: "FakeEventStream"):
+        """Send status changes as server-sent events until a final status."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        for status in stream:
+            self.wfile.write(f"data: {json.dumps({'status': status})}\n\n".encode())
+            self.wfile.flush()
+
+
+class FakeEventStream:
+    """Yields an application's status each time it changes (or every
+    ``event_interval`` seconds), until it settles."""
+
+    def __init__(self, fake: "FakeCoolify", app_id: str):
+        self.fake = fake
+        self.app_id = app_id
+
+    def __iter__(self):
+        last, sent = None, 0.0
+        while True:
+            status = self.fake.status_of(self.app_id)
+            interval = self.fake.event_interval
+            if status != last or (interval is not None and time.monotonic() - sent >= interval):
+                yield status
+                last, sent = status, time.monotonic()
+            if status in ("running", "failed", "error"):
+                return
+            time.sleep(0.01)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that time out hang up mid-response; that is expected here
+        pass
+
+
+class FakeCoolify:
+    """Threaded fake Coolify server listening on 127.0.0.1.
+
+    Args:
+        delay: Seconds every request sleeps before answering (to expose concurrency)
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.requests: List[Tuple[str, str]] = []
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.conditional_requests = 0
+        self.events_enabled = False
+        self.event_interval: Optional[float] = None
+        self.ranges_enabled = True
+        self.log_bytes_sent = 0
+        self.deploy_plan: List[Tuple[float, str]] = [(0.0, "deploying")]
+        self.sources = [{"id": "src-1", "type": "github", "name": "GitHub App"}]
+        self.applications: Dict[str, Dict] = {}
+        self.logs: Dict[str, str] = {}
+        self._next_id = 1
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._deployed_at: Dict[str, float] = {}
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeCoolify":
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.fake = self
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeCoolify":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def handle(self, method: str, path: str, body: Optional[Dict]) -> Tuple[int, object]:
+        """Return (HTTP status, JSON payload or text) for a request."""
+        parts = path.split("?")[0].strip("/").split("/")
+        if parts[:2] != ["api", "v1"]:
+            return 404, {"message": "Not found"}
+        route = parts[2:]
+
+        if route == ["health"] and method == "GET":
+            return 200, "OK"
+        if route == ["sources"] and method == "GET":
+            return 200, self.sources
+        if route == ["applications"] and method == "POST":
+            with self.lock:
+                app_id = f"app-{self._next_id}"
+                self._next_id += 1
+                app = {"id": app_id, "status": "stopped", "fqdn": f"http://{app_id}.local", **(body or {})}
+                self.applications[app_id] = app
+                self.logs[app_id] = ""
+            return 201, app
+        if len(route) >= 2 and route[0] == "applications":
+            app = self.applications.get(route[1])
+            if app is None:
+                return 404, {"message": f"Application {route[1]} not found"}
+            if len(route) == 2 and method == "GET":
+                return 200, dict(app, status=self.status_of(route[1]))
+            if len(route) == 2 and method == "DELETE":
+                with self.lock:
+                    del self.applications[route[1]]
+                return 200, {"message": "Deleted"}
+            if route[2:] == ["deploy"] and method == "POST":
+                self._deployed_at[route[1]] = time.monotonic()
+                return 200, {"deployment_uuid": f"dep-{route[1]}", "status": "queued"}
+            if route[2:] == ["logs"] and method == "GET":
+                return 200, self.logs[route[1]].encode()
+            if route[2:] == ["events"] and method == "GET" and self.events_enabled:
+                return 200, FakeEventStream(self, route[1])
+        return 404, {"message": "Not found"}
+
+    def status_of(self, app_id: str) -> str:
+        """Current status, following ``deploy_plan`` once the app was deployed."""
+        deployed_at = self._deployed_at.get(app_id)
+        if deployed_at is None:
+            return self.applications[app_id]["status"]
+        elapsed = time.monotonic() - deployed_at
+        status = self.deploy_plan[0][1]
+        for offset, planned in self.deploy_plan:
+            if elapsed >= offset:
+                status = planned
+        return status
@@ -0,0 +1,353 @@
+"""Cached, static view of the BDD feature files and step-definition modules.
+
+tests/bdd/conftest.py used to register every step module through
+``pytest_plugins``, so any run touching tests/bdd imported pytest-bdd,
+parsed all seven features and built every step fixture, even for
+``pytest -k`` on a single scenario. This module answers the questions
+needed to load step modules lazily without importing them:
+
+- ``load_feature`` parses a .feature file (feature/scenario names, tags and
+  step texts), cached by mtime;
+- ``load_step_module`` reads a step module's source with ``ast``: the
+  feature it binds with ``scenarios()`` and its step patterns;
+- ``providers`` lists the other step modules whose steps a feature borrows
+  (e.g. a Background step defined in a sibling module);
+- ``may_select`` tells whether ``-k``/``-m`` could select any scenario of a
+  feature, erring on the side of collecting it.
+
+Usage:
+    from tests.bdd.gherkin import STEP_DEFS_DIR, load_step_module, providers
+
+    ram = load_step_module(STEP_DEFS_DIR / "test_ram_led_control_steps.py")
+    ram.feature.scenarios[0].test_name     # 'test_turn_ram_leds_off_independently'
+    providers(ram, others)                 # names of the modules ram borrows steps from
+"""
+import ast
+import re
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+
+BDD_DIR = Path(__file__).resolve().parent
+STEP_DEFS_DIR = BDD_DIR / "step_defs"
+
+# Step definition modules in registration order; when several define a borrowed step, the later one wins
+STEP_MODULES = [
+    "tests.bdd.step_defs.test_vm_llm_gpu_passthrough_steps",
+    "tests.bdd.step_defs.test_rgb_led_control_steps",
+    "tests.bdd.step_defs.test_ram_led_control_steps",
+    "tests.bdd.step_defs.test_coolify_platform_steps",
+    "tests.bdd.step_defs.test_adguard_dhcp_server_steps",
+    "tests.bdd.step_defs.test_bastion_dns_configuration_steps",
+    "tests.bdd.step_defs.test_scenario_02_github_deployment_steps",
+]
+
+STEP_KEYWORDS = ("Given", "When", "Then", "And", "But", "*")
+STEP_DECORATORS = frozenset({"given", "when", "then", "step"})
+
+_TAGS = re.compile(r"@(\S+)")
+_FIELD = re.compile(r"\\\{[^}]*\\\}")
+_NON_WORD = re.compile(r"\W")
+_LEADING_DIGITS = re.compile(r"^\d+_*")
+_NOT = re.compile(r"\bnot\b")
+# -k/-m tokens as pytest reads them; a mark call's arguments are skipped, not parsed
+_TOKEN = re.compile(r"\s*(?:(\()|(\))|([\w:+\-.\[\]\\/]+)(\([^)]*\))?)")
+
+# Parsed expression: an identifier (with "(...)" when a mark call), or (operator, operands)
+Node = Union[str, Tuple[str, list]]
+
+
+def python_name(name: str) -> str:
+    """Test function name pytest-bdd generates for a scenario."""
+    name = _NON_WORD.sub("", name.replace(" ", "_"))
+    return "test_" + _LEADING_DIGITS.sub("", name).lower()
+
+
+class Scenario:
+    """One scenario: its name, tags (feature tags included) and steps."""
+
+    __slots__ = ("name", "tags", "steps", "outline", "line")
+
+    def __init__(self, name: str, tags: Set[str], outline: bool, line: int):
+        self.name = name
+        self.tags = tags
+        self.steps: List[str] = []
+        self.outline = outline
+        self.line = line
+
+    @property
+    def test_name(self) -> str:
+        return python_name(self.name)
+
+    def as_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"Scenario({self.name!r})"
+
+
+class Feature:
+    """A parsed .feature file."""
+
+    def __init__(self, text: str, path: Optional[Path] = None):
+        self.path = path
+        self.name = ""
+        self.tags: Set[str] = set()
+        self.background: List[str] = []
+        self.scenarios: List[Scenario] = []
+        self._parse(text)
+
+    def _parse(self, text: str) -> None:
+        pending: Set[str] = set()
+        current: Optional[Scenario] = None
+        in_background = in_docstring = False
+        for number, line in enumerate(text.splitlines(), 1):
+            stripped = line.strip()
+            if stripped.startswith(('"""', "```")):
+                in_docstring = not in_docstring
+                continue
+            if in_docstring or not stripped or stripped.startswith(("#", "|")):
+                continue
+            if stripped.startswith("@"):
+                pending |= set(_TAGS.findall(stripped))
+                continue
+            keyword, _, rest = stripped.partition(":")
+            if keyword == "Feature":
+                self.name, self.tags, pending = rest.strip(), pending, set()
+            elif keyword == "Background":
+                in_background, current, pending = True, None, set()
+            elif keyword in ("Scenario", "Example", "Scenario Outline", "Scenario Template"):
+                current = Scenario(rest.strip(), self.tags | pending, "Outline" in keyword or "Template" in keyword,
+                                   number)
+                self.scenarios.append(current)
+                in_background, pending = False, set()
+            elif keyword in ("Examples", "Scenarios"):
+                if current is not None:
+                    current.outline = True
+                pending = set()
+            else:
+                word, _, step = stripped.partition(" ")
+                if word in STEP_KEYWORDS and step:
+                    if in_background:
+                        self.background.append(step.strip())
+                    elif current is not None:
+                        current.steps.append(step.strip())
+
+    def steps(self) -> List[str]:
+        """Every distinct step text, background first."""
+        seen: Dict[str, None] = dict.fromkeys(self.background)
+        for scenario in self.scenarios:
+            seen.update(dict.fromkeys(scenario.steps))
+        return list(seen)
+
+    def __repr__(self) -> str:
+        return f"Feature({self.name!r})"
+
+
+class StepModule:
+    """What a step-definition module declares, read from its source."""
+
+    def __init__(self, source: str, path: Path):
+        self.path = path
+        self.name = ".".join(("tests", "bdd", "step_defs", path.stem))
+        self.feature_path: Optional[Path] = None
+        self.patterns: List[re.Pattern] = []
+        for node in ast.walk(ast.parse(source, str(path))):
+            if isinstance(node, ast.Call) and _callee(node) == "scenarios" and node.args:
+                if isinstance(node.args[0], ast.Constant):
+                    self.feature_path = (path.parent / node.args[0].value).resolve()
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                for decorator in node.decorator_list:
+                    if isinstance(decorator, ast.Call) and _callee(decorator) in STEP_DECORATORS:
+                        pattern = _step_pattern(decorator)
+                        if pattern is not None:
+                            self.patterns.append(pattern)
+
+    @property
+    def feature(self) -> Optional[Feature]:
+        """The feature bound by ``scenarios()``, if any."""
+        if self.feature_path is None or not self.feature_path.exists():
+            return None
+        return load_feature(self.feature_path)
+
+    def defines(self, step: str) -> bool:
+        """Whether one of the module's step definitions matches a step text."""
+        return any(pattern.fullmatch(step) for pattern in self.patterns)
+
+    def __repr__(self) -> str:
+        return f"StepModule({self.path.name!r})"
+
+
+def _callee(call: ast.Call) -> Optional[str]:
+    if isinstance(call.func, ast.Name):
+        return call.func.id
+    if isinstance(call.func, ast.Attribute):
+        return call.func.attr
+    return None
+
+
+def _step_pattern(decorator: ast.Call) -> Optional[re.Pattern]:
+    """Regex for a ``@given("text")``/``@given(parsers.parse|cfparse|re(...))`` step."""
+    if not decorator.args:
+        return None
+    argument = decorator.args[0]
+    if isinstance(argument, ast.Constant) and isinstance(argument.value, str):
+        return re.compile(re.escape(argument.value))
+    if isinstance(argument, ast.Call) and argument.args and isinstance(argument.args[0], ast.Constant):
+        text = argument.args[0].value
+        if _callee(argument) == "re":
+            return re.compile(text)
+        # parse/cfparse: any {field} matches some text
+        return re.compile(_FIELD.sub(".+?", re.escape(text)))
+    return None
+
+
+# Parsed features and step modules keyed by resolved path; reparsed when the file's mtime changes.
+_cache: Dict[Path, Tuple[int, object]] = {}
+
+
+def _cached(path: Path, parse: Callable[[str, Path], object]) -> object:
+    resolved = Path(path).resolve()
+    mtime = resolved.stat().st_mtime_ns
+    cached = _cache.get(resolved)
+    if cached and cached[0] == mtime:
+        sys.audit("homelab.read", str(resolved))
+        return cached[1]
+    parsed = parse(resolved.read_text(), resolved)
+    _cache[resolved] = (mtime, parsed)
+    return parsed
+
+
+def load_feature(path: Path) -> Feature:
+    """Parse a .feature file, reusing the parsed copy while it is unchanged."""
+    return _cached(path, Feature)
+
+
+def load_step_module(path: Path) -> StepModule:
+    """Read a step module's declarations without importing it."""
+    return _cached(path, StepModule)
+
+
+def providers(module: StepModule, candidates: List[StepModule]) -> List[str]:
+    """Candidates (in order) defining steps the module's feature uses but it does not define."""
+    feature = module.feature
+    if feature is None:
+        return []
+    missing = [step for step in feature.steps() if not module.defines(step)]
+    return [
+        other.name for other in candidates
+        if other.path != module.path and any(other.defines(step) for step in missing)
+    ]
+
+
+def _monotonic(expression: str) -> bool:
+    """Whether an expression has no ``not`` (matching more names can only select more)."""
+    return _NOT.search(expression) is None
+
+
+def parse_expression(text: str) -> Node:
+    """Parse a ``-k``/``-m`` expression (``and``/``or``/``not``, parentheses).
+
+    pytest's own parser lives in the private ``_pytest.mark.expression``;
+    this covers the same grammar for selection pruning without importing it.
+
+    Raises:
+        ValueError: If the expression is malformed
+    """
+    tokens = []
+    position = 0
+    while text[position:].strip():
+        match = _TOKEN.match(text, position)
+        if not match or match.end() == position:
+            raise ValueError(f"unexpected character at {position} in {text!r}")
+        opening, closing, ident, call = match.groups()
+        tokens.append(opening or closing or ident + ("(...)" if call else ""))
+        position = match.end()
+
+    def parse_or(index: int) -> Tuple[Node, int]:
+        node, index = parse_and(index)
+        operands = [node]
+        while index < len(tokens) and tokens[index] == "or":
+            node, index = parse_and(index + 1)
+            operands.append(node)
+        return (node if len(operands) == 1 else ("or", operands)), index
+
+    def parse_and(index: int) -> Tuple[Node, int]:
+        node, index = parse_not(index)
+        operands = [node]
+        while index < len(tokens) and tokens[index] == "and":
+            node, index = parse_not(index + 1)
+            operands.append(node)
+        return (node if len(operands) == 1 else ("and", operands)), index
+
+    def parse_not(index: int) -> Tuple[Node, int]:
+        if index >= len(tokens):
+            raise ValueError(f"unexpected end of {text!r}")
+        token = tokens[index]
+        if token == "not":
+            node, index = parse_not(index + 1)
+            return ("not", [node]), index
+        if token == "(":
+            node, index = parse_or(index + 1)
+            if index >= len(tokens) or tokens[index] != ")":
+                raise ValueError(f"missing ')' in {text!r}")
+            return node, index + 1
+        if token in (")", "and", "or"):
+            raise ValueError(f"unexpected {token!r} in {text!r}")
+        return token, index + 1
+
+    node, index = parse_or(0)
+    if index != len(tokens):
+        raise ValueError(f"unexpected {tokens[index]!r} in {text!r}")
+    return node
+
+
+def evaluate(node: Node, matches: Callable[[str], bool]) -> bool:
+    """Evaluate a parsed expression, asking ``matches`` about each identifier."""
+    if isinstance(node, str):
+        return matches(node)
+    operator, operands = node
+    if operator == "not":
+        return not evaluate(operands[0], matches)
+    results = (evaluate(operand, matches) for operand in operands)
+    return any(results) if operator == "or" else all(results)
+
+
+def may_select(module: StepModule, keyword: str = "", markexpr: str = "") -> bool:
+    """Whether ``-k keyword`` / ``-m markexpr`` could select a scenario of the module.
+
+    Each scenario is matched on the names pytest gives its test (function,
+    module and directory names) and on its tags, which pytest-bdd turns into
+    markers. The names are a superset of pytest's keywords, so expressions
+    using ``not`` are not used to prune; neither are outlines (their test ids
+    carry example values), unparsable expressions or modules without a feature.
+    """
+    keyword = keyword if keyword and _monotonic(keyword) else ""
+    markexpr = markexpr if markexpr and _monotonic(markexpr) else ""
+    feature = module.feature
+    if feature is None or not (keyword or markexpr):
+        return True
+    try:
+        keyword_expression = parse_expression(keyword) if keyword else None
+        mark_expression = parse_expression(markexpr) if markexpr else None
+    except ValueError:
+        return True
+
+    parents = [part.lower() for part in module.path.parts]
+    for scenario in feature.scenarios:
+        if scenario.outline:
+            return True
+        names = parents + [scenario.test_name] + [tag.lower() for tag in scenario.tags]
+
+        def keyword_matches(subname: str) -> bool:
+            subname = subname.lower()
+            return any(subname in name for name in names)
+
+        def mark_matches(name: str) -> bool:
+            # Mark arguments are not in the feature file; assume they match
+            return name.endswith("(...)") or name in scenario.tags
+
+        if (keyword_expression is None or evaluate(keyword_expression, keyword_matches)) and \
+                (mark_expression is None or evaluate(mark_expression, mark_matches)):
+            return True
+    return False
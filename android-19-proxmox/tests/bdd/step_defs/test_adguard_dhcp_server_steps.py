@@ -6,6 +6,10 @@ import socket
 from pathlib import Path
 from pytest_bdd import scenarios, given, when, then, parsers
 
+from homelab.catalog import load_catalog
+from homelab.templating import render_file, role_vars
+from homelab.yaml_loader import load_yaml
+
 
 # Load all scenarios from the feature file
 scenarios('../features/adguard_dhcp_server.feature')
@@ -22,16 +26,13 @@ def adguard_role_dir(project_root):
 def adguard_defaults(adguard_role_dir):
     """Load AdGuard defaults/main.yml."""
     defaults_file = adguard_role_dir / "defaults" / "main.yml"
-    with open(defaults_file, 'r') as f:
-        return yaml.safe_load(f)
+    return load_yaml(defaults_file)
 
 
 @pytest.fixture(scope="function")
 def infrastructure_catalog(project_root):
     """Load infrastructure catalog."""
-    catalog_file = project_root / "infrastructure-catalog.yml"
-    with open(catalog_file, 'r') as f:
-        return yaml.safe_load(f)
+    return load_catalog(project_root / "infrastructure-catalog.yml").raw
 
 
 @pytest.fixture(scope="function")
@@ -40,36 +41,10 @@ def deployment_result():
     return {}
 
 
-def resolve_jinja_strings(data, context):
-    """Recursively resolve Jinja2 template strings in a dictionary.
-
-    Args:
-        data: Dictionary or value to process
-        context: Context dict for Jinja2 rendering (e.g., catalog)
-
-    Returns:
-        Data with all Jinja2 strings resolved
-    """
-    from jinja2 import Environment
-
-    if isinstance(data, dict):
-        return {k: resolve_jinja_strings(v, context) for k, v in data.items()}
-    elif isinstance(data, list):
-        return [resolve_jinja_strings(item, context) for item in data]
-    elif isinstance(data, str) and '{{' in data:
-        # Skip Ansible-specific filters (lookup, from_yaml, etc.) - can't resolve in plain Jinja2
-        if 'lookup(' in data or 'from_yaml' in data or 'playbook_dir' in data:
-            return data
-        # This is a Jinja2 template string - render it
-        try:
-            env = Environment()
-            template = env.from_string(data)
-            return template.render(**context)
-        except Exception:
-            # If rendering fails, return original string
-            return data
-    else:
-        return data
+def render_adguard_config(adguard_role_dir, infrastructure_catalog, **overrides):
+    """Render AdGuardHome-minimal.yaml.j2 with resolved role defaults."""
+    variables = role_vars(adguard_role_dir, infrastructure_catalog, overrides)
+    return render_file(adguard_role_dir / "templates" / "AdGuardHome-minimal.yaml.j2", variables)
 
 
 # Given steps
@@ -186,75 +161,24 @@ def configuration_loaded(adguard_defaults):
 @when('the administrator deploys AdGuard configuration')
 def deploy_adguard_configuration(deployment_result, adguard_role_dir, adguard_defaults, infrastructure_catalog):
     """Deploy AdGuard configuration (simulation for testing)."""
-    from jinja2 import Environment, FileSystemLoader
-
     # For E2E tests, we would actually deploy
     # For now, we simulate by rendering template with current settings
     deployment_result['deployed'] = True
     deployment_result['role_dir'] = adguard_role_dir
 
-    # Render template with current DHCP settings
-    template_dir = adguard_role_dir / "templates"
-    env = Environment(loader=FileSystemLoader(str(template_dir)))
-
-    # Add custom filter to_yaml (simulate Ansible filter)
-    def to_yaml_filter(value):
-        return yaml.dump(value, default_flow_style=True).strip()
-
-    env.filters['to_yaml'] = to_yaml_filter
-
-    template = env.get_template("AdGuardHome-minimal.yaml.j2")
-
     # Use current settings (DHCP enabled if set in deployment_result)
-    test_vars = adguard_defaults.copy()
-    if deployment_result.get('dhcp_enabled'):
-        test_vars["adguard_dhcp_enabled"] = True
-
-    # Resolve nested Jinja2 strings in defaults (e.g., "{{ catalog.network.gateway }}")
-    # First pass: resolve direct catalog references
-    resolved_vars = resolve_jinja_strings(test_vars, {'catalog': infrastructure_catalog})
-    # Second pass: resolve any nested references (e.g., variables that reference other resolved variables)
-    resolved_vars = resolve_jinja_strings(resolved_vars, {**resolved_vars, 'catalog': infrastructure_catalog})
-
-    # Remove catalog to avoid duplicate keyword argument
-    resolved_vars.pop('catalog', None)
-
-    rendered = template.render(**resolved_vars, catalog=infrastructure_catalog)
-    deployment_result['rendered_config'] = rendered
+    overrides = {"adguard_dhcp_enabled": True} if deployment_result.get('dhcp_enabled') else {}
+    deployment_result['rendered_config'] = render_adguard_config(
+        adguard_role_dir, infrastructure_catalog, **overrides
+    )
 
 
 @when('the template is rendered with DHCP enabled')
 def render_template_dhcp_enabled(deployment_result, adguard_role_dir, adguard_defaults, infrastructure_catalog):
     """Render template with DHCP enabled."""
-    from jinja2 import Environment, FileSystemLoader
-
-    template_dir = adguard_role_dir / "templates"
-    env = Environment(loader=FileSystemLoader(str(template_dir)))
-
-    # Add custom filter to_yaml (simulate Ansible filter)
-    def to_yaml_filter(value):
-        return yaml.dump(value, default_flow_style=True).strip()
-
-    env.filters['to_yaml'] = to_yaml_filter
-
-    template = env.get_template("AdGuardHome-minimal.yaml.j2")
-
-    # Override DHCP enabled
-    test_vars = adguard_defaults.copy()
-    test_vars["adguard_dhcp_enabled"] = True
-
-    # Resolve nested Jinja2 strings in defaults (e.g., "{{ catalog.network.gateway }}")
-    # First pass: resolve direct catalog references
-    resolved_vars = resolve_jinja_strings(test_vars, {'catalog': infrastructure_catalog})
-    # Second pass: resolve any nested references (e.g., variables that reference other resolved variables)
-    resolved_vars = resolve_jinja_strings(resolved_vars, {**resolved_vars, 'catalog': infrastructure_catalog})
-
-    # Remove catalog from resolved_vars to avoid duplicate keyword argument
-    # (defaults/main.yml contains catalog as a Jinja2 lookup string)
-    resolved_vars.pop('catalog', None)
-
-    rendered = template.render(**resolved_vars, catalog=infrastructure_catalog)
-    deployment_result['rendered_config'] = rendered
+    deployment_result['rendered_config'] = render_adguard_config(
+        adguard_role_dir, infrastructure_catalog, adguard_dhcp_enabled=True
+    )
 
 
 @when('the IP ranges are compared')
@@ -1,11 +1,13 @@
 """BDD step definitions for bastion host DNS configuration."""
 import pytest
-import yaml
 import subprocess
 import re
 from pathlib import Path
 from pytest_bdd import scenarios, given, when, then, parsers
 
+from homelab.catalog import load_catalog
+from homelab.yaml_loader import load_yaml
+
 
 # Load all scenarios from the feature file
 scenarios('../features/bastion_dns_configuration.feature')
@@ -22,16 +24,13 @@ def bastion_dir(project_root):
 def bastion_playbook(bastion_dir):
     """Load bastion playbook.yml."""
     playbook_file = bastion_dir / "playbook.yml"
-    with open(playbook_file, 'r') as f:
-        return yaml.safe_load(f)
+    return load_yaml(playbook_file)
 
 
 @pytest.fixture(scope="function")
 def infrastructure_catalog(project_root):
     """Load infrastructure catalog."""
-    catalog_file = project_root / "infrastructure-catalog.yml"
-    with open(catalog_file, 'r') as f:
-        return yaml.safe_load(f)
+    return load_catalog(project_root / "infrastructure-catalog.yml").raw
 
 
 @pytest.fixture(scope="function")
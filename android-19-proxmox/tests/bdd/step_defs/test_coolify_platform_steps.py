@@ -7,6 +7,8 @@ SSL certificate management, monitoring, backups, and CI/CD workflows.
 import pytest
 from pytest_bdd import scenarios, given, when, then, parsers
 
+from homelab.yaml_loader import load_yaml
+
 # Load all scenarios from the feature file
 scenarios('../features/coolify_platform.feature')
 
@@ -49,17 +51,17 @@ def proxmox_accessible(ssh_runner):
 
 
 @given('the cloud image template VM 9000 exists')
-def cloud_template_exists(ssh_runner):
+def cloud_template_exists(cluster_resources):
     """Verify cloud image template (VM 9000) exists on Proxmox."""
     # Check if template VM 9000 exists
-    result = ssh_runner("192.168.0.19", "qm config 9000")
+    template = cluster_resources.get(9000)
 
-    assert result.returncode == 0, \
-        f"Cloud image template VM 9000 does not exist. Run 'make proxmox-host-cloud-templates' first.\n{result.stderr}"
+    assert template is not None, \
+        "Cloud image template VM 9000 does not exist. Run 'make proxmox-host-cloud-templates' first."
 
     # Verify it's marked as a template
-    assert "template:" in result.stdout, \
-        f"VM 9000 exists but is not marked as a template:\n{result.stdout}"
+    assert template.template, \
+        f"VM 9000 exists but is not marked as a template: {template!r}"
 
 
 @given('the infrastructure catalog defines VM 160 for Coolify')
@@ -497,7 +499,6 @@ def verify_vm_resources(ssh_runner, test_context, catalog):
 @then('cloud-init configures SSH keys and network settings')
 def verify_cloudinit(ssh_runner, test_context, project_root):
     """Verify cloud-init verification tasks are configured in vm-coolify role."""
-    import yaml
 
     # Verify the vm-coolify role has cloud-init verification tasks
     verify_cloudinit_path = (
@@ -509,8 +510,7 @@ def verify_cloudinit(ssh_runner, test_context, project_root):
         "vm-coolify role should have verify-cloudinit.yml task file"
 
     # Load and verify the verification tasks
-    with open(verify_cloudinit_path, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(verify_cloudinit_path)
 
     # Verify cloud-init wait/check task exists
     has_status_check = any(
@@ -553,7 +553,6 @@ def verify_cloudinit(ssh_runner, test_context, project_root):
 @then('Ansible installs Coolify and all dependencies')
 def verify_ansible_install(test_context, project_root):
     """Verify Ansible role is configured to install Coolify and dependencies."""
-    import yaml
 
     # Verify Docker installation (critical dependency for Coolify)
     install_docker_path = (
@@ -565,8 +564,7 @@ def verify_ansible_install(test_context, project_root):
         "vm-coolify role should have install-docker.yml for Docker dependency"
 
     # Load and verify Docker installation tasks
-    with open(install_docker_path, 'r') as f:
-        docker_tasks = yaml.safe_load(f)
+    docker_tasks = load_yaml(install_docker_path)
 
     # Verify Docker packages are installed
     docker_content = install_docker_path.read_text()
@@ -598,8 +596,7 @@ def verify_ansible_install(test_context, project_root):
         "vm-coolify role should have install-coolify.yml for Coolify installation"
 
     # Load and verify Coolify installation tasks
-    with open(install_coolify_path, 'r') as f:
-        coolify_tasks = yaml.safe_load(f)
+    coolify_tasks = load_yaml(install_coolify_path)
 
     coolify_content = install_coolify_path.read_text()
 
@@ -153,15 +153,12 @@ def package_repo_unavailable(ssh_runner):
 
 
 @given('the Makefile has been configured with RGB light control targets')
-def makefile_configured(project_root):
+def makefile_configured(makefile):
     """Verify Makefile has RGB light control targets."""
-    makefile = project_root / "Makefile"
-    assert makefile.exists(), "Makefile should exist in project root"
-
-    content = makefile.read_text()
-    # We'll verify this when we implement Scenario 8
-    # For now, just check Makefile exists
-    assert len(content) > 0, "Makefile should not be empty"
+    for target in ("proxmox-rgb-lights-off", "proxmox-rgb-lights-on", "proxmox-rgb-lights-status"):
+        assert target in makefile, f"Makefile should have {target} target"
+        assert any("--tags rgb" in command for command in makefile.recipe(target)), \
+            f"{target} should run the playbook with --tags rgb"
 
 
 # ============================================================================
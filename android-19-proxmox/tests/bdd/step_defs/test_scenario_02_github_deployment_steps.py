@@ -188,13 +188,13 @@ def verify_repository_cloned(coolify_api, scenario_context):
     import time
     time.sleep(3)
 
-    # Get deployment logs
+    # Stream deployment logs until a git clone indicator appears
     try:
-        logs = coolify_api.get_deployment_logs(app_id)
+        match = coolify_api.find_in_deployment_logs(app_id, ['clone', 'cloning', 'git'])
 
-        # Check for git clone indicators in logs
-        assert any(indicator in logs.lower() for indicator in ['clone', 'cloning', 'git']), \
+        assert match, \
             "Deployment logs don't show repository cloning"
+        scenario_context['log_offset'] = match[0]
 
     except Exception as e:
         # If logs endpoint not available, skip this verification
@@ -207,11 +207,15 @@ def verify_dockerfile_build(coolify_api, scenario_context):
     app_id = scenario_context['application']['id']
 
     try:
-        logs = coolify_api.get_deployment_logs(app_id)
-
-        # Check for Docker build indicators
+        # Check for Docker build indicators, resuming after the clone output
         build_indicators = ['dockerfile', 'docker build', 'building', 'step 1/']
-        assert any(indicator in logs.lower() for indicator in build_indicators), \
+        match = coolify_api.find_in_deployment_logs(
+            app_id, build_indicators, since_offset=scenario_context.get('log_offset', 0)
+        )
+        if match is None and scenario_context.get('log_offset'):
+            match = coolify_api.find_in_deployment_logs(app_id, build_indicators)
+
+        assert match, \
             "Deployment logs don't show Dockerfile build process"
 
     except Exception as e:
@@ -227,6 +231,7 @@ def verify_docker_deployment(coolify_api, scenario_context):
     try:
         success = coolify_api.wait_for_deployment(app_id, timeout=300)
         assert success, "Deployment did not complete successfully"
+        scenario_context['deployment_wait'] = success
 
     except TimeoutError:
         pytest.fail("Deployment timed out after 5 minutes")
@@ -277,18 +282,20 @@ def verify_successful_deployment_logs(coolify_api, scenario_context):
     app_id = scenario_context['application']['id']
 
     try:
-        logs = coolify_api.get_deployment_logs(app_id)
-
-        # Check for success indicators
         success_indicators = ['success', 'successfully', 'complete', 'deployed', 'running']
-        assert any(indicator in logs.lower() for indicator in success_indicators), \
-            "Deployment logs don't show successful completion"
-
-        # Check for failure indicators (should not be present)
         failure_indicators = ['failed', 'error:', 'fatal']
-        failure_found = [ind for ind in failure_indicators if ind in logs.lower()]
-        assert not failure_found, \
-            f"Deployment logs contain failure indicators: {failure_found}"
+        success_found = False
+
+        # Stream line by line, stopping at the first failure indicator
+        for _, line in coolify_api.stream_deployment_logs(app_id):
+            lowered = line.lower()
+            failure_found = [ind for ind in failure_indicators if ind in lowered]
+            assert not failure_found, \
+                f"Deployment logs contain failure indicators: {failure_found}\n{line}"
+            success_found = success_found or any(ind in lowered for ind in success_indicators)
+
+        assert success_found, \
+            "Deployment logs don't show successful completion"
 
     except Exception as e:
         pytest.skip(f"Could not verify deployment logs: {e}")
@@ -264,7 +264,7 @@ def verify_vm_created():
     """Verify VM was created with correct specifications.
 
     Should check:
-    - qm status 140 (VM exists)
+    - cluster_resources[140] (VM exists, one /cluster/resources query)
     - qm config 140 (verify cores, memory, disk)
     """
     raise NotImplementedError("VM creation verification not yet implemented")
@@ -294,7 +294,7 @@ def verify_cloud_init():
 def verify_vm_started():
     """Verify VM is in running state.
 
-    Should check: qm status 140 | grep running
+    Should check: cluster_resources[140].running
     """
     raise NotImplementedError("VM running state verification not yet implemented")
 
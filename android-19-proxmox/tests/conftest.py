@@ -1,8 +1,68 @@
 """Shared pytest fixtures for infrastructure testing."""
 import pytest
-import yaml
 from pathlib import Path
 
+from homelab import yaml_loader
+from homelab.ansible_syntax import SyntaxCheckSession, discover_playbooks
+from homelab.catalog import load_catalog
+from homelab.makefile import load_makefile
+from homelab.roles import load_roles
+from homelab.template_check import check_templates
+from tests.impact import ImpactPlugin
+from tests.timing import TimingPlugin
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+_SNAPSHOT = "homelab_yaml_snapshot"
+_snapshot_key = pytest.StashKey[Path]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("homelab")
+    group.addoption("--impact", action="store_true",
+                    help="Run only tests whose recorded input files changed (see tests/impact.py)")
+    group.addoption("--impact-base", metavar="REF", default=None,
+                    help="With --impact, take changed files from 'git diff REF' instead of content hashes")
+    group.addoption("--timing-report", action="store_true",
+                    help="Print the slowest tests and fixtures (see tests/timing.py)")
+    group.addoption("--enforce-budgets", action="store_true",
+                    help="Fail tests that exceed their timing budget instead of warning")
+    parser.addini("timing_budgets", type="linelist", default=[],
+                  help="'path = milliseconds' setup+call budgets for tests under path (slow tests exempt)")
+
+
+def pytest_configure(config):
+    """Persist parsed YAML under .pytest_cache so warm reruns skip parsing.
+
+    Under pytest-xdist the controller parses every repository YAML file once
+    into a snapshot that workers attach to instead of parsing themselves.
+    """
+    cache = getattr(config, "cache", None)
+    if cache is not None:
+        yaml_loader.set_cache_dir(cache.mkdir("homelab-yaml"))
+
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is not None:
+        if workerinput.get(_SNAPSHOT):
+            yaml_loader.attach_snapshot(workerinput[_SNAPSHOT])
+    elif cache is not None and config.getoption("numprocesses", None):
+        config.stash[_snapshot_key] = yaml_loader.build_snapshot(
+            yaml_loader.discover_yaml(REPO_ROOT), cache.mkdir("homelab-yaml-snapshot")
+        )
+
+    if config.getoption("impact"):
+        config.pluginmanager.register(ImpactPlugin(config), "homelab-impact")
+    config.pluginmanager.register(TimingPlugin(config), "homelab-timing")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Hand the controller's YAML snapshot to each xdist worker."""
+    snapshot = node.config.stash.get(_snapshot_key, None)
+    if snapshot is not None:
+        node.workerinput[_SNAPSHOT] = str(snapshot)
+
 
 @pytest.fixture(scope="session")
 def project_root():
@@ -11,12 +71,16 @@ def project_root():
 
 
 @pytest.fixture(scope="session")
-def catalog(project_root):
-    """Load infrastructure catalog once for all tests."""
+def catalog_index(project_root):
+    """Parsed, indexed infrastructure catalog shared by all tests."""
     # project_root is android-19-proxmox directory
-    catalog_path = project_root / "infrastructure-catalog.yml"
-    with open(catalog_path) as f:
-        return yaml.safe_load(f)
+    return load_catalog(project_root / "infrastructure-catalog.yml")
+
+
+@pytest.fixture(scope="session")
+def catalog(catalog_index):
+    """Return the raw catalog mapping (as loaded from YAML)."""
+    return catalog_index.raw
 
 
 @pytest.fixture(scope="session")
@@ -29,3 +93,47 @@ def catalog_services(catalog):
 def catalog_network(catalog):
     """Return network configuration from the catalog."""
     return catalog.get('network', {})
+
+
+@pytest.fixture(scope="session")
+def roles(project_root):
+    """Every Ansible role, parsed once and indexed by module, tag and variable."""
+    return load_roles(project_root / "configuration-by-ansible")
+
+
+@pytest.fixture(scope="session")
+def makefile():
+    """Parsed repository Makefile (targets, recipes, variables) shared by all tests."""
+    return load_makefile(REPO_ROOT / "Makefile")
+
+
+@pytest.fixture(scope="session")
+def ansible_syntax(request, project_root):
+    """Syntax-check playbooks through one shared Ansible process.
+
+    Every repository playbook is checked in a single batch on first use;
+    results are cached in .pytest_cache and reused while the files each
+    playbook loaded are unchanged.
+    """
+    if not SyntaxCheckSession.available():
+        pytest.skip("ansible not installed (runs in Docker environment)")
+
+    cache = getattr(request.config, "cache", None)
+    cache_file = cache.mkdir("homelab-ansible") / "syntax-check.json" if cache is not None else None
+
+    session = SyntaxCheckSession(cwd=project_root.parent, cache_file=cache_file)
+    session.check_many(discover_playbooks())
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def rendered_templates(request):
+    """Render and validate every role template once per session.
+
+    Results are cached in .pytest_cache by a hash of each template and its
+    variables, so warm runs only render templates whose inputs changed.
+    """
+    cache = getattr(request.config, "cache", None)
+    cache_file = cache.mkdir("homelab-templates") / "results.json" if cache is not None else None
+    return check_templates(cache_file=cache_file)
@@ -0,0 +1,256 @@
+"""Test-impact analysis: run only tests whose inputs changed.
+
+Enabled with ``--impact`` (``make test-impact``). While tests run, an audit
+hook records every repository file opened during each test and during each
+fixture's setup (plus reads served from ``homelab.yaml_loader``'s and
+``homelab.catalog``'s in-memory caches, which announce themselves with a
+``homelab.read`` audit event). A test depends on its own reads, the reads
+of every fixture it uses and its test module. The map is stored in
+``.pytest_cache``.
+
+On the next ``--impact`` run only tests with a changed input are selected:
+changed by content hash against the recorded map, or, with
+``--impact-base REF``, changed according to ``git diff REF``. New tests
+and tests that failed last time always run. Everything runs (and the map is rebuilt) when there is no map
+yet or the shared code it was recorded with changed: the homelab package,
+conftest files, helper modules under tests/ or pytest.ini.
+
+Under pytest-xdist every worker collects, so every worker applies the same
+(deterministic) selection; each records the tests it ran and sends its
+map to the controller, which persists it. The controller does not collect,
+so the ``impact:`` line comes from the workers and is printed in the
+terminal summary instead of after collection. Without the cacheprovider
+plugin (``-p no:cacheprovider``) there is no map: everything runs.
+"""
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+REPO_ROOT = PROJECT_ROOT.parent
+CACHE_KEY = "homelab/impact"
+_SELECTED = "homelab/impact-selected"
+_SUMMARY = "homelab/impact-summary"
+
+# Bump when the map format changes
+_VERSION = 1
+
+_IGNORED_PARTS = {".git", ".cache", ".pytest_cache", "__pycache__", ".terraform"}
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_APPEND | os.O_TRUNC
+
+# Set receiving repository files read right now (None: not recording)
+_reads: Optional[Set[str]] = None
+
+
+def _audit(event: str, args: tuple) -> None:
+    if _reads is None or event not in ("open", "homelab.read"):
+        return
+    path = args[0]
+    if event == "open":
+        mode, flags = args[1], args[2]
+        if isinstance(mode, str) and any(c in mode for c in "wax+"):
+            return
+        if mode is None and isinstance(flags, int) and flags & _WRITE_FLAGS:
+            return
+    if isinstance(path, bytes):
+        path = os.fsdecode(path)
+    if not isinstance(path, (str, os.PathLike)):
+        return
+    path = os.path.abspath(path)
+    if path.startswith(str(REPO_ROOT) + os.sep):
+        relative = os.path.relpath(path, REPO_ROOT)
+        if not _IGNORED_PARTS.intersection(Path(relative).parts):
+            _reads.add(relative)
+
+
+_hook_installed = False
+
+
+def _install_hook() -> None:
+    # Audit hooks cannot be removed; install once and gate on _reads
+    global _hook_installed
+    if not _hook_installed:
+        sys.addaudithook(_audit)
+        _hook_installed = True
+
+
+class _Recording:
+    """Collects the repository files read inside a ``with`` block."""
+
+    def __init__(self):
+        self.files: Set[str] = set()
+
+    def __enter__(self) -> Set[str]:
+        global _reads
+        self._outer = _reads
+        _reads = self.files
+        return self.files
+
+    def __exit__(self, *exc_info) -> None:
+        global _reads
+        _reads = self._outer
+        if self._outer is not None:
+            self._outer.update(self.files)
+
+
+def file_digest(relative: str) -> Optional[str]:
+    """SHA-256 of a repository file, or None if it no longer exists."""
+    try:
+        return hashlib.sha256((REPO_ROOT / relative).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def shared_code_digest() -> str:
+    """Digest of the code every test depends on implicitly."""
+    digest = hashlib.sha256(f"{_VERSION}".encode())
+    paths = sorted(
+        [p for p in (PROJECT_ROOT / "homelab").rglob("*.py")]
+        + [p for p in (PROJECT_ROOT / "tests").rglob("*.py") if not p.name.startswith("test_")]
+        + [PROJECT_ROOT / "pytest.ini"]
+    )
+    for path in paths:
+        if "__pycache__" in path.parts:
+            continue
+        digest.update(str(path.relative_to(REPO_ROOT)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def git_changed_files(base: str) -> Set[str]:
+    """Files differing from a git ref, including uncommitted and untracked files."""
+    changed = subprocess.run(["git", "diff", "--name-only", base], cwd=REPO_ROOT,
+                             capture_output=True, text=True, check=True).stdout.split()
+    untracked = subprocess.run(["git", "ls-files", "--others", "--exclude-standard"], cwd=REPO_ROOT,
+                               capture_output=True, text=True, check=True).stdout.split()
+    return set(changed) | set(untracked)
+
+
+def affected(tests: Dict[str, Iterable[str]], changed: Set[str]) -> Set[str]:
+    """Node IDs of recorded tests with at least one changed input."""
+    return {nodeid for nodeid, files in tests.items() if changed.intersection(files)}
+
+
+class ImpactPlugin:
+    """Records per-test file dependencies and deselects unaffected tests."""
+
+    def __init__(self, config: pytest.Config):
+        self.config = config
+        self.base = config.getoption("impact_base")
+        self.cache = getattr(config, "cache", None)
+        self.stored = self.cache.get(CACHE_KEY, None) if self.cache is not None else None
+        self.fixture_files: Dict[tuple, Set[str]] = {}
+        self.recorded: Dict[str, Set[str]] = {}
+        self.failed: Set[str] = set()
+        self.selected: Optional[int] = None
+        self.summary: Optional[str] = None
+        _install_hook()
+
+    def _report(self, config: pytest.Config, line: str) -> None:
+        """Print an ``impact:`` line, or hand it to the xdist controller from a worker."""
+        if hasattr(config, "workerinput"):
+            self.summary = line
+            return
+        reporter = config.pluginmanager.get_plugin("terminalreporter")
+        if reporter:
+            reporter.write_line(line)
+
+    def _usable_map(self) -> Optional[Dict]:
+        stored = self.stored
+        if not stored or stored.get("version") != _VERSION:
+            return None
+        if stored.get("shared") != shared_code_digest():
+            return None
+        return stored
+
+    def changed_files(self, stored: Dict) -> Set[str]:
+        if self.base:
+            return git_changed_files(self.base)
+        return {path for path, digest in stored["files"].items() if file_digest(path) != digest}
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, config, items):
+        stored = self._usable_map()
+        if stored is None:
+            self._report(config, "impact: no usable dependency map (first run or shared code changed), "
+                                 "running everything")
+            return
+
+        changed = self.changed_files(stored)
+        selected = affected(stored["tests"], changed) | set(stored["failed"])
+        keep, drop = [], []
+        for item in items:
+            (keep if item.nodeid in selected or item.nodeid not in stored["tests"] else drop).append(item)
+        if drop:
+            config.hook.pytest_deselected(items=drop)
+            items[:] = keep
+        self.selected = len(keep)
+        self._report(config, f"impact: {len(changed)} changed file(s), {len(keep)} affected test(s), "
+                             f"{len(drop)} deselected")
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        with _Recording() as files:
+            yield
+        key = (fixturedef.baseid, fixturedef.argname)
+        self.fixture_files.setdefault(key, set()).update(files)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        with _Recording() as files:
+            yield
+        for name in item.fixturenames:
+            for fixturedef in item._fixtureinfo.name2fixturedefs.get(name, ()):
+                files |= self.fixture_files.get((fixturedef.baseid, fixturedef.argname), set())
+        files.add(os.path.relpath(str(item.path), REPO_ROOT))
+        self.recorded[item.nodeid] = files
+
+    def pytest_runtest_logreport(self, report):
+        if report.failed:
+            self.failed.add(report.nodeid)
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        output = getattr(node, "workeroutput", {})
+        if output.get(CACHE_KEY):
+            for nodeid, files in json.loads(output[CACHE_KEY]).items():
+                self.recorded[nodeid] = set(files)
+        if output.get(_SELECTED) is not None:
+            self.selected = output[_SELECTED]
+        if output.get(_SUMMARY):
+            self.summary = output[_SUMMARY]
+
+    def pytest_terminal_summary(self, terminalreporter):
+        # Only set on the controller when the line came from xdist workers
+        if self.summary and not hasattr(self.config, "workerinput"):
+            terminalreporter.write_line(self.summary)
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        if hasattr(self.config, "workerinput"):
+            self.config.workeroutput[CACHE_KEY] = json.dumps({k: sorted(v) for k, v in self.recorded.items()})
+            self.config.workeroutput[_SELECTED] = self.selected
+            self.config.workeroutput[_SUMMARY] = self.summary
+            return
+        if self.selected == 0 and exitstatus == pytest.ExitCode.NO_TESTS_COLLECTED:
+            session.exitstatus = pytest.ExitCode.OK
+        if self.cache is None or not self.recorded:
+            return
+
+        stored = self._usable_map() or {"tests": {}, "failed": []}
+        failed = (set(stored["failed"]) - set(self.recorded)) | self.failed
+        tests = {nodeid: sorted(files) for nodeid, files in stored["tests"].items()}
+        tests.update({nodeid: sorted(files) for nodeid, files in self.recorded.items()})
+        files = sorted({path for deps in tests.values() for path in deps})
+        self.cache.set(CACHE_KEY, {
+            "version": _VERSION,
+            "shared": shared_code_digest(),
+            "tests": tests,
+            "failed": sorted(failed),
+            "files": {path: file_digest(path) for path in files},
+        })
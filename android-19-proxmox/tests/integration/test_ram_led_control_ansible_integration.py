@@ -3,10 +3,11 @@
 These tests validate actual Ansible execution context and playbook loading.
 """
 import pytest
-import subprocess
 import yaml
 from pathlib import Path
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def host_proxmox_role_path(project_root):
@@ -27,8 +28,7 @@ def test_ram_led_control_tasks_ansible_syntax_valid(host_proxmox_role_path):
     ram_led_control_task_file = host_proxmox_role_path / "tasks" / "ram-led-control.yml"
 
     # Act - Try to load the file with PyYAML (Ansible uses this)
-    with open(ram_led_control_task_file) as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(ram_led_control_task_file)
 
     # Assert - File is parseable and has expected structure
     assert tasks is not None, "Task file should be parseable"
@@ -43,7 +43,7 @@ def test_ram_led_control_tasks_ansible_syntax_valid(host_proxmox_role_path):
 
 
 @pytest.mark.integration
-def test_ram_led_control_tasks_can_be_included_in_playbook(host_proxmox_role_path, tmp_path):
+def test_ram_led_control_tasks_can_be_included_in_playbook(host_proxmox_role_path, tmp_path, ansible_syntax):
     """RAM LED control tasks should be includable in an Ansible playbook.
 
     Creates a minimal playbook that includes ram-led-control.yml and validates
@@ -51,14 +51,6 @@ def test_ram_led_control_tasks_can_be_included_in_playbook(host_proxmox_role_pat
 
     Linked to Task 1.1: Create Ansible tasks for RAM LED control off
     """
-    # Check if ansible-playbook is available
-    ansible_check = subprocess.run(
-        ['which', 'ansible-playbook'],
-        capture_output=True
-    )
-    if ansible_check.returncode != 0:
-        pytest.skip("ansible-playbook not available (runs in Docker environment)")
-
     # Arrange - Create a minimal test playbook
     test_playbook_content = f"""---
 - name: Test RAM LED Control Integration
@@ -76,16 +68,12 @@ def test_ram_led_control_tasks_can_be_included_in_playbook(host_proxmox_role_pat
     with open(test_playbook_path, 'w') as f:
         f.write(test_playbook_content)
 
-    # Act - Run ansible-playbook --syntax-check
-    result = subprocess.run(
-        ['ansible-playbook', '--syntax-check', str(test_playbook_path)],
-        capture_output=True,
-        text=True
-    )
+    # Act - Run the shared Ansible syntax check
+    error = ansible_syntax.check(test_playbook_path)
 
     # Assert - Syntax check should pass
-    assert result.returncode == 0, \
-        f"Ansible syntax check should pass. Error: {result.stderr}"
+    assert error is None, \
+        f"Ansible syntax check should pass. Error: {error}"
 
 
 @pytest.mark.integration
@@ -3,6 +3,8 @@ import pytest
 from pathlib import Path
 import yaml
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def vm_coolify_role_path(project_root):
@@ -33,8 +35,7 @@ def test_main_tasks_should_include_verification_in_correct_order(vm_coolify_role
     """main.yml should include cloud-init verification before installation tasks."""
     tasks_main = vm_coolify_role_path / "tasks" / "main.yml"
 
-    with open(tasks_main, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(tasks_main)
 
     # Find the include_tasks for verify-cloudinit.yml
     verification_index = None
@@ -59,8 +60,7 @@ def test_all_verification_tasks_use_proper_ansible_modules(vm_coolify_role_path)
     """All verification tasks should use ansible.builtin modules."""
     verify_cloudinit = vm_coolify_role_path / "tasks" / "verify-cloudinit.yml"
 
-    with open(verify_cloudinit, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(verify_cloudinit)
 
     expected_modules = {
         'ansible.builtin.command',
@@ -90,8 +90,7 @@ def test_verification_tasks_have_failure_conditions(vm_coolify_role_path):
     """Verification tasks should have explicit failure conditions."""
     verify_cloudinit = vm_coolify_role_path / "tasks" / "verify-cloudinit.yml"
 
-    with open(verify_cloudinit, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(verify_cloudinit)
 
     failure_checks = 0
     for task in tasks:
@@ -125,11 +124,9 @@ def test_role_structure_supports_complete_verification_workflow(vm_coolify_role_
     verify_cloudinit = vm_coolify_role_path / "tasks" / "verify-cloudinit.yml"
 
     # Both files should be valid YAML
-    with open(tasks_main, 'r') as f:
-        main_tasks = yaml.safe_load(f)
+    main_tasks = load_yaml(tasks_main)
 
-    with open(verify_cloudinit, 'r') as f:
-        verify_tasks = yaml.safe_load(f)
+    verify_tasks = load_yaml(verify_cloudinit)
 
     assert main_tasks is not None, "main.yml should be valid YAML"
     assert verify_tasks is not None, "verify-cloudinit.yml should be valid YAML"
@@ -3,6 +3,8 @@ import pytest
 from pathlib import Path
 import yaml
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def vm_coolify_role_path(project_root):
@@ -33,8 +35,7 @@ def test_main_tasks_should_include_coolify_in_correct_order(vm_coolify_role_path
     """main.yml should include Coolify installation after Docker installation."""
     tasks_main = vm_coolify_role_path / "tasks" / "main.yml"
 
-    with open(tasks_main, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(tasks_main)
 
     # Find the include_tasks for install-coolify.yml
     coolify_index = None
@@ -62,8 +63,7 @@ def test_all_coolify_tasks_use_proper_ansible_modules(vm_coolify_role_path):
     """All Coolify installation tasks should use ansible.builtin modules."""
     install_coolify = vm_coolify_role_path / "tasks" / "install-coolify.yml"
 
-    with open(install_coolify, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(install_coolify)
 
     expected_modules = {
         'ansible.builtin.stat',
@@ -89,8 +89,7 @@ def test_coolify_tasks_have_privilege_escalation(vm_coolify_role_path):
     """Coolify installation tasks should use become: yes for privilege escalation."""
     install_coolify = vm_coolify_role_path / "tasks" / "install-coolify.yml"
 
-    with open(install_coolify, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(install_coolify)
 
     # Count tasks with become: yes
     privileged_tasks = 0
@@ -108,8 +107,7 @@ def test_coolify_installation_has_idempotency_check(vm_coolify_role_path):
     """Coolify installation should check if already installed before proceeding."""
     install_coolify = vm_coolify_role_path / "tasks" / "install-coolify.yml"
 
-    with open(install_coolify, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(install_coolify)
 
     # Should have a stat task to check if installed
     has_stat_check = False
@@ -144,11 +142,9 @@ def test_role_structure_supports_complete_coolify_workflow(vm_coolify_role_path)
     install_coolify = vm_coolify_role_path / "tasks" / "install-coolify.yml"
 
     # Both files should be valid YAML
-    with open(tasks_main, 'r') as f:
-        main_tasks = yaml.safe_load(f)
+    main_tasks = load_yaml(tasks_main)
 
-    with open(install_coolify, 'r') as f:
-        coolify_tasks = yaml.safe_load(f)
+    coolify_tasks = load_yaml(install_coolify)
 
     assert main_tasks is not None, "main.yml should be valid YAML"
     assert coolify_tasks is not None, "install-coolify.yml should be valid YAML"
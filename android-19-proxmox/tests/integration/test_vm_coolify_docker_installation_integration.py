@@ -3,6 +3,8 @@ import pytest
 from pathlib import Path
 import yaml
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def vm_coolify_role_path(project_root):
@@ -33,8 +35,7 @@ def test_main_tasks_should_include_docker_in_correct_order(vm_coolify_role_path)
     """main.yml should include Docker installation after cloud-init verification."""
     tasks_main = vm_coolify_role_path / "tasks" / "main.yml"
 
-    with open(tasks_main, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(tasks_main)
 
     # Find the include_tasks for install-docker.yml
     docker_index = None
@@ -62,8 +63,7 @@ def test_all_docker_tasks_use_proper_ansible_modules(vm_coolify_role_path):
     """All Docker installation tasks should use ansible.builtin modules."""
     install_docker = vm_coolify_role_path / "tasks" / "install-docker.yml"
 
-    with open(install_docker, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(install_docker)
 
     expected_modules = {
         'ansible.builtin.apt',
@@ -91,8 +91,7 @@ def test_docker_tasks_have_privilege_escalation(vm_coolify_role_path):
     """Docker installation tasks should use become: yes for privilege escalation."""
     install_docker = vm_coolify_role_path / "tasks" / "install-docker.yml"
 
-    with open(install_docker, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(install_docker)
 
     # Count tasks with become: yes
     privileged_tasks = 0
@@ -124,8 +123,7 @@ def test_docker_packages_installation_is_idempotent(vm_coolify_role_path):
     """Docker package installation should use state=present for idempotency."""
     install_docker = vm_coolify_role_path / "tasks" / "install-docker.yml"
 
-    with open(install_docker, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(install_docker)
 
     # Find apt package installation tasks
     package_tasks = [t for t in tasks if 'ansible.builtin.apt' in t or 'apt' in t]
@@ -149,11 +147,9 @@ def test_role_structure_supports_complete_docker_workflow(vm_coolify_role_path):
     install_docker = vm_coolify_role_path / "tasks" / "install-docker.yml"
 
     # Both files should be valid YAML
-    with open(tasks_main, 'r') as f:
-        main_tasks = yaml.safe_load(f)
+    main_tasks = load_yaml(tasks_main)
 
-    with open(install_docker, 'r') as f:
-        docker_tasks = yaml.safe_load(f)
+    docker_tasks = load_yaml(install_docker)
 
     assert main_tasks is not None, "main.yml should be valid YAML"
     assert docker_tasks is not None, "install-docker.yml should be valid YAML"
@@ -3,6 +3,8 @@ import pytest
 import subprocess
 from pathlib import Path
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def vm_coolify_role_path(project_root):
@@ -62,12 +64,10 @@ def test_vm_coolify_handlers_should_use_systemd_module(vm_coolify_role_path):
 @pytest.mark.ansible
 def test_vm_coolify_defaults_should_define_coolify_variables(vm_coolify_role_path):
     """defaults/main.yml should define Coolify-related variables."""
-    import yaml
 
     defaults_main = vm_coolify_role_path / "defaults" / "main.yml"
 
-    with open(defaults_main, 'r') as f:
-        defaults = yaml.safe_load(f)
+    defaults = load_yaml(defaults_main)
 
     if defaults:  # If not empty
         # Should have Coolify-related variables
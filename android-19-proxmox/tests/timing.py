@@ -0,0 +1,220 @@
+"""Per-test and per-fixture timing with budgets and a regression diff.
+
+Always active. For every test the setup, call and teardown durations are
+recorded, and for every fixture the time its setup took (count, total and
+slowest, with its scope). After the run:
+
+- durations are stored in ``.pytest_cache/v/homelab/timing`` (JSON): the
+  latest durations per test and per fixture plus a summary of recent runs;
+- tests that got noticeably slower than in the previous run are listed
+  (at least ``REGRESSION_FACTOR`` times and ``REGRESSION_MIN_MS`` slower);
+- ``--timing-report`` also prints the slowest tests and fixtures.
+
+Budgets are set in pytest.ini as ``path = milliseconds`` lines::
+
+    timing_budgets =
+        tests/unit = 2000
+
+A test under that path whose setup plus call exceed the budget is listed
+as a warning in the terminal summary; with ``--enforce-budgets`` it fails
+instead. Wall-clock time varies with machine load (xdist, CI), so failing
+is opt-in. Time spent setting up session/package/module/class fixtures is
+not counted: it is shared with other tests and only lands on whichever
+test ran first. Tests marked ``slow`` are exempt.
+Under pytest-xdist budgets are checked on the workers and fixture timings
+are sent to the controller, which writes the history. Without the
+cacheprovider plugin (``-p no:cacheprovider``) no history is kept.
+"""
+import json
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+CACHE_KEY = "homelab/timing"
+_FIXTURES = "homelab/timing-fixtures"
+# report.user_properties key carrying an over-budget warning to the controller
+_OVER_BUDGET = "homelab-timing-over-budget"
+
+# Bump when the stored format changes
+_VERSION = 1
+
+HISTORY_RUNS = 20
+REGRESSION_FACTOR = 1.5
+REGRESSION_MIN_MS = 100
+REPORT_LINES = 10
+
+_setup_key = pytest.StashKey[float]()
+_shared_key = pytest.StashKey[float]()
+
+
+def parse_budgets(lines: List[str]) -> List[Tuple[str, float]]:
+    """``path = ms`` lines as (path prefix, seconds), longest prefix first.
+
+    Raises:
+        pytest.UsageError: If a line is not ``path = milliseconds``
+    """
+    budgets = []
+    for line in lines:
+        path, sep, value = line.partition("=")
+        try:
+            budgets.append((path.strip().rstrip("/") + "/", float(value) / 1000))
+        except ValueError:
+            sep = ""
+        if not sep or not path.strip():
+            raise pytest.UsageError(f"timing_budgets: expected 'path = milliseconds', got {line!r}")
+    return sorted(budgets, key=lambda budget: len(budget[0]), reverse=True)
+
+
+def budget_for(nodeid: str, budgets: List[Tuple[str, float]]) -> Optional[Tuple[str, float]]:
+    """The budget (path, seconds) covering a test, if any."""
+    for path, seconds in budgets:
+        if nodeid.startswith(path):
+            return path, seconds
+    return None
+
+
+def regressions(previous: Dict[str, Dict[str, float]], current: Dict[str, Dict[str, float]]) -> List[Tuple]:
+    """Tests noticeably slower than in the previous run, worst first.
+
+    Returns:
+        (nodeid, previous seconds, current seconds) tuples
+    """
+    slower = []
+    for nodeid, phases in current.items():
+        if nodeid not in previous:
+            continue
+        before, after = sum(previous[nodeid].values()), sum(phases.values())
+        if after >= before * REGRESSION_FACTOR and (after - before) * 1000 >= REGRESSION_MIN_MS:
+            slower.append((nodeid, before, after))
+    return sorted(slower, key=lambda entry: entry[2] - entry[1], reverse=True)
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.0f} ms"
+
+
+class TimingPlugin:
+    """Records durations, enforces budgets and keeps the timing history."""
+
+    def __init__(self, config: pytest.Config):
+        self.config = config
+        self.budgets = parse_budgets(config.getini("timing_budgets"))
+        self.enforce = config.getoption("enforce_budgets")
+        self.over_budget: List[Tuple[str, str]] = []
+        self.tests: Dict[str, Dict[str, float]] = {}
+        self.fixtures: Dict[str, Dict] = {}
+        self.previous: Dict[str, Dict[str, float]] = {}
+        self.slower: List[Tuple] = []
+        self.current: Optional[pytest.Item] = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        self.current = item
+        item.stash[_shared_key] = 0.0
+        yield
+        self.current = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        started = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - started
+        stats = self.fixtures.setdefault(f"{fixturedef.baseid}::{fixturedef.argname}", {
+            "scope": fixturedef.scope, "count": 0, "total": 0.0, "max": 0.0,
+        })
+        stats["count"] += 1
+        stats["total"] += elapsed
+        stats["max"] = max(stats["max"], elapsed)
+        if fixturedef.scope != "function" and self.current is not None:
+            self.current.stash[_shared_key] += elapsed
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        report = outcome.get_result()
+        if call.when == "setup":
+            item.stash[_setup_key] = report.duration
+        if call.when != "call" or not report.passed or item.get_closest_marker("slow"):
+            return
+        budget = budget_for(item.nodeid, self.budgets)
+        if budget is None:
+            return
+        spent = item.stash.get(_setup_key, 0.0) - item.stash.get(_shared_key, 0.0) + report.duration
+        if spent <= budget[1]:
+            return
+        message = (f"Timing budget exceeded: setup+call took {_ms(spent)}, the budget for {budget[0]} is "
+                   f"{_ms(budget[1])}. Make the test faster or mark it @pytest.mark.slow.")
+        if self.enforce:
+            report.outcome = "failed"
+            report.longrepr = message
+        else:
+            report.user_properties.append((_OVER_BUDGET, message))
+
+    def pytest_runtest_logreport(self, report):
+        self.tests.setdefault(report.nodeid, {})[report.when] = report.duration
+        self.over_budget += [(report.nodeid, value) for key, value in report.user_properties if key == _OVER_BUDGET]
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        for name, stats in json.loads(getattr(node, "workeroutput", {}).get(_FIXTURES, "{}")).items():
+            merged = self.fixtures.setdefault(name, dict(stats, count=0, total=0.0, max=0.0))
+            merged["count"] += stats["count"]
+            merged["total"] += stats["total"]
+            merged["max"] = max(merged["max"], stats["max"])
+
+    def pytest_sessionfinish(self, session):
+        if hasattr(self.config, "workerinput"):
+            self.config.workeroutput[_FIXTURES] = json.dumps(self.fixtures)
+            return
+        cache = getattr(self.config, "cache", None)
+        if cache is None or not self.tests:
+            return
+
+        stored = cache.get(CACHE_KEY, None)
+        if not stored or stored.get("version") != _VERSION:
+            stored = {"tests": {}, "fixtures": {}, "runs": []}
+        self.previous = stored["tests"]
+        self.slower = regressions(self.previous, self.tests)
+
+        run = {
+            "finished": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "tests": len(self.tests),
+            "seconds": round(sum(sum(phases.values()) for phases in self.tests.values()), 3),
+            "regressions": len(self.slower),
+        }
+        cache.set(CACHE_KEY, {
+            "version": _VERSION,
+            "tests": {**stored["tests"], **self.tests},
+            "fixtures": {**stored["fixtures"], **self.fixtures},
+            "runs": (stored["runs"] + [run])[-HISTORY_RUNS:],
+        })
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if hasattr(self.config, "workerinput"):
+            return
+        write = terminalreporter.write_line
+        if self.over_budget:
+            terminalreporter.section("timing budgets exceeded (--enforce-budgets fails these)")
+            for nodeid, message in self.over_budget:
+                write(f"{nodeid}: {message}")
+        if self.slower:
+            terminalreporter.section("timing regressions (vs previous run)")
+            for nodeid, before, after in self.slower[:REPORT_LINES]:
+                write(f"+{_ms(after - before):>9}  {_ms(before):>9} -> {_ms(after):>9}  {nodeid}")
+            if len(self.slower) > REPORT_LINES:
+                write(f"... and {len(self.slower) - REPORT_LINES} more")
+
+        if not self.config.getoption("timing_report"):
+            return
+        terminalreporter.section("slowest tests (setup/call/teardown)")
+        by_total = sorted(self.tests.items(), key=lambda entry: sum(entry[1].values()), reverse=True)
+        for nodeid, phases in by_total[:REPORT_LINES]:
+            detail = "/".join(_ms(phases.get(when, 0.0)) for when in ("setup", "call", "teardown"))
+            write(f"{_ms(sum(phases.values())):>9}  {nodeid}  ({detail})")
+        terminalreporter.section("slowest fixtures (setup)")
+        by_fixture = sorted(self.fixtures.items(), key=lambda entry: entry[1]["total"], reverse=True)
+        for name, stats in by_fixture[:REPORT_LINES]:
+            write(f"{_ms(stats['total']):>9}  {name}  ({stats['scope']}, {stats['count']}x, "
+                  f"max {_ms(stats['max'])})")
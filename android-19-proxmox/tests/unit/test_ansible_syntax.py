@@ -0,0 +1,55 @@
+"""Tests for the batch Ansible syntax checker (homelab.ansible_syntax)."""
+import pytest
+
+from homelab.ansible_syntax import SyntaxCheckSession, discover_playbooks
+
+
+def test_discover_playbooks_finds_entry_points(project_root):
+    """Discovery returns playbooks and skips task, vars and inventory files."""
+    playbooks = discover_playbooks()
+    names = {p.name for p in playbooks if p.parent == project_root / "configuration-by-ansible"}
+
+    assert {"playbook.yml", "adguard-setup.yml"} <= names
+    assert "inventory.yml" not in names
+    assert any(p.parent.name == "android-16-bastion" for p in playbooks)
+
+
+@pytest.mark.slow
+def test_syntax_check_reports_unknown_module(ansible_syntax, tmp_path):
+    """An invalid playbook yields an error message instead of None."""
+    playbook = tmp_path / "broken.yml"
+    playbook.write_text(
+        "- hosts: localhost\n"
+        "  tasks:\n"
+        "    - name: Unknown module\n"
+        "      no_such_module_anywhere:\n"
+        "        arg: value\n"
+    )
+
+    error = ansible_syntax.check(playbook)
+
+    assert error is not None
+    assert "no_such_module_anywhere" in error
+
+
+@pytest.mark.slow
+def test_syntax_check_cache_reused_until_file_changes(project_root, tmp_path):
+    """A second session answers from the cache file; edits force a re-check."""
+    if not SyntaxCheckSession.available():
+        pytest.skip("ansible is not installed")
+
+    playbook = tmp_path / "ping.yml"
+    playbook.write_text("- hosts: localhost\n  tasks:\n    - ansible.builtin.ping:\n")
+    cache_file = tmp_path / "cache.json"
+
+    first = SyntaxCheckSession(cwd=project_root.parent, cache_file=cache_file)
+    assert first.check(playbook) is None
+    first.close()
+
+    second = SyntaxCheckSession(cwd=project_root.parent, cache_file=cache_file)
+    assert second.check(playbook) is None
+    assert second._worker is None, "Unchanged playbook should not start a worker"
+
+    playbook.write_text("- hosts: localhost\n  tasks:\n    - bogus_module_name:\n")
+    assert second.check(playbook) is not None
+    second.close()
@@ -0,0 +1,180 @@
+"""Tests for the resident apcupsd NIS exporter (homelab.apcupsd_exporter)."""
+import socketserver
+import struct
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from homelab.apcupsd_exporter import Exporter, NisClient, NisError, parse_status, render
+from homelab.exporter import handler
+
+STATUS = {
+    "APC": "001,036,0878",
+    "UPSNAME": "proxmox",
+    "MODEL": "Back-UPS XS 2200G",
+    "STATUS": "ONLINE",
+    "LINEV": "231.0 Volts",
+    "LOADPCT": "17.0 Percent",
+    "BCHARGE": "100.0 Percent",
+    "TIMELEFT": "42.5 Minutes",
+    "BATTV": "27.1 Volts",
+    "NOMPOWER": "1320 Watts",
+    "TONBATT": "0 Seconds",
+    "CUMONBATT": "12 Seconds",
+    "SELFTEST": "NO",
+}
+
+
+class FakeNis(socketserver.ThreadingTCPServer):
+    """apcupsd's NIS: length-prefixed commands, status lines ending in a zero-length record."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeNisHandler)
+        self.status = dict(STATUS)
+        self.connections = 0
+        self.requests = 0
+        self.drop_after_reply = False
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+class FakeNisHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        self.server.connections += 1
+        while True:
+            header = self.request.recv(2)
+            if len(header) < 2:
+                return
+            command = self.request.recv(struct.unpack("!H", header)[0])
+            assert command == b"status"
+            self.server.requests += 1
+            reply = b""
+            for key, value in self.server.status.items():
+                line = f"{key:<9}: {value}\n".encode()
+                reply += struct.pack("!H", len(line)) + line
+            self.request.sendall(reply + struct.pack("!H", 0))
+            if self.server.drop_after_reply:
+                return
+
+
+@pytest.fixture
+def nis():
+    server = FakeNis()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_status_reply_is_parsed_over_one_persistent_connection(nis):
+    """Repeated requests reuse the connection; values keep their unit suffixes."""
+    client = NisClient("127.0.0.1", nis.port)
+
+    first = client.status()
+    client.status()
+    client.close()
+
+    assert first["LINEV"] == "231.0 Volts" and first["MODEL"] == "Back-UPS XS 2200G"
+    assert (nis.connections, nis.requests) == (1, 2)
+    assert parse_status(["STATUS   : ONBATT LOWBATT", "not a field"]) == {"STATUS": "ONBATT LOWBATT"}
+
+
+def test_client_reconnects_after_dropped_connection(nis):
+    """A connection apcupsd closed is replaced transparently; an absent apcupsd raises NisError."""
+    nis.drop_after_reply = True
+    client = NisClient("127.0.0.1", nis.port)
+
+    client.status()
+    client.status()
+
+    assert nis.connections == 2 and client.connects == 2
+    client.close()
+    with pytest.raises(NisError, match="cannot connect"):
+        NisClient("127.0.0.1", 1, timeout=0.5).status()
+
+
+def test_metrics_keep_script_names_and_add_status_gauges():
+    """The textfile script's metric names are kept; STATUS becomes per-flag gauges."""
+    text = render(dict(STATUS, STATUS="ONBATT LOWBATT"), True, 1.5, 0)
+
+    assert "apcupsd_up 1\n" in text
+    assert "apcupsd_loadpct 17\n" in text
+    assert "apcupsd_timeleft 42.5\n" in text
+    assert "apcupsd_nompower 1320\n" in text
+    assert "apcupsd_online 0\n" in text
+    assert 'apcupsd_status{flag="onbatt"} 1\n' in text
+    assert 'apcupsd_status{flag="lowbatt"} 1\n' in text
+    assert 'apcupsd_status{flag="online"} 0\n' in text
+    assert 'apcupsd_selftest_info{result="NO"} 1\n' in text
+    assert "apcupsd_itemp" not in text  # not reported by this UPS
+    assert render(None, False, None, 3) == (
+        "# HELP apcupsd_up Whether the last reading is fresh enough to be served.\n"
+        "# TYPE apcupsd_up gauge\napcupsd_up 0\n"
+        "# HELP apcupsd_nis_errors_total Failed requests to apcupsd's NIS.\n"
+        "# TYPE apcupsd_nis_errors_total counter\napcupsd_nis_errors_total 3\n"
+    )
+
+
+def test_cached_reading_is_served_within_staleness_bound(nis):
+    """Scrapes within refresh hit the cache; an unreachable apcupsd is masked until max_age."""
+    clock = Clock()
+    exporter = Exporter(NisClient("127.0.0.1", nis.port), refresh=5, max_age=30, clock=clock)
+
+    assert "apcupsd_online 1\n" in exporter.metrics()
+    clock.now += 4
+    nis.status["LOADPCT"] = "50.0 Percent"
+    assert "apcupsd_loadpct 17\n" in exporter.metrics()
+    assert nis.requests == 1
+
+    clock.now += 1
+    assert "apcupsd_loadpct 50\n" in exporter.metrics()
+
+    exporter.client.close()
+    exporter.client.port = 1
+    clock.now += 20
+    stale = exporter.metrics()
+    assert "apcupsd_up 1\n" in stale and "apcupsd_loadpct 50\n" in stale
+    assert "apcupsd_reading_age_seconds 20.000\n" in stale
+
+    clock.now += 11
+    expired = exporter.metrics()
+    assert "apcupsd_up 0\n" in expired and "apcupsd_loadpct" not in expired
+    assert "apcupsd_nis_errors_total 2\n" in expired
+
+
+def test_metrics_are_served_over_http(nis):
+    """/metrics serves the exposition format; other paths are 404."""
+    exporter = Exporter(NisClient("127.0.0.1", nis.port))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler(exporter.metrics, "apcupsd metrics"))
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base}/metrics", timeout=5) as response:
+            body = response.read().decode()
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        with pytest.raises(urllib.error.HTTPError, match="404"):
+            urllib.request.urlopen(f"{base}/nope", timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
+        exporter.client.close()
+
+    assert "apcupsd_bcharge 100\n" in body
+    assert 'apcupsd_info{upsname="proxmox",model="Back-UPS XS 2200G"} 1\n' in body
@@ -3,6 +3,9 @@ import pytest
 import yaml
 from pathlib import Path
 
+from homelab.catalog import load_catalog
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture(scope="module")
 def bastion_dir(project_root):
@@ -23,9 +26,7 @@ def bastion_playbook(bastion_dir):
 @pytest.fixture(scope="module")
 def infrastructure_catalog(project_root):
     """Load infrastructure catalog."""
-    catalog_file = project_root / "infrastructure-catalog.yml"
-    with open(catalog_file, 'r') as f:
-        return yaml.safe_load(f)
+    return load_catalog(project_root / "infrastructure-catalog.yml").raw
 
 
 def test_bastion_playbook_exists(bastion_dir):
@@ -84,8 +85,7 @@ def test_bastion_dns_tasks_file_exists(bastion_dir):
 def test_bastion_dns_tasks_valid_yaml(bastion_dir):
     """DNS configuration tasks are valid YAML."""
     dns_tasks_file = bastion_dir / "tasks" / "dns-configure.yml"
-    with open(dns_tasks_file, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(dns_tasks_file)
 
     assert tasks is not None, \
         "DNS tasks should be valid YAML"
@@ -187,8 +187,7 @@ def test_bastion_dns_tasks_verify_configuration(bastion_dir):
 def test_bastion_dns_tasks_have_descriptions(bastion_dir):
     """DNS tasks have descriptive names."""
     dns_tasks_file = bastion_dir / "tasks" / "dns-configure.yml"
-    with open(dns_tasks_file, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(dns_tasks_file)
 
     # Tasks should be a list
     if isinstance(tasks, list):
@@ -201,8 +200,7 @@ def test_bastion_dns_tasks_have_descriptions(bastion_dir):
 def test_bastion_inventory_defines_bastion(project_root):
     """Ansible inventory defines bastion host."""
     inventory_file = project_root.parent / "inventory.yml"
-    with open(inventory_file, 'r') as f:
-        inventory = yaml.safe_load(f)
+    inventory = load_yaml(inventory_file)
 
     assert 'all' in inventory, "Inventory should have 'all' group"
     assert 'children' in inventory['all'], "Inventory should have children"
@@ -213,8 +211,7 @@ def test_bastion_inventory_defines_bastion(project_root):
 def test_bastion_inventory_has_correct_ip(project_root):
     """Bastion host in inventory has correct IP address."""
     inventory_file = project_root.parent / "inventory.yml"
-    with open(inventory_file, 'r') as f:
-        inventory = yaml.safe_load(f)
+    inventory = load_yaml(inventory_file)
 
     bastion_group = inventory['all']['children']['bastion']
     assert 'hosts' in bastion_group, "Bastion group should have hosts"
@@ -0,0 +1,120 @@
+"""Tests for the static feature/step index behind lazy BDD step loading (tests/bdd/gherkin.py)."""
+import pytest
+
+from tests.bdd.gherkin import (
+    STEP_DEFS_DIR, STEP_MODULES, Feature, evaluate, load_step_module, may_select, parse_expression, providers,
+    python_name,
+)
+
+FEATURE = """\
+@acceptance @rgb
+Feature: Lights
+  Background:
+    Given the host is up
+
+  @deployment
+  Scenario: Turn lights off (first-time)
+    Given lights are on
+    When I run the playbook with "state=off"
+    Then lights are off
+
+  Scenario Outline: Set <colour>
+    \"\"\"
+    Given this is a docstring, not a step
+    \"\"\"
+    When I set <colour>
+    Examples:
+      | colour |
+      | red    |
+"""
+
+STEPS = """\
+from pytest_bdd import scenarios, given, when, then, parsers
+
+scenarios('lights.feature')
+
+@given('lights are on')
+@given('the host is up')
+def lights_on():
+    pass
+
+@when(parsers.parse('I run the playbook with "{extra}"'))
+def run(extra):
+    pass
+
+@then(parsers.re(r'lights are (?P<state>on|off)'))
+def lights(state):
+    pass
+"""
+
+
+def _module(tmp_path, steps=STEPS):
+    (tmp_path / "lights.feature").write_text(FEATURE)
+    (tmp_path / "test_lights_steps.py").write_text(steps)
+    return load_step_module(tmp_path / "test_lights_steps.py")
+
+
+def test_feature_parse_tags_steps_and_outlines():
+    """Scenarios carry feature tags; background and docstrings are not scenario steps."""
+    feature = Feature(FEATURE)
+
+    off, outline = feature.scenarios
+    assert feature.tags == {"acceptance", "rgb"}
+    assert feature.background == ["the host is up"]
+    assert off.tags == {"acceptance", "rgb", "deployment"}
+    assert off.steps == ["lights are on", 'I run the playbook with "state=off"', "lights are off"]
+    assert off.test_name == "test_turn_lights_off_firsttime"
+    assert outline.outline and outline.steps == ["I set <colour>"]
+    assert python_name("2 Lights: on/off") == "test_lights_onoff"
+
+
+def test_step_module_read_without_import(tmp_path):
+    """Plain, parse and re step patterns are read from source; pytest_bdd is never imported."""
+    module = _module(tmp_path)
+
+    assert module.feature_path == tmp_path / "lights.feature"
+    assert module.defines('I run the playbook with "state=off"')
+    assert module.defines("lights are off")
+    assert not module.defines("lights are dim")
+    assert not module.defines("I set <colour>")
+
+
+def test_borrowed_steps_name_their_providers(tmp_path):
+    """A feature borrowing a step registers the modules that define it, in order."""
+    lights = _module(tmp_path, STEPS.replace("@given('the host is up')\n", ""))
+    repository = [load_step_module(STEP_DEFS_DIR / f"{name.rsplit('.', 1)[1]}.py") for name in STEP_MODULES]
+    ram = load_step_module(STEP_DEFS_DIR / "test_ram_led_control_steps.py")
+
+    assert providers(lights, [lights]) == []
+    assert providers(ram, repository) == [
+        "tests.bdd.step_defs.test_rgb_led_control_steps",
+        "tests.bdd.step_defs.test_coolify_platform_steps",
+        "tests.bdd.step_defs.test_adguard_dhcp_server_steps",
+    ]
+
+
+def test_selection_only_prunes_when_safe(tmp_path):
+    """-k/-m prune modules with no matching scenario, but never on 'not' or outlines."""
+    module = _module(tmp_path)
+    module.feature.scenarios.pop()  # drop the outline
+
+    assert may_select(module)
+    assert may_select(module, keyword="lights_off and firsttime")
+    assert may_select(module, markexpr="deployment")
+    assert not may_select(module, keyword="adguard")
+    assert not may_select(module, keyword="lights_off", markexpr="dhcp")
+    assert may_select(module, keyword="not lights")
+    assert may_select(module, keyword="broken (")
+    assert may_select(module, markexpr="deployment(env=lab) or dhcp")
+
+
+def test_expression_parser_follows_pytest_precedence():
+    """'and' binds tighter than 'or'; 'not' and parentheses nest; malformed input is rejected."""
+    tags = {"a", "c"}
+
+    assert evaluate(parse_expression("a and b or c"), tags.__contains__)
+    assert not evaluate(parse_expression("a and (b or not c)"), tags.__contains__)
+    assert parse_expression("tests/unit/x.py::t[1]") == "tests/unit/x.py::t[1]"
+    for malformed in ("", "a and", "(a", "a b", "or a"):
+        with pytest.raises(ValueError):
+            parse_expression(malformed)
@@ -0,0 +1,94 @@
+"""Tests for the indexed infrastructure catalog (homelab.catalog)."""
+import os
+
+import pytest
+import yaml
+
+from homelab.catalog import CatalogError, load_catalog, main
+
+
+def _write_catalog(path, services):
+    path.write_text(yaml.safe_dump({
+        'services': services,
+        'proxmox': {'ip': '192.168.0.19', 'node_name': 'proxmox', 'api_port': 8006},
+        'network': {'subnet': '192.168.0.0/24', 'gateway': '192.168.0.1', 'dns': '192.168.0.25'},
+    }))
+    return path
+
+
+def test_catalog_index_matches_raw_services(catalog_index, catalog_services):
+    """Every raw service is indexed by ID, name, IP and type."""
+    assert len(catalog_index) == len(catalog_services)
+
+    for service_id, entry in catalog_services.items():
+        service = catalog_index.service(service_id)
+        assert catalog_index.by_name(entry['name']) is service
+        assert catalog_index.by_ip(entry['ip']) is service
+        assert service in catalog_index.of_type(entry['type'])
+
+
+def test_catalog_index_typed_fields(catalog_index):
+    """Typed records expose catalog fields as attributes."""
+    vm = catalog_index.service(140)
+    assert vm.name == 'vm-llm-aimachine'
+    assert vm.is_vm and not vm.is_container
+    assert vm.template_vm_id == 9000
+    assert vm.resources.cores == 32
+    assert vm.get('cloud_init_user') == 'ubuntu'
+
+    assert catalog_index.proxmox.node_name == 'proxmox'
+    assert catalog_index.network.dns == catalog_index.service(125).ip
+
+
+def test_catalog_index_type_views_preserve_catalog_order(catalog_index, catalog_services):
+    """Container and VM views keep the order services appear in the catalog."""
+    expected = [sid for sid, svc in catalog_services.items() if svc['type'] == 'container']
+    assert [svc.id for svc in catalog_index.containers] == expected
+
+
+def test_load_catalog_is_shared_until_file_changes(tmp_path):
+    """Repeated loads reuse the parsed catalog; edits invalidate it."""
+    path = _write_catalog(tmp_path / 'catalog.yml', {
+        125: {'name': 'adguard', 'type': 'container', 'ip': '192.168.0.25'},
+    })
+    first = load_catalog(path)
+    assert load_catalog(path) is first
+
+    _write_catalog(path, {
+        125: {'name': 'adguard', 'type': 'container', 'ip': '192.168.0.25'},
+        126: {'name': 'monitoring', 'type': 'container', 'ip': '192.168.0.26'},
+    })
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1_000_000))
+
+    reloaded = load_catalog(path)
+    assert reloaded is not first
+    assert reloaded.by_name('monitoring').id == 126
+
+
+@pytest.mark.parametrize("services,message", [
+    ({125: {'name': 'a', 'type': 'container', 'ip': '10.0.0.1'},
+      126: {'name': 'a', 'type': 'container', 'ip': '10.0.0.2'}}, "duplicate service name"),
+    ({125: {'name': 'a', 'type': 'container', 'ip': '10.0.0.1'},
+      126: {'name': 'b', 'type': 'vm', 'ip': '10.0.0.1'}}, "duplicate IP"),
+    ({125: {'name': 'a', 'type': 'lxc', 'ip': '10.0.0.1'}}, "has type 'lxc'"),
+    ({125: {'name': 'a', 'type': 'vm'}}, "missing required field(s): ip"),
+])
+def test_load_catalog_rejects_invalid_services(tmp_path, services, message):
+    """Validation errors name the offending service."""
+    path = _write_catalog(tmp_path / 'catalog.yml', services)
+
+    with pytest.raises(CatalogError, match=message.replace('(', r'\(').replace(')', r'\)')):
+        load_catalog(path)
+
+
+def test_catalog_cli_services_by_type(capsys, project_root):
+    """CLI prints id:name:ip lines consumed by rebuild-state.sh."""
+    catalog_path = project_root / "infrastructure-catalog.yml"
+
+    assert main(['--catalog', str(catalog_path), 'services', '--type', 'container']) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert '125:adguard:192.168.0.25' in lines
+    assert all(line.split(':')[0] != '140' for line in lines)
+
+    assert main(['--catalog', str(catalog_path), 'proxmox', 'ip', 'node_name']) == 0
+    assert capsys.readouterr().out.strip() == '192.168.0.19 proxmox'
@@ -0,0 +1,90 @@
+"""Tests for the homelab_catalog Ansible vars plugin."""
+import os
+import shutil
+
+import pytest
+
+ansible = pytest.importorskip("ansible")
+
+from ansible.inventory.manager import InventoryManager  # noqa: E402
+from ansible.parsing.dataloader import DataLoader  # noqa: E402
+from ansible.plugins.loader import vars_loader  # noqa: E402
+
+
+@pytest.fixture
+def plugin(project_root):
+    """The vars plugin loaded through Ansible's plugin loader."""
+    vars_loader.add_directory(str(project_root / "plugins" / "vars"))
+    module = vars_loader.get("homelab_catalog")
+    assert module is not None, "homelab_catalog vars plugin should load"
+    return module
+
+
+@pytest.fixture
+def inventory(project_root):
+    """Repository inventory."""
+    return InventoryManager(DataLoader(), sources=[str(project_root.parent / "inventory.yml")])
+
+
+def _vars(plugin, inventory, entity, catalog_path=None):
+    plugin.set_options(direct={"catalog_path": str(catalog_path) if catalog_path else ""})
+    return plugin.get_vars(inventory._loader, inventory._sources[0], [entity])
+
+
+def test_plugin_sets_catalog_on_all_group(plugin, inventory, catalog):
+    """The all group carries the parsed catalog."""
+    data = _vars(plugin, inventory, inventory.groups["all"])
+
+    assert data["catalog"] == catalog
+    assert data["catalog"]["services"][140]["ip"] == "192.168.0.140"
+
+
+def test_plugin_sets_prometheus_targets_on_all_group(plugin, inventory):
+    """The all group carries file_sd target groups per Prometheus job."""
+    targets = _vars(plugin, inventory, inventory.groups["all"])["prometheus_file_sd"]
+
+    assert {"node", "gpu"} <= set(targets)
+    assert {"targets": ["192.168.0.140:9400"], "labels": {
+        "node": "ai", "service_id": "140", "service_name": "vm-llm-aimachine", "service_type": "vm",
+    }} in targets["gpu"]
+
+
+def test_plugin_resolves_exporters_against_inventory_vars(plugin, inventory, project_root, tmp_path):
+    """vLLM is off by default; enabling it in a host's inventory vars adds its scrape target."""
+    assert "vllm" not in _vars(plugin, inventory, inventory.groups["all"])["prometheus_file_sd"]
+
+    inventory_file = tmp_path / "inventory.yml"
+    inventory_file.write_text((project_root.parent / "inventory.yml").read_text().replace(
+        "          vm_id: 140\n",
+        "          vm_id: 140\n          vllm_service_enabled: true\n          vllm_port: 8001\n",
+    ))
+    enabled = InventoryManager(DataLoader(), sources=[str(inventory_file)])
+
+    targets = _vars(plugin, enabled, enabled.groups["all"])["prometheus_file_sd"]
+    assert [group["targets"] for group in targets["vllm"]] == [["192.168.0.140:8001"]]
+
+
+def test_plugin_derives_vm_config_from_vm_id(plugin, inventory, catalog_services):
+    """Hosts with a catalog vm_id get vm_config; others do not."""
+    assert _vars(plugin, inventory, inventory.get_host("vm_llm_aimachine")) == \
+        {"vm_config": catalog_services[140]}
+    assert _vars(plugin, inventory, inventory.get_host("vm_coolify_platform"))["vm_config"]["ip"] == \
+        "192.168.0.160"
+    assert _vars(plugin, inventory, inventory.get_host("android19")) == {}
+
+
+def test_plugin_reuses_parse_until_catalog_changes(plugin, inventory, project_root, tmp_path):
+    """The same parsed object is returned until the file's mtime changes."""
+    catalog_file = tmp_path / "infrastructure-catalog.yml"
+    shutil.copy(project_root / "infrastructure-catalog.yml", catalog_file)
+    group = inventory.groups["all"]
+
+    first = _vars(plugin, inventory, group, catalog_file)["catalog"]
+    assert _vars(plugin, inventory, group, catalog_file)["catalog"] is first
+
+    catalog_file.write_text(catalog_file.read_text().replace("192.168.0.140", "192.168.0.240"))
+    stat = catalog_file.stat()
+    os.utime(catalog_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    reloaded = _vars(plugin, inventory, group, catalog_file)["catalog"]
+    assert reloaded["services"][140]["ip"] == "192.168.0.240"
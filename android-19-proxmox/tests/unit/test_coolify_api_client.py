@@ -0,0 +1,259 @@
+"""Tests for the Coolify API clients against a local fake Coolify server."""
+import asyncio
+import time
+
+import pytest
+import requests
+
+from tests.bdd.coolify_api import (
+    AsyncCoolifyAPIClient,
+    Backoff,
+    CoolifyAPIClient,
+    DeploymentFailedError,
+)
+from tests.bdd.fake_coolify import FakeCoolify
+
+
+@pytest.fixture
+def coolify():
+    """Running fake Coolify server."""
+    with FakeCoolify() as fake:
+        yield fake
+
+
+def test_sync_client_reuses_connection(coolify):
+    """Consecutive calls share one keep-alive connection."""
+    client = CoolifyAPIClient(coolify.url, "admin@example.com", "secret")
+
+    app = client.create_application("src-1", "owner/repo", name="demo")
+    client.deploy_application(app['id'])
+    assert client.get_deployment_status(app['id']) == 'deploying'
+    client.delete_application(app['id'])
+
+    assert coolify.connections == 1
+    assert len(coolify.requests) == 4
+
+
+def test_sync_client_applies_timeout(coolify):
+    """Every call is bounded by the client timeout."""
+    coolify.delay = 0.5
+    client = CoolifyAPIClient(coolify.url, "admin@example.com", "secret", timeout=0.1)
+
+    with pytest.raises(requests.Timeout):
+        client.get_sources()
+
+
+def test_async_client_batch_runs_concurrently(coolify):
+    """create_applications/delete_applications overlap requests up to the pool size."""
+    coolify.delay = 0.2
+
+    async def scenario():
+        async with AsyncCoolifyAPIClient(coolify.url, "admin@example.com", "secret", pool_size=4) as api:
+            started = time.monotonic()
+            apps = await api.create_applications(
+                [{'source_id': 'src-1', 'repository': f'owner/repo-{i}'} for i in range(8)]
+            )
+            elapsed = time.monotonic() - started
+            errors = await api.delete_applications(app['id'] for app in apps)
+            return apps, elapsed, errors
+
+    apps, elapsed, errors = asyncio.run(scenario())
+
+    assert [app['repository'] for app in apps] == [f'owner/repo-{i}' for i in range(8)]
+    assert errors == [None] * 8
+    assert coolify.max_in_flight == 4, "Concurrency should be bounded by pool_size"
+    assert coolify.connections <= 4
+    assert elapsed < 8 * 0.2, f"Batch took {elapsed:.2f}s, expected concurrent requests"
+    assert coolify.applications == {}
+
+
+def test_async_client_per_call_timeout(coolify):
+    """A per-call timeout overrides the client default."""
+    coolify.delay = 0.5
+
+    async def scenario():
+        async with AsyncCoolifyAPIClient(coolify.url, "admin@example.com", "secret") as api:
+            await api.get_sources(timeout=0.1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(scenario())
+
+
+def test_async_client_timeout_releases_connection(coolify):
+    """A timed-out call's request is aborted too, so the one pooled connection serves later calls."""
+    coolify.delay = 5
+
+    async def scenario():
+        async with AsyncCoolifyAPIClient(coolify.url, "admin@example.com", "secret", pool_size=1) as api:
+            with pytest.raises(asyncio.TimeoutError):
+                await api.get_sources(timeout=0.1)
+            coolify.delay = 0
+            started = time.monotonic()
+            await api.get_sources(timeout=1)
+            return time.monotonic() - started
+
+    # Far below the delay, with headroom for a loaded machine
+    assert asyncio.run(scenario()) < 2.5
+
+
+def test_async_client_teardown_reports_failures(coolify):
+    """delete_applications attempts every deletion and returns the failures."""
+    async def scenario():
+        async with AsyncCoolifyAPIClient(coolify.url, "admin@example.com", "secret") as api:
+            app = await api.create_application('src-1', 'owner/repo')
+            return await api.delete_applications([app['id'], 'missing'])
+
+    ok, missing = asyncio.run(scenario())
+
+    assert ok is None
+    assert isinstance(missing, requests.HTTPError)
+    assert missing.response.status_code == 404
+
+
+@pytest.fixture
+def deployed_app(coolify):
+    """Client plus an application whose deployment was just triggered."""
+    client = CoolifyAPIClient(coolify.url, "admin@example.com", "secret")
+    app = client.create_application("src-1", "owner/repo")
+    client.deploy_application(app['id'])
+    return client, app['id']
+
+
+def test_backoff_grows_to_cap_and_resets():
+    """Delays double up to the cap and restart after reset()."""
+    backoff = Backoff(initial=0.5, maximum=5, jitter=0)
+
+    assert [backoff.next() for _ in range(6)] == [0.5, 1, 2, 4, 5, 5]
+    backoff.reset()
+    assert backoff.next() == 0.5
+
+
+def test_wait_for_deployment_detects_running_promptly(coolify, deployed_app):
+    """Short initial interval and conditional polls catch completion quickly."""
+    client, app_id = deployed_app
+    coolify.deploy_plan = [(0.0, 'deploying'), (0.3, 'running')]
+
+    wait = client.wait_for_deployment(app_id, timeout=10, poll_interval=0.2, initial_interval=0.02)
+
+    assert wait, f"Deployment should be running: {wait!r}"
+    assert 0.3 <= wait.time_to_running < 0.6
+    assert wait.not_modified > 0, "Unchanged polls should be answered 304"
+    assert coolify.conditional_requests == wait.polls - 1
+
+
+def test_wait_for_deployment_failure_includes_logs(coolify, deployed_app):
+    """A failed deployment raises with the deployment logs attached."""
+    client, app_id = deployed_app
+    coolify.deploy_plan = [(0.0, 'failed')]
+    coolify.logs[app_id] = "ERROR: Dockerfile not found"
+
+    with pytest.raises(DeploymentFailedError, match="Dockerfile not found"):
+        client.wait_for_deployment(app_id, timeout=5)
+
+
+def test_wait_for_deployment_timeout_reports_last_status(coolify, deployed_app):
+    """The timeout message uses the last observed status without another request."""
+    client, app_id = deployed_app
+
+    with pytest.raises(TimeoutError, match="Last status: deploying"):
+        client.wait_for_deployment(app_id, timeout=0.3, initial_interval=0.05)
+
+    assert coolify.requests[-1][0] == 'GET'
+    polls = [r for r in coolify.requests if r == ('GET', f'/api/v1/applications/{app_id}')]
+    assert len(polls) < 10, f"Backoff should limit polling, got {len(polls)} polls"
+
+
+@pytest.mark.parametrize("events_enabled", [True, False], ids=["event-stream", "fallback-polling"])
+def test_wait_for_deployment_event_stream(coolify, deployed_app, events_enabled):
+    """The event stream is used when offered; otherwise polling takes over."""
+    client, app_id = deployed_app
+    coolify.events_enabled = events_enabled
+    coolify.deploy_plan = [(0.0, 'deploying'), (0.2, 'running')]
+
+    wait = client.wait_for_deployment(app_id, timeout=5, initial_interval=0.02, events=True)
+
+    assert wait.status == 'running'
+    if events_enabled:
+        assert (wait.events, wait.polls) == (2, 0)
+    else:
+        assert wait.events == 0 and wait.polls > 0
+
+
+def test_wait_for_deployment_event_stream_honours_timeout(coolify, deployed_app):
+    """An event stream that never reaches a final status still times out."""
+    client, app_id = deployed_app
+    coolify.events_enabled = True
+    coolify.event_interval = 0.02
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError, match="Last status: deploying"):
+        client.wait_for_deployment(app_id, timeout=0.3, initial_interval=0.02, events=True)
+
+    assert time.monotonic() - started < 2
+
+
+def test_async_wait_for_deployment(coolify):
+    """Several deployments can be awaited concurrently."""
+    coolify.deploy_plan = [(0.0, 'deploying'), (0.2, 'running')]
+
+    async def scenario():
+        async with AsyncCoolifyAPIClient(coolify.url, "admin@example.com", "secret") as api:
+            apps = await api.create_applications(
+                [{'source_id': 'src-1', 'repository': f'owner/repo-{i}'} for i in range(3)]
+            )
+            await api.gather(*(api.deploy_application(app['id']) for app in apps))
+            return await api.gather(*(
+                api.wait_for_deployment(app['id'], timeout=5, initial_interval=0.02) for app in apps
+            ))
+
+    waits = asyncio.run(scenario())
+
+    assert all(waits), waits
+    assert all(wait.time_to_running < 1 for wait in waits)
+
+
+BUILD_LOG = (
+    "Cloning into '/artifacts/app'...\n"
+    "Step 1/4 : FROM nginx:alpine\r\n"
+    "Step 2/4 : COPY index.html /usr/share/nginx/html\n"
+    "Successfully built 3f2a\n"
+    "Deployed successfully"
+)
+
+
+@pytest.mark.parametrize("ranges_enabled", [True, False], ids=["range", "no-range"])
+def test_stream_deployment_logs_resumes_from_offset(coolify, deployed_app, ranges_enabled):
+    """Offsets resume the stream with or without server Range support."""
+    client, app_id = deployed_app
+    coolify.ranges_enabled = ranges_enabled
+    coolify.logs[app_id] = BUILD_LOG
+
+    lines = list(client.stream_deployment_logs(app_id, chunk_size=7))
+    assert [line for _, line in lines] == BUILD_LOG.replace('\r', '').split('\n')
+    assert lines[-1][0] == len(BUILD_LOG.encode())
+
+    resumed = list(client.stream_deployment_logs(app_id, since_offset=lines[1][0]))
+    assert [line for _, line in resumed] == [line for _, line in lines[2:]]
+    assert list(client.stream_deployment_logs(app_id, since_offset=lines[-1][0])) == []
+
+
+def test_find_in_deployment_logs_stops_at_first_match(coolify, deployed_app):
+    """Searching a huge log stops downloading once the marker line is seen."""
+    client, app_id = deployed_app
+    coolify.logs[app_id] = "Step 1/4 : FROM nginx:alpine\n" + ("y" * 199 + "\n") * 160_000
+    total = len(coolify.logs[app_id])
+
+    offset, line = client.find_in_deployment_logs(app_id, ['step 1/'])
+
+    assert line == "Step 1/4 : FROM nginx:alpine"
+    assert offset == len(line) + 1
+    assert coolify.log_bytes_sent < total / 2, \
+        f"Sent {coolify.log_bytes_sent} of {total} bytes; stream should short-circuit"
+
+
+def test_tail_deployment_logs_keeps_last_lines(coolify, deployed_app):
+    """Failure messages carry only the end of the log."""
+    client, app_id = deployed_app
+    coolify.logs[app_id] = "\n".join(f"line {i}" for i in range(1000))
+
+    assert client.tail_deployment_logs(app_id, lines=3) == "line 997\nline 998\nline 999"
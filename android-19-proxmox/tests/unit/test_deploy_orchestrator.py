@@ -0,0 +1,190 @@
+"""Tests for the parallel deployment orchestrator (homelab.deploy)."""
+import copy
+import io
+import threading
+import time
+
+import pytest
+
+from homelab.catalog import Catalog
+from homelab.deploy import (
+    PlanError,
+    Stage,
+    build_plan,
+    format_timings,
+    run_plan,
+    waves,
+)
+
+
+@pytest.fixture
+def plan(catalog_index):
+    """Full-lab plan derived from the real catalog."""
+    return build_plan(catalog_index)
+
+
+def _apply_stage(plan, service_id):
+    """Name of the terraform apply stage that creates a service."""
+    matches = [name for name in plan if name.startswith("terraform:")
+               and str(service_id) in name[len("terraform:"):].split(",")]
+    assert len(matches) == 1, f"Service {service_id} should be created by exactly one apply: {matches}"
+    return matches[0]
+
+
+def test_plan_clones_wait_for_their_template(plan, catalog_index):
+    """Cloud-image clones wait for template 9000; catalog clones wait for the source VM."""
+    for service in catalog_index.vms:
+        apply = plan[_apply_stage(plan, service.id)]
+        if service.template_vm_id == 9000:
+            assert "proxmox-cloud-templates" in apply.deps
+        elif service.template_vm_id in catalog_index and service.template_vm_id != service.id:
+            assert _apply_stage(plan, service.template_vm_id) in apply.deps
+
+
+def test_plan_dns_server_configured_before_other_services(plan, catalog_index):
+    """Every other configure stage depends on the DNS server's configure stage."""
+    dns = catalog_index.by_ip(catalog_index.network.dns)
+    dns_stage = f"configure:{dns.id}"
+
+    configure = [name for name in plan if name.startswith("configure:") and name != dns_stage]
+    assert configure, "Plan should configure services besides DNS"
+    for name in configure:
+        assert dns_stage in plan[name].deps, f"{name} should run after {dns_stage}"
+
+
+def test_plan_prepare_stages_only_download_isos(plan):
+    """ISO preparation runs only the download tasks and takes turns with other Proxmox host playbooks."""
+    prepare = [stage for name, stage in plan.items() if name.startswith("prepare:")]
+
+    assert prepare, "Plan should prepare ISO-based VMs"
+    for stage in prepare:
+        assert stage.command[-2:] == ["--tags", "download,iso"], stage.command
+        assert stage.lock == plan["proxmox-base"].lock
+
+
+def test_plan_gpu_passthrough_is_a_barrier(catalog):
+    """Host GPU setup may reboot Proxmox, so every stage but bastion waits for it."""
+    data = copy.deepcopy(catalog)
+    data["services"][140]["gpu_passthrough"]["enabled"] = True
+    plan = build_plan(Catalog(data))
+
+    assert sorted(waves(plan)[0]) == ["bastion", "proxmox-gpu-passthrough"]
+    for name, stage in plan.items():
+        if name not in ("bastion", "proxmox-gpu-passthrough"):
+            assert "proxmox-gpu-passthrough" in stage.deps, name
+
+
+def test_plan_skips_gpu_passthrough_when_disabled(catalog):
+    """gpu_passthrough is a mapping; only ``enabled: true`` schedules the host setup."""
+    data = copy.deepcopy(catalog)
+    for service in data["services"].values():
+        if service.get("gpu_passthrough"):
+            service["gpu_passthrough"]["enabled"] = False
+
+    assert "proxmox-gpu-passthrough" not in build_plan(Catalog(data))
+
+
+def test_plan_serializes_services_sharing_a_gpu(plan, catalog_index):
+    """Services attaching the same PCI device hold one lock, so they are never configured together."""
+    gpu_services = [s for s in catalog_index if s.gpu_device]
+    assert len({s.gpu_device for s in gpu_services}) < len(gpu_services), "Catalog should share a GPU"
+    for service in gpu_services:
+        assert plan[f"configure:{service.id}"].lock == f"pci:{service.gpu_device}"
+
+
+def test_plan_terraform_stages_share_state_lock(plan):
+    """Terraform stages serialize on the state lock; independent playbooks do not."""
+    terraform = [s for s in plan.values() if s.command[0] == "terraform"]
+    assert len({s.lock for s in terraform}) == 1 and terraform[0].lock
+    assert plan["bastion"].lock is None
+    assert len(waves(plan)[0]) > 1, "Independent stages should start together"
+
+
+def test_plan_for_single_service_includes_prerequisites(catalog_index):
+    """Selecting a clone pulls in its source VM but not unrelated services."""
+    plan = build_plan(catalog_index, ["vm-ubuntu-desktop-openclaw"])
+
+    assert "terraform:103" in plan
+    assert "configure:106" in plan
+    assert not any("140" in name for name in plan)
+    assert "bastion" not in plan
+
+
+def test_plan_rejects_unknown_service(catalog_index):
+    """Unknown targets are reported instead of silently ignored."""
+    with pytest.raises(PlanError, match="unknown service: 999"):
+        build_plan(catalog_index, ["999"])
+
+
+def test_run_plan_runs_independent_stages_concurrently():
+    """Stages without dependencies overlap; dependents wait for them."""
+    plan = {
+        "a": Stage("a", ["a"]),
+        "b": Stage("b", ["b"]),
+        "c": Stage("c", ["c"], deps=["a", "b"]),
+    }
+    active, peak = [], []
+    lock = threading.Lock()
+
+    def runner(stage):
+        with lock:
+            active.append(stage.name)
+            peak.append(len(active))
+        time.sleep(0.1)
+        with lock:
+            active.remove(stage.name)
+        return 0
+
+    results = run_plan(plan, workers=4, runner=runner, out=io.StringIO())
+
+    assert max(peak) == 2
+    assert results["c"].start >= results["a"].start + results["a"].elapsed
+    assert all(r.ok for r in results.values())
+
+
+def test_run_plan_serializes_stages_sharing_a_lock():
+    """Two stages holding the same lock never run at once."""
+    plan = {name: Stage(name, [name], lock="terraform-state") for name in ("x", "y", "z")}
+    overlaps = []
+    running = set()
+
+    def runner(stage):
+        if running:
+            overlaps.append(stage.name)
+        running.add(stage.name)
+        time.sleep(0.05)
+        running.discard(stage.name)
+        return 0
+
+    run_plan(plan, workers=3, runner=runner, out=io.StringIO())
+
+    assert overlaps == []
+
+
+def test_run_plan_skips_dependents_of_failed_stage():
+    """A failure skips its dependents but independent stages still run."""
+    plan = {
+        "tf": Stage("tf", ["tf"]),
+        "configure": Stage("configure", ["configure"], deps=["tf"]),
+        "after": Stage("after", ["after"], deps=["configure"]),
+        "bastion": Stage("bastion", ["bastion"]),
+    }
+    out = io.StringIO()
+
+    results = run_plan(plan, runner=lambda stage: 1 if stage.name == "tf" else 0, out=out)
+
+    assert {n: r.status for n, r in results.items()} == {
+        "tf": "failed", "configure": "skipped", "after": "skipped", "bastion": "ok",
+    }
+    assert "configure skipped" in out.getvalue()
+
+
+def test_format_timings_reports_speed_up():
+    """The timing table lists each stage and wall versus serial time."""
+    plan = {name: Stage(name, [name]) for name in ("one", "two")}
+    results = run_plan(plan, runner=lambda stage: time.sleep(0.05) or 0, out=io.StringIO())
+
+    table = format_timings(results)
+
+    assert "one" in table and "two" in table
+    assert "parallel speed-up" in table
@@ -0,0 +1,33 @@
+"""Tests for the plumbing shared by the stdlib exporters (homelab.exporter)."""
+import argparse
+import socket
+
+import pytest
+
+from homelab.exporter import address, escape, labels, serve
+
+
+def test_labels_escape_exposition_specials():
+    """Backslashes, quotes and newlines are escaped; values are stringified in argument order."""
+    assert escape('a\\b"c\nd') == 'a\\\\b\\"c\\nd'
+    assert labels(service_id=140, model='say "hi"') == 'service_id="140",model="say \\"hi\\""'
+
+
+def test_address_fills_default_host():
+    """[host]:port parses with the exporter's default host; anything else is an argparse error."""
+    assert address("127.0.0.1")(":3551") == ("127.0.0.1", 3551)
+    assert address()("0.0.0.0:9162") == ("0.0.0.0", 9162)
+    assert address()(":9221") == ("", 9221)
+    with pytest.raises(argparse.ArgumentTypeError, match=r"\[host\]:port"):
+        address()("localhost")
+
+
+def test_serve_reports_busy_port(capsys):
+    """A port that cannot be bound is reported instead of raising."""
+    with socket.socket() as busy:
+        busy.bind(("127.0.0.1", 0))
+        busy.listen()
+        port = busy.getsockname()[1]
+
+        assert serve(("127.0.0.1", port), lambda: "", "demo metrics", "serving demo") == 1
+    assert f"ERROR: cannot listen on 127.0.0.1:{port}" in capsys.readouterr().err
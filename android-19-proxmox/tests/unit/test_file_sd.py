@@ -0,0 +1,131 @@
+"""Tests for catalog-driven Prometheus file_sd targets (homelab.file_sd)."""
+import json
+
+import pytest
+
+from homelab import file_sd
+from homelab.catalog import Catalog, CatalogError
+from homelab.file_sd import main, render, scrape_targets, write_file_sd
+
+
+def _catalog(monitoring):
+    return Catalog({
+        "services": {
+            141: {"name": "b", "type": "vm", "ip": "10.0.0.141", "monitoring": monitoring},
+            125: {"name": "a", "type": "container", "ip": "10.0.0.25",
+                  "monitoring": {"exporters": {"node": 9100}}},
+            130: {"name": "unmonitored", "type": "container", "ip": "10.0.0.30"},
+        },
+        "proxmox": {"ip": "10.0.0.19", "node_name": "pve",
+                    "monitoring": {"node": "host", "exporters": {"node": 9100}}},
+        "network": {"subnet": "10.0.0.0/24", "gateway": "10.0.0.1", "dns": "10.0.0.25"},
+    })
+
+
+def test_repository_catalog_keeps_dashboard_labels(catalog_index):
+    """The generated jobs cover the hosts the dashboards query, with their node labels."""
+    jobs = scrape_targets(catalog_index)
+
+    nodes = {group["labels"]["node"]: group["targets"] for group in jobs["node"]}
+    assert nodes == {
+        "proxmox": ["192.168.0.19:9100"],
+        "desktop": ["192.168.0.103:9100"],
+        "ai": ["192.168.0.140:9100"],
+        "ai-testing": ["192.168.0.141:9100"],
+        "coolify": ["192.168.0.160:9100"],
+    }
+    assert [group["targets"] for group in jobs["gpu"]] == [["192.168.0.140:9400"], ["192.168.0.141:9400"]]
+    # vm-llm-aimachine leaves vLLM stopped by default (vllm_service_enabled), so it is not scraped
+    assert "vllm" not in jobs
+    assert [group["targets"] for group in jobs["ollama"]] == [["192.168.0.140:9435"], ["192.168.0.141:9435"]]
+
+
+def test_targets_are_labelled_with_service_identity():
+    """Host first, then services by ID; node label defaults to the service name."""
+    jobs = scrape_targets(_catalog({"node": "bee", "exporters": {"node": 9100, "vllm": 8000}}))
+
+    assert list(jobs) == ["node", "vllm"]
+    assert [group["labels"] for group in jobs["node"]] == [
+        {"node": "host", "service_name": "pve", "service_type": "host"},
+        {"node": "a", "service_id": "125", "service_name": "a", "service_type": "container"},
+        {"node": "bee", "service_id": "141", "service_name": "b", "service_type": "vm"},
+    ]
+    assert jobs["vllm"][0]["targets"] == ["10.0.0.141:8000"]
+
+
+@pytest.mark.parametrize("monitoring, message", [
+    ({"node": "x"}, "'exporters' mapping"),
+    ({"exporters": {"node-exporter": 9100}}, "valid Prometheus job name"),
+    ({"exporters": {"node": "9100"}}, "port must be an integer"),
+    ({"exporters": {"node": 70000}}, "port must be an integer"),
+    ({"exporters": {"vllm": {"port": "vllm_port", "enabled": "vllm_service_enabled"}}}, "has no 'role'"),
+    ({"role": "no-such-role", "exporters": {"node": 9100}}, "monitoring role 'no-such-role'"),
+    ({"role": "vm-llm-aimachine", "exporters": {"vllm": {"port": "vllm_port"}}}, "'port' and 'enabled'"),
+    ({"role": "vm-llm-aimachine", "exporters": {"vllm": {"port": "vllm_prot", "enabled": "vllm_service_enabled"}}},
+     "'vllm_prot' is not defined"),
+])
+def test_malformed_monitoring_rejected(monitoring, message):
+    """Malformed monitoring blocks name the service at fault."""
+    with pytest.raises(CatalogError, match=f"service 141: .*{message}"):
+        scrape_targets(_catalog(monitoring))
+
+
+def test_role_exporters_follow_role_variables(tmp_path, monkeypatch):
+    """Ports come from the named role's defaults; disabled exporters get no target."""
+    defaults = tmp_path / "inference" / "defaults"
+    defaults.mkdir(parents=True)
+    defaults.joinpath("main.yml").write_text(
+        "api_port: 8000\nmetrics_port: \"{{ api_port + 1 }}\"\napi_enabled: true\nsidecar_enabled: false\n")
+    monkeypatch.setattr(file_sd, "ROLES_DIR", tmp_path)
+
+    jobs = scrape_targets(_catalog({"role": "inference", "exporters": {
+        "node": 9100,
+        "api": {"port": "metrics_port", "enabled": "api_enabled"},
+        "sidecar": {"port": "api_port", "enabled": "sidecar_enabled"},
+    }}))
+
+    assert list(jobs) == ["api", "node"]
+    assert jobs["api"][0]["targets"] == ["10.0.0.141:8001"]
+
+    enabled = scrape_targets(_catalog({"role": "inference", "exporters": {
+        "sidecar": {"port": "api_port", "enabled": "sidecar_enabled"},
+    }}), {141: {"sidecar_enabled": True, "api_port": 9000}})
+    assert enabled["sidecar"][0]["targets"] == ["10.0.0.141:9000"]
+
+
+def test_write_file_sd_only_touches_changed_jobs(tmp_path):
+    """Unchanged jobs are left alone; stale jobs are removed; no temp files remain."""
+    jobs = scrape_targets(_catalog({"exporters": {"node": 9100, "gpu": 9400}}))
+    (tmp_path / "old.json").write_text("[]")
+
+    assert {path.name for path in write_file_sd(jobs, tmp_path)} == {"gpu.json", "node.json", "old.json"}
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["gpu.json", "node.json"]
+    assert json.loads((tmp_path / "gpu.json").read_text()) == jobs["gpu"]
+
+    jobs["node"] = jobs["node"][:1]
+    assert write_file_sd(jobs, tmp_path) == [tmp_path / "node.json"]
+    assert (tmp_path / "node.json").read_text() == render(jobs["node"])
+
+
+def test_cli_applies_inventory_overrides(tmp_path, capsys):
+    """Enabling vLLM in the inventory (group or host vars) adds its scrape target."""
+    inventory = tmp_path / "inventory.yml"
+    inventory.write_text(
+        "all:\n  children:\n    ai_vms:\n      vars:\n        vllm_service_enabled: true\n"
+        "      hosts:\n        ai:\n          vm_id: 140\n"
+        "        ai_testing:\n          vm_id: 141\n          vllm_service_enabled: false\n"
+    )
+
+    assert main(["--inventory", str(inventory), "--output", str(tmp_path / "targets")]) == 0
+
+    vllm = json.loads((tmp_path / "targets" / "vllm.json").read_text())
+    assert [group["targets"] for group in vllm] == [["192.168.0.140:8000"]]
+
+
+def test_cli_writes_targets(tmp_path, capsys):
+    """The CLI writes the repository catalog's jobs and reports them up to date on rerun."""
+    assert main(["--output", str(tmp_path)]) == 0
+    assert {"node.json", "gpu.json"} <= {path.name for path in tmp_path.iterdir()}
+
+    assert main(["--output", str(tmp_path)]) == 0
+    assert "up to date" in capsys.readouterr().out
@@ -6,9 +6,10 @@ and configuration for Nvidia GPU passthrough setup.
 """
 
 import pytest
-import yaml
 from pathlib import Path
 
+from homelab.yaml_loader import load_yaml
+
 
 def test_gpu_passthrough_role_exists(project_root):
     """GPU passthrough role directory exists with required structure."""
@@ -31,8 +32,7 @@ def test_gpu_defaults_configuration(project_root):
 
     assert defaults_file.exists(), f"Defaults file not found: {defaults_file}"
 
-    with open(defaults_file) as f:
-        defaults = yaml.safe_load(f)
+    defaults = load_yaml(defaults_file)
 
     # Verify GPU hardware configuration from README.md
     assert "gpu_model" in defaults, "Missing gpu_model in defaults"
@@ -48,8 +48,7 @@ def test_identify_gpu_task_structure(project_root):
 
     assert task_file.exists(), f"GPU identification task not found: {task_file}"
 
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(task_file)
 
     assert isinstance(tasks, list), "Task file should contain a list of tasks"
     assert len(tasks) > 0, "Task file should not be empty"
@@ -66,8 +65,7 @@ def test_validate_amd_cpu_task_exists(project_root):
 
     assert task_file.exists(), f"AMD CPU validation task not found: {task_file}"
 
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(task_file)
 
     assert isinstance(tasks, list), "Task file should contain a list of tasks"
     assert len(tasks) > 0, "Task file should not be empty"
@@ -87,8 +85,7 @@ def test_check_iommu_runtime_task_exists(project_root):
 
     assert task_file.exists(), f"IOMMU runtime check task not found: {task_file}"
 
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(task_file)
 
     assert isinstance(tasks, list), "Task file should contain a list of tasks"
     assert len(tasks) > 0, "Task file should not be empty"
@@ -113,8 +110,7 @@ def test_check_iommu_grub_task_exists(project_root):
 
     assert task_file.exists(), f"IOMMU GRUB check task not found: {task_file}"
 
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(task_file)
 
     assert isinstance(tasks, list), "Task file should contain a list of tasks"
     assert len(tasks) > 0, "Task file should not be empty"
@@ -139,8 +135,7 @@ def test_backup_grub_config_task_exists(project_root):
 
     assert task_file.exists(), f"GRUB backup task not found: {task_file}"
 
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(task_file)
 
     assert isinstance(tasks, list), "Task file should contain a list of tasks"
     assert len(tasks) > 0, "Task file should not be empty"
@@ -167,8 +162,7 @@ def test_configure_grub_iommu_task_exists(project_root):
 
     assert task_file.exists(), f"GRUB IOMMU configuration task not found: {task_file}"
 
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(task_file)
 
     assert isinstance(tasks, list), "Task file should contain a list of tasks"
     assert len(tasks) > 0, "Task file should not be empty"
@@ -199,8 +193,7 @@ def test_update_grub_task_exists(project_root):
 
     assert task_file.exists(), f"Update GRUB task not found: {task_file}"
 
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(task_file)
 
     assert isinstance(tasks, list), "Task file should contain a list of tasks"
     assert len(tasks) > 0, "Task file should not be empty"
@@ -225,8 +218,7 @@ def test_reboot_system_task_exists(project_root):
 
     assert task_file.exists(), f"Reboot system task not found: {task_file}"
 
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(task_file)
 
     assert isinstance(tasks, list), "Task file should contain a list of tasks"
     assert len(tasks) > 0, "Task file should not be empty"
@@ -255,8 +247,7 @@ def test_configure_vfio_modules_task_exists(project_root):
 
     assert task_file.exists(), f"VFIO modules configuration task not found: {task_file}"
 
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(task_file)
 
     assert isinstance(tasks, list), "Task file should contain a list of tasks"
     assert len(tasks) > 0, "Task file should not be empty"
@@ -283,8 +274,7 @@ def test_update_initramfs_task_exists(project_root):
 
     assert task_file.exists(), f"Update initramfs task not found: {task_file}"
 
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(task_file)
 
     assert isinstance(tasks, list), "Task file should contain a list of tasks"
     assert len(tasks) > 0, "Task file should not be empty"
@@ -311,8 +301,7 @@ def test_blacklist_gpu_drivers_task_exists(project_root):
 
     assert task_file.exists(), f"GPU driver blacklist task not found: {task_file}"
 
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(task_file)
 
     assert isinstance(tasks, list), "Task file should contain a list of tasks"
     assert len(tasks) > 0, "Task file should not be empty"
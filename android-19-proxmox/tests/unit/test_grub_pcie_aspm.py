@@ -6,10 +6,9 @@ tasks for disabling Active State Power Management to prevent network card
 disconnections.
 """
 
+import re
+
 import pytest
-import yaml
-import subprocess
-from pathlib import Path
 
 
 def test_pcie_aspm_task_files_exist(project_root):
@@ -33,148 +32,94 @@ def test_pcie_aspm_task_files_exist(project_root):
         assert task_path.exists(), f"Required task file not found: {task_file}"
 
 
-def test_check_pcie_aspm_grub_task_structure(project_root):
-    """Check PCIe ASPM GRUB config task reads /etc/default/grub and registers fact."""
-    task_file = project_root / "configuration-by-ansible" / "host-proxmox" / "tasks" / "grub-pcie-aspm-check.yml"
-
-    assert task_file.exists(), f"Check task file not found: {task_file}"
+@pytest.fixture(scope="module")
+def host_proxmox(roles):
+    """Indexed host-proxmox role."""
+    return roles["host-proxmox"]
 
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
 
-    assert isinstance(tasks, list), "Task file should contain a list of tasks"
+def test_check_pcie_aspm_grub_task_structure(host_proxmox):
+    """Check PCIe ASPM GRUB config task reads /etc/default/grub and registers fact."""
+    tasks = host_proxmox.tasks_in("grub-pcie-aspm-check.yml")
     assert len(tasks) > 0, "Task file should not be empty"
 
-    task_content = str(tasks)
-
     # Check for GRUB config file reading
-    assert "/etc/default/grub" in task_content, "Task should read /etc/default/grub"
-
-    # Check for pcie_aspm=off string search
-    assert "pcie_aspm=off" in task_content, "Task should check for pcie_aspm=off parameter"
-
-    # Check for fact registration
-    assert "set_fact" in task_content or "register" in task_content, \
-        "Task should register the result as a fact"
+    read = host_proxmox.first(module="slurp", file="grub-pcie-aspm-check.yml")
+    assert read is not None and read.get("args.src") == "/etc/default/grub", \
+        "Task should read /etc/default/grub"
+    assert read.register, "Task should register the file content"
+
+    # Check for pcie_aspm=off string search and fact registration
+    facts = host_proxmox.find(module="set_fact", file="grub-pcie-aspm-check.yml")
+    assert any("pcie_aspm=off" in str(task.args) for task in facts), \
+        "Task should check for pcie_aspm=off parameter"
+    assert all(read.register in str(task.args) for task in facts), \
+        "Facts should be derived from the registered GRUB config"
 
 
-def test_backup_grub_config_pcie_aspm_task(project_root):
+def test_backup_grub_config_pcie_aspm_task(host_proxmox):
     """GRUB backup task creates timestamped backup before PCIe ASPM modification."""
-    task_file = project_root / "configuration-by-ansible" / "host-proxmox" / "tasks" / "grub-pcie-aspm-backup.yml"
-
-    assert task_file.exists(), f"Backup task file not found: {task_file}"
-
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
-
-    assert isinstance(tasks, list), "Task file should contain a list of tasks"
-    assert len(tasks) > 0, "Task file should not be empty"
-
-    task_content = str(tasks)
+    backup = host_proxmox.first(module="copy", file="grub-pcie-aspm-backup.yml")
 
     # Check for copy module usage
-    assert "copy" in task_content.lower(), "Task should use copy module for backup"
-    assert "remote_src" in task_content, "Task should use remote_src for local copy"
+    assert backup is not None, "Task should use copy module for backup"
+    assert backup.get("args.remote_src") in (True, "yes"), "Task should use remote_src for local copy"
 
     # Check for source and destination paths
-    assert "/etc/default/grub" in task_content, "Task should backup /etc/default/grub"
-    assert ".backup" in task_content or "backup" in task_content.lower(), \
-        "Backup filename should include 'backup'"
+    assert backup.get("args.src") == "/etc/default/grub", "Task should backup /etc/default/grub"
+    dest = backup.get("args.dest", "")
+    assert "backup" in dest, "Backup filename should include 'backup'"
 
     # Check for timestamp in destination
-    assert "ansible_date_time" in task_content or "date" in task_content.lower(), \
-        "Task should use timestamp in backup filename"
+    assert "ansible_date_time" in dest, "Task should use timestamp in backup filename"
 
 
-def test_configure_grub_pcie_aspm_task(project_root):
+def test_configure_grub_pcie_aspm_task(host_proxmox):
     """GRUB PCIe ASPM configuration task adds pcie_aspm=off parameter using replace module."""
-    task_file = project_root / "configuration-by-ansible" / "host-proxmox" / "tasks" / "grub-pcie-aspm-configure.yml"
-
-    assert task_file.exists(), f"Configure task file not found: {task_file}"
-
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
-
-    assert isinstance(tasks, list), "Task file should contain a list of tasks"
-    assert len(tasks) > 0, "Task file should not be empty"
-
-    task_content = str(tasks)
+    replaces = host_proxmox.find(module="replace", file="grub-pcie-aspm-configure.yml")
 
     # Check for replace module usage
-    assert "replace" in task_content.lower(), "Task should use replace module for GRUB modification"
+    assert replaces, "Task should use replace module for GRUB modification"
 
     # Check for GRUB config file target
-    assert "/etc/default/grub" in task_content, "Task should modify /etc/default/grub"
+    assert all(task.get("args.path") == "/etc/default/grub" for task in replaces), \
+        "Task should modify /etc/default/grub"
 
-    # Check for GRUB_CMDLINE_LINUX_DEFAULT
-    assert "GRUB_CMDLINE_LINUX_DEFAULT" in task_content, \
+    # Check for GRUB_CMDLINE_LINUX_DEFAULT and regexp pattern matching
+    assert all(task.get("args.regexp") for task in replaces), "Task should use regexp for pattern matching"
+    assert any("GRUB_CMDLINE_LINUX_DEFAULT" in task.get("args.regexp") for task in replaces), \
         "Task should target GRUB_CMDLINE_LINUX_DEFAULT"
 
     # Check for pcie_aspm=off parameter
-    assert "pcie_aspm=off" in task_content, "Task should add pcie_aspm=off parameter"
-
-    # Check for regexp pattern
-    assert "regexp" in task_content.lower(), "Task should use regexp for pattern matching"
+    assert any("pcie_aspm=off" in task.get("args.regexp") for task in replaces), \
+        "Task should handle the pcie_aspm=off parameter"
 
 
-def test_update_grub_pcie_aspm_task(project_root):
+def test_update_grub_pcie_aspm_task(host_proxmox):
     """Update GRUB task runs update-grub command after PCIe ASPM configuration."""
-    task_file = project_root / "configuration-by-ansible" / "host-proxmox" / "tasks" / "grub-pcie-aspm-update.yml"
-
-    assert task_file.exists(), f"Update GRUB task file not found: {task_file}"
-
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
-
-    assert isinstance(tasks, list), "Task file should contain a list of tasks"
-    assert len(tasks) > 0, "Task file should not be empty"
-
-    task_content = str(tasks)
-
-    # Check for command module usage
-    assert "command" in task_content.lower() or "shell" in task_content.lower(), \
-        "Task should use command or shell module to run update-grub"
-
-    # Check for update-grub command
-    assert "update-grub" in task_content.lower() or "grub-mkconfig" in task_content.lower(), \
-        "Task should run update-grub or grub-mkconfig command"
+    # Check for command module usage running update-grub
+    update = host_proxmox.first(
+        module=("command", "shell"), file="grub-pcie-aspm-update.yml",
+        where=lambda task: "update-grub" in task.command or "grub-mkconfig" in task.command,
+    )
+    assert update is not None, "Task should run update-grub or grub-mkconfig with command or shell module"
 
     # Check for result registration or notification
-    assert "register" in task_content.lower() or "debug" in task_content.lower(), \
+    assert update.register or host_proxmox.find(module="debug", file="grub-pcie-aspm-update.yml"), \
         "Task should register result or display message"
 
 
-def test_update_grub_error_handling(project_root):
+def test_update_grub_error_handling(host_proxmox):
     """Update GRUB task has proper error handling for update-grub failures."""
-    task_file = project_root / "configuration-by-ansible" / "host-proxmox" / "tasks" / "grub-pcie-aspm-update.yml"
-
-    assert task_file.exists(), f"Update GRUB task file not found: {task_file}"
-
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
-
-    assert isinstance(tasks, list), "Task file should contain a list of tasks"
-
-    # Find the update-grub task
-    update_grub_task = None
-    for task in tasks:
-        # Check for various command module formats
-        has_command = (
-            "ansible.builtin.command" in task or
-            "command" in task or
-            "ansible.builtin.shell" in task or
-            "shell" in task
-        )
-        if has_command:
-            task_str = str(task)
-            if "update-grub" in task_str.lower() or "grub-mkconfig" in task_str.lower():
-                update_grub_task = task
-                break
+    update_grub_task = host_proxmox.first(
+        module=("command", "shell"), file="grub-pcie-aspm-update.yml",
+        where=lambda task: "update-grub" in task.command or "grub-mkconfig" in task.command,
+    )
 
     assert update_grub_task is not None, "Could not find update-grub command task"
 
     # Check for error handling - should have either failed_when or check mode
-    task_keys = update_grub_task.keys()
+    task_keys = update_grub_task.raw.keys()
     has_error_handling = (
         "failed_when" in task_keys or
         "ignore_errors" in task_keys or
@@ -185,104 +130,68 @@ def test_update_grub_error_handling(project_root):
         "Update GRUB task should have error handling (failed_when, ignore_errors, or check_mode)"
 
     # Check for result registration to capture errors
-    assert "register" in task_keys, \
+    assert update_grub_task.register, \
         "Update GRUB task should register result for error handling"
 
-    # Look for error message display task (assert or fail task)
-    task_content = str(tasks)
-    has_error_message = (
-        "assert" in task_content.lower() or
-        "fail" in task_content.lower() or
-        "rc" in task_content.lower()  # Return code checking
-    )
+    # Look for error message display task (assert or fail task) on the registered result
+    checks = host_proxmox.find(module=("assert", "fail"), file="grub-pcie-aspm-update.yml",
+                               where=lambda task: update_grub_task.register in str(task.args))
 
-    assert has_error_message, \
-        "Task file should include error message handling (assert, fail, or rc checking)"
+    assert checks, \
+        "Task file should include error message handling (assert or fail on the update-grub result)"
 
 
-def test_verify_pcie_aspm_task(project_root):
+def test_verify_pcie_aspm_task(host_proxmox):
     """Verify PCIe ASPM task checks /proc/cmdline for pcie_aspm=off parameter."""
-    task_file = project_root / "configuration-by-ansible" / "host-proxmox" / "tasks" / "grub-pcie-aspm-verify.yml"
-
-    assert task_file.exists(), f"Verify task file not found: {task_file}"
-
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
-
-    assert isinstance(tasks, list), "Task file should contain a list of tasks"
-    assert len(tasks) > 0, "Task file should not be empty"
-
-    task_content = str(tasks)
-
     # Check for /proc/cmdline reading
-    assert "/proc/cmdline" in task_content, "Task should read /proc/cmdline"
+    read = host_proxmox.first(module="slurp", file="grub-pcie-aspm-verify.yml")
+    assert read is not None and read.get("args.src") == "/proc/cmdline", "Task should read /proc/cmdline"
 
-    # Check for pcie_aspm=off parameter check
-    assert "pcie_aspm=off" in task_content or "pcie_aspm" in task_content.lower(), \
+    # Check for pcie_aspm parameter check and registration or debug output
+    facts = host_proxmox.find(module="set_fact", file="grub-pcie-aspm-verify.yml")
+    assert any("pcie_aspm" in str(task.args) for task in facts), \
         "Task should check for pcie_aspm=off parameter"
-
-    # Check for fact registration or debug output
-    assert "register" in task_content.lower() or "debug" in task_content.lower(), \
+    assert read.register or host_proxmox.find(module="debug", file="grub-pcie-aspm-verify.yml"), \
         "Task should register result or display verification message"
 
 
-def test_grub_pcie_aspm_orchestrator_exists(project_root):
+def test_grub_pcie_aspm_orchestrator_exists(host_proxmox):
     """PCIe ASPM orchestrator task file exists and includes subtasks in correct order."""
-    task_file = project_root / "configuration-by-ansible" / "host-proxmox" / "tasks" / "grub-pcie-aspm.yml"
-
-    assert task_file.exists(), f"Orchestrator task file not found: {task_file}"
-
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
+    tasks = host_proxmox.tasks_in("grub-pcie-aspm.yml")
 
-    assert isinstance(tasks, list), "Orchestrator file should contain a list of tasks"
     assert len(tasks) >= 4, "Orchestrator should include at least 4 subtasks (check, backup, configure, update)"
 
-    task_content = str(tasks)
-
-    # Check that all required subtasks are included
-    assert "grub-pcie-aspm-check.yml" in task_content, "Orchestrator should include check task"
-    assert "grub-pcie-aspm-backup.yml" in task_content, "Orchestrator should include backup task"
-    assert "grub-pcie-aspm-configure.yml" in task_content, "Orchestrator should include configure task"
-    assert "grub-pcie-aspm-update.yml" in task_content, "Orchestrator should include update task"
-
-    # Check for include_tasks usage
-    assert "include_tasks" in task_content, "Orchestrator should use include_tasks"
+    # Check that all required subtasks are included with include_tasks
+    included = [task.include for task in tasks if task.module == "include_tasks"]
+    assert included[:4] == [
+        "grub-pcie-aspm-check.yml",
+        "grub-pcie-aspm-backup.yml",
+        "grub-pcie-aspm-configure.yml",
+        "grub-pcie-aspm-update.yml",
+    ], "Orchestrator should include_tasks check, backup, configure and update in order"
 
 
-def test_main_yml_includes_pcie_aspm_configuration(project_root):
+def test_main_yml_includes_pcie_aspm_configuration(host_proxmox):
     """host-proxmox main.yml includes PCIe ASPM GRUB configuration with correct tags."""
-    main_yml = project_root / "configuration-by-ansible" / "host-proxmox" / "tasks" / "main.yml"
-
-    assert main_yml.exists(), f"Main task file not found: {main_yml}"
-
-    with open(main_yml) as f:
-        tasks = yaml.safe_load(f)
-
-    assert isinstance(tasks, list), "Main.yml should contain a list of tasks"
-
     # Find the PCIe ASPM configuration task
-    pcie_aspm_task = None
-    for task in tasks:
-        if "include_tasks" in task and "grub-pcie-aspm.yml" in str(task.get("include_tasks", "")):
-            pcie_aspm_task = task
-            break
+    pcie_aspm_task = host_proxmox.first(file="main.yml",
+                                        where=lambda task: task.include == "grub-pcie-aspm.yml")
 
     assert pcie_aspm_task is not None, "Main.yml should include grub-pcie-aspm.yml"
 
     # Check tags
-    tags = pcie_aspm_task.get("tags", [])
+    tags = pcie_aspm_task.tags
     assert "proxmox" in tags, "PCIe ASPM task should have 'proxmox' tag"
     assert "grub" in tags, "PCIe ASPM task should have 'grub' tag"
     assert "pcie-aspm" in tags, "PCIe ASPM task should have 'pcie-aspm' tag"
 
     # Check task name
-    task_name = pcie_aspm_task.get("name", "")
+    task_name = pcie_aspm_task.name or ""
     assert "pcie" in task_name.lower() or "aspm" in task_name.lower(), \
         "Task should have descriptive name mentioning PCIe or ASPM"
 
 
-def test_pcie_aspm_role_integration_ansible_syntax(project_root):
+def test_pcie_aspm_role_integration_ansible_syntax(project_root, ansible_syntax):
     """Integration test: Validate host-proxmox role with PCIe ASPM can be loaded by Ansible."""
     # Create a minimal test playbook that uses the host-proxmox role
     test_playbook_content = """---
@@ -302,66 +211,24 @@ def test_pcie_aspm_role_integration_ansible_syntax(project_root):
         f.write(test_playbook_content)
 
     try:
-        # Check if ansible-playbook is available
-        result = subprocess.run(
-            ["which", "ansible-playbook"],
-            capture_output=True,
-            text=True
-        )
-
-        if result.returncode == 0:
-            # ansible-playbook is available, run syntax check
-            syntax_result = subprocess.run(
-                ["ansible-playbook", "--syntax-check", str(test_playbook_path)],
-                capture_output=True,
-                text=True,
-                cwd=str(project_root)
-            )
-
-            # Clean up test playbook
-            test_playbook_path.unlink()
-
-            assert syntax_result.returncode == 0, \
-                f"Ansible syntax check failed:\nSTDOUT: {syntax_result.stdout}\nSTDERR: {syntax_result.stderr}"
-        else:
-            # ansible-playbook not available, skip with warning
-            test_playbook_path.unlink()
-            pytest.skip("ansible-playbook not installed, skipping Ansible syntax validation")
-
-    except Exception as e:
-        # Clean up on any error
-        if test_playbook_path.exists():
-            test_playbook_path.unlink()
-        raise e
-
-
-def test_grub_parameter_preservation(project_root):
-    """Configure task regexp pattern preserves existing GRUB parameters."""
-    import re
+        error = ansible_syntax.check(test_playbook_path)
+    finally:
+        # Clean up test playbook
+        test_playbook_path.unlink()
 
-    task_file = project_root / "configuration-by-ansible" / "host-proxmox" / "tasks" / "grub-pcie-aspm-configure.yml"
-
-    assert task_file.exists(), f"Configure task file not found: {task_file}"
-
-    with open(task_file) as f:
-        tasks = yaml.safe_load(f)
+    assert error is None, f"Ansible syntax check failed:\n{error}"
 
+def test_grub_parameter_preservation(host_proxmox):
+    """Configure task regexp pattern preserves existing GRUB parameters."""
     # Find the replace task that adds the new parameter (not the one that removes old param)
-    replace_task = None
-    for task in tasks:
-        if "ansible.builtin.replace" in task or "replace" in task:
-            task_name = task.get("name", "")
-            # Look for the task that adds the new parameter, not removes old one
-            if "Add" in task_name or "policy=performance" in str(task):
-                replace_task = task
-                break
+    replace_task = host_proxmox.first(module="replace", file="grub-pcie-aspm-configure.yml",
+                                      where=lambda task: "policy=performance" in task.get("args.replace", ""))
 
     assert replace_task is not None, "Could not find replace task for adding new parameter"
 
     # Extract regexp and replace patterns
-    replace_module = replace_task.get("ansible.builtin.replace") or replace_task.get("replace")
-    regexp_pattern = replace_module.get("regexp")
-    replace_pattern = replace_module.get("replace")
+    regexp_pattern = replace_task.get("args.regexp")
+    replace_pattern = replace_task.get("args.replace")
 
     assert regexp_pattern is not None, "Replace task should have regexp pattern"
     assert replace_pattern is not None, "Replace task should have replace pattern"
@@ -382,18 +249,12 @@ def test_grub_parameter_preservation(project_root):
             f"Parameter preservation failed:\n  Input: {input_line}\n  Expected: {expected_output}\n  Got: {result}"
 
 
-def test_pcie_aspm_idempotence(project_root):
+def test_pcie_aspm_idempotence(host_proxmox):
     """PCIe ASPM configuration tasks are idempotent - safe to run multiple times."""
-    tasks_dir = project_root / "configuration-by-ansible" / "host-proxmox" / "tasks"
-
     # Test 1: Check task sets fact for idempotence
-    check_file = tasks_dir / "grub-pcie-aspm-check.yml"
-    with open(check_file) as f:
-        check_tasks = yaml.safe_load(f)
-
-    check_content = str(check_tasks)
-    assert "set_fact" in check_content, "Check task should set fact for idempotence"
-    assert "pcie_aspm_configured" in check_content, "Check task should set pcie_aspm_configured fact"
+    fact = host_proxmox.first(module="set_fact", file="grub-pcie-aspm-check.yml",
+                              where=lambda task: "pcie_aspm_configured" in task.args)
+    assert fact is not None, "Check task should set pcie_aspm_configured fact"
 
     # Test 2: Modify tasks have idempotence guards
     # backup and configure use 'when: not pcie_aspm_configured'
@@ -405,40 +266,22 @@ def test_pcie_aspm_idempotence(project_root):
     }
 
     for modify_file, guard_keywords in modify_files_with_guards.items():
-        file_path = tasks_dir / modify_file
-        with open(file_path) as f:
-            tasks = yaml.safe_load(f)
-
-        # Check that at least one task has the idempotence guard
-        has_guard = False
-        for task in tasks:
-            if "when" in task:
-                when_condition = str(task["when"])
-                # Check if all required keywords are present
-                if all(keyword in when_condition for keyword in guard_keywords):
-                    has_guard = True
-                    break
+        # Check that at least one task of the file is guarded on the fact
+        has_guard = any(
+            task.file == modify_file and all(keyword in task.get("when") for keyword in guard_keywords)
+            for task in host_proxmox.uses(guard_keywords[0])
+        )
 
         assert has_guard, \
             f"{modify_file} should have idempotence guard with keywords: {guard_keywords}"
 
-    # Test 3: Orchestrator runs check before modifications
-    orchestrator_file = tasks_dir / "grub-pcie-aspm.yml"
-    with open(orchestrator_file) as f:
-        orchestrator_tasks = yaml.safe_load(f)
-
-    # Find check task and first modify task positions
-    check_pos = None
-    first_modify_pos = None
-
-    for idx, task in enumerate(orchestrator_tasks):
-        if "include_tasks" in task:
-            included = task["include_tasks"]
-            if "check" in included:
-                check_pos = idx
-            elif any(mod in included for mod in ["backup", "configure", "update"]):
-                if first_modify_pos is None:
-                    first_modify_pos = idx
+    # Test 3: Orchestrator runs check before modifications (in execution order)
+    flow = host_proxmox.flow("grub-pcie-aspm.yml")
+    files = [task.file for task in flow]
+    check_pos = files.index("grub-pcie-aspm-check.yml") if "grub-pcie-aspm-check.yml" in files else None
+    first_modify_pos = next((idx for idx, file in enumerate(files)
+                             if file in ("grub-pcie-aspm-backup.yml", "grub-pcie-aspm-configure.yml",
+                                         "grub-pcie-aspm-update.yml")), None)
 
     assert check_pos is not None, "Orchestrator should include check task"
     assert first_modify_pos is not None, "Orchestrator should include modify tasks"
@@ -446,27 +289,12 @@ def test_pcie_aspm_idempotence(project_root):
         "Check task must run before modify tasks for idempotence"
 
 
-def test_pcie_aspm_include_tasks_are_resolvable(project_root):
+def test_pcie_aspm_include_tasks_are_resolvable(host_proxmox):
     """Integration test: Verify all include_tasks references in orchestrator are resolvable."""
-    orchestrator = project_root / "configuration-by-ansible" / "host-proxmox" / "tasks" / "grub-pcie-aspm.yml"
-    tasks_dir = project_root / "configuration-by-ansible" / "host-proxmox" / "tasks"
-
-    assert orchestrator.exists(), "Orchestrator file must exist"
-
-    with open(orchestrator) as f:
-        tasks = yaml.safe_load(f)
-
     # Extract all include_tasks references
-    for task in tasks:
-        if "include_tasks" in task:
-            included_file = task["include_tasks"]
-            included_path = tasks_dir / included_file
-
-            assert included_path.exists(), \
-                f"Included task file not found: {included_file} (expected at {included_path})"
-
-            # Verify the included file is valid YAML
-            with open(included_path) as included_f:
-                included_tasks = yaml.safe_load(included_f)
-                assert included_tasks is not None, f"Included file {included_file} has invalid YAML"
-                assert isinstance(included_tasks, list), f"Included file {included_file} should contain a list of tasks"
+    for task in host_proxmox.find(module="include_tasks", file="grub-pcie-aspm.yml"):
+        assert task.include in host_proxmox.files, \
+            f"Included task file not found: {task.include} (expected under {host_proxmox.path / 'tasks'})"
+
+        # Verify the included file parsed into a non-empty list of tasks
+        assert host_proxmox.tasks_in(task.include), f"Included file {task.include} should contain a list of tasks"
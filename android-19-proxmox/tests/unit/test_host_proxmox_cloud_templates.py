@@ -1,8 +1,9 @@
 """Unit tests for host-proxmox cloud image template automation."""
 import pytest
-import yaml
 from pathlib import Path
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def host_proxmox_role_dir(project_root):
@@ -19,8 +20,7 @@ def test_cloud_image_templates_task_file_exists(host_proxmox_role_dir):
 def test_cloud_image_templates_valid_yaml(host_proxmox_role_dir):
     """cloud-image-templates.yml should be valid YAML."""
     task_file = host_proxmox_role_dir / "tasks" / "cloud-image-templates.yml"
-    with open(task_file, 'r') as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(task_file)
     assert data is not None, "cloud-image-templates.yml should not be empty"
     assert isinstance(data, list), "cloud-image-templates.yml should contain a list of tasks"
 
@@ -28,8 +28,7 @@ def test_cloud_image_templates_valid_yaml(host_proxmox_role_dir):
 def test_cloud_image_should_download_directly_on_proxmox(host_proxmox_role_dir):
     """Cloud image should be downloaded directly on Proxmox host (no scp)."""
     task_file = host_proxmox_role_dir / "tasks" / "cloud-image-templates.yml"
-    with open(task_file, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(task_file)
 
     # Find download task
     download_task = None
@@ -49,8 +48,7 @@ def test_cloud_image_should_download_directly_on_proxmox(host_proxmox_role_dir):
 def test_cloud_image_download_should_be_idempotent(host_proxmox_role_dir):
     """Cloud image download should check if file exists (idempotent)."""
     task_file = host_proxmox_role_dir / "tasks" / "cloud-image-templates.yml"
-    with open(task_file, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(task_file)
 
     # Find check task before download
     has_check_task = False
@@ -67,8 +65,7 @@ def test_cloud_image_download_should_be_idempotent(host_proxmox_role_dir):
 def test_template_vm_creation_should_be_idempotent(host_proxmox_role_dir):
     """Template VM creation should check if template already exists."""
     task_file = host_proxmox_role_dir / "tasks" / "cloud-image-templates.yml"
-    with open(task_file, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(task_file)
 
     # Find check task for template VM
     has_template_check = False
@@ -0,0 +1,63 @@
+"""Tests for the test-impact plugin (tests/impact.py)."""
+from homelab import yaml_loader
+from tests import impact
+from tests.impact import REPO_ROOT, _install_hook, _Recording, affected, file_digest
+
+
+def test_recording_sees_repository_reads_only(tmp_path, project_root):
+    """Opened repository files are recorded; writes and files outside the repo are not."""
+    _install_hook()
+    outside = tmp_path / "outside.txt"
+    outside.write_text("x")
+
+    with _Recording() as files:
+        (project_root / "pytest.ini").read_text()
+        outside.read_text()
+        with open(outside, "w") as f:
+            f.write("y")
+
+    assert files == {"android-19-proxmox/pytest.ini"}
+
+
+def test_recording_sees_cached_yaml_reads(project_root):
+    """A load served from the parse cache still counts as a read of the file."""
+    _install_hook()
+    catalog_file = project_root / "infrastructure-catalog.yml"
+    yaml_loader.load_yaml(catalog_file)
+
+    with _Recording() as files:
+        yaml_loader.load_yaml(catalog_file)
+
+    assert "android-19-proxmox/infrastructure-catalog.yml" in files
+
+
+def test_nested_recordings_propagate_to_outer():
+    """Fixture reads (inner) are also reads of the test running them (outer)."""
+    _install_hook()
+    running = impact._reads
+    with _Recording() as test_files:
+        with _Recording() as fixture_files:
+            (REPO_ROOT / "Makefile").read_bytes()
+
+    assert fixture_files == {"Makefile"}
+    assert test_files == {"Makefile"}
+    assert impact._reads is running
+
+
+def test_affected_selects_tests_with_changed_inputs():
+    """Only tests that read a changed file are selected."""
+    tests = {
+        "test_make.py::test_targets": ["Makefile", "tests/unit/test_make.py"],
+        "test_roles.py::test_adguard": ["roles/lxc-adguard/defaults/main.yml", "catalog.yml"],
+        "test_catalog.py::test_ips": ["catalog.yml"],
+    }
+
+    assert affected(tests, {"Makefile"}) == {"test_make.py::test_targets"}
+    assert affected(tests, {"catalog.yml"}) == {"test_roles.py::test_adguard", "test_catalog.py::test_ips"}
+    assert affected(tests, {"README.md"}) == set()
+
+
+def test_file_digest_tracks_content():
+    """Digests identify content; deleted files have none."""
+    assert file_digest("Makefile") == file_digest("Makefile")
+    assert file_digest("no/such/file") is None
@@ -1,9 +1,11 @@
 """Unit tests for AdGuard Home DHCP server configuration."""
 import pytest
-import yaml
 from pathlib import Path
 from jinja2 import Environment, FileSystemLoader
 
+from homelab.catalog import load_catalog
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture(scope="module")
 def adguard_role_dir(project_root):
@@ -15,16 +17,13 @@ def adguard_role_dir(project_root):
 def adguard_defaults(adguard_role_dir):
     """Load AdGuard defaults/main.yml."""
     defaults_file = adguard_role_dir / "defaults" / "main.yml"
-    with open(defaults_file, 'r') as f:
-        return yaml.safe_load(f)
+    return load_yaml(defaults_file)
 
 
 @pytest.fixture(scope="module")
 def infrastructure_catalog(project_root):
     """Load infrastructure catalog."""
-    catalog_file = project_root / "infrastructure-catalog.yml"
-    with open(catalog_file, 'r') as f:
-        return yaml.safe_load(f)
+    return load_catalog(project_root / "infrastructure-catalog.yml").raw
 
 
 def test_dhcp_enabled_flag_exists(adguard_defaults):
@@ -1,8 +1,9 @@
 """Tests for AdGuard DNS rewrites configuration."""
 import pytest
-import yaml
 from pathlib import Path
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture(scope="module")
 def adguard_role_dir(project_root):
@@ -14,8 +15,7 @@ def adguard_role_dir(project_root):
 def adguard_defaults(adguard_role_dir):
     """Load AdGuard defaults/main.yml."""
     defaults_file = adguard_role_dir / "defaults" / "main.yml"
-    with open(defaults_file, 'r') as f:
-        return yaml.safe_load(f)
+    return load_yaml(defaults_file)
 
 
 def test_adguard_defaults_file_exists(adguard_role_dir):
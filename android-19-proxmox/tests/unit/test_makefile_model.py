@@ -0,0 +1,94 @@
+"""Tests for the parsed Makefile model (homelab.makefile)."""
+import os
+
+import pytest
+
+from homelab.makefile import Makefile, load_makefile
+
+SAMPLE = """\
+# Variables
+DOCKER_COMPOSE := docker compose
+ANSIBLE_EXEC := $(DOCKER_COMPOSE) exec -T homelab-dev
+WORKERS ?= 4
+WORKERS ?= 8
+FLAGS = -v
+FLAGS += --tb=short
+
+.PHONY: deploy \\
+        init check
+
+# Terraform
+init: ## Initialize Terraform
+\t$(DOCKER_COMPOSE) exec -T homelab-dev sh -c "terraform init"
+
+# Services
+deploy: init check ## Deploy everything
+\t@echo "deploying"
+
+\t$(ANSIBLE_EXEC) ansible-playbook site.yml $(FLAGS) --forks $(WORKERS)
+\t-awk '{print $$1}' \\
+\t    hosts.txt
+
+check: init
+\t$(MAKE) -s help-section SECTION="$(UNDEFINED)"
+"""
+
+
+@pytest.fixture
+def sample():
+    """The sample Makefile, parsed."""
+    return Makefile(SAMPLE)
+
+
+def test_rules_index_targets(sample):
+    """Targets map to prerequisites, recipe, help text and section."""
+    deploy = sample.rule("deploy")
+
+    assert deploy.prerequisites == ("init", "check")
+    assert deploy.help == "Deploy everything"
+    assert deploy.section == "Services"
+    assert deploy.commands == [
+        'echo "deploying"',
+        "$(ANSIBLE_EXEC) ansible-playbook site.yml $(FLAGS) --forks $(WORKERS)",
+        "awk '{print $$1}' hosts.txt",
+    ]
+    assert [rule.name for rule in sample.section("Terraform")] == ["init"]
+    assert sample.phony == {"deploy", "init", "check"}
+    with pytest.raises(KeyError, match="no target 'missing'"):
+        sample.rule("missing")
+
+
+def test_variables_expand_like_make(sample):
+    """Nested references, ?= and += follow make; unknown names are kept."""
+    assert sample.recipe("deploy", expand=True)[1:] == [
+        "docker compose exec -T homelab-dev ansible-playbook site.yml -v --tb=short --forks 4",
+        "awk '{print $1}' hosts.txt",
+    ]
+    assert sample.recipe("check", expand=True) == ['make -s help-section SECTION="$(UNDEFINED)"']
+
+
+def test_transitive_prerequisites(sample):
+    """Recursive prerequisite queries visit each target once."""
+    assert sample.prerequisites("deploy", recursive=True) == ("init", "check")
+    assert sample.prerequisites("check") == ("init",)
+
+
+def test_repository_makefile_parses(makefile):
+    """Every .PHONY target of the real Makefile has a rule; help sections are indexed."""
+    assert makefile.phony <= set(makefile.rules)
+    assert "test-unit" in {rule.name for rule in makefile.section("Testing")}
+    assert all(rule.help for rule in makefile.section("Terraform"))
+
+
+def test_load_makefile_reparses_on_change(tmp_path):
+    """The parsed copy is shared until the file changes."""
+    path = tmp_path / "Makefile"
+    path.write_text("a:\n\ttrue\n")
+
+    first = load_makefile(path)
+    assert load_makefile(path) is first
+
+    mtime = path.stat().st_mtime_ns
+    path.write_text("b:\n\ttrue\n")
+    os.utime(path, ns=(mtime, mtime + 1_000_000))
+    assert "b" in load_makefile(path)
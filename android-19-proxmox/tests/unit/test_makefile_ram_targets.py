@@ -3,18 +3,9 @@
 These tests validate that the Makefile provides convenience targets
 for RAM LED control operations.
 """
-import pytest
-import re
-from pathlib import Path
 
 
-@pytest.fixture
-def makefile_path(project_root):
-    """Return path to project Makefile."""
-    return project_root.parent / "Makefile"
-
-
-def test_makefile_should_have_ram_lights_off_target(makefile_path):
+def test_makefile_should_have_ram_lights_off_target(makefile):
     """Makefile should have proxmox-ram-lights-off target.
 
     Validates:
@@ -26,26 +17,15 @@ def test_makefile_should_have_ram_lights_off_target(makefile_path):
     This supports BDD Scenario 6: Using Makefile Convenience Targets
     Linked to Task 6.1: Add Makefile targets for RAM LED control
     """
-    # Arrange & Act
-    with open(makefile_path) as f:
-        content = f.read()
-
     # Assert - Target exists
-    assert 'proxmox-ram-lights-off:' in content, \
+    assert 'proxmox-ram-lights-off' in makefile, \
         "Makefile should have proxmox-ram-lights-off target"
 
     # Assert - Target runs Ansible playbook
-    # Extract the target's command (the line(s) after the target definition)
-    target_match = re.search(
-        r'proxmox-ram-lights-off:.*?\n\t(.+?)(?:\n\n|\nproxmox-|\Z)',
-        content,
-        re.DOTALL
-    )
-    assert target_match is not None, \
+    target_command = " ".join(makefile.recipe('proxmox-ram-lights-off'))
+    assert target_command, \
         "proxmox-ram-lights-off target should have a command"
 
-    target_command = target_match.group(1)
-
     assert 'ansible-playbook' in target_command, \
         "Target should invoke ansible-playbook"
 
@@ -56,7 +36,7 @@ def test_makefile_should_have_ram_lights_off_target(makefile_path):
         "Target should set ram_lights_state=off"
 
 
-def test_makefile_should_have_ram_lights_on_target(makefile_path):
+def test_makefile_should_have_ram_lights_on_target(makefile):
     """Makefile should have proxmox-ram-lights-on target.
 
     Validates:
@@ -68,25 +48,15 @@ def test_makefile_should_have_ram_lights_on_target(makefile_path):
     This supports BDD Scenario 6: Using Makefile Convenience Targets
     Linked to Task 6.1: Add Makefile targets for RAM LED control
     """
-    # Arrange & Act
-    with open(makefile_path) as f:
-        content = f.read()
-
     # Assert - Target exists
-    assert 'proxmox-ram-lights-on:' in content, \
+    assert 'proxmox-ram-lights-on' in makefile, \
         "Makefile should have proxmox-ram-lights-on target"
 
-    # Assert - Target runs Ansible playbook with correct parameters
-    target_match = re.search(
-        r'proxmox-ram-lights-on:.*?\n\t(.+?)(?:\n\n|\nproxmox-|\Z)',
-        content,
-        re.DOTALL
-    )
-    assert target_match is not None, \
+    # Assert - Target runs Ansible playbook
+    target_command = " ".join(makefile.recipe('proxmox-ram-lights-on'))
+    assert target_command, \
         "proxmox-ram-lights-on target should have a command"
 
-    target_command = target_match.group(1)
-
     assert 'ansible-playbook' in target_command, \
         "Target should invoke ansible-playbook"
 
@@ -97,7 +67,7 @@ def test_makefile_should_have_ram_lights_on_target(makefile_path):
         "Target should set ram_lights_state=on"
 
 
-def test_makefile_should_have_ram_lights_status_target(makefile_path):
+def test_makefile_should_have_ram_lights_status_target(makefile):
     """Makefile should have proxmox-ram-lights-status target.
 
     Validates:
@@ -109,25 +79,15 @@ def test_makefile_should_have_ram_lights_status_target(makefile_path):
     This supports BDD Scenario 6: Using Makefile Convenience Targets
     Linked to Task 6.1: Add Makefile targets for RAM LED control
     """
-    # Arrange & Act
-    with open(makefile_path) as f:
-        content = f.read()
-
     # Assert - Target exists
-    assert 'proxmox-ram-lights-status:' in content, \
+    assert 'proxmox-ram-lights-status' in makefile, \
         "Makefile should have proxmox-ram-lights-status target"
 
-    # Assert - Target runs Ansible playbook with correct parameters
-    target_match = re.search(
-        r'proxmox-ram-lights-status:.*?\n\t(.+?)(?:\n\n|\nproxmox-|\Z)',
-        content,
-        re.DOTALL
-    )
-    assert target_match is not None, \
+    # Assert - Target runs Ansible playbook
+    target_command = " ".join(makefile.recipe('proxmox-ram-lights-status'))
+    assert target_command, \
         "proxmox-ram-lights-status target should have a command"
 
-    target_command = target_match.group(1)
-
     assert 'ansible-playbook' in target_command, \
         "Target should invoke ansible-playbook"
 
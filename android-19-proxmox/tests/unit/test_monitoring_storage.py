@@ -0,0 +1,77 @@
+"""Tests for the monitoring LXC's storage limits and optional long-term tier (lxc-monitoring)."""
+import pytest
+import yaml
+
+from homelab.file_sd import scrape_targets
+from homelab.templating import render_file, role_vars
+
+
+@pytest.fixture(scope="module")
+def monitoring_role_dir(project_root):
+    """Return the lxc-monitoring role directory."""
+    return project_root / "configuration-by-ansible" / "lxc-monitoring"
+
+
+def _render(role_dir, catalog, catalog_index, template, **overrides):
+    # What the homelab_catalog vars plugin sets for the monitoring host (vm_id 126)
+    plugin_vars = {"prometheus_file_sd": scrape_targets(catalog_index), "vm_config": catalog["services"][126]}
+    variables = role_vars(role_dir, catalog, overrides={**plugin_vars, **overrides})
+    return yaml.safe_load(render_file(role_dir / "templates" / template, variables))
+
+
+def test_prometheus_limits_follow_catalog_disk(monitoring_role_dir, catalog, catalog_index):
+    """Retention is bounded by time and by a share of the host's catalog disk (vm_config)."""
+    disk = catalog["services"][126]["resources"]["disk"]
+
+    compose = _render(monitoring_role_dir, catalog, catalog_index, "docker-compose.yml.j2")
+
+    command = compose["services"]["prometheus"]["command"]
+    assert "--storage.tsdb.retention.time=90d" in command
+    assert f"--storage.tsdb.retention.size={int(disk * 0.6)}GB" in command
+    assert "--storage.tsdb.wal-compression" in command
+    assert "victoriametrics" not in compose["services"]
+    assert "remote_write" not in _render(monitoring_role_dir, catalog, catalog_index, "prometheus.yml.j2")
+
+
+def test_long_term_tier_downsamples_to_victoriametrics(monitoring_role_dir, catalog, catalog_index):
+    """With the option on, Prometheus keeps a short raw window and remote_writes to VictoriaMetrics."""
+    resources = catalog["services"][126]["resources"]
+    compose, prometheus, aggregation, datasources = (
+        _render(monitoring_role_dir, catalog, catalog_index, template, monitoring_long_term_storage=True)
+        for template in ("docker-compose.yml.j2", "prometheus.yml.j2", "stream-aggr.yml.j2",
+                         "provisioning/datasources/prometheus.yml.j2")
+    )
+
+    command = compose["services"]["prometheus"]["command"]
+    assert "--storage.tsdb.retention.time=15d" in command
+    assert f"--storage.tsdb.retention.size={int(resources['disk'] * 0.3)}GB" in command
+    victoria = compose["services"]["victoriametrics"]["command"]
+    assert "-retentionPeriod=400d" in victoria
+    assert f"-storage.minFreeDiskSpaceBytes={int(resources['disk'] * 0.1)}GB" in victoria
+    assert f"-memory.allowedBytes={int(resources['memory'] * 0.25)}MB" in victoria
+    assert "victoriametrics_data" in compose["volumes"]
+    assert prometheus["remote_write"] == [{"url": "http://victoriametrics:8428/api/v1/write",
+                                           "queue_config": {"max_samples_per_send": 10000}}]
+    assert [(rule["interval"], rule["outputs"]) for rule in aggregation] == [
+        ("5m", ["avg", "max", "last"]), ("1h", ["avg", "max", "last"]),
+    ]
+    assert [source["uid"] for source in datasources["datasources"]] == ["prometheus", "victoriametrics"]
+
+
+def test_prometheus_config_mounted_as_directory(monitoring_role_dir, catalog, catalog_index):
+    """Files Ansible replaces by rename are mounted via their directory, so /-/reload sees new content."""
+    prometheus = _render(monitoring_role_dir, catalog, catalog_index, "docker-compose.yml.j2")["services"]["prometheus"]
+
+    sources = [volume.split(":")[0] for volume in prometheus["volumes"]]
+    assert "./prometheus" in sources
+    assert not any(source.endswith((".yml", ".json")) for source in sources)
+    assert "--config.file=/etc/prometheus/config/prometheus.yml" in prometheus["command"]
+
+
+def test_storage_budget_follows_host_vm_config(monitoring_role_dir, catalog, catalog_index):
+    """The budget comes from the inventory host's vm_config, not a fixed service ID."""
+    vm_config = {**catalog["services"][126], "resources": {"cores": 2, "memory": 4096, "disk": 200}}
+
+    compose = _render(monitoring_role_dir, catalog, catalog_index, "docker-compose.yml.j2", vm_config=vm_config)
+
+    assert "--storage.tsdb.retention.size=120GB" in compose["services"]["prometheus"]["command"]
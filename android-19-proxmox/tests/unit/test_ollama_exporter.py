@@ -0,0 +1,141 @@
+"""Tests for the Ollama runtime exporter (homelab.ollama_exporter)."""
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from homelab.exporter import handler
+from homelab.ollama_exporter import Collector, OllamaError, expires_in, fetch_json, render
+
+# 2026-01-01T00:00:00Z
+NOW = 1767225600.0
+
+PS = {"models": [
+    {"name": "qwen2.5-coder:32b", "model": "qwen2.5-coder:32b", "size": 25000000000, "size_vram": 20000000000,
+     "context_length": 8192, "expires_at": "2026-01-01T00:05:00.123456789Z",
+     "details": {"family": "qwen2", "parameter_size": "32.8B", "quantization_level": "Q4_K_M"}},
+    {"name": "llama3.2:3b", "size": 3000000000, "size_vram": 3000000000,
+     "expires_at": "2026-01-01T01:00:00+01:00", "details": {"family": "llama"}},
+]}
+
+
+class FakeOllama:
+    """Serves canned /api replies; fails while ``failing`` is set."""
+
+    def __init__(self):
+        self.paths = []
+        self.failing = False
+
+    def __call__(self, base_url, path):
+        self.paths.append(path)
+        if self.failing:
+            raise OllamaError(f"GET {path} failed: connection refused")
+        return PS if path == "/api/ps" else {"version": "0.5.7"}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def serve():
+    """Serve a request handler class on an ephemeral port, returning its base URL."""
+    servers = []
+
+    def start(handler_class):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+        threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_expiry_tolerates_nanoseconds_and_offsets():
+    """Go's nanosecond timestamps and UTC offsets parse; garbage does not."""
+    assert expires_in("2026-01-01T00:05:00.123456789Z", NOW) == pytest.approx(300.123456)
+    assert expires_in("2026-01-01T01:00:00+01:00", NOW) == 0
+    assert expires_in("", NOW) is None
+    assert expires_in("2026-01-01T00:05:00", NOW) is None
+
+
+def test_render_reports_vram_and_settings_per_model():
+    """Each loaded model gets size, VRAM share and keep-alive; settings become one info series."""
+    text = render(PS, "0.5.7", {"num_parallel": "1", "kv_cache_type": "q8_0"}, NOW)
+
+    assert "ollama_up 1\n" in text
+    assert 'ollama_config_info{num_parallel="1",kv_cache_type="q8_0"} 1\n' in text
+    assert 'ollama_version_info{version="0.5.7"} 1\n' in text
+    assert "ollama_loaded_models 2\n" in text
+    assert 'ollama_model_vram_bytes{model="qwen2.5-coder:32b"} 2e+10\n' in text
+    assert 'ollama_model_vram_ratio{model="qwen2.5-coder:32b"} 0.8000\n' in text
+    assert 'ollama_model_context_length{model="qwen2.5-coder:32b"} 8192\n' in text
+    assert 'ollama_model_expires_in_seconds{model="qwen2.5-coder:32b"} 300\n' in text
+    assert 'ollama_model_info{model="llama3.2:3b",family="llama",parameter_size="",quantization_level=""} 1\n' in text
+    assert text.count("# TYPE ollama_model_vram_bytes gauge\n") == 1
+
+    down = render(None, None, {}, NOW)
+    assert down == "# HELP ollama_up Whether Ollama's API answered.\n# TYPE ollama_up gauge\nollama_up 0\n"
+
+
+def test_one_poll_per_interval_and_version_fetched_once():
+    """Scrapes within the interval reuse the cached reply; failures are counted and mark Ollama down."""
+    ollama, clock = FakeOllama(), Clock()
+    collector = Collector("http://ollama", interval=5, fetch=ollama, clock=clock, wall_clock=lambda: NOW)
+
+    for _ in range(3):
+        assert "ollama_loaded_models 2\n" in collector.metrics()
+        clock.now += 1
+    assert ollama.paths == ["/api/ps", "/api/version"]
+
+    clock.now += 5
+    collector.metrics()
+    assert ollama.paths == ["/api/ps", "/api/version", "/api/ps"]
+
+    ollama.failing = True
+    clock.now += 5
+    text = collector.metrics()
+    assert "ollama_up 0\n" in text and "ollama_loaded_models" not in text
+    assert 'ollama_version_info{version="0.5.7"} 1\n' in text
+    assert "ollama_exporter_errors_total 1\n" in text
+
+
+def test_fetch_json_reports_unreachable_and_invalid_replies(serve):
+    """Connection errors and non-JSON bodies both raise OllamaError."""
+
+    class NotJson(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b"<html>")
+
+        def log_message(self, format, *args):
+            pass
+
+    with pytest.raises(OllamaError, match="GET /api/ps failed"):
+        fetch_json(serve(NotJson), "/api/ps")
+    with pytest.raises(OllamaError):
+        fetch_json("http://127.0.0.1:9", "/api/ps", timeout=1)
+
+
+def test_http_serves_metrics(serve):
+    """/metrics carries the exposition content type; unknown paths are 404."""
+    collector = Collector("http://ollama", {"num_parallel": "1"}, fetch=FakeOllama(), wall_clock=lambda: NOW)
+    url = serve(handler(collector.metrics, "Ollama metrics"))
+
+    with urllib.request.urlopen(url + "/metrics") as response:
+        assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        body = response.read().decode()
+    assert 'ollama_config_info{num_parallel="1"} 1\n' in body
+    with pytest.raises(urllib.error.HTTPError) as missing:
+        urllib.request.urlopen(url + "/api/ps")
+    assert missing.value.code == 404
@@ -1,9 +1,11 @@
 """Tests for Ansible playbook validation."""
 import pytest
-import subprocess
 import requests
 from pathlib import Path
 
+from homelab.ansible_syntax import discover_playbooks
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture(scope="module")
 def playbook_dir(project_root):
@@ -17,23 +19,25 @@ def test_ubuntu_desktop_playbook_exists(playbook_dir):
     assert playbook.exists(), f"Playbook not found: {playbook}"
 
 
-def test_ubuntu_desktop_playbook_syntax(playbook_dir):
+def test_ubuntu_desktop_playbook_syntax(playbook_dir, ansible_syntax):
     """Ubuntu Desktop playbook has valid Ansible syntax."""
     playbook = playbook_dir / "ubuntu-desktop-dev-setup.yml"
 
-    # Run ansible-playbook --syntax-check
-    result = subprocess.run(
-        ["ansible-playbook", "--syntax-check", str(playbook)],
-        capture_output=True,
-        text=True,
-        cwd=str(playbook_dir.parent)
-    )
+    error = ansible_syntax.check(playbook)
 
-    assert result.returncode == 0, (
-        f"Playbook syntax check failed:\n"
-        f"STDOUT: {result.stdout}\n"
-        f"STDERR: {result.stderr}"
-    )
+    assert error is None, f"Playbook syntax check failed:\n{error}"
+
+
+@pytest.mark.parametrize(
+    "playbook",
+    discover_playbooks(),
+    ids=lambda p: f"{p.parent.name}/{p.name}",
+)
+def test_playbook_syntax(playbook, ansible_syntax):
+    """Every repository playbook passes Ansible's syntax check."""
+    error = ansible_syntax.check(playbook)
+
+    assert error is None, f"Playbook syntax check failed:\n{error}"
 
 
 def test_ubuntu_desktop_playbook_references_catalog(playbook_dir):
@@ -75,9 +79,7 @@ def test_ubuntu_desktop_role_defaults(project_root):
     assert defaults_file.exists(), "Role missing defaults/main.yml"
 
     # Verify it's valid YAML
-    import yaml
-    with open(defaults_file) as f:
-        defaults = yaml.safe_load(f)
+    defaults = load_yaml(defaults_file)
 
     assert defaults is not None, "Defaults file is empty"
     assert isinstance(defaults, dict), "Defaults should be a dictionary"
@@ -90,9 +92,7 @@ def test_ubuntu_desktop_iso_url_accessible(project_root):
         "vm-ubuntu-desktop-devmachine" / "defaults" / "main.yml"
     )
 
-    import yaml
-    with open(defaults_file) as f:
-        defaults = yaml.safe_load(f)
+    defaults = load_yaml(defaults_file)
 
     iso_url = defaults.get('ubuntu_desktop_iso_url')
     assert iso_url, "ubuntu_desktop_iso_url not defined in defaults"
@@ -125,9 +125,7 @@ def test_ubuntu_desktop_no_hardcoded_ssh_key(project_root):
         "vm-ubuntu-desktop-devmachine" / "defaults" / "main.yml"
     )
 
-    import yaml
-    with open(defaults_file) as f:
-        defaults = yaml.safe_load(f)
+    defaults = load_yaml(defaults_file)
 
     # Verify ssh_public_key is not defined (moved to Terraform)
     # If it exists, ensure it's not hardcoded
@@ -155,9 +153,7 @@ def test_ubuntu_desktop_no_hardcoded_credentials(project_root):
         "vm-ubuntu-desktop-devmachine" / "defaults" / "main.yml"
     )
 
-    import yaml
-    with open(defaults_file) as f:
-        defaults = yaml.safe_load(f)
+    defaults = load_yaml(defaults_file)
 
     # Verify dev_password is not defined (moved to Terraform or manual setup)
     # If any password fields exist, ensure they're not insecure
@@ -207,9 +203,7 @@ def test_vm_llm_aimachine_inventory_entry(project_root):
     """Inventory should have vm_llm_aimachine entry with correct configuration."""
     inventory = project_root.parent / "inventory.yml"
 
-    import yaml
-    with open(inventory) as f:
-        inv_data = yaml.safe_load(f)
+    inv_data = load_yaml(inventory)
 
     # Check that ai_vms group exists
     assert 'ai_vms' in inv_data['all']['children'], \
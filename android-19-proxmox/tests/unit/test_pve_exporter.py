@@ -0,0 +1,123 @@
+"""Tests for the per-guest Proxmox metrics collector (homelab.pve_exporter)."""
+import json
+
+import pytest
+
+from homelab.pve_exporter import Collector, CollectorError, load_services, main, parse_resources, render_guests
+
+LISTING = [
+    {"vmid": 140, "id": "qemu/140", "type": "qemu", "name": "vm-llm-aimachine", "node": "proxmox",
+     "status": "running", "cpu": 0.25, "maxcpu": 32, "mem": 8589934592, "maxmem": 53687091200, "disk": 0,
+     "maxdisk": 536870912000, "diskread": 1024, "diskwrite": 2048, "netin": 300, "netout": 400, "uptime": 3600},
+    {"vmid": 125, "id": "lxc/125", "type": "lxc", "name": "adguard", "node": "proxmox", "status": "running",
+     "cpu": 0.01, "maxcpu": 1, "mem": 104857600, "maxmem": 536870912, "netin": 10, "netout": 20, "uptime": 60},
+    {"vmid": 9000, "id": "qemu/9000", "type": "qemu", "name": "ubuntu-cloud", "node": "proxmox",
+     "status": "stopped", "template": 1},
+    {"vmid": 500, "id": "qemu/500", "type": "qemu", "name": "elsewhere", "node": "other", "status": "running"},
+    {"id": "storage/proxmox/local", "type": "storage", "node": "proxmox"},
+]
+
+SERVICES = {
+    125: {"name": "adguard", "type": "container"},
+    140: {"name": "vm-llm-aimachine", "type": "vm"},
+    160: {"name": "vm-coolify-platform", "type": "vm"},
+}
+
+
+class FakePvesh:
+    """Counts cluster queries; fails while ``failing`` is set."""
+
+    def __init__(self, listing=LISTING):
+        self.listing = listing
+        self.calls = 0
+        self.failing = False
+
+    def __call__(self):
+        self.calls += 1
+        if self.failing:
+            raise CollectorError("pvesh failed: ipcc_send_rec failed")
+        return json.dumps(self.listing)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_resources_keeps_guests_of_the_node():
+    """Only qemu/lxc entries are guests; templates and other nodes are told apart."""
+    guests = parse_resources(json.dumps(LISTING), node="proxmox")
+
+    assert sorted(guests) == [125, 140, 9000]
+    assert guests[9000].template and not guests[9000].running
+    assert guests[125].values["mem"] == 104857600 and "diskread" not in guests[125].values
+    assert sorted(parse_resources(json.dumps(LISTING))) == [125, 140, 500, 9000]
+    with pytest.raises(CollectorError, match="unexpected pvesh output"):
+        parse_resources("ipcc_send_rec[1] failed")
+
+
+def test_metrics_are_labelled_by_catalog_service():
+    """Catalog services name their guests; others fall back to Proxmox name and type."""
+    text = render_guests(parse_resources(json.dumps(LISTING), node="proxmox"), SERVICES)
+
+    labels = 'service_id="140",service_name="vm-llm-aimachine",service_type="vm"'
+    assert f"pve_guest_up{{{labels}}} 1\n" in text
+    assert f"pve_guest_cpus{{{labels}}} 32\n" in text
+    assert f"pve_guest_disk_read_bytes_total{{{labels}}} 1024\n" in text
+    assert "# TYPE pve_guest_network_transmit_bytes_total counter\n" in text
+    assert 'pve_guest_up{service_id="9000",service_name="ubuntu-cloud",service_type="vm"} 0\n' in text
+    assert 'template="true"} 1\n' in text
+    coolify = 'service_id="160",service_name="vm-coolify-platform",service_type="vm"'
+    assert f"pve_catalog_guest_present{{{coolify}}} 0\n" in text
+    assert 'pve_catalog_guest_present{service_id="125",service_name="adguard",service_type="container"} 1\n' in text
+
+
+def test_one_query_per_interval_regardless_of_scrapes():
+    """Scrapes within the interval reuse the cached listing; failures serve it until max_age."""
+    pvesh, clock = FakePvesh(), Clock()
+    collector = Collector(SERVICES, query=pvesh, node="proxmox", interval=15, max_age=60, clock=clock)
+
+    for _ in range(5):
+        assert "pve_exporter_up 1\n" in collector.metrics()
+        clock.now += 2
+    assert pvesh.calls == 1
+
+    clock.now += 10
+    collector.metrics()
+    assert pvesh.calls == 2
+
+    pvesh.failing = True
+    clock.now += 30
+    stale = collector.metrics()
+    assert "pve_exporter_up 1\n" in stale and "pve_guest_up{" in stale
+    assert "pve_exporter_errors_total 1\n" in stale
+
+    clock.now += 31
+    expired = collector.metrics()
+    assert "pve_exporter_up 0\n" in expired and "pve_guest_up{" not in expired
+    assert "pve_exporter_cluster_queries_total 4\n" in expired
+
+
+def test_services_file_round_trips_catalog_ids(tmp_path, catalog):
+    """The role's services.json (string keys) loads back keyed by integer service ID."""
+    path = tmp_path / "services.json"
+    path.write_text(json.dumps({str(sid): {"name": s["name"], "type": s["type"]}
+                                for sid, s in catalog["services"].items()}))
+
+    services = load_services(path)
+
+    assert services[160] == {"name": "vm-coolify-platform", "type": "vm"}
+    assert set(services) == set(catalog["services"])
+    assert load_services(None) == {}
+
+
+def test_main_reports_unreadable_services(tmp_path, capsys):
+    """A broken services file is reported instead of serving unlabelled guests."""
+    path = tmp_path / "services.json"
+    path.write_text("[")
+
+    assert main(["--services", str(path), "--once"]) == 1
+    assert "ERROR: cannot read services" in capsys.readouterr().err
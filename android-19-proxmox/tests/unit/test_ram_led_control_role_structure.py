@@ -4,9 +4,10 @@ These tests validate that the Ansible role provides proper structure for
 independent RAM LED light control functionality.
 """
 import pytest
-import yaml
 from pathlib import Path
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def host_proxmox_role_path(project_root):
@@ -14,6 +15,12 @@ def host_proxmox_role_path(project_root):
     return project_root / "configuration-by-ansible" / "host-proxmox"
 
 
+@pytest.fixture
+def host_proxmox(roles):
+    """Indexed host-proxmox role."""
+    return roles["host-proxmox"]
+
+
 def test_should_provide_ram_led_control_task_structure_for_host_proxmox_role(host_proxmox_role_path):
     """RAM LED control task file should exist with valid structure for host-proxmox role.
 
@@ -33,15 +40,14 @@ def test_should_provide_ram_led_control_task_structure_for_host_proxmox_role(hos
         f"RAM LED control task file should exist at {ram_led_control_task_file}"
 
     # Act & Assert - Valid YAML
-    with open(ram_led_control_task_file) as f:
-        content = yaml.safe_load(f)
+    content = load_yaml(ram_led_control_task_file)
 
     # Assert - Basic structure (should be a list for Ansible tasks)
     assert isinstance(content, list), \
         "RAM LED control task file should contain a list of tasks"
 
 
-def test_ram_led_control_should_target_only_led4_channel(host_proxmox_role_path):
+def test_ram_led_control_should_target_only_led4_channel(host_proxmox_role_path, host_proxmox):
     """RAM LED control should target only led4 channel, not Arctic lights (led1-led3).
 
     Validates:
@@ -58,7 +64,6 @@ def test_ram_led_control_should_target_only_led4_channel(host_proxmox_role_path)
     # Act
     with open(ram_led_control_task_file) as f:
         content = f.read()
-        tasks = yaml.safe_load(content)
 
     # Assert - Contains led4 references (RAM channel)
     assert 'led4' in content, \
@@ -66,7 +71,8 @@ def test_ram_led_control_should_target_only_led4_channel(host_proxmox_role_path)
 
     # Assert - Does NOT contain Arctic light channel references
     # Check for led1, led2, led3 in command contexts (not in comments)
-    task_commands = [task.get('command', '') for task in tasks if isinstance(task, dict)]
+    task_commands = [task.command for task in host_proxmox.find(module=("command", "shell"),
+                                                                file="ram-led-control.yml")]
     all_commands = ' '.join(task_commands)
 
     assert 'led1' not in all_commands, \
@@ -98,7 +104,6 @@ def test_ram_led_control_should_support_off_state(host_proxmox_role_path):
     # Act
     with open(ram_led_control_task_file) as f:
         content = f.read()
-        tasks = yaml.safe_load(content)
 
     # Assert - Has 'color off' command
     assert 'color off' in content, \
@@ -130,8 +135,7 @@ def test_should_define_ram_led_control_default_variables_in_host_proxmox_role(ho
     # Act
     assert defaults_file.exists(), "defaults/main.yml should exist"
 
-    with open(defaults_file) as f:
-        defaults = yaml.safe_load(f)
+    defaults = load_yaml(defaults_file)
 
     # Assert - Required RAM LED variables are defined
     assert 'ram_lights_enabled' in defaults, \
@@ -148,7 +152,7 @@ def test_should_define_ram_led_control_default_variables_in_host_proxmox_role(ho
         "ram_lights_state should be 'on' or 'off'"
 
 
-def test_should_include_ram_led_control_tasks_in_host_proxmox_main_tasks(host_proxmox_role_path):
+def test_should_include_ram_led_control_tasks_in_host_proxmox_main_tasks(host_proxmox):
     """RAM LED control task file should be included in main task list.
 
     Validates:
@@ -159,34 +163,19 @@ def test_should_include_ram_led_control_tasks_in_host_proxmox_main_tasks(host_pr
     This supports BDD Scenario 1: Turn RAM LEDs Off Independently
     Linked to Task 1.3: Include RAM LED control tasks in main playbook
     """
-    # Arrange
-    main_tasks_file = host_proxmox_role_path / "tasks" / "main.yml"
-
-    # Act
-    assert main_tasks_file.exists(), "tasks/main.yml should exist"
-
-    with open(main_tasks_file) as f:
-        content = f.read()
+    # Act - Find the include among the parsed (so not commented out) main.yml tasks
+    include = host_proxmox.first(file="main.yml", where=lambda task: task.include == "ram-led-control.yml")
 
-    # Assert - ram-led-control.yml is included
-    assert 'ram-led-control.yml' in content, \
+    # Assert - ram-led-control.yml is included and not commented out
+    assert include is not None, \
         "tasks/main.yml should include ram-led-control.yml task file"
 
-    # Assert - Include is not commented out
-    # Check that the line containing ram-led-control.yml doesn't start with #
-    for line in content.split('\n'):
-        if 'ram-led-control.yml' in line:
-            stripped = line.strip()
-            assert not stripped.startswith('#'), \
-                "ram-led-control.yml include should not be commented out"
-            break
-
     # Assert - Has proper conditional
-    assert 'ram_lights_enabled' in content, \
+    assert include in host_proxmox.uses('ram_lights_enabled'), \
         "RAM LED control include should check ram_lights_enabled variable"
 
 
-def test_ram_led_control_should_support_on_state(host_proxmox_role_path):
+def test_ram_led_control_should_support_on_state(host_proxmox):
     """RAM LED control should support turning LEDs on with rainbow effect.
 
     Validates:
@@ -197,37 +186,26 @@ def test_ram_led_control_should_support_on_state(host_proxmox_role_path):
     This supports BDD Scenario 2: Turn RAM LEDs On Independently
     Linked to Task 2.1: Add Ansible task for RAM LED control on (rainbow)
     """
-    # Arrange
-    ram_led_control_task_file = host_proxmox_role_path / "tasks" / "ram-led-control.yml"
-
     # Act
-    with open(ram_led_control_task_file) as f:
-        content = f.read()
-        tasks = yaml.safe_load(content)
+    commands = host_proxmox.find(module=("command", "shell"), file="ram-led-control.yml")
 
     # Assert - Has 'color rainbow' command for led4
-    assert 'color rainbow' in content, \
+    rainbow_tasks = [task for task in commands if 'color rainbow' in task.command]
+    assert rainbow_tasks, \
         "RAM LED control should have command to turn LEDs on with rainbow effect"
 
-    assert 'led4' in content, \
+    assert any('led4' in task.command for task in rainbow_tasks), \
         "Rainbow command should target led4 channel (RAM)"
 
     # Assert - Has ram_lights_state == "on" conditional
     # Find the "on" task and verify it has proper conditional
-    on_task_found = False
-    for task in tasks:
-        if isinstance(task, dict) and 'command' in task:
-            cmd = task['command']
-            if 'rainbow' in cmd and 'led4' in cmd:
-                on_task_found = True
-                assert 'when' in task, "Rainbow task should have conditional"
-                when_clause = task['when']
-                when_str = ' '.join(when_clause) if isinstance(when_clause, list) else when_clause
-                assert 'ram_lights_state' in when_str and '"on"' in when_str, \
-                    "Rainbow task should check ram_lights_state == 'on'"
-                break
-
-    assert on_task_found, "Should have task for turning RAM LEDs on with rainbow"
+    on_task = next((task for task in rainbow_tasks if 'led4' in task.command), None)
+    assert on_task is not None, "Should have task for turning RAM LEDs on with rainbow"
+
+    when_str = on_task.get('when')
+    assert when_str, "Rainbow task should have conditional"
+    assert 'ram_lights_state' in when_str and '"on"' in when_str, \
+        "Rainbow task should check ram_lights_state == 'on'"
 
 
 def test_should_provide_ram_led_systemd_service_template_for_led4_only(host_proxmox_role_path):
@@ -290,7 +268,7 @@ def test_should_provide_ram_led_systemd_service_template_for_led4_only(host_prox
         "RAM LED systemd service should have RemainAfterExit=yes for state persistence"
 
 
-def test_should_deploy_ram_led_systemd_service_via_ansible_tasks(host_proxmox_role_path):
+def test_should_deploy_ram_led_systemd_service_via_ansible_tasks(host_proxmox):
     """RAM LED control tasks should deploy and enable systemd service.
 
     Validates:
@@ -305,65 +283,47 @@ def test_should_deploy_ram_led_systemd_service_via_ansible_tasks(host_proxmox_ro
     Ensures AC4: RAM LED state persists across system reboots
     Ensures AC13: Both RGB and RAM services start automatically after reboot
     """
-    # Arrange
-    ram_led_control_task_file = host_proxmox_role_path / "tasks" / "ram-led-control.yml"
-
-    # Act
-    with open(ram_led_control_task_file) as f:
-        content = f.read()
-        tasks = yaml.safe_load(content)
-
     # Assert - Template deployment task exists
-    template_task = None
-    for task in tasks:
-        if isinstance(task, dict) and 'template' in task:
-            if 'ram-led-control.service.j2' in str(task.get('template', {})):
-                template_task = task
-                break
+    template_task = host_proxmox.first(
+        module="template", file="ram-led-control.yml",
+        where=lambda task: task.get('args.src') == 'ram-led-control.service.j2',
+    )
 
     assert template_task is not None, \
         "Should have task to deploy ram-led-control.service.j2 template"
 
-    assert template_task['template']['dest'] == '/etc/systemd/system/ram-led-control.service', \
+    assert template_task.get('args.dest') == '/etc/systemd/system/ram-led-control.service', \
         "Template should be deployed to /etc/systemd/system/ram-led-control.service"
 
-    assert template_task['template']['mode'] == '0644', \
+    assert template_task.get('args.mode') == '0644', \
         "Template should have mode 0644"
 
     # Assert - Systemd daemon reload task exists
-    daemon_reload_task = None
-    for task in tasks:
-        if isinstance(task, dict) and 'systemd' in task:
-            if task.get('systemd', {}).get('daemon_reload'):
-                daemon_reload_task = task
-                break
+    daemon_reload_task = host_proxmox.first(module="systemd", file="ram-led-control.yml",
+                                            where=lambda task: task.get('args.daemon_reload'))
 
     assert daemon_reload_task is not None, \
         "Should have task to reload systemd daemon"
 
     # Assert - Service enable task exists
-    service_enable_task = None
-    for task in tasks:
-        if isinstance(task, dict) and 'systemd' in task:
-            systemd_config = task.get('systemd', {})
-            if (systemd_config.get('name') == 'ram-led-control.service' and
-                systemd_config.get('enabled')):
-                service_enable_task = task
-                break
+    service_enable_task = host_proxmox.first(
+        module="systemd", file="ram-led-control.yml",
+        where=lambda task: task.get('args.name') == 'ram-led-control.service' and task.get('args.enabled'),
+    )
 
     assert service_enable_task is not None, \
         "Should have task to enable ram-led-control.service for autostart"
 
-    assert service_enable_task['systemd']['enabled'] is True or service_enable_task['systemd']['enabled'] == 'yes', \
+    assert service_enable_task.get('args.enabled') is True or service_enable_task.get('args.enabled') == 'yes', \
         "Service should be enabled for autostart"
 
     # Assert - Service should NOT have state: started (following RGB pattern)
     # Oneshot services don't need to be started - liquidctl commands already applied state
-    assert 'state' not in service_enable_task['systemd'], \
+    assert 'state' not in service_enable_task.args, \
         "Service enable task should NOT have 'state: started' (oneshot service for boot persistence only)"
 
 
-def test_should_support_ram_led_status_checking(host_proxmox_role_path):
+def test_should_support_ram_led_status_checking(host_proxmox):
     """RAM LED control should support status checking mode.
 
     Validates:
@@ -375,48 +335,32 @@ def test_should_support_ram_led_status_checking(host_proxmox_role_path):
     This supports BDD Scenario 5: Check RAM LED Status
     Linked to Task 5.1: Add status checking tasks for RAM LED
     """
-    # Arrange
-    ram_led_control_task_file = host_proxmox_role_path / "tasks" / "ram-led-control.yml"
-
     # Act
-    with open(ram_led_control_task_file) as f:
-        content = f.read()
-        tasks = yaml.safe_load(content)
+    action_tasks = [task for task in host_proxmox.uses('ram_lights_action') if task.file == "ram-led-control.yml"]
 
-    # Assert - File contains ram_lights_action variable references
-    assert 'ram_lights_action' in content, \
+    # Assert - Tasks are conditional on the ram_lights_action variable
+    assert action_tasks, \
         "RAM LED control should support ram_lights_action variable"
 
     # Assert - Has status checking conditional
-    assert "ram_lights_action == 'status'" in content, \
+    assert any("ram_lights_action == 'status'" in task.get('when') for task in action_tasks), \
         "RAM LED control should have tasks conditional on ram_lights_action == 'status'"
 
     # Assert - Check for service status tasks
-    status_tasks_found = []
-    for task in tasks:
-        if isinstance(task, dict) and 'when' in task:
-            when_clause = task['when']
-            when_str = ' '.join(when_clause) if isinstance(when_clause, list) else str(when_clause)
-            if 'ram_lights_action' in when_str and 'status' in when_str:
-                status_tasks_found.append(task)
+    status_tasks_found = [task for task in action_tasks if 'status' in task.get('when')]
 
     assert len(status_tasks_found) >= 3, \
         f"Should have at least 3 status checking tasks (found {len(status_tasks_found)}): " \
         f"check service file, get service status, read service config"
 
     # Assert - Tasks use appropriate modules for status checking
-    status_task_modules = []
-    for task in status_tasks_found:
-        # Collect module names used in status tasks
-        for module in ['stat', 'systemd', 'slurp', 'debug']:
-            if module in task:
-                status_task_modules.append(module)
+    status_task_modules = [task.module for task in status_tasks_found]
 
     assert 'stat' in status_task_modules or 'systemd' in status_task_modules, \
         "Status tasks should use 'stat' or 'systemd' module to check service"
 
 
-def test_should_display_formatted_ram_led_status_output(host_proxmox_role_path):
+def test_should_display_formatted_ram_led_status_output(host_proxmox):
     """RAM LED status output should be formatted clearly with Arctic lights comparison.
 
     Validates:
@@ -429,30 +373,18 @@ def test_should_display_formatted_ram_led_status_output(host_proxmox_role_path):
     This supports BDD Scenario 5: Check RAM LED Status
     Linked to Task 5.2: Add formatted output for RAM LED status display
     """
-    # Arrange
-    ram_led_control_task_file = host_proxmox_role_path / "tasks" / "ram-led-control.yml"
-
-    # Act
-    with open(ram_led_control_task_file) as f:
-        content = f.read()
-        tasks = yaml.safe_load(content)
-
     # Assert - Has status display task (must check for == 'status', not != 'status')
-    status_display_task = None
-    for task in tasks:
-        if isinstance(task, dict) and 'debug' in task and 'when' in task:
-            when_clause = task['when']
-            when_str = ' '.join(when_clause) if isinstance(when_clause, list) else str(when_clause)
-            # Must be checking FOR status mode (not excluding it)
-            if 'ram_lights_action' in when_str and "== 'status'" in when_str:
-                status_display_task = task
-                break
+    status_display_task = host_proxmox.first(
+        module="debug", file="ram-led-control.yml",
+        # Must be checking FOR status mode (not excluding it)
+        where=lambda task: 'ram_lights_action' in task.variables and "== 'status'" in task.get('when'),
+    )
 
     assert status_display_task is not None, \
         "Should have a debug task to display RAM LED status (conditional on ram_lights_action == 'status')"
 
     # Assert - Output includes key information
-    debug_msg = str(status_display_task.get('debug', {}))
+    debug_msg = str(status_display_task.args)
     assert 'RAM LED' in debug_msg or 'RAM' in debug_msg, \
         "Status output should mention RAM LEDs"
 
@@ -462,6 +394,6 @@ def test_should_display_formatted_ram_led_status_output(host_proxmox_role_path):
 
     # Assert - Has visual formatting
     # Check for common formatting patterns (borders, headers, sections)
-    formatted = '═' in content or '─' in content or 'STATUS' in content.upper()
+    formatted = '═' in debug_msg or '─' in debug_msg or 'STATUS' in debug_msg.upper()
     assert formatted, \
         "Status output should have visual formatting (borders/headers/sections)"
@@ -4,16 +4,16 @@ These tests validate that RAM LED control gracefully handles
 missing liquidctl dependency with clear error messages.
 """
 import pytest
-import yaml
 from pathlib import Path
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def ram_led_tasks(project_root):
     """Load RAM LED control task file."""
     tasks_file = project_root / "configuration-by-ansible" / "host-proxmox" / "tasks" / "ram-led-control.yml"
-    with open(tasks_file) as f:
-        return yaml.safe_load(f)
+    return load_yaml(tasks_file)
 
 
 def test_should_check_liquidctl_installed_before_ram_operations(ram_led_tasks):
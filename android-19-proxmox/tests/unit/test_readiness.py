@@ -0,0 +1,109 @@
+"""Tests for VM readiness probes (homelab.readiness)."""
+import json
+import subprocess
+
+import pytest
+
+from homelab.deploy import build_plan
+from homelab.readiness import NotReadyError, ReadinessProbe, record
+from homelab.ssh_pool import SSHChannelError
+
+
+class FakeSSH:
+    """Scripted stand-in for SSHPool: maps a command to a list of outcomes."""
+
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.calls = []
+
+    def run(self, host, command, user="root", timeout=None):
+        self.calls.append((user, host, command))
+        outcome = self.outcomes[command].pop(0) if len(self.outcomes[command]) > 1 else self.outcomes[command][0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        returncode, stdout = outcome
+        return subprocess.CompletedProcess(command, returncode, stdout, "")
+
+
+def _port_opens_after(attempts):
+    calls = []
+
+    def check(host, port):
+        calls.append((host, port))
+        return len(calls) > attempts
+    check.calls = calls
+    return check
+
+
+def test_probe_phases_follow_catalog_flags(catalog_index):
+    """Agent and cloud-init phases only apply to VMs that enable them."""
+    proxmox = catalog_index.proxmox.ip
+    assert ReadinessProbe(catalog_index.service(140), proxmox, FakeSSH({})).phases() == \
+        ["guest-agent", "ssh", "cloud-init"]
+    assert ReadinessProbe(catalog_index.service(101), proxmox, FakeSSH({})).phases() == \
+        ["guest-agent", "ssh"]
+
+
+def test_probe_returns_as_soon_as_vm_is_ready(catalog_index):
+    """Each phase is retried until it passes; the report records timings."""
+    vm = catalog_index.service(140)
+    ssh = FakeSSH({
+        "qm agent 140 ping": [(2, ""), (0, "")],
+        "cloud-init status --wait": [SSHChannelError("Connection refused"), (0, "status: done\n")],
+    })
+    port_check = _port_opens_after(1)
+
+    report = ReadinessProbe(vm, catalog_index.proxmox.ip, ssh, port_check=port_check).wait(timeout=10)
+
+    assert report.ready
+    assert report.attempts == {"guest-agent": 2, "ssh": 2, "cloud-init": 2}
+    assert set(report.phases) == {"guest-agent", "ssh", "cloud-init"}
+    assert report.seconds < 5
+    assert port_check.calls[0] == (vm.ip, 22)
+    assert ("root", catalog_index.proxmox.ip, "qm agent 140 ping") in ssh.calls
+    assert (vm.cloud_init_user, vm.ip, "cloud-init status --wait") in ssh.calls
+
+
+def test_probe_times_out_with_failing_phase(catalog_index):
+    """A VM that never opens SSH fails with the phase named."""
+    vm = catalog_index.service(160)
+    ssh = FakeSSH({"qm agent 160 ping": [(0, "")]})
+
+    with pytest.raises(NotReadyError, match="ssh check still failing"):
+        ReadinessProbe(vm, catalog_index.proxmox.ip, ssh, port_check=lambda h, p: False).wait(timeout=0.5)
+
+
+def test_probe_fails_fast_on_cloud_init_error(catalog_index):
+    """A fatal cloud-init error is reported instead of waiting out the timeout."""
+    vm = catalog_index.service(160)
+    ssh = FakeSSH({
+        "qm agent 160 ping": [(0, "")],
+        "cloud-init status --wait": [(1, "status: error\n")],
+    })
+
+    with pytest.raises(RuntimeError, match="cloud-init failed on VM 160"):
+        ReadinessProbe(vm, catalog_index.proxmox.ip, ssh, port_check=lambda h, p: True).wait(timeout=30)
+
+
+def test_record_appends_latency_per_vm(tmp_path, catalog_index):
+    """Boot-to-ready latencies accumulate as JSON lines keyed by VM ID."""
+    vm = catalog_index.service(160)
+    ssh = FakeSSH({"qm agent 160 ping": [(0, "")], "cloud-init status --wait": [(0, "")]})
+    probe = ReadinessProbe(vm, catalog_index.proxmox.ip, ssh, port_check=lambda h, p: True)
+    path = tmp_path / "readiness.jsonl"
+
+    record(probe.wait(timeout=5), path)
+    record(probe.wait(timeout=5), path)
+
+    entries = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [e["vm_id"] for e in entries] == [160, 160]
+    assert all(e["ready"] and e["seconds"] >= 0 for e in entries)
+
+
+def test_deploy_plan_waits_for_readiness_before_configuring(catalog_index):
+    """VM configure stages run after the readiness probe instead of a sleep."""
+    plan = build_plan(catalog_index, ["160"])
+
+    assert plan["ready:160"].deps == {"terraform:160"}
+    assert "ready:160" in plan["configure:160"].deps
+    assert plan["ready:160"].command[-3:] == ["-m", "homelab.readiness", "160"]
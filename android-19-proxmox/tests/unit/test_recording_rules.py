@@ -0,0 +1,77 @@
+"""Tests for the Prometheus recording rules and the dashboards reading them (lxc-monitoring)."""
+import json
+import re
+
+import pytest
+import yaml
+
+from homelab.templating import render_file, role_vars
+
+# level:metric[:operations], as in the Prometheus recording rule naming convention
+RECORD_NAME = re.compile(r"^[a-z_]+:[a-z0-9_]+(:[a-z0-9_]+)?$")
+RECORDED_SERIES = re.compile(r"\b([a-z][a-z_]*:[a-z0-9_]+(?::[a-z0-9_]+)?)\b")
+
+
+@pytest.fixture(scope="module")
+def monitoring_role_dir(project_root):
+    """Return the lxc-monitoring role directory."""
+    return project_root / "configuration-by-ansible" / "lxc-monitoring"
+
+
+@pytest.fixture(scope="module")
+def rule_groups(monitoring_role_dir, catalog):
+    variables = role_vars(monitoring_role_dir, catalog)
+    return {group["name"]: group
+            for template in sorted((monitoring_role_dir / "templates" / "rules").glob("*.yml.j2"))
+            for group in yaml.safe_load(render_file(template, variables))["groups"]}
+
+
+@pytest.fixture(scope="module")
+def dashboard_exprs(monitoring_role_dir):
+    exprs = {}
+    for path in sorted((monitoring_role_dir / "files" / "dashboards").glob("homelab-*.json")):
+        dashboard = json.loads(path.read_text())
+        exprs[path.stem] = [target["expr"] for panel in dashboard["panels"] for target in panel.get("targets", [])]
+    return exprs
+
+
+def test_rules_follow_naming_convention(rule_groups):
+    """Every rule records a uniquely named level:metric:operations series."""
+    records = [rule["record"] for group in rule_groups.values() for rule in group["rules"]]
+
+    assert records and len(records) == len(set(records))
+    assert all(RECORD_NAME.match(record) for record in records), records
+
+
+def test_ups_watts_use_nominal_rating(rule_groups):
+    """Load percent becomes watts with the UPS rating the dashboard used to hard-code."""
+    rules = {rule["record"]: rule["expr"] for rule in rule_groups["homelab-power"]["rules"]}
+
+    assert rules["node:ups_load_watts"] == 'sum by (node) (apcupsd_loadpct{job="ups"}) * 1320 / 100'
+
+
+def test_dashboard_reads_recorded_series(rule_groups, dashboard_exprs):
+    """Power panels only query recorded series; energy is average power times the range's hours."""
+    records = {rule["record"] for group in rule_groups.values() for rule in group["rules"]}
+    used = {series for expr in dashboard_exprs["homelab-power"] for series in RECORDED_SERIES.findall(expr)}
+
+    assert used and used <= records
+    energy = [expr for expr in dashboard_exprs["homelab-power"] if "$__range" in expr]
+    assert len(energy) == 3
+    for expr in energy:
+        # Correct for any range: no fixed-step subquery that comes out empty below 1h
+        assert re.search(r"avg_over_time\([^)]*\[\$__range\]\)\)? \* \$__range_s / 3600 / 1000$", expr), expr
+    for expr in dashboard_exprs["homelab-power"]:
+        assert not re.search(r"node_hwmon_power_watt|DCGM_FI_DEV_POWER_USAGE|\* 1320", expr), expr
+
+
+def test_inference_dashboard_reads_recorded_series(rule_groups, dashboard_exprs):
+    """Inference panels read node-level rollups of vLLM and Ollama; quantiles follow the configured list."""
+    records = {rule["record"] for rule in rule_groups["homelab-inference"]["rules"]}
+    used = {series for expr in dashboard_exprs["homelab-inference"] for series in RECORDED_SERIES.findall(expr)}
+
+    assert {"node:vllm_time_to_first_token_seconds:p50_5m", "node:vllm_time_to_first_token_seconds:p95_5m",
+            "node:vllm_kv_cache_usage_ratio", "node:ollama_cpu_offload_bytes:sum"} <= records
+    # vllm:cache_config_info is vLLM's own name, not a recording rule
+    assert used - {"vllm:cache_config_info"} <= records
+    assert not any("histogram_quantile" in expr for expr in dashboard_exprs["homelab-inference"])
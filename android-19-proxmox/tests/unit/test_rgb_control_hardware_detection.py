@@ -4,16 +4,18 @@ These tests validate that the Ansible role properly detects RGB hardware
 components (Arctic fans, Arctic CPU cooler, RAM) using OpenRGB.
 """
 import pytest
-import yaml
-from pathlib import Path
 
 
 @pytest.fixture
-def rgb_control_tasks(project_root):
-    """Load RGB control task file."""
-    tasks_file = project_root / "configuration-by-ansible" / "host-proxmox" / "tasks" / "rgb-control.yml"
-    with open(tasks_file) as f:
-        return yaml.safe_load(f)
+def rgb_control_tasks(roles):
+    """RGB control tasks of the indexed host-proxmox role."""
+    return roles["host-proxmox"].tasks_in("rgb-control.yml")
+
+
+def _lists_openrgb_devices(task):
+    """Whether a command/shell task runs openrgb to list devices."""
+    command = task.command or ""
+    return "openrgb" in command and ("list" in command or "-l" in command)
 
 
 def test_should_detect_rgb_hardware_components_using_openrgb(rgb_control_tasks):
@@ -37,43 +39,40 @@ def test_should_detect_rgb_hardware_components_using_openrgb(rgb_control_tasks):
     # Act - Find the RGB hardware detection task
     hardware_detection_task = None
     for task in rgb_control_tasks:
-        if task and 'name' in task:
-            task_name = task['name'].lower()
-            if 'detect' in task_name and 'hardware' in task_name or \
-               'detect' in task_name and 'device' in task_name or \
-               'list' in task_name and 'device' in task_name:
-                # Make sure it's using openrgb command
-                if 'command' in task or 'shell' in task:
-                    command = task.get('command') or task.get('shell')
-                    if 'openrgb' in command and 'list' in command:
-                        hardware_detection_task = task
-                        break
+        task_name = (task.name or "").lower()
+        if 'detect' in task_name and 'hardware' in task_name or \
+           'detect' in task_name and 'device' in task_name or \
+           'list' in task_name and 'device' in task_name:
+            # Make sure it's using openrgb command
+            if 'openrgb' in (task.command or "") and 'list' in task.command:
+                hardware_detection_task = task
+                break
 
     # Assert - Hardware detection task exists
     assert hardware_detection_task is not None, \
         "Should have a task that detects RGB hardware using OpenRGB"
 
     # Assert - Uses command module with openrgb --list-devices
-    assert 'command' in hardware_detection_task or 'shell' in hardware_detection_task, \
+    assert hardware_detection_task.module in ('command', 'shell'), \
         "Hardware detection should use 'command' or 'shell' module"
 
-    command_value = hardware_detection_task.get('command') or hardware_detection_task.get('shell')
+    command_value = hardware_detection_task.command
     assert 'openrgb' in command_value.lower(), \
         "Should use OpenRGB for hardware detection"
     assert '--list-devices' in command_value or '-l' in command_value, \
         "Should use --list-devices flag to list RGB hardware"
 
     # Assert - Registers the result
-    assert 'register' in hardware_detection_task, \
+    assert hardware_detection_task.register, \
         "Hardware detection task should register result for use in subsequent tasks"
-    assert hardware_detection_task['register'] == 'rgb_devices_detected', \
+    assert hardware_detection_task.register == 'rgb_devices_detected', \
         "Should register result as 'rgb_devices_detected' variable"
 
     # Assert - Does not fail when no devices found
-    assert 'failed_when' in hardware_detection_task, \
+    failed_when = hardware_detection_task.get('failed_when')
+    assert failed_when is not None, \
         "Should have failed_when to handle case when no RGB devices found"
-    assert hardware_detection_task['failed_when'] == False or \
-           hardware_detection_task['failed_when'] == 'false', \
+    assert failed_when == False or failed_when == 'false', \
         "Should set failed_when: false to not fail when no RGB devices present"
 
 
@@ -93,19 +92,15 @@ def test_hardware_detection_should_run_after_installation(rgb_control_tasks):
     install_index = None
     hardware_detection_index = None
 
-    for i, task in enumerate(rgb_control_tasks):
-        if task and 'name' in task:
-            task_name = task['name'].lower()
-            # Installation task
-            if install_index is None and 'install' in task_name and 'openrgb' in task_name:
-                if 'apt' in task:
-                    install_index = i
-            # Hardware detection task
-            if hardware_detection_index is None:
-                if 'command' in task or 'shell' in task:
-                    command = task.get('command') or task.get('shell', '')
-                    if 'openrgb' in command and ('list' in command or '-l' in command):
-                        hardware_detection_index = i
+    for task in rgb_control_tasks:
+        task_name = (task.name or "").lower()
+        # Installation task
+        if install_index is None and 'install' in task_name and 'openrgb' in task_name:
+            if task.module == 'apt':
+                install_index = task.index
+        # Hardware detection task
+        if hardware_detection_index is None and _lists_openrgb_devices(task):
+            hardware_detection_index = task.index
 
     # Assert - Proper ordering
     if install_index is not None and hardware_detection_index is not None:
@@ -126,14 +121,8 @@ def test_hardware_detection_should_only_run_after_successful_installation(rgb_co
     assert isinstance(rgb_control_tasks, list), "Tasks should be a list"
 
     # Act - Find hardware detection task
-    hardware_detection_task = None
-    for task in rgb_control_tasks:
-        if task and 'name' in task:
-            if 'command' in task or 'shell' in task:
-                command = task.get('command') or task.get('shell', '')
-                if 'openrgb' in command and ('list' in command or '-l' in command):
-                    hardware_detection_task = task
-                    break
+    hardware_detection_task = next(
+        (task for task in rgb_control_tasks if task.name and _lists_openrgb_devices(task)), None)
 
     # Assert - Task exists
     assert hardware_detection_task is not None, \
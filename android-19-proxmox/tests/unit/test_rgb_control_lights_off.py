@@ -4,16 +4,16 @@ These tests validate that the Ansible role properly turns off RGB/LED lights
 on Arctic fans, Arctic CPU cooler, and RAM when rgb_lights_state is "off".
 """
 import pytest
-import yaml
 from pathlib import Path
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def rgb_control_tasks(project_root):
     """Load RGB control task file."""
     tasks_file = project_root / "configuration-by-ansible" / "host-proxmox" / "tasks" / "rgb-control.yml"
-    with open(tasks_file) as f:
-        return yaml.safe_load(f)
+    return load_yaml(tasks_file)
 
 
 def test_should_turn_all_rgb_lights_off_when_state_is_off(rgb_control_tasks):
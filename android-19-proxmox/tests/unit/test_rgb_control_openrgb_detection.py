@@ -4,16 +4,16 @@ These tests validate that the Ansible role properly detects whether OpenRGB
 is already installed before attempting installation (idempotent behavior).
 """
 import pytest
-import yaml
 from pathlib import Path
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def rgb_control_tasks(project_root):
     """Load RGB control task file."""
     tasks_file = project_root / "configuration-by-ansible" / "host-proxmox" / "tasks" / "rgb-control.yml"
-    with open(tasks_file) as f:
-        return yaml.safe_load(f)
+    return load_yaml(tasks_file)
 
 
 def test_should_detect_openrgb_installation_status_before_attempting_install(rgb_control_tasks):
@@ -7,6 +7,8 @@ import pytest
 import yaml
 from pathlib import Path
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def host_proxmox_role_path(project_root):
@@ -32,8 +34,7 @@ def test_should_provide_rgb_control_task_structure_for_host_proxmox_role(host_pr
         f"RGB control task file should exist at {rgb_control_task_file}"
 
     # Act & Assert - Valid YAML
-    with open(rgb_control_task_file) as f:
-        content = yaml.safe_load(f)
+    content = load_yaml(rgb_control_task_file)
 
     # Assert - Basic structure (should be a list for Ansible tasks)
     assert isinstance(content, list), \
@@ -56,8 +57,7 @@ def test_should_define_rgb_control_default_variables_in_host_proxmox_role(host_p
     # Act
     assert defaults_file.exists(), "defaults/main.yml should exist"
 
-    with open(defaults_file) as f:
-        defaults = yaml.safe_load(f)
+    defaults = load_yaml(defaults_file)
 
     # Assert - Required RGB variables are defined
     assert 'rgb_lights_enabled' in defaults, \
@@ -0,0 +1,123 @@
+"""Tests for the indexed Ansible role model and rule engine (homelab.roles)."""
+import os
+
+import pytest
+
+from homelab.roles import RoleRule, evaluate, load_role
+
+MAIN = """\
+---
+- name: Check the thing
+  ansible.builtin.include_tasks: check.yml
+  tags: [demo, check]
+
+- name: Guarded work
+  when: thing_enabled | bool
+  tags: demo
+  block:
+    - name: Run the tool
+      ansible.builtin.command: tool --apply
+      register: tool_result
+      failed_when: false
+      when: not thing_done
+
+    - name: Show it
+      debug:
+        msg: "{{ tool_result.stdout }}"
+  rescue:
+    - name: Give up
+      ansible.builtin.fail:
+        msg: failed
+"""
+
+CHECK = """\
+---
+- name: Read the config
+  ansible.builtin.slurp:
+    src: /etc/thing.conf
+  register: thing_config
+
+- name: Remember whether it is done
+  set_fact:
+    thing_done: "{{ 'done' in (thing_config.content | b64decode) }}"
+"""
+
+
+@pytest.fixture
+def demo(tmp_path):
+    """A small role with an include, a guarded block and a rescue."""
+    tasks = tmp_path / "demo" / "tasks"
+    tasks.mkdir(parents=True)
+    (tasks / "main.yml").write_text(MAIN)
+    (tasks / "check.yml").write_text(CHECK)
+    (tmp_path / "demo" / "defaults").mkdir()
+    (tmp_path / "demo" / "defaults" / "main.yml").write_text("---\nthing_enabled: false\n")
+    return load_role("demo", root=tmp_path)
+
+
+def test_tasks_are_normalized(demo):
+    """FQCN modules collapse, free-form args land in _raw_params, fields resolve by path."""
+    tool = demo.registered("tool_result")
+
+    assert tool.module == "command"
+    assert tool.command == "tool --apply"
+    assert tool.get("failed_when") is False
+    assert demo.first(module="slurp").get("args.src") == "/etc/thing.conf"
+    assert demo.first(module="include_tasks").include == "check.yml"
+    assert demo.defaults == {"thing_enabled": False}
+
+
+def test_blocks_pass_when_and_tags_down(demo):
+    """Block and rescue tasks inherit the block's conditions and tags."""
+    tool = demo.registered("tool_result")
+
+    assert tool.when == ("thing_enabled | bool", "not thing_done")
+    assert tool.get("when") == "thing_enabled | bool and not thing_done"
+    assert demo.first(module="fail").tags == ("demo",)
+    assert [task.name for task in demo.find(tag="demo")] == [
+        "Check the thing", "Run the tool", "Show it", "Give up",
+    ]
+
+
+def test_indexes_and_flow(demo):
+    """Variables read by conditions are indexed; flow follows includes in order."""
+    assert demo.uses("thing_done") == [demo.registered("tool_result")]
+    assert len(demo.uses("thing_enabled")) == 3
+    assert [task.name for task in demo.flow()][:4] == [
+        "Check the thing", "Read the config", "Remember whether it is done", "Run the tool",
+    ]
+    with pytest.raises(KeyError, match="no task file 'missing.yml'"):
+        demo.tasks_in("missing.yml")
+
+
+def test_evaluate_checks_expectations_and_counts(demo):
+    """One pass reports unmet expectations and match counts per rule."""
+    rules = [
+        RoleRule("tool-checked", "tool output is registered", module="command",
+                 expect={"register": r"^\w+$", "failed_when": False}),
+        RoleRule("no-shell", "shell is not used", role="demo", module="shell", min_count=0, max_count=0),
+        RoleRule("tagged", "every task is tagged demo", role="demo", file="main.yml",
+                 expect={"tags": ["demo", "check"]}),
+        RoleRule("reads-config", "a config is read", role="demo", module="slurp", min_count=2),
+        RoleRule("other-role", "rules for absent roles fail", role="absent", min_count=0),
+    ]
+
+    results = evaluate(rules, {"demo": demo})
+
+    assert results["tool-checked"].ok and len(results["tool-checked"].matched) == 1
+    assert results["no-shell"].ok
+    assert len(results["tagged"].violations) == 3
+    assert results["reads-config"].violations == ["expected at least 2 matching task(s), found 1"]
+    assert results["other-role"].violations == ["role absent not found"]
+
+
+def test_load_role_reparses_on_change(demo, tmp_path):
+    """The indexed role is shared until one of its YAML files changes."""
+    assert load_role("demo", root=tmp_path) is demo
+
+    check = tmp_path / "demo" / "tasks" / "check.yml"
+    mtime = check.stat().st_mtime_ns
+    check.write_text("---\n- name: Only task\n  debug:\n    msg: hi\n")
+    os.utime(check, ns=(mtime, mtime + 1_000_000))
+
+    assert [task.name for task in load_role("demo", root=tmp_path).tasks_in("check.yml")] == ["Only task"]
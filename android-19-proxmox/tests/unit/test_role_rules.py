@@ -0,0 +1,50 @@
+"""Declarative structural rules over every Ansible role.
+
+Each rule selects tasks (role, file, module, tag, field patterns) and states
+what must hold for them; all rules are checked in a single pass over the
+indexed roles (homelab.roles), and each rule reports as its own test.
+"""
+import pytest
+
+from homelab.roles import RoleRule, evaluate
+
+RULES = [
+    RoleRule("systemd-units-world-readable", "unit files installed under /etc/systemd/system are mode 0644",
+             module=("template", "copy"), match={"args.dest": r"^/etc/systemd/system/"},
+             expect={"args.mode": "^0644$"}),
+    RoleRule("grub-backups-stay-local", "GRUB backups copy the file on the host and keep its mode",
+             module="copy", match={"args.src": "^/etc/default/grub$"},
+             expect={"args.remote_src": True, "args.dest": r"^/etc/default/grub\.backup\.", "args.mode": "preserve"},
+             min_count=2),
+    RoleRule("api-token-private", "the Proxmox API token file is only readable by root",
+             role="host-proxmox", module="copy", match={"args.dest": "proxmox-api-token"},
+             expect={"args.mode": "^0600$"}),
+    RoleRule("update-grub-checked", "update-grub registers its result and defines failure",
+             role="host-proxmox", file="grub-pcie-aspm-update.yml", module="command",
+             match={"command": "update-grub"}, expect={"register": r"^\w+$", "failed_when": r"\S"}),
+    RoleRule("pcie-aspm-guarded", "GRUB backup and edits are guarded on the pcie_aspm facts (idempotent)",
+             role="host-proxmox", module=("copy", "replace"), match={"file": "^grub-pcie-aspm-"},
+             expect={"when": r"\bpcie_aspm_\w+"}, min_count=3),
+    RoleRule("host-proxmox-includes-tagged", "every host-proxmox subsystem is tagged proxmox",
+             role="host-proxmox", file="main.yml", module="include_tasks",
+             expect={"tags": ["proxmox"]}, min_count=10),
+    RoleRule("hardware-control-opt-in", "LED/RGB control only runs when explicitly enabled",
+             role="host-proxmox", file="main.yml", tag="hardware",
+             expect={"when": r"default\(false\) \| bool"}, min_count=2),
+    RoleRule("legacy-node-exporter-stopped", "the tarball node_exporter is stopped in favour of the packaged one",
+             role="host-proxmox-monitoring", module="systemd", match={"args.name": "^node_exporter$"},
+             expect={"args.state": "stopped", "args.enabled": False}, min_count=1, max_count=1),
+]
+
+
+@pytest.fixture(scope="module")
+def results(roles):
+    """Outcome of every rule, evaluated once for the module."""
+    return evaluate(RULES, roles)
+
+
+@pytest.mark.parametrize("rule_id", [rule.id for rule in RULES])
+def test_role_rule(results, rule_id):
+    """The rule selects its expected number of tasks and all meet its expectations."""
+    result = results[rule_id]
+    assert result.ok, result.message
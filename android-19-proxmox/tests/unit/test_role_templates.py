@@ -0,0 +1,81 @@
+"""Render-and-validate checks for every role template (homelab.template_check)."""
+import os
+from pathlib import Path
+
+import pytest
+
+from homelab import template_check
+from homelab.template_check import (
+    REPO_ROOT,
+    check_templates,
+    detect_format,
+    discover_templates,
+    role_hosts,
+    validate,
+)
+
+TEMPLATES = [os.path.relpath(t, REPO_ROOT) for t in discover_templates()]
+
+
+@pytest.mark.parametrize("template", TEMPLATES, ids=[Path(t).name for t in TEMPLATES])
+def test_template_renders_valid_output(rendered_templates, template):
+    """Each template renders with role defaults + catalog and is valid for its format."""
+    result = rendered_templates[template]
+    assert result.ok, f"{template}: {result.error}"
+
+
+def test_every_format_is_validated():
+    """Templates are validated by real parsers, not only rendered."""
+    formats = {detect_format(Path(t)) for t in TEMPLATES}
+    assert {"yaml", "json", "systemd"} <= formats
+    assert "text" not in formats, "Every template should map to a validated format"
+
+
+@pytest.mark.parametrize("name, text", [
+    ("x.yml.j2", "key: [unclosed"),
+    ("x.json.j2", '{"a": 1,}'),
+    ("x.service.j2", "[Service]\nType=simple\n"),
+    ("x.service.j2", "ExecStart=/bin/true\n"),
+    ("x.sh.j2", "if true; then\n"),
+    ("x.conf.j2", "blacklist nouveau\nnonsense here\n"),
+    ("x.j2", "ARGS=ok\nnot an assignment\n"),
+])
+def test_validators_reject_broken_output(name, text):
+    """Broken output is reported with its format."""
+    error = validate(text, detect_format(Path(name)))
+    assert error and error.startswith(f"invalid {detect_format(Path(name))}"), error
+
+
+def test_systemd_validator_accepts_continuation_lines():
+    """ExecStart split with trailing backslashes is one setting."""
+    unit = "[Service]\nExecStart=/usr/bin/node_exporter \\\n    --collector.systemd\n"
+    assert validate(unit, "systemd") is None
+
+
+def test_role_hosts_come_from_playbooks():
+    """Host vars (for ansible_host etc.) come from a host the role runs on."""
+    hosts = role_hosts()
+    assert hosts["vm-coolify"] == "vm_coolify_platform"
+    assert hosts["lxc-adguard"] == "android19"
+
+
+def test_results_cached_until_template_changes(tmp_path, monkeypatch):
+    """Only templates whose inputs changed are rendered again."""
+    role = tmp_path / "roles" / "demo"
+    (role / "templates").mkdir(parents=True)
+    (role / "defaults").mkdir()
+    (role / "defaults" / "main.yml").write_text("port: 9100\n")
+    template = role / "templates" / "demo.service.j2"
+    template.write_text("[Service]\nExecStart=/bin/demo --port {{ port }}\n")
+    cache_file = tmp_path / "cache.json"
+    monkeypatch.setattr(template_check, "ROLES_DIR", tmp_path / "roles")
+
+    first = check_templates([template], workers=1, cache_file=cache_file)
+    second = check_templates([template], workers=1, cache_file=cache_file)
+    template.write_text("[Service]\nType=simple\n")
+    third = check_templates([template], workers=1, cache_file=cache_file)
+
+    (key,) = first
+    assert first[key].ok and not first[key].cached
+    assert second[key].cached
+    assert not third[key].cached and "ExecStart" in third[key].error
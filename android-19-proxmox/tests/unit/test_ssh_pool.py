@@ -0,0 +1,124 @@
+"""Tests for pooled SSH channels (homelab.ssh_pool) against a local stand-in."""
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from homelab.ssh_pool import SSHChannelError, SSHPool
+
+# Stands in for `ssh [options] user@host sh`: logs the connection, then runs
+# the remote command (a local shell) on the same stdin/stdout/stderr.
+FAKE_SSH = """\
+import os, sys
+target, remote = sys.argv[-2], sys.argv[-1]
+with open(os.environ["FAKE_SSH_LOG"], "a") as log:
+    log.write(target + "\\n")
+if target.startswith("nobody@"):
+    sys.stderr.write("Permission denied (publickey).\\n")
+    sys.exit(255)
+os.execvp(remote, [remote])
+"""
+
+
+@pytest.fixture
+def fake_ssh(tmp_path, monkeypatch):
+    """Pool whose ssh client is a local stand-in; returns (pool, connection log)."""
+    script = tmp_path / "fake_ssh.py"
+    script.write_text(FAKE_SSH)
+    log = tmp_path / "connections.log"
+    log.touch()
+    monkeypatch.setenv("FAKE_SSH_LOG", str(log))
+
+    pool = SSHPool(ssh_command=[sys.executable, str(script)])
+    yield pool, log
+    pool.close()
+
+
+def test_ssh_pool_reuses_connection_per_host(fake_ssh):
+    """Repeated commands to one user@host share a single connection."""
+    pool, log = fake_ssh
+
+    for _ in range(5):
+        assert pool.run("192.168.0.19", "true").returncode == 0
+    pool.run("192.168.0.160", "true", user="ubuntu")
+
+    assert log.read_text().splitlines() == ["root@192.168.0.19", "ubuntu@192.168.0.160"]
+
+
+def test_ssh_pool_result_matches_one_shot_ssh(fake_ssh):
+    """stdout, stderr and exit status are framed exactly per command."""
+    pool, _ = fake_ssh
+
+    result = pool.run("192.168.0.19", "printf 'no newline'; echo oops >&2; exit 3")
+    assert (result.returncode, result.stdout, result.stderr) == (3, "no newline", "oops\n")
+
+    result = pool.run("192.168.0.19", "echo 'SSH OK' | tr a-z A-Z")
+    assert (result.returncode, result.stdout, result.stderr) == (0, "SSH OK\n", "")
+
+
+def test_ssh_pool_commands_do_not_share_state(fake_ssh):
+    """Each command runs in its own shell like a fresh ssh invocation."""
+    pool, _ = fake_ssh
+
+    pool.run("192.168.0.19", "cd /tmp; export HOMELAB_MARK=1")
+    result = pool.run("192.168.0.19", "echo ${HOMELAB_MARK:-unset}; pwd")
+
+    assert result.stdout.split()[0] == "unset"
+    assert result.stdout.split()[1] != "/tmp"
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="needs bash")
+def test_ssh_pool_runs_commands_in_login_shell(fake_ssh, monkeypatch):
+    """Commands run in the user's $SHELL, as with one-shot ssh, so bash-isms keep working."""
+    pool, _ = fake_ssh
+    monkeypatch.setenv("SHELL", shutil.which("bash"))
+
+    result = pool.run("192.168.0.19", "set -o pipefail; [[ a == a ]] && echo {x,y}")
+
+    assert (result.returncode, result.stdout) == (0, "x y\n")
+
+
+def test_ssh_pool_reconnects_dead_channel(fake_ssh):
+    """A dropped connection is reopened transparently on the next command."""
+    pool, log = fake_ssh
+    pool.run("192.168.0.19", "true")
+    pool._channels[("root", "192.168.0.19")].process.kill()
+    pool._channels[("root", "192.168.0.19")].process.wait()
+
+    assert pool.run("192.168.0.19", "echo back").stdout == "back\n"
+    assert len(log.read_text().splitlines()) == 2
+
+
+def test_ssh_pool_reports_connection_failure(fake_ssh):
+    """Authentication failures surface as SSHChannelError with ssh's message."""
+    pool, _ = fake_ssh
+
+    with pytest.raises(SSHChannelError, match="Permission denied"):
+        pool.run("192.168.0.19", "true", user="nobody")
+
+
+def test_ssh_pool_timeout_discards_channel(fake_ssh):
+    """A timed-out command cannot leak its output into the next one."""
+    pool, log = fake_ssh
+    # Connect first so the count below does not depend on process start-up time
+    pool.run("192.168.0.19", "true")
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        pool.run("192.168.0.19", "sleep 5; echo late", timeout=0.2)
+
+    assert pool.run("192.168.0.19", "echo fresh").stdout == "fresh\n"
+    assert len(log.read_text().splitlines()) == 2
+
+
+def test_ssh_pool_records_latency(fake_ssh):
+    """Every command is timed; only the first to a host counts a connection."""
+    pool, _ = fake_ssh
+    for _ in range(3):
+        pool.run("192.168.0.19", "true")
+
+    summary = pool.latency_summary()["root@192.168.0.19"]
+    assert summary["commands"] == 3
+    assert summary["connections"] == 1
+    assert [t.connected for t in pool.timings] == [True, False, False]
+    assert 0 < summary["mean"] <= summary["max"]
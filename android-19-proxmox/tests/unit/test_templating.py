@@ -0,0 +1,85 @@
+"""Tests for the shared Jinja2 rendering service (homelab.templating)."""
+import pytest
+import yaml
+from jinja2.exceptions import SecurityError
+
+from homelab.templating import (
+    TemplateResolutionError,
+    compile_string,
+    render_file,
+    render_string,
+    resolve_vars,
+    role_vars,
+)
+
+
+@pytest.fixture(scope="module")
+def adguard_role_dir(project_root):
+    """Return the lxc-adguard role directory."""
+    return project_root / "configuration-by-ansible" / "lxc-adguard"
+
+
+def test_resolve_vars_follows_references_in_one_pass(catalog):
+    """Variables referring to other templated variables resolve in dependency order."""
+    variables = {
+        "c": "{{ b }}.lan",
+        "b": "{{ a | upper }}",
+        "a": "{{ catalog.services[125].name }}",
+        "ports": [53, "{{ port }}"],
+        "port": 3000,
+    }
+
+    resolved = resolve_vars(variables, {"catalog": catalog})
+
+    name = catalog["services"][125]["name"]
+    assert resolved["a"] == name
+    assert resolved["c"] == f"{name.upper()}.lan"
+    assert resolved["ports"] == [53, 3000], "Single expressions keep their native type"
+
+
+def test_resolve_vars_keeps_unresolvable_strings():
+    """Names that only exist at Ansible runtime are left for Ansible."""
+    variables = {"home": "{{ ansible_env.HOME }}/bin", "user": "{{ lookup('env', 'USER') }}"}
+
+    assert resolve_vars(variables) == variables
+
+
+def test_resolve_vars_rejects_cycles():
+    """Mutually referencing variables are reported instead of half-resolved."""
+    with pytest.raises(TemplateResolutionError, match="cycle"):
+        resolve_vars({"a": "{{ b }}", "b": "{{ a }}"})
+
+
+def test_compiled_templates_are_shared():
+    """The same source is compiled once."""
+    assert compile_string("{{ x }}") is compile_string("{{ x }}")
+    assert render_string("{{ x }}-{{ y }}", {"x": 1, "y": 2}) == "1-2"
+
+
+def test_ansible_filters():
+    """Common Ansible filters behave as under the template module."""
+    rendered = render_string(
+        "{{ data | to_yaml }}|{{ 'a: 1' | from_yaml }}|{{ 'yes' | bool }}|{{ missing | default('d') }}|"
+        "{{ '192.168.0.25/24' | ipaddr('netmask') }}|{{ 'nonsense' | ipaddr }}",
+        {"data": {"k": [1]}},
+    )
+
+    assert rendered == "k: [1]\n|{'a': 1}|True|d|255.255.255.0|False"
+
+
+def test_environment_is_sandboxed():
+    """Templates cannot reach Python internals."""
+    with pytest.raises(SecurityError):
+        render_string("{{ ''.__class__.__mro__[1].__subclasses__() }}", {})
+
+
+def test_role_vars_render_adguard_template(adguard_role_dir, catalog):
+    """Role defaults resolve against the catalog and render a valid config."""
+    variables = role_vars(adguard_role_dir, catalog, overrides={"adguard_dhcp_enabled": True})
+
+    config = yaml.safe_load(render_file(adguard_role_dir / "templates" / "AdGuardHome-minimal.yaml.j2",
+                                        variables))
+
+    assert config["dhcp"]["enabled"] is True
+    assert config["dhcp"]["dhcpv4"]["gateway_ip"] == catalog["network"]["gateway"]
+    assert variables["adguard_static_ip"] == catalog["services"][125]["ip"]
@@ -0,0 +1,156 @@
+"""Tests for the Terraform state rebuild (homelab.terraform_state)."""
+import json
+import subprocess
+
+import pytest
+
+from homelab.terraform_state import (
+    IMPORTS_FILE,
+    PLAN_FILE,
+    StateRebuildError,
+    import_all,
+    is_import_only,
+    list_guests,
+    plan_imports,
+    render_import_blocks,
+)
+
+
+class FakeSSH:
+    """Returns a canned pvesh listing and records the commands run."""
+
+    def __init__(self, returncode, stdout):
+        self.result = (returncode, stdout)
+        self.calls = []
+
+    def run(self, host, command, user="root", timeout=None):
+        self.calls.append(command)
+        return subprocess.CompletedProcess(command, self.result[0], self.result[1], "boom")
+
+
+class FakeTerraform:
+    """Scripted terraform: maps a subcommand to (returncode, stdout)."""
+
+    def __init__(self, version="1.9.0", plan=None):
+        self.calls = []
+        self.outputs = {
+            "version": (0, json.dumps({"terraform_version": version})),
+            "plan": (0, ""),
+            "show": (0, json.dumps(plan or {"resource_changes": []})),
+            "apply": (0, ""),
+            "import": (0, ""),
+        }
+
+    def __call__(self, args):
+        self.calls.append(args)
+        returncode, stdout = self.outputs[args[1]]
+        return subprocess.CompletedProcess(args, returncode, stdout, "")
+
+
+def _change(actions, importing=True):
+    change = {"actions": actions}
+    if importing:
+        change["importing"] = {"id": "pve/1"}
+    return {"change": change}
+
+
+def test_list_guests_uses_one_api_call(catalog_index):
+    """Every guest on the node comes from a single pvesh listing."""
+    listing = [
+        {"vmid": 125, "type": "lxc", "node": "pve"},
+        {"vmid": 140, "type": "qemu", "node": "pve"},
+        {"vmid": 900, "type": "qemu", "node": "other"},
+        {"id": "storage/pve/local", "type": "storage", "node": "pve"},
+    ]
+    ssh = FakeSSH(0, json.dumps(listing))
+
+    guests = list_guests(ssh, catalog_index.proxmox.ip, "pve")
+
+    assert guests == {125: "lxc", 140: "qemu"}
+    assert len(ssh.calls) == 1 and ssh.calls[0].startswith("pvesh get /cluster/resources")
+
+
+def test_list_guests_reports_failures(catalog_index):
+    """A failing listing raises instead of importing nothing silently."""
+    with pytest.raises(StateRebuildError, match="boom"):
+        list_guests(FakeSSH(255, ""), catalog_index.proxmox.ip, "pve")
+
+
+def test_plan_imports_sorts_services(catalog_index):
+    """Existing guests are imported unless already managed or of the wrong type."""
+    containers, vms = catalog_index.containers, catalog_index.vms
+    guests = {containers[0].id: "lxc", vms[0].id: "qemu", vms[1].id: "lxc"}
+    managed = ['proxmox_virtual_environment_container.containers["%d"]' % containers[0].id]
+
+    plan = plan_imports(catalog_index, guests, managed)
+
+    assert [s.id for s in plan.managed] == [containers[0].id]
+    assert [t.service.id for t in plan.imports] == [vms[0].id]
+    assert plan.imports[0].import_id == f"{catalog_index.proxmox.node_name}/{vms[0].id}"
+    assert [(s.id, kind) for s, kind in plan.conflicts] == [(vms[1].id, "lxc")]
+    assert len(plan.missing) == len(catalog_index) - 3
+
+
+def test_render_import_blocks(catalog_index):
+    """One import block per target with the provider's node/id import ID."""
+    plan = plan_imports(catalog_index, {s.id: "qemu" for s in catalog_index.vms}, [])
+
+    hcl = render_import_blocks(plan.imports)
+
+    assert hcl.count("import {") == len(catalog_index.vms)
+    vm = catalog_index.vms[0]
+    assert f'to = proxmox_virtual_environment_vm.vms["{vm.id}"]' in hcl
+    assert f'id = "{catalog_index.proxmox.node_name}/{vm.id}"' in hcl
+
+
+def test_is_import_only():
+    """Plans that also update, create or destroy need review."""
+    assert is_import_only({"resource_changes": [_change(["no-op"])]})
+    assert not is_import_only({"resource_changes": [_change(["update"])]})
+    assert not is_import_only({"resource_changes": [_change(["create"], importing=False)]})
+
+
+def test_import_all_runs_one_plan_and_apply(tmp_path, catalog_index):
+    """All imports share one targeted plan and one apply; imports.tf is removed afterwards."""
+    plan = plan_imports(catalog_index, {s.id: "qemu" for s in catalog_index.vms}, [])
+    terraform = FakeTerraform(plan={"resource_changes": [_change(["no-op"])]})
+
+    assert import_all(plan.imports, tmp_path, terraform)
+
+    subcommands = [args[1] for args in terraform.calls]
+    assert subcommands == ["version", "plan", "show", "apply"]
+    targets = [arg for arg in terraform.calls[1] if arg.startswith("-target=")]
+    assert len(targets) == len(plan.imports)
+    assert not (tmp_path / IMPORTS_FILE).exists()
+
+
+def test_import_all_leaves_drifting_plan_for_review(tmp_path, catalog_index):
+    """An import that would also update a guest is not applied without force, nor left behind."""
+    plan = plan_imports(catalog_index, {s.id: "qemu" for s in catalog_index.vms}, [])
+    terraform = FakeTerraform(plan={"resource_changes": [_change(["update"])]})
+    (tmp_path / PLAN_FILE).write_text("plan")
+
+    assert not import_all(plan.imports, tmp_path, terraform)
+    assert "apply" not in [args[1] for args in terraform.calls]
+    assert not (tmp_path / IMPORTS_FILE).exists()
+    assert not (tmp_path / PLAN_FILE).exists()
+
+
+def test_import_all_removes_import_blocks_on_failure(tmp_path, catalog_index):
+    """A failed plan does not leave import blocks for the next terraform apply."""
+    plan = plan_imports(catalog_index, {s.id: "qemu" for s in catalog_index.vms}, [])
+    terraform = FakeTerraform()
+    terraform.outputs["plan"] = (1, "")
+
+    with pytest.raises(StateRebuildError):
+        import_all(plan.imports, tmp_path, terraform)
+    assert not (tmp_path / IMPORTS_FILE).exists()
+
+
+def test_import_all_falls_back_for_old_terraform(tmp_path, catalog_index):
+    """Terraform without import blocks imports resource by resource."""
+    plan = plan_imports(catalog_index, {s.id: "qemu" for s in catalog_index.vms}, [])
+    terraform = FakeTerraform(version="1.4.6")
+
+    assert import_all(plan.imports, tmp_path, terraform)
+    assert [args[1] for args in terraform.calls].count("import") == len(plan.imports)
@@ -0,0 +1,89 @@
+"""Tests for the timing and budget plugin (tests/timing.py)."""
+import json
+
+import pytest
+
+from tests.timing import CACHE_KEY, budget_for, parse_budgets, regressions
+
+pytest_plugins = ["pytester"]
+
+CONFTEST = """
+from tests.conftest import pytest_addoption
+from tests.timing import TimingPlugin
+
+def pytest_configure(config):
+    config.pluginmanager.register(TimingPlugin(config), "homelab-timing")
+"""
+
+
+def test_budgets_match_longest_path():
+    """The most specific path's budget applies."""
+    budgets = parse_budgets(["tests/unit = 500", "tests/unit/slow_area/ = 3000"])
+
+    assert budget_for("tests/unit/test_a.py::test_x", budgets) == ("tests/unit/", 0.5)
+    assert budget_for("tests/unit/slow_area/test_b.py::test_y", budgets) == ("tests/unit/slow_area/", 3.0)
+    assert budget_for("tests/bdd/test_c.py::test_z", budgets) is None
+
+
+@pytest.mark.parametrize("line", ["tests/unit", "tests/unit = fast", "= 100"])
+def test_malformed_budget_rejected(line):
+    """Budget lines must be 'path = milliseconds'."""
+    with pytest.raises(pytest.UsageError, match="timing_budgets"):
+        parse_budgets([line])
+
+
+def test_regressions_ignore_noise():
+    """Only tests both relatively and absolutely slower are regressions."""
+    previous = {"a": {"call": 0.010}, "b": {"call": 0.200}, "c": {"call": 1.0}}
+    current = {"a": {"call": 0.040}, "b": {"setup": 0.1, "call": 0.300}, "c": {"call": 1.2}, "new": {"call": 5.0}}
+
+    assert regressions(previous, current) == [("b", 0.200, 0.400)]
+
+
+def test_budget_fails_slow_unit_tests(pytester):
+    """With --enforce-budgets over-budget tests fail; slow-marked tests and shared fixture setup are exempt."""
+    pytester.makeconftest(CONFTEST)
+    pytester.makeini("[pytest]\ntiming_budgets =\n    unit = 100\n")
+    pytester.mkpydir("unit")
+    pytester.path.joinpath("unit", "test_speed.py").write_text(
+        "import time, pytest\n"
+        "@pytest.fixture(scope='session')\n"
+        "def expensive():\n    time.sleep(0.3)\n"
+        "def test_fast(expensive):\n    pass\n"
+        "def test_sluggish():\n    time.sleep(0.3)\n"
+        "@pytest.mark.slow\n"
+        "def test_marked_slow():\n    time.sleep(0.3)\n"
+    )
+
+    result = pytester.runpytest("--timing-report", "--enforce-budgets")
+
+    result.assert_outcomes(passed=2, failed=1)
+    result.stdout.fnmatch_lines([
+        "*Timing budget exceeded: setup+call took * ms, the budget for unit/ is 100 ms*",
+        "*slowest fixtures*",
+        "*unit/test_speed.py::expensive  (session, 1x*",
+        "FAILED unit/test_speed.py::test_sluggish*",
+    ])
+    history = json.loads(pytester.path.joinpath(".pytest_cache", "v", CACHE_KEY).read_text())
+    assert len(history["runs"]) == 1
+    assert history["fixtures"]["unit/test_speed.py::expensive"]["scope"] == "session"
+
+
+def test_budget_warns_by_default_without_cache(pytester):
+    """By default an over-budget test passes with a warning; no cacheprovider means no history."""
+    pytester.makeconftest(CONFTEST)
+    pytester.makeini("[pytest]\ntiming_budgets =\n    unit = 100\n")
+    pytester.mkpydir("unit")
+    pytester.path.joinpath("unit", "test_speed.py").write_text(
+        "import time\n"
+        "def test_sluggish():\n    time.sleep(0.3)\n"
+    )
+
+    result = pytester.runpytest("-p", "no:cacheprovider")
+
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines([
+        "*timing budgets exceeded*",
+        "unit/test_speed.py::test_sluggish: Timing budget exceeded: setup+call took * ms*",
+    ])
+    assert not pytester.path.joinpath(".pytest_cache").exists()
@@ -3,6 +3,8 @@ import pytest
 from pathlib import Path
 import yaml
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def vm_coolify_role_path(project_root):
@@ -40,8 +42,7 @@ def test_should_verify_cloudinit_status_completed_successfully(vm_coolify_role_p
     """Should check cloud-init status shows 'done' before proceeding."""
     verify_cloudinit = vm_coolify_role_path / "tasks" / "verify-cloudinit.yml"
 
-    with open(verify_cloudinit, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(verify_cloudinit)
 
     # Find task that checks cloud-init status
     status_task = None
@@ -62,8 +63,7 @@ def test_should_verify_ssh_keys_installed_by_cloudinit(vm_coolify_role_path):
     """Should verify SSH authorized_keys file exists and is not empty."""
     verify_cloudinit = vm_coolify_role_path / "tasks" / "verify-cloudinit.yml"
 
-    with open(verify_cloudinit, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(verify_cloudinit)
 
     # Find task that checks SSH keys
     ssh_task = None
@@ -85,8 +85,7 @@ def test_should_verify_qemu_guest_agent_running(vm_coolify_role_path):
     """Should verify QEMU guest agent service is active for Proxmox integration."""
     verify_cloudinit = vm_coolify_role_path / "tasks" / "verify-cloudinit.yml"
 
-    with open(verify_cloudinit, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(verify_cloudinit)
 
     # Find task that checks guest agent
     agent_task = None
@@ -108,8 +107,7 @@ def test_should_verify_network_configuration_from_catalog(vm_coolify_role_path):
     """Should verify VM has expected IP address from infrastructure catalog."""
     verify_cloudinit = vm_coolify_role_path / "tasks" / "verify-cloudinit.yml"
 
-    with open(verify_cloudinit, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(verify_cloudinit)
 
     # Find task that checks network/IP
     network_task = None
@@ -127,8 +125,7 @@ def test_cloudinit_verification_should_fail_deployment_if_incomplete(vm_coolify_
     """Cloud-init verification tasks should fail deployment if preconditions not met."""
     verify_cloudinit = vm_coolify_role_path / "tasks" / "verify-cloudinit.yml"
 
-    with open(verify_cloudinit, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(verify_cloudinit)
 
     # Check that critical tasks have failure conditions
     has_failure_conditions = False
@@ -3,6 +3,8 @@ import pytest
 from pathlib import Path
 import yaml
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def vm_coolify_role_path(project_root):
@@ -106,8 +108,7 @@ def test_should_use_root_privileges_for_installation(vm_coolify_role_path):
     """Coolify installation tasks should use become: yes for root privileges."""
     install_coolify = vm_coolify_role_path / "tasks" / "install-coolify.yml"
 
-    with open(install_coolify, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(install_coolify)
 
     # Count tasks with become: yes
     privileged_tasks = 0
@@ -166,8 +167,7 @@ def test_coolify_installation_should_be_idempotent(vm_coolify_role_path):
     """Coolify installation tasks should be safe to run multiple times."""
     install_coolify = vm_coolify_role_path / "tasks" / "install-coolify.yml"
 
-    with open(install_coolify, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(install_coolify)
 
     # Check for idempotent patterns (when conditions, creates parameter, etc.)
     has_idempotent_patterns = False
@@ -224,8 +224,7 @@ def test_defaults_should_have_admin_account_configuration(vm_coolify_role_path):
     """Role defaults should include admin account configuration variables."""
     defaults_file = vm_coolify_role_path / "defaults" / "main.yml"
 
-    with open(defaults_file, 'r') as f:
-        defaults = yaml.safe_load(f)
+    defaults = load_yaml(defaults_file)
 
     # Should have admin username
     assert 'coolify_admin_username' in defaults, \
@@ -244,8 +243,7 @@ def test_web_port_should_be_8000(vm_coolify_role_path):
     """Coolify web UI port should be 8000 (default Coolify port)."""
     defaults_file = vm_coolify_role_path / "defaults" / "main.yml"
 
-    with open(defaults_file, 'r') as f:
-        defaults = yaml.safe_load(f)
+    defaults = load_yaml(defaults_file)
 
     assert 'coolify_web_port' in defaults, \
         "defaults/main.yml should define coolify_web_port"
@@ -1,8 +1,9 @@
 """Unit tests for vm-coolify DNS configuration tasks."""
 import pytest
-import yaml
 from pathlib import Path
 
+from homelab.yaml_loader import load_yaml
+
 @pytest.fixture
 def vm_coolify_role_path(project_root):
     """Path to vm-coolify Ansible role."""
@@ -52,13 +53,11 @@ def test_vm_coolify_main_yml_should_include_dns_tasks(vm_coolify_role_path):
 def test_dns_configure_yml_valid_yaml(vm_coolify_role_path):
     """dns-configure.yml should have valid YAML syntax."""
     dns_configure = vm_coolify_role_path / "tasks" / "dns-configure.yml"
-    with open(dns_configure, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(dns_configure)
     assert isinstance(tasks, list), "dns-configure.yml should contain a task list"
 
 def test_configure_docker_dns_yml_valid_yaml(vm_coolify_role_path):
     """configure-docker-dns.yml should have valid YAML syntax."""
     docker_dns = vm_coolify_role_path / "tasks" / "configure-docker-dns.yml"
-    with open(docker_dns, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(docker_dns)
     assert isinstance(tasks, list), "configure-docker-dns.yml should contain a task list"
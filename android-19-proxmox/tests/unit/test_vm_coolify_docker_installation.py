@@ -3,6 +3,8 @@ import pytest
 from pathlib import Path
 import yaml
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def vm_coolify_role_path(project_root):
@@ -83,8 +85,7 @@ def test_should_start_and_enable_docker_service(vm_coolify_role_path):
     """Should start Docker service and enable it for automatic boot."""
     install_docker = vm_coolify_role_path / "tasks" / "install-docker.yml"
 
-    with open(install_docker, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(install_docker)
 
     # Find systemd task for Docker service
     docker_service_task = None
@@ -130,8 +131,7 @@ def test_docker_installation_should_be_idempotent(vm_coolify_role_path):
     """Docker installation tasks should be safe to run multiple times."""
     install_docker = vm_coolify_role_path / "tasks" / "install-docker.yml"
 
-    with open(install_docker, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(install_docker)
 
     # Check for idempotent patterns (state=present, etc.)
     has_idempotent_tasks = False
@@ -163,8 +163,7 @@ def test_docker_installation_should_update_apt_cache_first(vm_coolify_role_path)
     """Should update apt package cache before installing Docker packages."""
     install_docker = vm_coolify_role_path / "tasks" / "install-docker.yml"
 
-    with open(install_docker, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(install_docker)
 
     # First few tasks should handle apt cache/repository setup
     # Look for update_cache or apt_repository tasks
@@ -1,15 +1,4 @@
 """Unit tests for vm-coolify-platform infrastructure catalog entry."""
-import pytest
-import yaml
-from pathlib import Path
-
-
-@pytest.fixture
-def catalog(project_root):
-    """Load infrastructure catalog."""
-    catalog_path = project_root / "infrastructure-catalog.yml"
-    with open(catalog_path) as f:
-        return yaml.safe_load(f)
 
 
 def test_vm_coolify_platform_exists_in_catalog(catalog):
@@ -1,7 +1,5 @@
 """Unit tests for vm-coolify Ansible role structure."""
 import pytest
-from pathlib import Path
-import yaml
 
 
 @pytest.fixture
@@ -10,6 +8,12 @@ def vm_coolify_role_path(project_root):
     return project_root / "configuration-by-ansible" / "vm-coolify"
 
 
+@pytest.fixture
+def vm_coolify(roles):
+    """Indexed vm-coolify role (defaults, task files and handlers parsed)."""
+    return roles["vm-coolify"]
+
+
 def test_vm_coolify_role_should_exist(vm_coolify_role_path):
     """vm-coolify role directory should exist following vm-* naming convention."""
     assert vm_coolify_role_path.exists(), \
@@ -60,39 +64,24 @@ def test_vm_coolify_should_have_handlers_main_yml(vm_coolify_role_path):
         "handlers/main.yml should be a file"
 
 
-def test_vm_coolify_defaults_main_yml_should_be_valid_yaml(vm_coolify_role_path):
+def test_vm_coolify_defaults_main_yml_should_be_valid_yaml(vm_coolify):
     """defaults/main.yml should have valid YAML syntax."""
-    defaults_main = vm_coolify_role_path / "defaults" / "main.yml"
-
-    with open(defaults_main, 'r') as f:
-        content = yaml.safe_load(f)
-
-    # Should be None (empty) or dict (with defaults)
-    assert content is None or isinstance(content, dict), \
+    # Parsed when the role was loaded; empty defaults become {}
+    assert isinstance(vm_coolify.defaults, dict), \
         "defaults/main.yml should contain valid YAML (empty or dict)"
 
 
-def test_vm_coolify_tasks_main_yml_should_be_valid_yaml(vm_coolify_role_path):
+def test_vm_coolify_tasks_main_yml_should_be_valid_yaml(vm_coolify):
     """tasks/main.yml should have valid YAML syntax."""
-    tasks_main = vm_coolify_role_path / "tasks" / "main.yml"
-
-    with open(tasks_main, 'r') as f:
-        content = yaml.safe_load(f)
-
-    # Should be None (empty), list (tasks), or dict
-    assert content is None or isinstance(content, (list, dict)), \
+    # Parsed into (possibly no) tasks when the role was loaded
+    assert isinstance(vm_coolify.files.get("main.yml"), list), \
         "tasks/main.yml should contain valid YAML"
 
 
-def test_vm_coolify_handlers_main_yml_should_be_valid_yaml(vm_coolify_role_path):
+def test_vm_coolify_handlers_main_yml_should_be_valid_yaml(vm_coolify):
     """handlers/main.yml should have valid YAML syntax."""
-    handlers_main = vm_coolify_role_path / "handlers" / "main.yml"
-
-    with open(handlers_main, 'r') as f:
-        content = yaml.safe_load(f)
-
-    # Should be None (empty), list (handlers), or dict
-    assert content is None or isinstance(content, (list, dict)), \
+    # Parsed into (possibly no) handlers when the role was loaded
+    assert isinstance(vm_coolify.handlers, list), \
         "handlers/main.yml should contain valid YAML"
 
 
@@ -1,8 +1,9 @@
 """Unit tests for vm-llm-aimachine Ansible role structure."""
 import pytest
-import yaml
 from pathlib import Path
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def role_dir(project_root):
@@ -25,8 +26,7 @@ def test_vm_llm_defaults_file_exists(role_dir):
 def test_vm_llm_defaults_valid_yaml(role_dir):
     """defaults/main.yml should be valid YAML."""
     defaults_file = role_dir / "defaults" / "main.yml"
-    with open(defaults_file, 'r') as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(defaults_file)
     assert data is not None, "defaults/main.yml should not be empty"
 
 
@@ -39,8 +39,7 @@ def test_vm_llm_tasks_main_exists(role_dir):
 def test_vm_llm_tasks_main_valid_yaml(role_dir):
     """tasks/main.yml should be valid YAML."""
     tasks_file = role_dir / "tasks" / "main.yml"
-    with open(tasks_file, 'r') as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(tasks_file)
     assert data is not None, "tasks/main.yml should not be empty"
     assert isinstance(data, list), "tasks/main.yml should contain a list of tasks"
 
@@ -74,8 +73,7 @@ def test_vm_llm_defaults_references_catalog(role_dir):
 def test_vm_llm_defaults_has_required_variables(role_dir):
     """defaults/main.yml should define required configuration variables."""
     defaults_file = role_dir / "defaults" / "main.yml"
-    with open(defaults_file, 'r') as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(defaults_file)
 
     # Should have configuration for NVIDIA drivers, vLLM, and Ollama
     # At minimum, should have some configuration structure
@@ -92,8 +90,7 @@ def test_gpu_passthrough_task_file_exists(role_dir):
 def test_gpu_passthrough_should_restart_vm_when_gpu_configured(role_dir):
     """GPU passthrough task should restart VM (stop/start) when GPU is newly configured."""
     gpu_task_file = role_dir / "tasks" / "gpu-passthrough.yml"
-    with open(gpu_task_file, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(gpu_task_file)
 
     assert tasks is not None, "gpu-passthrough.yml should not be empty"
     assert isinstance(tasks, list), "gpu-passthrough.yml should contain a list of tasks"
@@ -134,8 +131,7 @@ def test_gpu_passthrough_should_restart_vm_when_gpu_configured(role_dir):
 def test_gpu_passthrough_should_wait_for_vm_after_restart(role_dir):
     """GPU passthrough should wait for VM to boot after restart."""
     gpu_task_file = role_dir / "tasks" / "gpu-passthrough.yml"
-    with open(gpu_task_file, 'r') as f:
-        tasks = yaml.safe_load(f)
+    tasks = load_yaml(gpu_task_file)
 
     # Find wait task (after start task)
     has_wait_task = False
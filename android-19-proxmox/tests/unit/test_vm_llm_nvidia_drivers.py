@@ -1,8 +1,9 @@
 """Unit tests for NVIDIA driver installation tasks in vm-llm-aimachine role."""
 import pytest
-import yaml
 from pathlib import Path
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def nvidia_tasks_file(project_root):
@@ -17,8 +18,7 @@ def test_nvidia_drivers_task_file_exists(nvidia_tasks_file):
 
 def test_nvidia_drivers_task_valid_yaml(nvidia_tasks_file):
     """nvidia-drivers.yml should be valid YAML."""
-    with open(nvidia_tasks_file, 'r') as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(nvidia_tasks_file)
     assert data is not None, "nvidia-drivers.yml should not be empty"
     assert isinstance(data, list), "nvidia-drivers.yml should contain a list of tasks"
 
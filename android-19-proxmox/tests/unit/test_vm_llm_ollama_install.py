@@ -1,8 +1,9 @@
 """Unit tests for Ollama installation tasks in vm-llm-aimachine role."""
 import pytest
-import yaml
 from pathlib import Path
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def ollama_tasks_file(project_root):
@@ -17,8 +18,7 @@ def test_ollama_task_file_exists(ollama_tasks_file):
 
 def test_ollama_task_valid_yaml(ollama_tasks_file):
     """ollama-install.yml should be valid YAML."""
-    with open(ollama_tasks_file, 'r') as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(ollama_tasks_file)
     assert data is not None, "ollama-install.yml should not be empty"
     assert isinstance(data, list), "ollama-install.yml should contain a list of tasks"
 
@@ -1,8 +1,9 @@
 """Unit tests for Ollama model management tasks in vm-llm-aimachine role."""
 import pytest
-import yaml
 from pathlib import Path
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def ollama_models_file(project_root):
@@ -33,8 +34,7 @@ def test_ollama_models_task_file_exists(ollama_models_file):
 
 def test_ollama_models_valid_yaml(ollama_models_file):
     """ollama-models.yml should be valid YAML."""
-    with open(ollama_models_file, 'r') as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(ollama_models_file)
     assert data is not None, "ollama-models.yml should not be empty"
     assert isinstance(data, list), "ollama-models.yml should contain a list of tasks"
 
@@ -89,8 +89,7 @@ def test_ollama_models_uses_loop_for_multiple_models(ollama_models_file):
 
 def test_defaults_has_models_to_pull_config(defaults_file):
     """defaults/main.yml should have ollama_models_to_pull configuration."""
-    with open(defaults_file, 'r') as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(defaults_file)
     assert 'ollama_models_to_pull' in data, \
            "Should have ollama_models_to_pull configuration"
     assert isinstance(data['ollama_models_to_pull'], list), \
@@ -99,8 +98,7 @@ def test_defaults_has_models_to_pull_config(defaults_file):
 
 def test_defaults_has_deepseek_r1_model(defaults_file):
     """defaults/main.yml should include DeepSeek-R1:14B in models list."""
-    with open(defaults_file, 'r') as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(defaults_file)
     models = data.get('ollama_models_to_pull', [])
     assert any('deepseek-r1' in str(m).lower() for m in models), \
            "Should include deepseek-r1:14b in models list"
@@ -108,8 +106,7 @@ def test_defaults_has_deepseek_r1_model(defaults_file):
 
 def test_defaults_has_coding_agent_models(defaults_file):
     """defaults/main.yml should include coding agent models (Qwen, Llama, Nomic)."""
-    with open(defaults_file, 'r') as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(defaults_file)
     models = data.get('ollama_models_to_pull', [])
     model_str = str(models).lower()
     assert 'qwen2.5' in model_str, "Should include qwen2.5 coding model"
@@ -119,8 +116,7 @@ def test_defaults_has_coding_agent_models(defaults_file):
 
 def test_defaults_has_pull_on_deploy_flag(defaults_file):
     """defaults/main.yml should have ollama_pull_models_on_deploy flag."""
-    with open(defaults_file, 'r') as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(defaults_file)
     assert 'ollama_pull_models_on_deploy' in data, \
            "Should have ollama_pull_models_on_deploy flag"
     assert data['ollama_pull_models_on_deploy'] is True, \
@@ -129,8 +125,7 @@ def test_defaults_has_pull_on_deploy_flag(defaults_file):
 
 def test_defaults_has_model_pull_timeout(defaults_file):
     """defaults/main.yml should have ollama_model_pull_timeout for large downloads."""
-    with open(defaults_file, 'r') as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(defaults_file)
     assert 'ollama_model_pull_timeout' in data, \
            "Should have ollama_model_pull_timeout configuration"
     assert data['ollama_model_pull_timeout'] >= 1800, \
@@ -1,8 +1,9 @@
 """Unit tests for vLLM installation tasks in vm-llm-aimachine role."""
 import pytest
-import yaml
 from pathlib import Path
 
+from homelab.yaml_loader import load_yaml
+
 
 @pytest.fixture
 def vllm_tasks_file(project_root):
@@ -17,8 +18,7 @@ def test_vllm_task_file_exists(vllm_tasks_file):
 
 def test_vllm_task_valid_yaml(vllm_tasks_file):
     """vllm-install.yml should be valid YAML."""
-    with open(vllm_tasks_file, 'r') as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(vllm_tasks_file)
     assert data is not None, "vllm-install.yml should not be empty"
     assert isinstance(data, list), "vllm-install.yml should contain a list of tasks"
 
@@ -0,0 +1,115 @@
+"""Tests for the cached YAML loader (homelab.yaml_loader)."""
+import os
+
+import pytest
+import yaml
+
+from homelab import yaml_loader
+
+
+@pytest.fixture
+def isolated_loader(tmp_path):
+    """Loader with an empty memory cache and a private disk cache."""
+    previous = yaml_loader._cache_dir
+    yaml_loader.clear_memory_cache()
+    yaml_loader.set_cache_dir(tmp_path / "cache")
+    yield yaml_loader
+    yaml_loader.clear_memory_cache()
+    yaml_loader.set_cache_dir(previous)
+
+
+def _forbid_parsing(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("YAML should have been served from cache")
+    monkeypatch.setattr(yaml_loader.yaml, "load", fail)
+
+
+def test_load_yaml_returns_independent_copies(isolated_loader, tmp_path):
+    """Callers can mutate results without corrupting the cache."""
+    path = tmp_path / "defaults.yml"
+    path.write_text("packages:\n  - curl\n")
+
+    first = isolated_loader.load_yaml(path)
+    first["packages"].append("git")
+
+    assert isolated_loader.load_yaml(path) == {"packages": ["curl"]}
+
+
+def test_load_yaml_warm_run_skips_parsing(isolated_loader, tmp_path, monkeypatch):
+    """A new process (empty memory cache) is served from the disk cache."""
+    path = tmp_path / "tasks.yml"
+    path.write_text("- name: Install\n  apt:\n    name: curl\n")
+    expected = isolated_loader.load_yaml(path)
+
+    isolated_loader.clear_memory_cache()
+    _forbid_parsing(monkeypatch)
+
+    assert isolated_loader.load_yaml(path) == expected
+
+
+def test_load_yaml_reparses_changed_file(isolated_loader, tmp_path):
+    """Editing a file invalidates both cache levels."""
+    path = tmp_path / "defaults.yml"
+    path.write_text("enabled: false\n")
+    assert isolated_loader.load_yaml(path) == {"enabled": False}
+
+    path.write_text("enabled: true\n")
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1_000_000))
+
+    assert isolated_loader.load_yaml(path) == {"enabled": True}
+
+
+def test_load_yaml_matches_safe_load(isolated_loader, project_root):
+    """Cached results are identical to a plain yaml.safe_load."""
+    defaults = project_root / "configuration-by-ansible" / "lxc-adguard" / "defaults" / "main.yml"
+
+    with open(defaults) as f:
+        assert isolated_loader.load_yaml(defaults) == yaml.safe_load(f)
+
+
+def test_load_yaml_raises_on_invalid_yaml(isolated_loader, tmp_path):
+    """Parse errors propagate as yaml.YAMLError and are not cached."""
+    path = tmp_path / "broken.yml"
+    path.write_text("key: [unclosed\n")
+
+    with pytest.raises(yaml.YAMLError):
+        isolated_loader.load_yaml(path)
+    assert not list((tmp_path / "cache").iterdir())
+
+
+def test_snapshot_is_attached_without_parsing(isolated_loader, tmp_path, monkeypatch):
+    """Workers attaching the controller's snapshot never parse the files."""
+    files = []
+    for i in range(3):
+        path = tmp_path / "role" / f"vars{i}.yml"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(f"index: {i}\n")
+        files.append(path)
+    (tmp_path / "role" / "broken.yaml").write_text("key: [unclosed\n")
+
+    snapshot = isolated_loader.build_snapshot(isolated_loader.discover_yaml(tmp_path / "role"),
+                                              tmp_path / "snapshots")
+    assert isolated_loader.build_snapshot(files + [tmp_path / "role" / "broken.yaml"],
+                                          tmp_path / "snapshots") == snapshot, \
+        "Unchanged files should reuse the existing snapshot"
+
+    isolated_loader.clear_memory_cache()
+    isolated_loader.set_cache_dir(None)
+    _forbid_parsing(monkeypatch)
+    assert isolated_loader.attach_snapshot(snapshot) == 3
+    assert [isolated_loader.load_yaml(path) for path in files] == [{"index": i} for i in range(3)]
+
+
+def test_snapshot_entries_are_revalidated(isolated_loader, tmp_path):
+    """A file edited after the snapshot was built is parsed again."""
+    path = tmp_path / "defaults.yml"
+    path.write_text("enabled: false\n")
+    snapshot = isolated_loader.build_snapshot([path], tmp_path / "snapshots")
+
+    path.write_text("enabled: true\n")
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1_000_000))
+    isolated_loader.clear_memory_cache()
+    isolated_loader.attach_snapshot(snapshot)
+
+    assert isolated_loader.load_yaml(path) == {"enabled": True}
+    assert isolated_loader.attach_snapshot(tmp_path / "missing.pickle") == 0
@@ -0,0 +1,16 @@
+"""Shared fixtures for repository-level tests."""
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "android-19-proxmox"))
+
+from homelab.makefile import load_makefile  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def makefile():
+    """Parsed repository Makefile shared by all tests."""
+    return load_makefile(REPO_ROOT / "Makefile")
@@ -5,12 +5,10 @@ Tests ensure all Makefile targets follow the established pattern of executing
 commands through the Docker development container instead of directly on the host.
 """
 
-import os
 import re
-from pathlib import Path
 
 
-def test_should_execute_setup_ssh_in_container_when_target_invoked():
+def test_should_execute_setup_ssh_in_container_when_target_invoked(makefile):
     """
     Validates that setup-ssh target executes the script inside the container.
 
@@ -21,28 +19,11 @@ def test_should_execute_setup_ssh_in_container_when_target_invoked():
     CURRENT STATE: Currently uses direct bash execution (non-compliant)
     EXPECTED: Should use containerized execution pattern
     """
-    # Get Makefile path
-    project_root = Path(__file__).parent.parent.parent
-    makefile_path = project_root / "Makefile"
-
-    assert makefile_path.exists(), f"Makefile not found at {makefile_path}"
-
-    # Read Makefile
-    with open(makefile_path, 'r') as f:
-        makefile_content = f.read()
-
-    # Find the setup-ssh target
-    # Pattern: setup-ssh: (anything) followed by the command
-    setup_ssh_pattern = r'setup-ssh:.*?\n\t(.+?)(?:\n[^\t]|\n$)'
-    match = re.search(setup_ssh_pattern, makefile_content, re.DOTALL)
-
-    assert match, "setup-ssh target not found in Makefile"
-
-    command = match.group(1).strip()
+    command = makefile.recipe("setup-ssh")[0]
 
     # Check that command does NOT use direct bash execution
     # Direct bash execution looks like: @bash scripts/...
-    assert not re.match(r'@?bash\s+scripts/', command), \
+    assert not re.match(r'bash\s+scripts/', command), \
         f"setup-ssh uses direct bash execution (non-compliant): {command}"
 
     # Check that command DOES use container execution pattern
@@ -57,7 +38,7 @@ def test_should_execute_setup_ssh_in_container_when_target_invoked():
         f"setup-ssh should execute in homelab-dev container: {command}"
 
 
-def test_should_not_use_direct_docker_commands_when_cleaning_environment():
+def test_should_not_use_direct_docker_commands_when_cleaning_environment(makefile):
     """
     Validates that env-clean target does not use direct docker commands on host.
 
@@ -72,24 +53,8 @@ def test_should_not_use_direct_docker_commands_when_cleaning_environment():
     CURRENT STATE: Uses 'docker system prune -f' (non-compliant)
     EXPECTED: Should only use $(DOCKER_COMPOSE) commands
     """
-    # Get Makefile path
-    project_root = Path(__file__).parent.parent.parent
-    makefile_path = project_root / "Makefile"
-
-    assert makefile_path.exists(), f"Makefile not found at {makefile_path}"
-
-    # Read Makefile
-    with open(makefile_path, 'r') as f:
-        makefile_content = f.read()
-
-    # Find the env-clean target with all its commands
-    # Pattern: env-clean: (anything) followed by all tab-indented commands
-    env_clean_pattern = r'env-clean:.*?\n((?:\t.+\n)+)'
-    match = re.search(env_clean_pattern, makefile_content, re.MULTILINE)
-
-    assert match, "env-clean target not found in Makefile"
-
-    commands_block = match.group(1)
+    commands = makefile.recipe("env-clean")
+    assert commands, "env-clean target has no commands"
 
     # Check that NO direct 'docker' commands are used
     # Direct docker commands look like: docker <subcommand>
@@ -97,15 +62,13 @@ def test_should_not_use_direct_docker_commands_when_cleaning_environment():
     # Pattern: match 'docker' NOT preceded by $( or other make variable syntax
     direct_docker_pattern = r'(?<!\$\()(?<!\w)docker\s+'
 
-    direct_docker_match = re.search(direct_docker_pattern, commands_block)
+    violations = [command for command in commands if re.search(direct_docker_pattern, command)]
 
-    assert not direct_docker_match, \
-        f"env-clean uses direct docker command (non-compliant). " \
-        f"Found: {direct_docker_match.group(0) if direct_docker_match else 'N/A'}. " \
-        f"Commands block: {commands_block.strip()}"
+    assert not violations, \
+        f"env-clean uses direct docker command (non-compliant): {violations}"
 
 
-def test_should_use_ansible_variables_when_running_ansible_commands():
+def test_should_use_ansible_variables_when_running_ansible_commands(makefile):
     """
     Validates that all Ansible commands use container execution variables.
 
@@ -120,43 +83,19 @@ def test_should_use_ansible_variables_when_running_ansible_commands():
     EXPECTED: All ansible/ansible-playbook commands should be preceded by
     $(ANSIBLE_EXEC) or $(ANSIBLE_INTERACTIVE) variables
     """
-    # Get Makefile path
-    project_root = Path(__file__).parent.parent.parent
-    makefile_path = project_root / "Makefile"
-
-    assert makefile_path.exists(), f"Makefile not found at {makefile_path}"
-
-    # Read Makefile
-    with open(makefile_path, 'r') as f:
-        makefile_content = f.read()
-
-    # Extract all command lines (tab-indented lines)
-    # Pattern: lines starting with tab
-    command_lines = []
-    for line in makefile_content.split('\n'):
-        if line.startswith('\t'):
-            command_lines.append(line.strip())
-
-    # Check for direct ansible/ansible-playbook commands
-    # Pattern: 'ansible' or 'ansible-playbook' NOT preceded by $(
-    # We need to exclude $(ANSIBLE_EXEC) and $(ANSIBLE_INTERACTIVE)
     violations = []
-    for line_num, line in enumerate(command_lines, 1):
-        # Skip variable definitions, comments, and echo statements
-        if line.startswith('#') or ':=' in line:
+    for rule, command in makefile.commands():
+        # Skip echo statements (they may mention 'ansible' in messages)
+        if re.match(r'echo\s+', command):
             continue
 
-        # Skip echo statements (they may mention 'ansible' in messages)
-        if re.match(r'@?echo\s+', line):
+        # Ensure it's used with a variable (contains $(ANSIBLE_)
+        if '$(ANSIBLE_EXEC)' in command or '$(ANSIBLE_INTERACTIVE)' in command:
             continue
 
-        # Check if line contains 'ansible' or 'ansible-playbook'
-        if 'ansible' in line.lower():
-            # Ensure it's used with a variable (contains $(ANSIBLE_)
-            if '$(ANSIBLE_EXEC)' not in line and '$(ANSIBLE_INTERACTIVE)' not in line:
-                # Check if it's an actual ansible command (not just word 'ansible' in a path)
-                if re.search(r'\bansible\b|\bansible-playbook\b', line, re.IGNORECASE):
-                    violations.append(f"Line {line_num}: {line}")
+        # Check if it's an actual ansible command (not just word 'ansible' in a path)
+        if re.search(r'\bansible\b|\bansible-playbook\b', command, re.IGNORECASE):
+            violations.append(f"{rule.name}: {command}")
 
     assert len(violations) == 0, \
         f"Found {len(violations)} Ansible command(s) not using container variables:\n" + \
@@ -164,7 +103,7 @@ def test_should_use_ansible_variables_when_running_ansible_commands():
         "\n\nAll Ansible commands must use $(ANSIBLE_EXEC) or $(ANSIBLE_INTERACTIVE)"
 
 
-def test_should_use_docker_compose_exec_when_running_terraform_commands():
+def test_should_use_docker_compose_exec_when_running_terraform_commands(makefile):
     """
     Validates that all Terraform commands use container execution pattern.
 
@@ -179,55 +118,26 @@ def test_should_use_docker_compose_exec_when_running_terraform_commands():
 
     EXPECTED PATTERN: $(DOCKER_COMPOSE) exec -T homelab-dev sh -c "cd ... && terraform ..."
     """
-    # Get Makefile path
-    project_root = Path(__file__).parent.parent.parent
-    makefile_path = project_root / "Makefile"
-
-    assert makefile_path.exists(), f"Makefile not found at {makefile_path}"
-
-    # Read Makefile
-    with open(makefile_path, 'r') as f:
-        makefile_content = f.read()
-
-    # Extract all command lines (tab-indented lines)
-    command_lines = []
-    for line in makefile_content.split('\n'):
-        if line.startswith('\t'):
-            command_lines.append(line.strip())
-
-    # Check for direct terraform commands
     violations = []
-    for line_num, line in enumerate(command_lines, 1):
-        # Skip variable definitions, comments, and echo statements
-        if line.startswith('#') or ':=' in line:
-            continue
-
+    for rule, command in makefile.commands():
         # Skip echo statements (they may mention 'terraform' in messages)
-        if re.match(r'@?echo\s+', line):
+        # and $(MAKE) commands (they may have 'Terraform' in section names)
+        if re.match(r'echo\s+', command) or '$(MAKE)' in command:
             continue
 
-        # Skip $(MAKE) commands (they may have 'Terraform' in section names)
-        if '$(MAKE)' in line:
+        # Check if line contains actual 'terraform' command (not just the word in quotes)
+        if not re.search(r'\bterraform\s+', command, re.IGNORECASE):
             continue
 
-        # Check if line contains actual 'terraform' command (not just the word in quotes)
-        # Look for terraform as a command, not just anywhere in the line
-        if re.search(r'\bterraform\s+', line, re.IGNORECASE):
-            # Ensure it uses $(DOCKER_COMPOSE) exec pattern
-            if '$(DOCKER_COMPOSE)' not in line:
-                violations.append(f"Line {line_num}: Missing $(DOCKER_COMPOSE) - {line}")
-                continue
-
-            # Ensure it uses exec
-            if 'exec' not in line:
-                violations.append(f"Line {line_num}: Missing 'exec' - {line}")
-                continue
-
-            # Ensure it uses sh -c wrapper for directory changes
-            # (This is important for cd commands before terraform)
-            if 'sh -c' not in line:
-                violations.append(f"Line {line_num}: Missing 'sh -c' wrapper - {line}")
-                continue
+        # Ensure it uses $(DOCKER_COMPOSE) exec pattern
+        if '$(DOCKER_COMPOSE)' not in command:
+            violations.append(f"{rule.name}: Missing $(DOCKER_COMPOSE) - {command}")
+        elif 'exec' not in command:
+            violations.append(f"{rule.name}: Missing 'exec' - {command}")
+        # Ensure it uses sh -c wrapper for directory changes
+        # (This is important for cd commands before terraform)
+        elif 'sh -c' not in command:
+            violations.append(f"{rule.name}: Missing 'sh -c' wrapper - {command}")
 
     assert len(violations) == 0, \
         f"Found {len(violations)} Terraform command(s) not using container pattern:\n" + \
@@ -235,7 +145,7 @@ def test_should_use_docker_compose_exec_when_running_terraform_commands():
         "\n\nAll Terraform commands must use $(DOCKER_COMPOSE) exec -T homelab-dev sh -c pattern"
 
 
-def test_should_not_have_any_direct_host_command_execution():
+def test_should_not_have_any_direct_host_command_execution(makefile):
     """
     Comprehensive validation: No direct host command execution allowed.
 
@@ -259,52 +169,27 @@ def test_should_not_have_any_direct_host_command_execution():
 
     Related to specs/makefile-command-standardization/spec.md (Scenario 7)
     """
-    # Get Makefile path
-    project_root = Path(__file__).parent.parent.parent
-    makefile_path = project_root / "Makefile"
-
-    assert makefile_path.exists(), f"Makefile not found at {makefile_path}"
-
-    # Read Makefile
-    with open(makefile_path, 'r') as f:
-        makefile_content = f.read()
-
-    # Extract all command lines (tab-indented lines)
-    command_lines = []
-    for line in makefile_content.split('\n'):
-        if line.startswith('\t'):
-            command_lines.append(line.strip())
-
     # Define prohibited direct command patterns
     # These commands should NEVER run directly on the host
     prohibited_commands = {
         'ssh': r'\bssh\s+',
     }
 
-    # Check each command line for violations
     violations = []
-
-    for line_num, line in enumerate(command_lines, 1):
-        # Skip comments, variable definitions
-        if line.startswith('#') or ':=' in line:
-            continue
-
+    for rule, command in makefile.commands():
         # Skip echo statements (may mention command names)
-        if re.match(r'@?echo\s+', line):
-            continue
-
-        # Skip $(MAKE) commands (internal make recursion)
-        if '$(MAKE)' in line:
+        # and $(MAKE) commands (internal make recursion)
+        if re.match(r'echo\s+', command) or '$(MAKE)' in command:
             continue
 
         # Skip lines that already use approved container patterns
-        if '$(DOCKER_COMPOSE)' in line or '$(ANSIBLE_EXEC)' in line or '$(ANSIBLE_INTERACTIVE)' in line:
+        if '$(DOCKER_COMPOSE)' in command or '$(ANSIBLE_EXEC)' in command or '$(ANSIBLE_INTERACTIVE)' in command:
             continue
 
         # Check for prohibited direct command patterns
         for cmd_name, cmd_pattern in prohibited_commands.items():
-            if re.search(cmd_pattern, line):
-                violations.append(f"Line {line_num}: Direct '{cmd_name}' command - {line}")
+            if re.search(cmd_pattern, command):
+                violations.append(f"{rule.name}: Direct '{cmd_name}' command - {command}")
 
     assert len(violations) == 0, \
         f"Found {len(violations)} direct host command(s) violating container execution policy:\n" + \